@@ -54,6 +54,27 @@ class APISettings(BaseSettings):
     cache_ttl_search: int = Field(default=300, alias="API_CACHE_TTL_SEARCH")  # 5 min
     cache_ttl_recommend: int = Field(default=120, alias="API_CACHE_TTL_RECOMMEND")  # 2 min
     cache_ttl_product: int = Field(default=3600, alias="API_CACHE_TTL_PRODUCT")  # 1 hour
+    max_batch_size: int = Field(default=100, alias="API_MAX_BATCH_SIZE")  # items per batch request
+
+    # Blocking work executor (per-stage thread pools; workers = concurrency limit)
+    executor_encode_workers: int = Field(default=2, alias="API_EXECUTOR_ENCODE_WORKERS")
+    executor_search_workers: int = Field(default=4, alias="API_EXECUTOR_SEARCH_WORKERS")
+    executor_db_workers: int = Field(default=16, alias="API_EXECUTOR_DB_WORKERS")
+    executor_max_queue: int = Field(default=256, alias="API_EXECUTOR_MAX_QUEUE")  # per stage
+
+    # Startup warm-up (runs in the background; /ready reports not ready until it completes)
+    warmup_enabled: bool = Field(default=True, alias="API_WARMUP_ENABLED")
+    warmup_queries: List[str] = Field(
+        default=["dress", "running shoes", "leather handbag", "summer shirt"],
+        alias="API_WARMUP_QUERIES",
+    )  # synthetic queries, also cache-warmed
+    warmup_popular_queries: int = Field(default=50, alias="API_WARMUP_POPULAR_QUERIES")
+    warmup_iterations: int = Field(default=3, alias="API_WARMUP_ITERATIONS")
+    # Failed index loads are retried with exponential backoff (readiness waits for them)
+    warmup_index_retry_seconds: float = Field(default=5.0, alias="API_WARMUP_INDEX_RETRY_SECONDS")
+    warmup_index_retry_max_seconds: float = Field(
+        default=300.0, alias="API_WARMUP_INDEX_RETRY_MAX_SECONDS"
+    )
 
     # Rate limiting
     enable_rate_limit: bool = Field(default=True, alias="API_ENABLE_RATE_LIMIT")
@@ -81,10 +102,10 @@ class APISettings(BaseSettings):
     enable_personalization: bool = Field(default=True, alias="API_ENABLE_PERSONALIZATION")
     enable_feedback: bool = Field(default=True, alias="API_ENABLE_FEEDBACK")
 
-    @field_validator("cors_origins", mode="before")
+    @field_validator("cors_origins", "warmup_queries", mode="before")
     @classmethod
     def parse_cors_origins(cls, v: Any) -> List[str]:
-        """Parse CORS origins from JSON string or list."""
+        """Parse CORS origins (or warm-up queries) from JSON string or list."""
         if isinstance(v, str):
             try:
                 return json.loads(v)
@@ -13,10 +13,10 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from ..db.models import User
 from ..ml.caching import EmbeddingCache
-from ..ml.retrieval import get_index_manager
 from ..ml.search import SearchService
 from .config import APISettings, get_settings
 from .security import verify_token
+from .services.container import ServiceContainer, get_service_container
 
 logger = logging.getLogger(__name__)
 
@@ -67,34 +67,32 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_search_service(db: Session = Depends(get_db)) -> SearchService:
+def get_services() -> ServiceContainer:
+    """
+    Get the application-lifetime service container.
+
+    The container is built in the application lifespan; this builds it on first
+    use when running without one (scripts, tests).
+    """
+    return get_service_container(db_session_factory=get_session_factory())
+
+
+def get_search_service(services: ServiceContainer = Depends(get_services)) -> SearchService:
     """
     Get search service instance.
 
+    The service is shared by all requests; the FAISS index is loaded lazily by
+    the first search that needs it.
+
     Use as FastAPI dependency:
         @app.post("/search")
         def search(service: SearchService = Depends(get_search_service)):
             ...
     """
-    settings = get_settings()
-
-    # Create session factory for the service
-    SessionLocal = get_session_factory()
-
-    service = SearchService(db_session_factory=SessionLocal)
-
-    # Ensure FAISS index is loaded
-    try:
-        index_manager = get_index_manager()
-        index_manager.ensure_index_loaded(session=db)
-    except Exception as e:
-        logger.error(f"Failed to load FAISS index: {e}")
-        # Don't fail the request, but log the error
-
-    return service
+    return services.search_service
 
 
-def get_embedding_cache() -> EmbeddingCache:
+def get_embedding_cache(services: ServiceContainer = Depends(get_services)) -> EmbeddingCache:
     """
     Get embedding cache instance.
 
@@ -103,7 +101,7 @@ def get_embedding_cache() -> EmbeddingCache:
         def endpoint(cache: EmbeddingCache = Depends(get_embedding_cache)):
             ...
     """
-    return EmbeddingCache()
+    return services.embedding_cache
 
 
 def verify_api_key(
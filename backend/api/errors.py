@@ -65,6 +65,17 @@ class InvalidRequestError(APIError):
         super().__init__(message=message, status_code=status.HTTP_400_BAD_REQUEST, details=details)
 
 
+class ServiceOverloadedError(APIError):
+    """Exception raised when a processing stage has too much queued work."""
+
+    def __init__(self, stage: str, queued: int):
+        super().__init__(
+            message=f"Service overloaded ({stage} queue full), retry later",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            details={"stage": stage, "queued": queued},
+        )
+
+
 def setup_error_handlers(app: FastAPI) -> None:
     """
     Set up custom error handlers for the FastAPI app.
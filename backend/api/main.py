@@ -55,6 +55,12 @@ async def lifespan(app: FastAPI):
 
     settings = get_settings()
 
+    # Build shared services once instead of per request
+    from .dependencies import get_session_factory
+    from .services.container import init_service_container
+
+    app.state.services = init_service_container(db_session_factory=get_session_factory())
+
     # Pre-load CLIP model if PRELOAD_CLIP_MODEL environment variable is set
     # This is useful for local development to avoid blocking requests during first model load
     # In production (Cloud Run), concurrent request handling makes this unnecessary
@@ -76,11 +82,59 @@ async def lifespan(app: FastAPI):
         # This prevents memory issues during startup and allows the app to start quickly
         logger.info("GreenThumb ML API started successfully (FAISS index will load on-demand)")
 
+    # Load the index and model and prime caches in the background.
+    # /ready reports not ready until this has finished.
+    warmup = None
+    if settings.warmup_enabled:
+        from .services.warmup import start_warmup
+
+        warmup = start_warmup(app.state.services, settings=settings)
+
+    # Apply incremental product updates to the FAISS index as they are published.
+    # The consumer idles until the index has been loaded.
+    delta_consumer = None
+    try:
+        index_manager = get_index_manager()
+        if index_manager.config.storage.faiss_delta_updates_enabled:
+            from ..ml.retrieval.index_updates import IndexDeltaConsumer
+
+            delta_consumer = IndexDeltaConsumer(index_manager)
+            delta_consumer.start()
+    except Exception as e:
+        logger.warning(f"Incremental FAISS index updates disabled: {e}")
+
+    # Drop changed products from the in-process metadata cache as they are published
+    metadata_cache = app.state.services.metadata_service.metadata_cache
+    metadata_cache.start_invalidation_listener()
+
     yield
 
     # Shutdown
     logger.info("Shutting down GreenThumb ML API...")
 
+    if warmup is not None:
+        warmup.stop()
+
+    # Let the next instance warm its caches with this one's popular queries
+    app.state.services.cache_service.persist_popular_queries(settings.warmup_popular_queries)
+
+    from ..ml.encoder_scheduler import get_text_encoding_scheduler
+
+    get_text_encoding_scheduler().stop()
+
+    from .services.executor import shutdown_stage_executor
+
+    shutdown_stage_executor()
+
+    from .services.container import reset_service_container
+
+    reset_service_container()
+
+    if delta_consumer is not None:
+        delta_consumer.stop()
+
+    metadata_cache.stop_invalidation_listener()
+
 
 def create_app() -> FastAPI:
     """
@@ -3,20 +3,37 @@ Pydantic Models
 Request/response models for API endpoints.
 """
 
-from .common import ErrorResponse, PaginationParams
+from .common import BatchItemError, ErrorResponse, PaginationParams
 from .feedback import FeedbackRequest, FeedbackResponse, InteractionType
-from .recommend import RecommendationContext, RecommendRequest, RecommendResponse
-from .search import ProductResult, SearchRequest, SearchResponse
+from .recommend import (
+    BatchRecommendRequest,
+    BatchRecommendResponse,
+    RecommendationContext,
+    RecommendRequest,
+    RecommendResponse,
+)
+from .search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    ProductResult,
+    SearchRequest,
+    SearchResponse,
+)
 
 __all__ = [
     "ErrorResponse",
     "PaginationParams",
+    "BatchItemError",
     "SearchRequest",
     "SearchResponse",
     "ProductResult",
+    "BatchSearchRequest",
+    "BatchSearchResponse",
     "RecommendRequest",
     "RecommendResponse",
     "RecommendationContext",
+    "BatchRecommendRequest",
+    "BatchRecommendResponse",
     "FeedbackRequest",
     "FeedbackResponse",
     "InteractionType",
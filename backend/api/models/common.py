@@ -39,3 +39,11 @@ class FilterParams(BaseModel):
     merchant_ids: Optional[list[int]] = Field(None, description="Filter by merchant IDs")
     category_ids: Optional[list[int]] = Field(None, description="Filter by category IDs")
     brand_ids: Optional[list[int]] = Field(None, description="Filter by brand IDs")
+
+
+class BatchItemError(BaseModel):
+    """Error for a single item of a batch request."""
+
+    index: int = Field(..., ge=0, description="Position of the failed item in the request")
+    message: str = Field(..., description="Error message")
+    status_code: int = Field(..., description="HTTP status the item would have returned alone")
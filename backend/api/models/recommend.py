@@ -8,7 +8,7 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
-from .common import FilterParams
+from .common import BatchItemError, FilterParams
 from .search import ProductResult
 
 
@@ -155,3 +155,46 @@ class RecommendResponse(BaseModel):
                 "blend_weights": {"long_term": 0.6, "session": 0.4},
             }
         }
+
+
+class BatchRecommendRequest(BaseModel):
+    """
+    Batch recommendation request model.
+
+    Generates recommendations for many users (or contexts) in one request.
+    """
+
+    requests: List[RecommendRequest] = Field(
+        ..., min_length=1, description="Recommendation requests to execute"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"user_id": "4f1c2a9e-0d3b-4c55-9a51-6f2d8e7b1a20", "limit": 20},
+                    {"user_id": "9b7e3d12-5a4f-4e0c-8c61-2d9f0a6b3e47", "limit": 20},
+                ]
+            }
+        }
+
+
+class BatchRecommendResponse(BaseModel):
+    """
+    Batch recommendation response model.
+
+    ``responses`` is aligned with the request list; entries for requests that
+    failed are null and described in ``errors``.
+    """
+
+    responses: List[Optional[RecommendResponse]] = Field(
+        ..., description="Per-request recommendation responses (null on error)"
+    )
+    errors: List[BatchItemError] = Field(default_factory=list, description="Per-request errors")
+    total: int = Field(..., description="Number of requests processed")
+
+    # Performance metrics
+    recommendation_time_ms: float = Field(
+        ..., description="Total recommendation time in milliseconds"
+    )
+    total_time_ms: float = Field(..., description="Total request time in milliseconds")
@@ -169,3 +169,41 @@ class SearchResponse(BaseModel):
                 "cached": False,
             }
         }
+
+
+class BatchSearchRequest(BaseModel):
+    """
+    Batch search request model.
+
+    Runs many searches in one request: query texts are encoded in a single
+    forward pass and unfiltered queries share one FAISS search.
+    """
+
+    queries: List[SearchRequest] = Field(
+        ..., min_length=1, description="Search requests to execute"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    {"query": "summer dresses", "limit": 10},
+                    {"query": "leather boots", "filters": {"max_price": 150.0}, "limit": 10},
+                ]
+            }
+        }
+
+
+class BatchSearchResponse(BaseModel):
+    """
+    Batch search response model.
+
+    Contains one response per query, in request order.
+    """
+
+    responses: List[SearchResponse] = Field(..., description="Per-query search responses")
+    total: int = Field(..., description="Number of queries processed")
+
+    # Performance metrics
+    search_time_ms: float = Field(..., description="Total search time in milliseconds")
+    total_time_ms: float = Field(..., description="Total request time in milliseconds")
@@ -3,6 +3,8 @@ Admin Endpoints
 POST /admin/rebuild-index - Manually trigger FAISS index rebuild
 POST /admin/generate-embeddings - Manually trigger product embedding generation
 POST /admin/clear-cache - Clear Redis cache
+GET /admin/clear-cache/{job_id} - Check cache clear job progress
+POST /admin/clear-cache/{job_id}/resume - Resume an interrupted cache clear job
 POST /admin/refresh-user-embeddings - Refresh user embeddings
 GET /admin/task-status/{task_id} - Check Celery task status
 """
@@ -11,13 +13,19 @@ import logging
 import os  # GCS upload requires google-cloud-storage package
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from ...ml.caching import EmbeddingCache
+from ...ml.caching import (
+    CacheClearJob,
+    CacheClearJobError,
+    EmbeddingCache,
+    patterns_for_cache_type,
+)
 from ..config import APISettings, get_settings
 from ..dependencies import get_db, get_embedding_cache
+from ..services.cache_service import CacheService, get_cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +73,9 @@ class RefreshUserEmbeddingsResponse(BaseModel):
 class ClearCacheRequest(BaseModel):
     cache_type: str = Field(
         default="all",
-        description="Type of cache to clear: 'all', 'embeddings', 'search', 'recommendations'",
+        description=(
+            "Type of cache to clear: 'all', 'embeddings', 'search', 'recommendations', 'metadata'"
+        ),
     )
     user_id: int | None = Field(None, description="Clear cache for specific user")
 
@@ -74,6 +84,20 @@ class ClearCacheResponse(BaseModel):
     status: str = Field(..., description="Status")
     message: str = Field(..., description="Result message")
     keys_cleared: int | None = Field(None, description="Number of keys cleared")
+    job_id: str | None = Field(None, description="Background cache clear job ID")
+    task_id: str | None = Field(None, description="Celery task ID (if run by a worker)")
+
+
+class CacheClearJobResponse(BaseModel):
+    job_id: str = Field(..., description="Cache clear job ID")
+    status: str = Field(..., description="pending, running, completed or failed")
+    patterns: list[str] = Field(..., description="Key patterns being deleted")
+    patterns_done: int = Field(..., description="Patterns fully scanned")
+    current_pattern: str | None = Field(None, description="Pattern being scanned")
+    keys_deleted: int = Field(..., description="Keys deleted so far")
+    error: str | None = Field(None, description="Last error (failed jobs can be resumed)")
+    created_at: str = Field(..., description="Creation time")
+    updated_at: str = Field(..., description="Time of the last progress update")
 
 
 class TaskStatusResponse(BaseModel):
@@ -257,7 +281,9 @@ async def refresh_user_embeddings(
 @router.post("/clear-cache", response_model=ClearCacheResponse, status_code=status.HTTP_200_OK)
 async def clear_cache(
     request: ClearCacheRequest,
+    background_tasks: BackgroundTasks,
     cache: EmbeddingCache = Depends(get_embedding_cache),
+    cache_service: CacheService = Depends(get_cache_service),
     settings: APISettings = Depends(get_settings),
 ) -> ClearCacheResponse:
     """
@@ -265,8 +291,12 @@ async def clear_cache(
 
     Options:
     - Clear all caches
-    - Clear specific cache type (embeddings, search, recommendations)
+    - Clear specific cache type (embeddings, search, recommendations, metadata)
     - Clear cache for specific user
+
+    User caches are cleared immediately. Namespaces are cleared by a resumable
+    background job (incremental SCAN + UNLINK, see CacheClearJob); poll
+    GET /clear-cache/{job_id} for progress.
     """
     try:
         if not settings.enable_cache:
@@ -274,115 +304,40 @@ async def clear_cache(
                 status="skipped", message="Cache is disabled in settings", keys_cleared=0
             )
 
-        keys_cleared = 0
-
         if request.user_id:
-            # Clear user-specific cache
-            user_id_str = str(request.user_id)
+            keys_cleared = 0
 
             # Clear user embeddings
             if request.cache_type in ["all", "embeddings"]:
-                try:
-                    cache.redis.delete(f"user_embeddings:{user_id_str}")
-                    cache.redis.delete(f"user_long_term:{user_id_str}")
-                    cache.redis.delete(f"user_session:{user_id_str}")
-                    keys_cleared += 3
-                except Exception as e:
-                    logger.warning(f"Failed to clear user embeddings: {e}")
-
-            # Clear user recommendations
-            if request.cache_type in ["all", "recommendations"]:
-                try:
-                    # Delete all keys matching pattern
-                    pattern = f"recommend:*user:{user_id_str}*"
-                    cursor = 0
-                    while True:
-                        cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                        if keys:
-                            cache.redis.connection.delete(*keys)
-                            keys_cleared += len(keys)
-                        if cursor == 0:
-                            break
-                except Exception as e:
-                    logger.warning(f"Failed to clear user recommendations: {e}")
-
-            message = f"Cleared cache for user {request.user_id}"
+                keys_cleared += cache.delete_user_embeddings(str(request.user_id))
 
-        else:
-            # Clear all caches or specific type
-            try:
-                if request.cache_type == "all":
-                    # Flush entire Redis database
-                    cache.redis.connection.flushdb()
-                    keys_cleared = -1  # Unknown count
-                    message = "Cleared all cache"
-
-                elif request.cache_type == "embeddings":
-                    # Clear embedding caches
-                    patterns = [
-                        "user_embeddings:*",
-                        "user_long_term:*",
-                        "user_session:*",
-                        "product_embedding:*",
-                    ]
-                    for pattern in patterns:
-                        cursor = 0
-                        while True:
-                            cursor, keys = cache.redis.connection.scan(
-                                cursor, match=pattern, count=100
-                            )
-                            if keys:
-                                cache.redis.connection.delete(*keys)
-                                keys_cleared += len(keys)
-                            if cursor == 0:
-                                break
-                    message = f"Cleared {keys_cleared} embedding cache keys"
-
-                elif request.cache_type == "search":
-                    # Clear search result caches
-                    pattern = "search:*"
-                    cursor = 0
-                    while True:
-                        cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                        if keys:
-                            cache.redis.connection.delete(*keys)
-                            keys_cleared += len(keys)
-                        if cursor == 0:
-                            break
-                    message = f"Cleared {keys_cleared} search cache keys"
-
-                elif request.cache_type == "recommendations":
-                    # Clear recommendation caches
-                    pattern = "recommend:*"
-                    cursor = 0
-                    while True:
-                        cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                        if keys:
-                            cache.redis.connection.delete(*keys)
-                            keys_cleared += len(keys)
-                        if cursor == 0:
-                            break
-                    message = f"Cleared {keys_cleared} recommendation cache keys"
+            # Clear user recommendations and search results (generation bump, no key scan)
+            if request.cache_type in ["all", "recommendations", "search"]:
+                if not cache_service.invalidate_user(request.user_id):
+                    logger.warning(f"Failed to clear cached results for user {request.user_id}")
 
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Invalid cache_type: {request.cache_type}",
-                    )
+            logger.info(f"Cache cleared for user {request.user_id}: type={request.cache_type}")
+            return ClearCacheResponse(
+                status="success",
+                message=f"Cleared cache for user {request.user_id}",
+                keys_cleared=keys_cleared,
+            )
 
-            except Exception as e:
-                logger.error(f"Failed to clear cache: {e}", exc_info=True)
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to clear cache: {str(e)}",
-                )
+        try:
+            patterns = patterns_for_cache_type(request.cache_type)
+        except CacheClearJobError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        job = CacheClearJob.create(cache.redis, patterns)
+        task_id = _dispatch_clear_cache_job(job, background_tasks)
 
-        logger.info(f"Cache cleared: type={request.cache_type}, keys={keys_cleared}")
+        logger.info(f"Cache clear queued: type={request.cache_type}, job_id={job.job_id}")
 
         return ClearCacheResponse(
-            status="success",
-            message=message,
-            keys_cleared=keys_cleared if keys_cleared >= 0 else None,
+            status="queued",
+            message=f"Clearing {request.cache_type} cache in the background",
+            job_id=job.job_id,
+            task_id=task_id,
         )
 
     except HTTPException:
@@ -395,6 +350,80 @@ async def clear_cache(
         )
 
 
+@router.get(
+    "/clear-cache/{job_id}", response_model=CacheClearJobResponse, status_code=status.HTTP_200_OK
+)
+async def get_clear_cache_job(
+    job_id: str, cache: EmbeddingCache = Depends(get_embedding_cache)
+) -> CacheClearJobResponse:
+    """Progress of a cache clear job."""
+    job = CacheClearJob.load(cache.redis, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Cache clear job not found: {job_id}"
+        )
+    return CacheClearJobResponse(**job.to_dict())
+
+
+@router.post(
+    "/clear-cache/{job_id}/resume",
+    response_model=ClearCacheResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def resume_clear_cache_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    cache: EmbeddingCache = Depends(get_embedding_cache),
+) -> ClearCacheResponse:
+    """Continue an interrupted cache clear job from its last saved SCAN cursor."""
+    job = CacheClearJob.load(cache.redis, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Cache clear job not found: {job_id}"
+        )
+    if job.done:
+        return ClearCacheResponse(
+            status="success",
+            message="Cache clear job already completed",
+            keys_cleared=job.deleted,
+            job_id=job_id,
+        )
+
+    task_id = _dispatch_clear_cache_job(job, background_tasks)
+    return ClearCacheResponse(
+        status="queued",
+        message=f"Resuming cache clear job ({job.deleted} keys deleted so far)",
+        job_id=job_id,
+        task_id=task_id,
+    )
+
+
+def _dispatch_clear_cache_job(
+    job: CacheClearJob, background_tasks: BackgroundTasks
+) -> Optional[str]:
+    """
+    Run a cache clear job on a Celery worker, or in this process if Celery is unavailable.
+
+    Returns:
+        Celery task ID (None when the job runs in-process)
+    """
+    try:
+        from ...tasks.cache import clear_cache as clear_cache_task
+
+        return clear_cache_task.delay(job_id=job.job_id).id
+    except Exception as e:
+        logger.warning(f"Failed to dispatch cache clear task, running in-process: {e}")
+
+    def run_job() -> None:
+        try:
+            job.run()
+        except Exception as e:
+            logger.error(f"Cache clear job {job.job_id} failed: {e}")
+
+    background_tasks.add_task(run_job)
+    return None
+
+
 @router.get(
     "/task-status/{task_id}", response_model=TaskStatusResponse, status_code=status.HTTP_200_OK
 )
@@ -593,143 +622,34 @@ async def rebuild_faiss_index_sync(
     Synchronously rebuild FAISS index from database embeddings (no Celery required).
 
     This endpoint:
-    1. Fetches all product embeddings from database
-    2. Builds a new FAISS index
-    3. Saves index to disk and uploads to GCS
-    4. Returns when complete
+    1. Streams all product embeddings from database into a new FAISS index
+       (shared index build pipeline)
+    2. Saves a new index version to disk and uploads it to GCS
+    3. Returns when complete
 
     Suitable for Cloud Scheduler or manual triggers.
     """
     try:
-        import numpy as np
-        from sqlalchemy import text as sql_text
-
         logger.info(f"Starting synchronous FAISS index rebuild for {embedding_type} embeddings")
 
-        # Import FAISS builder
-        from ...ml.retrieval.index_builder import FAISSIndexBuilder
-
-        # Fetch all product embeddings from database
-        logger.info("Fetching product embeddings from database...")
-
-        if embedding_type == "text":
-            # First try denormalized column on Product table for performance
-            result = db.execute(
-                sql_text(
-                    """
-                SELECT id, text_embedding
-                FROM products
-                WHERE text_embedding IS NOT NULL
-                ORDER BY id
-            """
-                )
-            )
-
-            embeddings_list = []
-            product_ids = []
-
-            for row in result:
-                product_id = str(row.id)
-                text_embedding = row.text_embedding
-
-                if text_embedding is not None:
-                    # Handle both list and array formats
-                    if isinstance(text_embedding, (list, tuple)):
-                        emb = np.array(text_embedding, dtype=np.float32)
-                    else:
-                        emb = np.array(text_embedding, dtype=np.float32)
-
-                    embeddings_list.append(emb)
-                    product_ids.append(product_id)
-
-            # If no embeddings found in denormalized column, fallback to product_embeddings table
-            if len(embeddings_list) == 0:
-                logger.info(
-                    "No embeddings in denormalized column, falling back to product_embeddings table"
-                )
-                result = db.execute(
-                    sql_text(
-                        """
-                    SELECT product_id, embedding
-                    FROM product_embeddings
-                    WHERE embedding_type = 'text'
-                    ORDER BY product_id
-                """
-                    )
-                )
-
-                for row in result:
-                    product_id = str(row.product_id)
-                    embedding_data = row.embedding
-
-                    if embedding_data is not None:
-                        if isinstance(embedding_data, (list, tuple)):
-                            emb = np.array(embedding_data, dtype=np.float32)
-                        else:
-                            emb = np.array(embedding_data, dtype=np.float32)
-
-                        embeddings_list.append(emb)
-                        product_ids.append(product_id)
-        else:
-            # For other types, use ProductEmbedding table
-            result = db.execute(
-                sql_text(
-                    """
-                SELECT product_id, embedding
-                FROM product_embeddings
-                WHERE embedding_type = :embedding_type
-                ORDER BY product_id
-            """
-                ),
-                {"embedding_type": embedding_type},
-            )
-
-            embeddings_list = []
-            product_ids = []
-
-            for row in result:
-                product_id = str(row.product_id)
-                embedding_data = row.embedding
-
-                if embedding_data is not None:
-                    if isinstance(embedding_data, (list, tuple)):
-                        emb = np.array(embedding_data, dtype=np.float32)
-                    else:
-                        emb = np.array(embedding_data, dtype=np.float32)
-
-                    embeddings_list.append(emb)
-                    product_ids.append(product_id)
+        from ...ml.retrieval.build_pipeline import (
+            IndexBuildPipeline,
+            NoEmbeddingsError,
+            source_for_embedding_type,
+        )
 
-        if len(embeddings_list) == 0:
+        pipeline = IndexBuildPipeline()
+        try:
+            result = pipeline.run(source_for_embedding_type(embedding_type), session=db)
+        except NoEmbeddingsError:
             logger.error(f"No {embedding_type} embeddings found in database")
             return {
                 "status": "error",
                 "error": f"No {embedding_type} embeddings found",
                 "embedding_type": embedding_type,
             }
-
-        # Convert to numpy array
-        embeddings = np.vstack(embeddings_list)
-        logger.info(f"Fetched {len(embeddings)} embeddings from database")
-
-        # Build FAISS index
-        logger.info("Building FAISS index...")
-        builder = FAISSIndexBuilder()
-        index, id_mapping = builder.build_index(embeddings=embeddings, product_ids=product_ids)
-
-        # Save index to disk
-        logger.info("Saving FAISS index to disk...")
-        save_path = builder.save_index(index, id_mapping)
-
-        # Get index stats
-        stats = builder.get_index_stats(index)
-
-        logger.info(
-            f"FAISS index rebuilt successfully: "
-            f"{stats['num_vectors']} vectors, "
-            f"type={stats['index_type']}, "
-            f"saved to {save_path}"
-        )
+        save_path = result.save_path
+        stats = result.stats
 
         # Upload to GCS if configured
         gcs_uploaded = False
@@ -739,15 +659,12 @@ async def rebuild_faiss_index_sync(
         if gcs_bucket and gcs_path:
             try:
                 from ...ml.utils.gcs_utils import (
-                    delete_faiss_index_from_gcs,
+                    prune_faiss_index_versions_in_gcs,
                     upload_faiss_index_to_gcs,
                 )
 
-                # Delete old index from GCS first
-                logger.info(f"Deleting old FAISS index from GCS: gs://{gcs_bucket}/{gcs_path}/")
-                delete_faiss_index_from_gcs(bucket_name=gcs_bucket, gcs_path=gcs_path)
-
-                # Upload new index to GCS
+                # Upload new version (unchanged artifacts are skipped); CURRENT is
+                # switched last, so workers never download a partial index
                 logger.info(f"Uploading new FAISS index to GCS: gs://{gcs_bucket}/{gcs_path}/")
                 gcs_uploaded = upload_faiss_index_to_gcs(
                     local_path=save_path, bucket_name=gcs_bucket, gcs_path=gcs_path
@@ -755,6 +672,13 @@ async def rebuild_faiss_index_sync(
 
                 if gcs_uploaded:
                     logger.info("Successfully uploaded FAISS index to GCS")
+
+                    # Then remove versions and blobs no longer needed
+                    prune_faiss_index_versions_in_gcs(
+                        bucket_name=gcs_bucket,
+                        gcs_path=gcs_path,
+                        keep_versions=pipeline.config.storage.faiss_artifact_keep_versions,
+                    )
                 else:
                     logger.warning("Failed to upload FAISS index to GCS")
             except Exception as e:
@@ -770,6 +694,8 @@ async def rebuild_faiss_index_sync(
             "num_vectors": stats["num_vectors"],
             "index_type": stats["index_type"],
             "save_path": str(save_path),
+            "source": result.source,
+            "timings": result.to_dict()["timings"],
             "gcs_uploaded": gcs_uploaded,
             "gcs_bucket": gcs_bucket if gcs_bucket else None,
             "stats": stats,
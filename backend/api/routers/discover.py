@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 from ...db.models import Product, UserInteraction
 from ..dependencies import get_db
 from ..models.search import ProductResult
+from ..services.executor import STAGE_DB, run_in_stage
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,8 @@ router = APIRouter(prefix="/api/v1", tags=["discover"])
 
 
 @router.get("/discover", status_code=status.HTTP_200_OK)
-async def discover_products(
+@run_in_stage(STAGE_DB)
+def discover_products(
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
     sort_by: str = Query(default="popular", regex="^(popular|recent|price_low|price_high)$"),
@@ -22,6 +22,8 @@ from ..models.feedback import (
     FeedbackResponse,
     InteractionType,
 )
+from ..services.cache_service import CacheService, get_cache_service
+from ..services.executor import STAGE_DB, run_in_stage
 
 logger = logging.getLogger(__name__)
 
@@ -29,10 +31,12 @@ router = APIRouter(prefix="/api/v1", tags=["feedback"])
 
 
 @router.post("/feedback", response_model=FeedbackResponse, status_code=status.HTTP_200_OK)
-async def record_feedback(
+@run_in_stage(STAGE_DB)
+def record_feedback(
     request: FeedbackRequest,
     db: Session = Depends(get_db),
     cache: EmbeddingCache = Depends(get_embedding_cache),
+    cache_service: CacheService = Depends(get_cache_service),
     settings: APISettings = Depends(get_settings),
     request_id: str = Depends(get_request_id),
 ) -> FeedbackResponse:
@@ -114,7 +118,9 @@ async def record_feedback(
     # Step 5: Invalidate cached recommendations
     cache_invalidated = False
     if settings.enable_cache:
-        cache_invalidated = _invalidate_user_cache(user_id=request.user_id, cache=cache)
+        cache_invalidated = _invalidate_user_cache(
+            user_id=request.user_id, cache=cache, cache_service=cache_service
+        )
 
     # Step 6: Build response
     processing_time_ms = (time.time() - start_time) * 1000
@@ -342,18 +348,21 @@ def _update_session_embeddings(
         return False
 
 
-def _invalidate_user_cache(user_id: int, cache: EmbeddingCache) -> bool:
+def _invalidate_user_cache(
+    user_id: int, cache: EmbeddingCache, cache_service: CacheService
+) -> bool:
     """
     Invalidate cached recommendations and search results for user.
 
-    Deletes:
-    - All cached recommendation results for this user
-    - All cached search results for this user
+    Invalidates:
+    - All cached recommendation and search results for this user (one
+      generation bump, see CacheService.invalidate_user)
     - User embedding caches (will be refreshed on next request)
 
     Args:
         user_id: User ID
         cache: Embedding cache
+        cache_service: Cache service
 
     Returns:
         True if invalidated, False otherwise
@@ -361,38 +370,11 @@ def _invalidate_user_cache(user_id: int, cache: EmbeddingCache) -> bool:
     try:
         keys_deleted = 0
 
-        # Pattern 1: Recommendations containing this user_id
-        # Cache keys follow pattern: recommend:{hash} where hash contains user:{user_id}
-        pattern = f"recommend:*user:{user_id}*"
-
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                if keys:
-                    cache.redis.connection.delete(*keys)
-                    keys_deleted += len(keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Failed to delete recommendation cache keys: {e}")
-
-        # Pattern 2: Search results containing this user_id
-        pattern = f"search:*user:{user_id}*"
-
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                if keys:
-                    cache.redis.connection.delete(*keys)
-                    keys_deleted += len(keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Failed to delete search cache keys: {e}")
+        # Cached results: keys embed the user's generation, so bumping it retires them all
+        if not cache_service.invalidate_user(user_id):
+            logger.warning(f"Failed to invalidate cached results for user {user_id}")
 
-        # Pattern 3: User embedding caches
+        # User embedding caches
         # These will be refreshed when the embedding update task completes
         # But we can delete them now to force fresh lookup
         user_id_str = str(user_id)
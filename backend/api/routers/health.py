@@ -7,16 +7,21 @@ import logging
 from datetime import datetime
 from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from ...ml.caching import EmbeddingCache
+from ...ml.caching import EmbeddingCache, get_query_embedding_cache
+from ...ml.encoder_scheduler import get_text_encoding_scheduler
 from ...ml.retrieval import get_index_manager
 from ..config import APISettings, get_settings
 from ..dependencies import get_db, get_embedding_cache
 from ..middleware.timing import get_latency_tracker
 from ..services.cache_service import get_cache_service
+from ..services.container import get_service_container
+from ..services.executor import get_stage_executor
 from ..services.performance_monitor import get_performance_monitor
+from ..services.warmup import get_warmup_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +66,7 @@ async def status_check(
 
     # Check database
     try:
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         status_info["components"]["database"] = {
             "status": "healthy",
             "url": settings.database_url.split("@")[-1],  # Hide credentials
@@ -144,11 +149,18 @@ async def get_metrics() -> Dict[str, Any]:
     """
     tracker = get_latency_tracker()
     stats = tracker.get_stats()
+    warmup = get_warmup_pipeline()
 
     return {
         "requests": {
             "total": stats["count"],
         },
+        "text_encoder": get_text_encoding_scheduler().get_stats(),
+        "query_embedding_cache": get_query_embedding_cache().get_stats(),
+        "product_metadata_cache": get_service_container().metadata_service.metadata_cache.get_stats(),
+        "stages": get_stage_executor().get_stats(),
+        "filtered_search": get_service_container().filtered_search.get_stats(),
+        "warmup": warmup.get_status() if warmup else None,
         "latency": {
             "p50_ms": round(stats["p50"], 2),
             "p95_ms": round(stats["p95"], 2),
@@ -216,29 +228,42 @@ async def get_slow_queries(limit: int = 100) -> Dict[str, Any]:
 
 
 @router.get("/ready", status_code=status.HTTP_200_OK)
-async def readiness_check(db: Session = Depends(get_db)) -> Dict[str, str]:
+async def readiness_check(response: Response, db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Kubernetes readiness probe.
 
-    Checks if the service is ready to accept traffic.
+    Checks if the service is ready to accept traffic. Returns 503 until the
+    startup warm-up has finished (index and model loaded, caches primed).
 
     Returns:
         Readiness status
     """
     # Check critical dependencies
     try:
+        # Check warm-up
+        warmup = get_warmup_pipeline()
+        if warmup is not None and not warmup.is_ready:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+            return {
+                "status": "not_ready",
+                "reason": f"Warm-up {warmup.state}",
+                "warmup": warmup.get_status(),
+            }
+
         # Check database
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
 
         # Check FAISS index
         index_manager = get_index_manager()
         if index_manager.index is None:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
             return {"status": "not_ready", "reason": "FAISS index not loaded"}
 
         return {"status": "ready", "timestamp": datetime.utcnow().isoformat()}
 
     except Exception as e:
         logger.error(f"Readiness check failed: {e}")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
         return {"status": "not_ready", "reason": str(e)}
 
 
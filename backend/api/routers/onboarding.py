@@ -25,6 +25,7 @@ from ..schemas.onboarding import (
     OnboardingProductsResponse,
     OnboardingStatusResponse,
 )
+from ..services.executor import STAGE_DB, run_in_stage
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,8 @@ router = APIRouter(prefix="/onboarding", tags=["Onboarding"])
 
 
 @router.get("/products", response_model=OnboardingProductsResponse)
-async def get_onboarding_products(
+@run_in_stage(STAGE_DB)
+def get_onboarding_products(
     request: OnboardingProductsRequest = OnboardingProductsRequest(),
     db: Session = Depends(get_db),
 ) -> OnboardingProductsResponse:
@@ -130,7 +132,8 @@ async def get_onboarding_products(
 
 
 @router.post("/complete", response_model=OnboardingCompleteResponse)
-async def complete_onboarding(
+@run_in_stage(STAGE_DB)
+def complete_onboarding(
     request: OnboardingCompleteRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -303,7 +306,8 @@ async def complete_onboarding(
 
 
 @router.get("/status", response_model=OnboardingStatusResponse)
-async def get_onboarding_status(
+@run_in_stage(STAGE_DB)
+def get_onboarding_status(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> OnboardingStatusResponse:
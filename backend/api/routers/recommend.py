@@ -6,22 +6,38 @@ POST /recommend - Personalized product recommendations.
 import hashlib
 import logging
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ...ml.caching import EmbeddingCache
-from ...ml.retrieval import ProductFilters, create_user_context
+from ...ml.retrieval import create_user_context
 from ...ml.search import SearchService
 from ..config import APISettings, get_settings
 from ..dependencies import get_db, get_embedding_cache, get_request_id, get_search_service
 from ..errors import SearchError
-from ..models.recommend import RecommendationContext, RecommendRequest, RecommendResponse
+from ..models.common import BatchItemError
+from ..models.recommend import (
+    BatchRecommendRequest,
+    BatchRecommendResponse,
+    RecommendationContext,
+    RecommendRequest,
+    RecommendResponse,
+)
 from ..models.search import ProductResult
 from ..services.cache_service import CacheService, get_cache_service
+from ..services.executor import (
+    STAGE_DB,
+    STAGE_ENCODE,
+    STAGE_SEARCH,
+    StageExecutor,
+    get_stage_executor,
+)
 from ..services.metadata_service import MetadataService, get_metadata_service
 from ..services.text_encoder import TextEncoderService, get_text_encoder_service
+from .search import _build_product_filters, _search_query_vectors
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +54,15 @@ async def recommend(
     cache: EmbeddingCache = Depends(get_embedding_cache),
     cache_service: CacheService = Depends(get_cache_service),
     settings: APISettings = Depends(get_settings),
+    executor: StageExecutor = Depends(get_stage_executor),
     request_id: str = Depends(get_request_id),
 ) -> RecommendResponse:
     """
     Generate personalized product recommendations for a user.
 
     Workflow:
-    1. Check cache for results
+    1. Check cache for results (concurrent identical misses are computed once,
+       and an expired result is served while one request refreshes it)
     2. Load user embeddings (long-term + session)
     3. Build query vector based on context
     4. Apply filters
@@ -61,8 +79,10 @@ async def recommend(
         text_encoder: Text encoder service
         metadata_service: Metadata service
         cache: Embedding cache
+        cache_service: Cache service
         settings: API settings
         request_id: Request ID for tracing
+        executor: Stage executor for blocking work
 
     Returns:
         Recommendation response with results and metadata
@@ -75,30 +95,320 @@ async def recommend(
     )
 
     # Track user activity for cache warming
-    cache_service.track_user_activity(request.user_id)
-    if request.search_query:
-        cache_service.track_query(request.search_query)
+    (cache_key,) = await executor.run(
+        STAGE_DB, _recommend_cache_keys, [request], cache_service, settings
+    )
+
+    async def compute_response() -> Dict[str, Any]:
+        # Step 1: Load user embeddings (cache, then database)
+        long_term_embedding, session_embedding = await executor.run(
+            STAGE_DB, _load_user_embeddings, request, cache, db
+        )
+        has_long_term_profile = long_term_embedding is not None
+        has_session_context = session_embedding is not None
+
+        # Step 2: Build query vector based on context
+        query_embedding = None
+        if request.context == RecommendationContext.SEARCH and request.search_query:
+            try:
+                query_embedding = await text_encoder.encode_query_async(request.search_query)
+            except Exception as e:
+                logger.error(f"Failed to encode query: {e}")
+                raise SearchError(
+                    message="Failed to encode search query",
+                    details={"query": request.search_query, "error": str(e)},
+                )
+
+        query_vector, blend_weights = await executor.run(
+            STAGE_DB,
+            _build_query_vector,
+            request,
+            long_term_embedding,
+            session_embedding,
+            search_service,
+            text_encoder,
+            cache,
+            db,
+            query_embedding=query_embedding,
+        )
+
+        # Step 3: Build filters
+        filters = _build_product_filters(request.filters)
+
+        # Step 4: Perform personalized search
+        recommend_start = time.time()
+        (ml_results,) = await executor.run(
+            STAGE_SEARCH,
+            _search_query_vectors,
+            query_vectors=query_vector,
+            filters=[filters],
+            ks=[request.limit * 2],  # Get more for better results after enrichment
+            search_service=search_service,
+            db=db,
+        )
+        recommendation_time_ms = (time.time() - recommend_start) * 1000
 
-    # Generate cache key
-    cache_key = _generate_cache_key(request)
+        # Step 5: Extract product IDs and scores
+        product_ids = ml_results.get_product_ids()
+        scores = ml_results.to_score_dicts()
 
-    # Check cache if enabled
-    cached_response = None
+        # Step 6: Enrich with metadata
+        enriched_results = await executor.run(
+            STAGE_DB, metadata_service.enrich_results, product_ids=product_ids, scores=scores, db=db
+        )
+
+        # Step 7: Apply pagination
+        paginated_results = enriched_results[request.offset : request.offset + request.limit]
+
+        # Step 8: Build response
+        return {
+            "results": paginated_results,
+            "total": len(enriched_results),
+            "offset": request.offset,
+            "limit": request.limit,
+            "page": (request.offset // request.limit) + 1 if request.limit > 0 else 1,
+            "user_id": request.user_id,
+            "context": request.context.value,
+            "recommendation_time_ms": recommendation_time_ms,
+            "total_time_ms": (time.time() - start_time) * 1000,
+            "personalized": True,
+            "cached": False,
+            "filters_applied": filters is not None,
+            "diversity_applied": request.enable_diversity,
+            "has_long_term_profile": has_long_term_profile,
+            "has_session_context": has_session_context,
+            "blend_weights": blend_weights,
+        }
+
+    # Serve from cache, or compute once for all concurrent identical requests and cache
     if settings.enable_cache:
-        cached_response = cache_service.get_recommend_results(cache_key)
+        response_data, cached = await cache_service.get_or_compute(
+            "recommend", cache_key, compute_response, settings.cache_ttl_recommend
+        )
+    else:
+        response_data, cached = await compute_response(), False
 
+    total_time_ms = (time.time() - start_time) * 1000
+
+    if cached:
+        logger.info(
+            f"Cache HIT for user {request.user_id}, context={request.context}",
+            extra={"request_id": request_id},
+        )
+        response_data["cached"] = True
+        response_data["total_time_ms"] = total_time_ms
+        return RecommendResponse(**response_data)
+
+    logger.info(
+        f"Recommendation completed: {response_data['total']} results in {total_time_ms:.2f}ms",
+        extra={"request_id": request_id},
+    )
+
+    return RecommendResponse(**response_data)
+
+
+@router.post(
+    "/recommend/batch", response_model=BatchRecommendResponse, status_code=status.HTTP_200_OK
+)
+async def recommend_batch(
+    request: BatchRecommendRequest,
+    db: Session = Depends(get_db),
+    search_service: SearchService = Depends(get_search_service),
+    text_encoder: TextEncoderService = Depends(get_text_encoder_service),
+    metadata_service: MetadataService = Depends(get_metadata_service),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
+    cache_service: CacheService = Depends(get_cache_service),
+    settings: APISettings = Depends(get_settings),
+    executor: StageExecutor = Depends(get_stage_executor),
+    request_id: str = Depends(get_request_id),
+) -> BatchRecommendResponse:
+    """
+    Generate recommendations for many users in one request.
+
+    Workflow:
+    1. Serve requests found in the result cache
+    2. Encode all search-context queries in one CLIP forward pass
+    3. Build a query vector per request (failures are reported per item)
+    4. Run one FAISS search over the stacked unfiltered query vectors
+       (filtered requests go through the filtered search path)
+    5. Enrich all results with one metadata fetch
+    6. Cache and return per-request responses
+
+    Args:
+        request: Batch of recommendation requests
+        db: Database session
+        search_service: Search service instance
+        text_encoder: Text encoder service
+        metadata_service: Metadata service
+        cache: Embedding cache
+        cache_service: Cache service
+        settings: API settings
+        request_id: Request ID for tracing
+        executor: Stage executor for blocking work
+
+    Returns:
+        Batch recommendation response aligned with the request list
+    """
+    start_time = time.time()
+    items = request.requests
+
+    if len(items) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch contains {len(items)} requests, maximum is {settings.max_batch_size}",
+        )
+
+    logger.info(f"Batch recommend request: {len(items)} requests", extra={"request_id": request_id})
+
+    # Step 1: Serve cached requests
+    responses: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    errors: List[BatchItemError] = []
+    cache_keys, cached_responses = await executor.run(
+        STAGE_DB, _check_recommend_cache, items, cache_service, settings
+    )
+    pending = []
+
+    for i, cached_response in enumerate(cached_responses):
         if cached_response:
-            logger.info(
-                f"Cache HIT for user {request.user_id}, context={request.context}",
-                extra={"request_id": request_id},
-            )
             cached_response["cached"] = True
-            cached_response["total_time_ms"] = (time.time() - start_time) * 1000
-            return RecommendResponse(**cached_response)
+            responses[i] = cached_response
+        else:
+            pending.append(i)
+
+    # Step 2: Encode all search-context queries in one batch
+    search_indices = [
+        i
+        for i in pending
+        if items[i].context == RecommendationContext.SEARCH and items[i].search_query
+    ]
+    query_embeddings: Dict[int, np.ndarray] = {}
+    if search_indices:
+        try:
+            encoded = await executor.run(
+                STAGE_ENCODE,
+                text_encoder.encode_batch,
+                [items[i].search_query for i in search_indices],
+            )
+        except Exception as e:
+            logger.error(f"Failed to encode batch queries: {e}")
+            raise SearchError(
+                message="Failed to encode search queries",
+                details={"num_queries": len(search_indices), "error": str(e)},
+            )
+        query_embeddings = dict(zip(search_indices, encoded))
+
+    # Step 3: Build query vectors
+    query_vectors, blend_weights, profiles, item_errors = await executor.run(
+        STAGE_DB,
+        _build_query_vectors,
+        items,
+        pending,
+        search_service,
+        text_encoder,
+        cache,
+        db,
+        query_embeddings,
+    )
+    errors.extend(item_errors)
+    ready = list(query_vectors)
+
+    recommendation_time_ms = 0.0
+    if ready:
+        # Step 4: Search all query vectors
+        filters = [_build_product_filters(items[i].filters) for i in ready]
+        recommend_start = time.time()
+        ml_results = await executor.run(
+            STAGE_SEARCH,
+            _search_query_vectors,
+            query_vectors=np.vstack([query_vectors[i] for i in ready]),
+            filters=filters,
+            ks=[items[i].limit * 2 for i in ready],
+            search_service=search_service,
+            db=db,
+        )
+        recommendation_time_ms = (time.time() - recommend_start) * 1000
+
+        # Step 5: Enrich all results with one metadata fetch
+        enriched = await executor.run(
+            STAGE_DB,
+            metadata_service.enrich_results_batch,
+            product_id_lists=[results.get_product_ids() for results in ml_results],
+            score_lists=[results.to_score_dicts() for results in ml_results],
+            db=db,
+        )
+
+        # Step 6: Build and cache per-request responses
+        for i, item_filters, enriched_results in zip(ready, filters, enriched):
+            item = items[i]
+            has_long_term_profile, has_session_context = profiles[i]
+            response_data = {
+                "results": enriched_results[item.offset : item.offset + item.limit],
+                "total": len(enriched_results),
+                "offset": item.offset,
+                "limit": item.limit,
+                "page": (item.offset // item.limit) + 1 if item.limit > 0 else 1,
+                "user_id": item.user_id,
+                "context": item.context.value,
+                "recommendation_time_ms": recommendation_time_ms / len(ready),
+                "total_time_ms": (time.time() - start_time) * 1000,
+                "personalized": True,
+                "cached": False,
+                "filters_applied": item_filters is not None,
+                "diversity_applied": item.enable_diversity,
+                "has_long_term_profile": has_long_term_profile,
+                "has_session_context": has_session_context,
+                "blend_weights": blend_weights[i],
+            }
+
+            responses[i] = response_data
+
+        if settings.enable_cache:
+            await executor.run(
+                STAGE_DB,
+                _store_recommend_results,
+                [(cache_keys[i], responses[i]) for i in ready],
+                cache_service,
+                settings,
+            )
+
+    total_time_ms = (time.time() - start_time) * 1000
+
+    logger.info(
+        f"Batch recommendation completed: {len(items)} requests "
+        f"({len(errors)} errors) in {total_time_ms:.2f}ms",
+        extra={"request_id": request_id},
+    )
+
+    return BatchRecommendResponse(
+        responses=[
+            RecommendResponse(**response_data) if response_data is not None else None
+            for response_data in responses
+        ],
+        errors=errors,
+        total=len(items),
+        recommendation_time_ms=recommendation_time_ms,
+        total_time_ms=total_time_ms,
+    )
+
+
+def _load_user_embeddings(
+    request: RecommendRequest, cache: EmbeddingCache, db: Session
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Load a user's embeddings from cache, falling back to the database.
 
-    logger.debug(f"Cache MISS for user {request.user_id}, context={request.context}")
+    Args:
+        request: Recommendation request
+        cache: Embedding cache
+        db: Database session
+
+    Returns:
+        Tuple of (long_term_embedding, session_embedding); session is None when
+        session context is disabled
 
-    # Step 1: Load user embeddings from cache
+    Raises:
+        HTTPException: 404 if the user has no embeddings at all
+    """
     user_embeddings = cache.get_user_embeddings(request.user_id)
     long_term_embedding = user_embeddings.get("long_term")
     session_embedding = user_embeddings.get("session") if request.use_session_context else None
@@ -108,8 +418,6 @@ async def recommend(
         logger.info(f"Cache miss for user {request.user_id}, querying database")
         from uuid import UUID
 
-        import numpy as np
-
         from ...db.models import UserEmbedding
 
         try:
@@ -162,18 +470,50 @@ async def recommend(
         except Exception as e:
             logger.error(f"Error loading embeddings from database: {e}", exc_info=True)
 
-    has_long_term_profile = long_term_embedding is not None
-    has_session_context = session_embedding is not None
-
     # Validate user has embeddings
-    if not has_long_term_profile and not has_session_context:
+    if long_term_embedding is None and session_embedding is None:
         logger.warning(f"No embeddings found for user {request.user_id} in cache or database")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User has no preference profile. Please complete onboarding first.",
         )
 
-    # Step 2: Build query vector based on context
+    return long_term_embedding, session_embedding
+
+
+def _build_query_vector(
+    request: RecommendRequest,
+    long_term_embedding: Optional[np.ndarray],
+    session_embedding: Optional[np.ndarray],
+    search_service: SearchService,
+    text_encoder: TextEncoderService,
+    cache: EmbeddingCache,
+    db: Session,
+    query_embedding: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    Build the recommendation query vector for a request context.
+
+    Args:
+        request: Recommendation request (context=category adds a category filter)
+        long_term_embedding: User's long-term embedding
+        session_embedding: User's session embedding
+        search_service: Search service
+        text_encoder: Text encoder service (used for context=search)
+        cache: Embedding cache
+        db: Database session
+        query_embedding: Pre-encoded search query (skips encoding for context=search)
+
+    Returns:
+        Tuple of (query_vector, blend_weights)
+
+    Raises:
+        HTTPException: 400/404 if context parameters are missing or invalid
+        SearchError: If the search query cannot be encoded
+    """
+    has_long_term_profile = long_term_embedding is not None
+    has_session_context = session_embedding is not None
+
     query_vector = None
     blend_weights = {}
 
@@ -198,14 +538,15 @@ async def recommend(
                 detail="search_query required for context=search",
             )
 
-        try:
-            query_embedding = text_encoder.encode_query(request.search_query)
-        except Exception as e:
-            logger.error(f"Failed to encode query: {e}")
-            raise SearchError(
-                message="Failed to encode search query",
-                details={"query": request.search_query, "error": str(e)},
-            )
+        if query_embedding is None:
+            try:
+                query_embedding = text_encoder.encode_query(request.search_query)
+            except Exception as e:
+                logger.error(f"Failed to encode query: {e}")
+                raise SearchError(
+                    message="Failed to encode search query",
+                    details={"query": request.search_query, "error": str(e)},
+                )
 
         # Blend query with user profile
         if has_long_term_profile:
@@ -260,106 +601,143 @@ async def recommend(
             request.filters.category_ids = []
         request.filters.category_ids.append(request.category_id)
 
-    # Step 3: Build filters
-    filters = None
-    if request.filters:
-        filters = ProductFilters(
-            min_price=request.filters.min_price,
-            max_price=request.filters.max_price,
-            in_stock_only=request.filters.in_stock,
-            merchant_ids=request.filters.merchant_ids,
-            category_ids=request.filters.category_ids,
-            brand_ids=request.filters.brand_ids,
-        )
+    return query_vector, blend_weights
+
+
+def _build_query_vectors(
+    items: List[RecommendRequest],
+    indices: List[int],
+    search_service: SearchService,
+    text_encoder: TextEncoderService,
+    cache: EmbeddingCache,
+    db: Session,
+    query_embeddings: Dict[int, np.ndarray],
+) -> Tuple[
+    Dict[int, np.ndarray],
+    Dict[int, Dict[str, float]],
+    Dict[int, Tuple[bool, bool]],
+    List[BatchItemError],
+]:
+    """
+    Load embeddings and build query vectors for several batch items.
 
-    # Step 4: Perform personalized search
-    from ...ml.retrieval import FilteredSimilaritySearch, SimilaritySearch
+    Args:
+        items: Batch recommendation requests
+        indices: Positions in items to build vectors for
+        search_service: Search service
+        text_encoder: Text encoder service
+        cache: Embedding cache
+        db: Database session
+        query_embeddings: Pre-encoded search queries keyed by position
 
-    recommend_start = time.time()
+    Returns:
+        Tuple of (query_vectors, blend_weights, profiles, errors); the dicts are keyed
+        by position and profiles holds (has_long_term_profile, has_session_context)
+    """
+    query_vectors = {}
+    blend_weights = {}
+    profiles = {}
+    errors = []
 
-    if filters:
-        filtered_search = FilteredSimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager,
-            db_session_factory=lambda: db,
-        )
+    for i in indices:
+        item = items[i]
+        try:
+            long_term_embedding, session_embedding = _load_user_embeddings(item, cache, db)
+            query_vectors[i], blend_weights[i] = _build_query_vector(
+                item,
+                long_term_embedding,
+                session_embedding,
+                search_service,
+                text_encoder,
+                cache,
+                db,
+                query_embedding=query_embeddings.get(i),
+            )
+        except HTTPException as e:
+            errors.append(BatchItemError(index=i, message=e.detail, status_code=e.status_code))
+            continue
 
-        ml_results = filtered_search.search_with_filters(
-            query_vector=query_vector,
-            filters=filters,
-            k=request.limit * 2,  # Get more for better results after enrichment
-            session=db,
-        )
-    else:
-        similarity_search = SimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager
-        )
+        profiles[i] = (long_term_embedding is not None, session_embedding is not None)
 
-        ml_results = similarity_search.search(query_vector=query_vector, k=request.limit * 2)
+    return query_vectors, blend_weights, profiles, errors
 
-    recommendation_time_ms = (time.time() - recommend_start) * 1000
 
-    # Step 5: Extract product IDs and scores
-    product_ids = [r.product_id for r in ml_results.results]
-    scores = {}
+def _recommend_cache_keys(
+    requests: List[RecommendRequest],
+    cache_service: CacheService,
+    settings: APISettings,
+) -> List[str]:
+    """
+    Track user activity for cache warming and build result cache keys.
 
-    for result in ml_results.results:
-        scores[result.product_id] = {
-            "similarity": result.similarity,
-            "rank": result.rank,
-            "final_score": result.metadata.get("final_score", result.similarity),
-            "popularity_score": result.metadata.get("popularity_score"),
-            "price_affinity_score": result.metadata.get("price_affinity_score"),
-            "brand_match_score": result.metadata.get("brand_match_score"),
-        }
+    Cache keys include each user's cache generation (one MGET for the batch).
 
-    # Step 6: Enrich with metadata
-    enriched_results = metadata_service.enrich_results(
-        product_ids=product_ids, scores=scores, db=db
+    Args:
+        requests: Recommendation requests
+        cache_service: Cache service
+        settings: API settings
+
+    Returns:
+        Result cache key per request
+    """
+    generations = (
+        cache_service.get_user_generations([request.user_id for request in requests])
+        if settings.enable_cache
+        else {}
     )
 
-    # Step 7: Apply pagination
-    paginated_results = enriched_results[request.offset : request.offset + request.limit]
+    for request in requests:
+        cache_service.track_user_activity(request.user_id)
+        if request.search_query:
+            cache_service.track_query(request.search_query)
 
-    # Step 8: Build response
-    total_time_ms = (time.time() - start_time) * 1000
+    return [
+        _generate_cache_key(request, generations.get(str(request.user_id), 0))
+        for request in requests
+    ]
 
-    response_data = {
-        "results": paginated_results,
-        "total": len(enriched_results),
-        "offset": request.offset,
-        "limit": request.limit,
-        "page": (request.offset // request.limit) + 1 if request.limit > 0 else 1,
-        "user_id": request.user_id,
-        "context": request.context.value,
-        "recommendation_time_ms": recommendation_time_ms,
-        "total_time_ms": total_time_ms,
-        "personalized": True,
-        "cached": False,
-        "filters_applied": filters is not None,
-        "diversity_applied": request.enable_diversity,
-        "has_long_term_profile": has_long_term_profile,
-        "has_session_context": has_session_context,
-        "blend_weights": blend_weights,
-    }
-
-    # Step 9: Cache response
-    if settings.enable_cache:
-        cache_service.set_recommend_results(cache_key, response_data, settings.cache_ttl_recommend)
 
-    logger.info(
-        f"Recommendation completed: {len(enriched_results)} results in {total_time_ms:.2f}ms",
-        extra={"request_id": request_id},
-    )
+def _check_recommend_cache(
+    requests: List[RecommendRequest],
+    cache_service: CacheService,
+    settings: APISettings,
+) -> Tuple[List[str], List[Optional[Dict[str, Any]]]]:
+    """
+    Track user activity for cache warming and look up cached responses.
 
-    return RecommendResponse(**response_data)
+    Args:
+        requests: Recommendation requests
+        cache_service: Cache service
+        settings: API settings
 
+    Returns:
+        Tuple of (result cache key per request, cached response data per request;
+        None on miss or when caching is disabled)
+    """
+    cache_keys = _recommend_cache_keys(requests, cache_service, settings)
+    cached_responses = [
+        cache_service.get_recommend_results(cache_key) if settings.enable_cache else None
+        for cache_key in cache_keys
+    ]
+
+    return cache_keys, cached_responses
 
-def _generate_cache_key(request: RecommendRequest) -> str:
+
+def _store_recommend_results(
+    entries: List[tuple], cache_service: CacheService, settings: APISettings
+) -> None:
+    """Cache (cache_key, response_data) pairs."""
+    for cache_key, response_data in entries:
+        cache_service.set_recommend_results(cache_key, response_data, settings.cache_ttl_recommend)
+
+
+def _generate_cache_key(request: RecommendRequest, generation: int = 0) -> str:
     """
     Generate cache key for recommendation request.
 
     Args:
         request: Recommendation request
+        generation: User's cache generation (see UserCacheGenerations)
 
     Returns:
         Cache key string
@@ -367,6 +745,7 @@ def _generate_cache_key(request: RecommendRequest) -> str:
     # Create a deterministic string representation of the request
     key_parts = [
         f"user:{request.user_id}",
+        f"gen:{generation}",
         f"context:{request.context.value}",
         f"offset:{request.offset}",
         f"limit:{request.limit}",
@@ -394,33 +773,6 @@ def _generate_cache_key(request: RecommendRequest) -> str:
     return f"recommend:{key_hash}"
 
 
-def _get_cached_response(cache_key: str, cache: EmbeddingCache) -> Optional[Dict[str, Any]]:
-    """Get cached recommendation response."""
-    try:
-        return cache.redis.get(cache_key)
-    except Exception as e:
-        logger.warning(f"Failed to get cached response: {e}")
-        return None
-
-
-def _cache_response(
-    cache_key: str, response_data: Dict[str, Any], cache: EmbeddingCache, ttl: int
-) -> bool:
-    """Cache recommendation response."""
-    try:
-        # Convert Pydantic models to dicts for caching
-        cacheable_data = response_data.copy()
-        if "results" in cacheable_data:
-            cacheable_data["results"] = [
-                r.dict() if hasattr(r, "dict") else r for r in cacheable_data["results"]
-            ]
-
-        return cache.redis.set(cache_key, cacheable_data, ttl=ttl)
-    except Exception as e:
-        logger.warning(f"Failed to cache response: {e}")
-        return False
-
-
 def _get_product_embedding(
     product_id: str, search_service: SearchService, cache: EmbeddingCache, db: Session = None
 ) -> Optional[Any]:
@@ -6,21 +6,36 @@ POST /search - Text-based product search with personalization.
 import hashlib
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, status
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ...ml.caching import EmbeddingCache
-from ...ml.retrieval import ProductFilters, create_user_context
+from ...ml.retrieval import ProductFilters, SearchResults
 from ...ml.search import SearchMode
 from ...ml.search import SearchRequest as MLSearchRequest
 from ...ml.search import SearchService
 from ..config import APISettings, get_settings
 from ..dependencies import get_db, get_embedding_cache, get_request_id, get_search_service
 from ..errors import SearchError
-from ..models.search import ProductResult, SearchRequest, SearchResponse
+from ..models.common import FilterParams
+from ..models.search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    ProductResult,
+    SearchRequest,
+    SearchResponse,
+)
 from ..services.cache_service import CacheService, get_cache_service
+from ..services.executor import (
+    STAGE_DB,
+    STAGE_ENCODE,
+    STAGE_SEARCH,
+    StageExecutor,
+    get_stage_executor,
+)
 from ..services.metadata_service import MetadataService, get_metadata_service
 from ..services.text_encoder import TextEncoderService, get_text_encoder_service
 
@@ -38,14 +53,20 @@ async def search(
     metadata_service: MetadataService = Depends(get_metadata_service),
     cache: EmbeddingCache = Depends(get_embedding_cache),
     cache_service: CacheService = Depends(get_cache_service),
+    executor: StageExecutor = Depends(get_stage_executor),
     settings: APISettings = Depends(get_settings),
     request_id: str = Depends(get_request_id),
 ) -> SearchResponse:
     """
     Search for products using text query.
 
+    Blocking work runs in the stage executor (Redis/DB in the ``db`` stage,
+    FAISS in the ``search`` stage), so the event loop stays free while a
+    request waits on the model, the index or the database.
+
     Workflow:
-    1. Check cache for results
+    1. Check cache for results (concurrent identical misses are computed once,
+       and an expired result is served while one request refreshes it)
     2. Encode query text to embedding
     3. Perform similarity search with FAISS
     4. Apply filters and ranking
@@ -60,6 +81,8 @@ async def search(
         text_encoder: Text encoder service
         metadata_service: Metadata service
         cache: Embedding cache
+        cache_service: Cache service
+        executor: Stage executor for blocking work
         settings: API settings
         request_id: Request ID for tracing
 
@@ -74,74 +97,275 @@ async def search(
     )
 
     # Track query for cache warming
-    cache_service.track_query(request.query)
-    if request.user_id:
-        cache_service.track_user_activity(request.user_id)
+    (cache_key,) = await executor.run(
+        STAGE_DB, _search_cache_keys, [request], cache_service, settings
+    )
+
+    async def compute_response() -> Dict[str, Any]:
+        # Step 1: Encode query text to embedding
+        try:
+            query_embedding = await text_encoder.encode_query_async(request.query)
+        except Exception as e:
+            logger.error(f"Failed to encode query: {e}")
+            raise SearchError(
+                message="Failed to encode search query",
+                details={"query": request.query, "error": str(e)},
+            )
+
+        # Step 2: Build filters
+        filters = _build_product_filters(request.filters)
+
+        # Step 3: Check for user embeddings (for personalization)
+        (personalized,) = await executor.run(
+            STAGE_DB, _personalization_flags, [request.user_id], cache
+        )
+
+        # Step 4: Perform search
+        # We'll use the text search mode, but for MVP we'll treat it as a vector search
+        # TODO: Implement proper text search in SearchService
+        (ml_results,) = await executor.run(
+            STAGE_SEARCH,
+            _search_query_vectors,
+            query_vectors=query_embedding,
+            filters=[filters],
+            ks=[request.limit * 2],  # Get more for better results after enrichment
+            search_service=search_service,
+            db=db,
+        )
 
-    # Generate cache key
-    cache_key = _generate_cache_key(request)
+        # Step 5: Extract product IDs and scores
+        product_ids = ml_results.get_product_ids()
+        scores = ml_results.to_score_dicts()
 
-    # Check cache if enabled
-    cached_response = None
+        # Step 6: Enrich with metadata
+        enriched_results = await executor.run(
+            STAGE_DB, metadata_service.enrich_results, product_ids=product_ids, scores=scores, db=db
+        )
+
+        # Step 7: Apply pagination
+        paginated_results = enriched_results[request.offset : request.offset + request.limit]
+
+        # Step 8: Build response
+        return {
+            "results": paginated_results,
+            "total": len(enriched_results),
+            "offset": request.offset,
+            "limit": request.limit,
+            "page": (request.offset // request.limit) + 1 if request.limit > 0 else 1,
+            "query": request.query,
+            "user_id": request.user_id,
+            "search_time_ms": ml_results.search_time_ms,
+            "total_time_ms": (time.time() - start_time) * 1000,
+            "personalized": personalized,
+            "cached": False,
+            "filters_applied": filters is not None,
+            "ranking_applied": request.use_ranking,
+        }
+
+    # Serve from cache, or compute once for all concurrent identical requests and cache
     if settings.enable_cache:
-        cached_response = cache_service.get_search_results(cache_key)
+        response_data, cached = await cache_service.get_or_compute(
+            "search", cache_key, compute_response, settings.cache_ttl_search
+        )
+    else:
+        response_data, cached = await compute_response(), False
+
+    total_time_ms = (time.time() - start_time) * 1000
+
+    if cached:
+        logger.info(f"Cache HIT for query: '{request.query}'", extra={"request_id": request_id})
+        response_data["cached"] = True
+        response_data["total_time_ms"] = total_time_ms
+        return SearchResponse(**response_data)
+
+    logger.info(
+        f"Search completed: {response_data['total']} results in {total_time_ms:.2f}ms",
+        extra={"request_id": request_id},
+    )
+
+    return SearchResponse(**response_data)
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse, status_code=status.HTTP_200_OK)
+async def search_batch(
+    request: BatchSearchRequest,
+    db: Session = Depends(get_db),
+    search_service: SearchService = Depends(get_search_service),
+    text_encoder: TextEncoderService = Depends(get_text_encoder_service),
+    metadata_service: MetadataService = Depends(get_metadata_service),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
+    cache_service: CacheService = Depends(get_cache_service),
+    executor: StageExecutor = Depends(get_stage_executor),
+    settings: APISettings = Depends(get_settings),
+    request_id: str = Depends(get_request_id),
+) -> BatchSearchResponse:
+    """
+    Run many text searches in one request.
+
+    Workflow:
+    1. Serve queries found in the result cache
+    2. Encode all remaining query texts in one CLIP forward pass
+    3. Run one FAISS search over the stacked unfiltered query vectors
+       (filtered queries go through the filtered search path)
+    4. Enrich all results with one metadata fetch
+    5. Cache and return per-query responses
+
+    Args:
+        request: Batch of search requests
+        db: Database session
+        search_service: Search service instance
+        text_encoder: Text encoder service
+        metadata_service: Metadata service
+        cache: Embedding cache
+        cache_service: Cache service
+        executor: Stage executor for blocking work
+        settings: API settings
+        request_id: Request ID for tracing
+
+    Returns:
+        Batch search response with one SearchResponse per query
+    """
+    start_time = time.time()
+    queries = request.queries
 
+    if len(queries) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch contains {len(queries)} queries, maximum is {settings.max_batch_size}",
+        )
+
+    logger.info(f"Batch search request: {len(queries)} queries", extra={"request_id": request_id})
+
+    # Step 1: Serve cached queries
+    cache_keys, responses = await executor.run(
+        STAGE_DB, _check_search_cache, queries, cache_service, settings
+    )
+    pending = []
+
+    for i, cached_response in enumerate(responses):
         if cached_response:
-            logger.info(f"Cache HIT for query: '{request.query}'", extra={"request_id": request_id})
             cached_response["cached"] = True
-            cached_response["total_time_ms"] = (time.time() - start_time) * 1000
-            return SearchResponse(**cached_response)
+        else:
+            pending.append(i)
 
-    logger.debug(f"Cache MISS for query: '{request.query}'")
+    logger.debug(f"Batch search: {len(queries) - len(pending)} cache hits, {len(pending)} misses")
 
-    # Step 1: Encode query text to embedding
-    try:
-        query_embedding = text_encoder.encode_query(request.query)
-    except Exception as e:
-        logger.error(f"Failed to encode query: {e}")
-        raise SearchError(
-            message="Failed to encode search query",
-            details={"query": request.query, "error": str(e)},
-        )
+    search_time_ms = 0.0
+    if pending:
+        # Step 2: Encode all query texts in one batch
+        try:
+            query_embeddings = await executor.run(
+                STAGE_ENCODE, text_encoder.encode_batch, [queries[i].query for i in pending]
+            )
+        except Exception as e:
+            logger.error(f"Failed to encode batch queries: {e}")
+            raise SearchError(
+                message="Failed to encode search queries",
+                details={"num_queries": len(pending), "error": str(e)},
+            )
 
-    # Step 2: Build filters
-    filters = None
-    if request.filters:
-        filters = ProductFilters(
-            min_price=request.filters.min_price,
-            max_price=request.filters.max_price,
-            in_stock_only=request.filters.in_stock,
-            merchant_ids=request.filters.merchant_ids,
-            category_ids=request.filters.category_ids,
-            brand_ids=request.filters.brand_ids,
+        # Step 3: Search all query vectors
+        filters = [_build_product_filters(queries[i].filters) for i in pending]
+        search_start = time.time()
+        ml_results = await executor.run(
+            STAGE_SEARCH,
+            _search_query_vectors,
+            query_vectors=query_embeddings,
+            filters=filters,
+            ks=[queries[i].limit * 2 for i in pending],
+            search_service=search_service,
+            db=db,
+        )
+        search_time_ms = (time.time() - search_start) * 1000
+
+        # Step 4: Enrich all results with one metadata fetch
+        enriched = await executor.run(
+            STAGE_DB,
+            metadata_service.enrich_results_batch,
+            product_id_lists=[results.get_product_ids() for results in ml_results],
+            score_lists=[results.to_score_dicts() for results in ml_results],
+            db=db,
+        )
+        personalized = await executor.run(
+            STAGE_DB, _personalization_flags, [queries[i].user_id for i in pending], cache
         )
 
-    # Step 3: Build user context (for personalization)
-    user_context = None
-    if request.user_id:
-        # Get user embeddings from cache
-        user_embeddings = cache.get_user_embeddings(request.user_id)
-        long_term = user_embeddings.get("long_term")
-        session_emb = user_embeddings.get("session")
-
-        if long_term or session_emb:
-            user_context = create_user_context(
-                user_id=request.user_id,
-                long_term_embedding=long_term,
-                session_embedding=session_emb,
+        # Step 5: Build and cache per-query responses
+        for i, query_filters, results, enriched_results, query_personalized in zip(
+            pending, filters, ml_results, enriched, personalized
+        ):
+            query = queries[i]
+            response_data = {
+                "results": enriched_results[query.offset : query.offset + query.limit],
+                "total": len(enriched_results),
+                "offset": query.offset,
+                "limit": query.limit,
+                "page": (query.offset // query.limit) + 1 if query.limit > 0 else 1,
+                "query": query.query,
+                "user_id": query.user_id,
+                "search_time_ms": results.search_time_ms,
+                "total_time_ms": (time.time() - start_time) * 1000,
+                "personalized": query_personalized,
+                "cached": False,
+                "filters_applied": query_filters is not None,
+                "ranking_applied": query.use_ranking,
+            }
+
+            responses[i] = response_data
+
+        if settings.enable_cache:
+            await executor.run(
+                STAGE_DB,
+                _store_search_results,
+                [(cache_keys[i], responses[i]) for i in pending],
+                cache_service,
+                settings,
             )
 
-    # Step 4: Perform search
-    # We'll use the text search mode, but for MVP we'll treat it as a vector search
-    # TODO: Implement proper text search in SearchService
+    total_time_ms = (time.time() - start_time) * 1000
 
-    # For now, use the query embedding directly
-    from ...ml.retrieval import FilteredSimilaritySearch, SimilaritySearch
+    logger.info(
+        f"Batch search completed: {len(queries)} queries in {total_time_ms:.2f}ms",
+        extra={"request_id": request_id},
+    )
+
+    return BatchSearchResponse(
+        responses=[SearchResponse(**response_data) for response_data in responses],
+        total=len(queries),
+        search_time_ms=search_time_ms,
+        total_time_ms=total_time_ms,
+    )
+
+
+def _search_query_vectors(
+    query_vectors: np.ndarray,
+    filters: List[Optional[ProductFilters]],
+    ks: List[int],
+    search_service: SearchService,
+    db: Session,
+) -> List[SearchResults]:
+    """
+    Search many query vectors at once.
+
+    Unfiltered queries share a single FAISS search over the stacked matrix
+    (at the largest requested k, then trimmed per query). Filtered queries
+    go through FilteredSimilaritySearch one by one.
+
+    Args:
+        query_vectors: Query vectors (num_queries x dimension)
+        filters: Product filters per query (None for unfiltered)
+        ks: Number of results per query
+        search_service: Search service (owns the shared searchers)
+        db: Database session
+
+    Returns:
+        SearchResults per query, in input order
+    """
+    personalized_search = search_service.personalized_search
 
     # Ensure FAISS index is loaded (lazy loading on first search request)
-    index_manager = search_service.personalized_search.index_manager
     try:
-        index_manager.ensure_index_loaded(session=db)
+        personalized_search.index_manager.ensure_index_loaded(session=db)
     except Exception as e:
         logger.error(f"Failed to load FAISS index: {e}")
         raise SearchError(
@@ -149,84 +373,138 @@ async def search(
             details={"error": str(e)},
         )
 
-    if filters:
-        filtered_search = FilteredSimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager,
-            db_session_factory=lambda: db,
-        )
+    query_vectors = np.asarray(query_vectors, dtype=np.float32).reshape(len(ks), -1)
+    results: List[Optional[SearchResults]] = [None] * len(ks)
 
-        ml_results = filtered_search.search_with_filters(
-            query_vector=query_embedding,
-            filters=filters,
-            k=request.limit * 2,  # Get more for better results after enrichment
-            session=db,
-        )
-    else:
-        similarity_search = SimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager
+    unfiltered = [i for i, query_filters in enumerate(filters) if query_filters is None]
+    if unfiltered:
+        batch_results = personalized_search.similarity_search.search_batch(
+            query_vectors=query_vectors[unfiltered], k=max(ks[i] for i in unfiltered)
         )
+        for i, query_results in zip(unfiltered, batch_results):
+            query_results.truncate(ks[i])
+            query_results.k = ks[i]
+            results[i] = query_results
+
+    filtered = [i for i, query_filters in enumerate(filters) if query_filters is not None]
+    if filtered:
+        for i in filtered:
+            results[i] = personalized_search.filtered_search.search_with_filters(
+                query_vector=query_vectors[i], filters=filters[i], k=ks[i], session=db
+            )
 
-        ml_results = similarity_search.search(query_vector=query_embedding, k=request.limit * 2)
+    return results
 
-    # Step 5: Extract product IDs and scores
-    product_ids = [r.product_id for r in ml_results.results]
-    scores = {}
 
-    for result in ml_results.results:
-        scores[result.product_id] = {
-            "similarity": result.similarity,
-            "rank": result.rank,
-            "final_score": result.metadata.get("final_score", result.similarity),
-            "popularity_score": result.metadata.get("popularity_score"),
-            "price_affinity_score": result.metadata.get("price_affinity_score"),
-            "brand_match_score": result.metadata.get("brand_match_score"),
-        }
+def _build_product_filters(filter_params: Optional[FilterParams]) -> Optional[ProductFilters]:
+    """Convert API filter parameters into ML product filters."""
+    if not filter_params:
+        return None
 
-    # Step 6: Enrich with metadata
-    enriched_results = metadata_service.enrich_results(
-        product_ids=product_ids, scores=scores, db=db
+    return ProductFilters(
+        min_price=filter_params.min_price,
+        max_price=filter_params.max_price,
+        in_stock_only=filter_params.in_stock,
+        merchant_ids=filter_params.merchant_ids,
+        category_ids=filter_params.category_ids,
+        brand_ids=filter_params.brand_ids,
     )
 
-    # Step 7: Apply pagination
-    paginated_results = enriched_results[request.offset : request.offset + request.limit]
 
-    # Step 8: Build response
-    total_time_ms = (time.time() - start_time) * 1000
+def _personalization_flags(user_ids: List[Optional[int]], cache: EmbeddingCache) -> List[bool]:
+    """Check which users have cached embeddings (i.e. get personalized results)."""
+    flags = []
 
-    response_data = {
-        "results": paginated_results,
-        "total": len(enriched_results),
-        "offset": request.offset,
-        "limit": request.limit,
-        "page": (request.offset // request.limit) + 1 if request.limit > 0 else 1,
-        "query": request.query,
-        "user_id": request.user_id,
-        "search_time_ms": ml_results.search_time_ms,
-        "total_time_ms": total_time_ms,
-        "personalized": user_context is not None,
-        "cached": False,
-        "filters_applied": filters is not None,
-        "ranking_applied": request.use_ranking,
-    }
-
-    # Step 9: Cache response
-    if settings.enable_cache:
-        cache_service.set_search_results(cache_key, response_data, settings.cache_ttl_search)
+    for user_id in user_ids:
+        if not user_id:
+            flags.append(False)
+            continue
 
-    logger.info(
-        f"Search completed: {len(enriched_results)} results in {total_time_ms:.2f}ms",
-        extra={"request_id": request_id},
+        user_embeddings = cache.get_user_embeddings(user_id)
+        flags.append(
+            user_embeddings.get("long_term") is not None
+            or user_embeddings.get("session") is not None
+        )
+
+    return flags
+
+
+def _search_cache_keys(
+    requests: List[SearchRequest],
+    cache_service: CacheService,
+    settings: APISettings,
+) -> List[str]:
+    """
+    Track queries for cache warming and build result cache keys.
+
+    Cache keys include each user's cache generation (one MGET for the batch).
+
+    Args:
+        requests: Search requests
+        cache_service: Cache service
+        settings: API settings
+
+    Returns:
+        Result cache key per request
+    """
+    generations = (
+        cache_service.get_user_generations([request.user_id for request in requests])
+        if settings.enable_cache
+        else {}
     )
 
-    return SearchResponse(**response_data)
+    for request in requests:
+        cache_service.track_query(request.query)
+        if request.user_id:
+            cache_service.track_user_activity(request.user_id)
+
+    return [
+        _generate_cache_key(request, generations.get(str(request.user_id), 0))
+        for request in requests
+    ]
+
+
+def _check_search_cache(
+    requests: List[SearchRequest],
+    cache_service: CacheService,
+    settings: APISettings,
+) -> Tuple[List[str], List[Optional[Dict[str, Any]]]]:
+    """
+    Track queries for cache warming and look up cached responses.
+
+    Args:
+        requests: Search requests
+        cache_service: Cache service
+        settings: API settings
+
+    Returns:
+        Tuple of (result cache key per request, cached response data per request;
+        None on miss or when caching is disabled)
+    """
+    cache_keys = _search_cache_keys(requests, cache_service, settings)
+    cached_responses = [
+        cache_service.get_search_results(cache_key) if settings.enable_cache else None
+        for cache_key in cache_keys
+    ]
+
+    return cache_keys, cached_responses
 
 
-def _generate_cache_key(request: SearchRequest) -> str:
+def _store_search_results(
+    entries: List[tuple], cache_service: CacheService, settings: APISettings
+) -> None:
+    """Cache (cache_key, response_data) pairs."""
+    for cache_key, response_data in entries:
+        cache_service.set_search_results(cache_key, response_data, settings.cache_ttl_search)
+
+
+def _generate_cache_key(request: SearchRequest, generation: int = 0) -> str:
     """
     Generate cache key for search request.
 
     Args:
         request: Search request
+        generation: User's cache generation (see UserCacheGenerations)
 
     Returns:
         Cache key string
@@ -235,6 +513,7 @@ def _generate_cache_key(request: SearchRequest) -> str:
     key_parts = [
         f"query:{request.query.lower().strip()}",
         f"user:{request.user_id or 'anon'}",
+        f"gen:{generation}",
         f"offset:{request.offset}",
         f"limit:{request.limit}",
     ]
@@ -268,30 +547,3 @@ def _hash_filters(filters) -> str:
         filter_parts.append(f"brands:{','.join(map(str, sorted(filters.brand_ids)))}")
 
     return "|".join(filter_parts)
-
-
-def _get_cached_response(cache_key: str, cache: EmbeddingCache) -> Dict[str, Any]:
-    """Get cached search response."""
-    try:
-        return cache.redis.get(cache_key)
-    except Exception as e:
-        logger.warning(f"Failed to get cached response: {e}")
-        return None
-
-
-def _cache_response(
-    cache_key: str, response_data: Dict[str, Any], cache: EmbeddingCache, ttl: int
-) -> bool:
-    """Cache search response."""
-    try:
-        # Convert Pydantic models to dicts for caching
-        cacheable_data = response_data.copy()
-        if "results" in cacheable_data:
-            cacheable_data["results"] = [
-                r.dict() if hasattr(r, "dict") else r for r in cacheable_data["results"]
-            ]
-
-        return cache.redis.set(cache_key, cacheable_data, ttl=ttl)
-    except Exception as e:
-        logger.warning(f"Failed to cache response: {e}")
-        return False
@@ -4,6 +4,7 @@ Business logic services for API endpoints.
 """
 
 from .cache_service import CacheService, get_cache_service
+from .container import ServiceContainer, get_service_container
 from .metadata_service import MetadataService
 from .performance_monitor import PerformanceMonitor, get_performance_monitor
 from .text_encoder import TextEncoderService
@@ -15,4 +16,6 @@ __all__ = [
     "get_cache_service",
     "PerformanceMonitor",
     "get_performance_monitor",
+    "ServiceContainer",
+    "get_service_container",
 ]
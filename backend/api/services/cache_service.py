@@ -8,9 +8,11 @@ import logging
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-from ...ml.caching import EmbeddingCache
+from ...ml.caching import EmbeddingCache, SingleFlight, UserCacheGenerations
+from ...ml.caching.single_flight import SOURCE_COMPUTED
+from .executor import STAGE_DB, get_stage_executor
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +30,16 @@ class CacheConfig:
 
     # Cache warming
     POPULAR_QUERY_THRESHOLD = 5  # Query must appear 5+ times
+    POPULAR_QUERIES_KEY = "stats:popular_queries"  # Redis sorted set shared by all instances
     ACTIVE_USER_THRESHOLD = 10  # User must have 10+ interactions
     CACHE_WARM_BATCH_SIZE = 100  # Warm 100 items at a time
 
+    # Stampede protection (see SingleFlight)
+    STALE_WHILE_REVALIDATE_SECONDS = 60  # Serve expired results this long while refreshing
+    REFRESH_LOCK_SECONDS = 10  # Redis lock held by the request recomputing a key
+    REFRESH_WAIT_SECONDS = 3.0  # Poll for another worker's result this long, then compute
+    REFRESH_POLL_INTERVAL_SECONDS = 0.05
+
     # Statistics
     STATS_WINDOW_SECONDS = 3600  # 1 hour rolling window
 
@@ -43,6 +52,7 @@ class CacheStatistics:
         self.misses = 0
         self.sets = 0
         self.deletes = 0
+        self.invalidations = 0
         self.errors = 0
 
         # Per-key-type stats
@@ -73,6 +83,10 @@ class CacheStatistics:
         """Record a cache delete operation."""
         self.deletes += 1
 
+    def record_invalidation(self):
+        """Record a user cache invalidation (generation bump)."""
+        self.invalidations += 1
+
     def record_error(self):
         """Record a cache error."""
         self.errors += 1
@@ -93,6 +107,7 @@ class CacheStatistics:
             "misses": self.misses,
             "sets": self.sets,
             "deletes": self.deletes,
+            "user_invalidations": self.invalidations,
             "errors": self.errors,
             "hit_rate_percent": self.get_hit_rate(),
             "hits_by_type": dict(self.hits_by_type),
@@ -120,6 +135,15 @@ class CacheService:
         self.cache = cache or EmbeddingCache()
         self.config = CacheConfig()
         self.stats = CacheStatistics()
+        self.user_generations = UserCacheGenerations(self.cache.config, self.cache.redis)
+        self.single_flight = SingleFlight(
+            self.cache.redis,
+            stale_seconds=self.config.STALE_WHILE_REVALIDATE_SECONDS,
+            lock_seconds=self.config.REFRESH_LOCK_SECONDS,
+            wait_seconds=self.config.REFRESH_WAIT_SECONDS,
+            poll_interval_seconds=self.config.REFRESH_POLL_INTERVAL_SECONDS,
+            run_blocking=_run_in_db_stage,
+        )
 
         # Track popular queries and active users for warming
         self.popular_queries: Dict[str, int] = {}  # query -> count
@@ -135,29 +159,9 @@ class CacheService:
             cache_key: Cache key
 
         Returns:
-            Cached search results or None
+            Cached search results or None (expired entries count as misses)
         """
-        start_time = time.time()
-
-        try:
-            result = self.cache.redis.get(cache_key)
-
-            elapsed_ms = (time.time() - start_time) * 1000
-            self.stats.total_get_time_ms += elapsed_ms
-
-            if result:
-                self.stats.record_hit("search")
-                logger.debug(f"Search cache HIT: {cache_key} ({elapsed_ms:.2f}ms)")
-            else:
-                self.stats.record_miss("search")
-                logger.debug(f"Search cache MISS: {cache_key}")
-
-            return result
-
-        except Exception as e:
-            self.stats.record_error()
-            logger.error(f"Failed to get search results from cache: {e}")
-            return None
+        return self._get_results("search", cache_key)
 
     def set_search_results(
         self, cache_key: str, results: Dict[str, Any], ttl: Optional[int] = None
@@ -173,80 +177,163 @@ class CacheService:
         Returns:
             True if cached successfully
         """
-        start_time = time.time()
-        ttl = ttl or self.config.TTL_SEARCH_RESULTS
+        return self._set_results(
+            "search", cache_key, results, ttl or self.config.TTL_SEARCH_RESULTS
+        )
 
-        try:
-            # Convert Pydantic models to dicts
-            cacheable_data = results.copy()
-            if "results" in cacheable_data:
-                cacheable_data["results"] = [
-                    r.dict() if hasattr(r, "dict") else r for r in cacheable_data["results"]
-                ]
-
-            success = self.cache.redis.set(cache_key, cacheable_data, ttl=ttl)
-
-            elapsed_ms = (time.time() - start_time) * 1000
-            self.stats.total_set_time_ms += elapsed_ms
+    def get_recommend_results(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get cached recommendation results."""
+        return self._get_results("recommend", cache_key)
 
-            if success:
-                self.stats.record_set()
-                logger.debug(f"Cached search results: {cache_key} (TTL={ttl}s)")
+    def set_recommend_results(
+        self, cache_key: str, results: Dict[str, Any], ttl: Optional[int] = None
+    ) -> bool:
+        """Cache recommendation results."""
+        return self._set_results(
+            "recommend", cache_key, results, ttl or self.config.TTL_RECOMMEND_RESULTS
+        )
+
+    async def get_or_compute(
+        self,
+        key_type: str,
+        cache_key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Get cached results, computing them at most once across concurrent misses.
 
-            return success
+        Concurrent misses for the same key share one computation (see
+        SingleFlight), and an expired entry is served to concurrent requests
+        while one request refreshes it, so a popular key expiring does not
+        trigger a stampede of identical searches.
 
-        except Exception as e:
-            self.stats.record_error()
-            logger.error(f"Failed to cache search results: {e}")
-            return False
+        Args:
+            key_type: "search" or "recommend"
+            cache_key: Cache key
+            compute: Coroutine function producing the response data on a miss
+            ttl: Time-to-live in seconds (default: config TTL for key_type)
 
-    def get_recommend_results(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached recommendation results."""
+        Returns:
+            Tuple of (response data, True if it was not computed by this request)
+        """
+        if ttl is None:
+            ttl = (
+                self.config.TTL_SEARCH_RESULTS
+                if key_type == "search"
+                else self.config.TTL_RECOMMEND_RESULTS
+            )
+
+        value, source = await self.single_flight.get_or_compute(
+            cache_key,
+            compute,
+            lookup=self._read_results,
+            store=lambda key, results: self._set_results(key_type, key, results, ttl),
+        )
+
+        if source == SOURCE_COMPUTED:
+            self.stats.record_miss(key_type)
+        else:
+            self.stats.record_hit(key_type)
+            logger.debug(f"{key_type} cache {source.upper()}: {cache_key}")
+
+        return value, source != SOURCE_COMPUTED
+
+    def _get_results(self, key_type: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get fresh cached results, recording hit/miss statistics."""
         start_time = time.time()
+        result, fresh = self._read_results(cache_key)
 
-        try:
-            result = self.cache.redis.get(cache_key)
+        elapsed_ms = (time.time() - start_time) * 1000
+        self.stats.total_get_time_ms += elapsed_ms
 
-            elapsed_ms = (time.time() - start_time) * 1000
-            self.stats.total_get_time_ms += elapsed_ms
+        if result is not None and fresh:
+            self.stats.record_hit(key_type)
+            logger.debug(f"{key_type} cache HIT: {cache_key} ({elapsed_ms:.2f}ms)")
+            return result
 
-            if result:
-                self.stats.record_hit("recommend")
-            else:
-                self.stats.record_miss("recommend")
+        self.stats.record_miss(key_type)
+        logger.debug(f"{key_type} cache MISS: {cache_key}")
+        return None
 
-            return result
+    def _read_results(self, cache_key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Read cached results without recording statistics.
+
+        Returns:
+            Tuple of (results or None, fresh)
+        """
+        try:
+            return self.single_flight.unwrap(self.cache.redis.get(cache_key))
 
         except Exception as e:
             self.stats.record_error()
-            logger.error(f"Failed to get recommend results: {e}")
-            return None
+            logger.error(f"Failed to get {cache_key} from cache: {e}")
+            return None, False
 
-    def set_recommend_results(
-        self, cache_key: str, results: Dict[str, Any], ttl: Optional[int] = None
+    def _set_results(
+        self, key_type: str, cache_key: str, results: Dict[str, Any], ttl: int
     ) -> bool:
-        """Cache recommendation results."""
-        ttl = ttl or self.config.TTL_RECOMMEND_RESULTS
+        """Cache results; kept past their TTL for stale-while-revalidate."""
+        start_time = time.time()
 
         try:
+            # Convert Pydantic models to dicts
             cacheable_data = results.copy()
             if "results" in cacheable_data:
                 cacheable_data["results"] = [
                     r.dict() if hasattr(r, "dict") else r for r in cacheable_data["results"]
                 ]
 
-            success = self.cache.redis.set(cache_key, cacheable_data, ttl=ttl)
+            cacheable_data, redis_ttl = self.single_flight.wrap(cacheable_data, ttl)
+            success = self.cache.redis.set(cache_key, cacheable_data, ttl=redis_ttl)
+
+            elapsed_ms = (time.time() - start_time) * 1000
+            self.stats.total_set_time_ms += elapsed_ms
 
             if success:
                 self.stats.record_set()
+                logger.debug(f"Cached {key_type} results: {cache_key} (TTL={ttl}s)")
 
             return success
 
         except Exception as e:
             self.stats.record_error()
-            logger.error(f"Failed to cache recommend results: {e}")
+            logger.error(f"Failed to cache {key_type} results: {e}")
             return False
 
+    def get_user_generations(self, user_ids: List[Any]) -> Dict[str, int]:
+        """
+        Current cache generations for the users of a batch of requests.
+
+        Args:
+            user_ids: User IDs (None for anonymous requests)
+
+        Returns:
+            Dict mapping str(user_id) -> generation
+        """
+        return self.user_generations.get_many(user_ids)
+
+    def invalidate_user(self, user_id: Any) -> bool:
+        """
+        Invalidate all cached search and recommendation results of a user.
+
+        Bumps the user's cache generation: one INCR, no key scan. Entries of
+        the old generation are never read again and expire through their TTL.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            True if the generation was bumped
+        """
+        if self.user_generations.bump(user_id) is None:
+            self.stats.record_error()
+            return False
+
+        self.stats.record_invalidation()
+        return True
+
     def track_query(self, query: str):
         """
         Track query for cache warming.
@@ -282,6 +369,72 @@ class CacheService:
             query for query, count in sorted_queries if count >= self.config.POPULAR_QUERY_THRESHOLD
         ][:limit]
 
+    def persist_popular_queries(self, limit: int = 100) -> int:
+        """
+        Add this instance's popular query counts to the shared set in Redis.
+
+        Called on shutdown so the next instance can warm its caches with them.
+        Only queries seen at least POPULAR_QUERY_THRESHOLD times are persisted,
+        and the shared set is trimmed to the ``limit`` most popular queries, so
+        it does not grow with every one-off query. Persisted local counts are
+        cleared, so repeated calls never double count.
+
+        Args:
+            limit: Queries kept in the shared set (the warm-up reads at most this many)
+
+        Returns:
+            Number of distinct queries persisted
+        """
+        counts = {
+            query: count
+            for query, count in self.popular_queries.items()
+            if count >= self.config.POPULAR_QUERY_THRESHOLD
+        }
+        if not counts:
+            return 0
+
+        try:
+            pipe = self.cache.redis._get_client().pipeline(transaction=False)
+            for query, count in counts.items():
+                pipe.zincrby(self.config.POPULAR_QUERIES_KEY, count, query)
+            # Keep only the top `limit` (ranks are ascending by score)
+            pipe.zremrangebyrank(self.config.POPULAR_QUERIES_KEY, 0, -(limit + 1))
+            pipe.execute()
+        except Exception as e:
+            self.stats.record_error()
+            logger.error(f"Failed to persist popular queries: {e}")
+            return 0
+
+        for query in counts:
+            self.popular_queries.pop(query, None)
+
+        logger.info(f"Persisted {len(counts)} popular queries")
+        return len(counts)
+
+    def load_popular_queries(self, limit: int = 100) -> List[str]:
+        """
+        Get the most popular queries across all instances.
+
+        Merges the shared Redis set with this instance's own popular queries.
+
+        Args:
+            limit: Maximum number of queries to return
+
+        Returns:
+            List of popular queries, most popular first
+        """
+        try:
+            shared = self.cache.redis._get_client().zrevrange(
+                self.config.POPULAR_QUERIES_KEY, 0, limit - 1
+            )
+        except Exception as e:
+            self.stats.record_error()
+            logger.warning(f"Failed to load popular queries: {e}")
+            shared = []
+
+        queries = [q.decode("utf-8") if isinstance(q, bytes) else q for q in shared]
+        return list(dict.fromkeys(queries + self.get_popular_queries(limit)))[:limit]
+
     def get_active_users(self) -> List[int]:
         """
         Get active users for cache warming.
@@ -342,16 +495,11 @@ class CacheService:
             Number of keys deleted
         """
         try:
-            # Note: This requires Redis SCAN which may not be in EmbeddingCache
-            # For now, just log
-            logger.info(f"Invalidating cache pattern: {pattern}")
+            # Incremental SCAN + UNLINK; never blocks Redis like KEYS would
+            deleted = self.cache.redis.delete_pattern(pattern)
             self.stats.record_delete()
-
-            # TODO: Implement with Redis SCAN
-            # deleted = self.cache.redis.delete_pattern(pattern)
-            # return deleted
-
-            return 0
+            logger.info(f"Invalidated {deleted} keys matching {pattern}")
+            return deleted
 
         except Exception as e:
             self.stats.record_error()
@@ -360,7 +508,7 @@ class CacheService:
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        return self.stats.get_stats()
+        return {**self.stats.get_stats(), "single_flight": self.single_flight.get_stats()}
 
     def reset_statistics(self):
         """Reset cache statistics."""
@@ -368,6 +516,11 @@ class CacheService:
         logger.info("Cache statistics reset")
 
 
+async def _run_in_db_stage(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking cache call in the stage executor's db pool."""
+    return await get_stage_executor().run(STAGE_DB, func, *args)
+
+
 # Singleton instance
 _cache_service: Optional[CacheService] = None
 
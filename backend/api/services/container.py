@@ -0,0 +1,103 @@
+"""
+Service Container
+Application-lifetime instances of the services used by request handlers.
+"""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from ...ml.config import MLConfig, get_ml_config
+from ...ml.search import SearchService
+from .cache_service import get_cache_service
+from .metadata_service import get_metadata_service
+from .text_encoder import get_text_encoder_service
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Services that are expensive to construct and safe to share between requests.
+
+    ``SearchService`` pulls in PersonalizedSearch, FeedbackHandler, SessionManager,
+    WarmUserEmbedding and several caches, so building it per request cost far more
+    than most cache-hit responses. The container builds that graph once at startup.
+    Per-request state (the database session) is always passed into each call, so
+    every member can be used from any worker thread.
+    """
+
+    def __init__(
+        self, config: Optional[MLConfig] = None, db_session_factory: Optional[Callable] = None
+    ):
+        """
+        Initialize service container.
+
+        Args:
+            config: ML configuration
+            db_session_factory: Database session factory
+        """
+        self.config = config or get_ml_config()
+        self.db_session_factory = db_session_factory
+
+        self.search_service = SearchService(
+            config=self.config, db_session_factory=db_session_factory
+        )
+
+        # Reuse the searchers already owned by the search service
+        personalized_search = self.search_service.personalized_search
+        self.index_manager = personalized_search.index_manager
+        self.similarity_search = personalized_search.similarity_search
+        self.filtered_search = personalized_search.filtered_search
+        self.embedding_cache = self.search_service.cache
+
+        self.text_encoder = get_text_encoder_service()
+        self.metadata_service = get_metadata_service()
+        self.cache_service = get_cache_service()
+
+        logger.info("Service container initialized")
+
+
+# Singleton instance
+_service_container: Optional[ServiceContainer] = None
+_service_container_lock = threading.Lock()
+
+
+def init_service_container(db_session_factory: Optional[Callable] = None) -> ServiceContainer:
+    """
+    Build the global service container (application startup).
+
+    Args:
+        db_session_factory: Database session factory
+
+    Returns:
+        ServiceContainer instance
+    """
+    global _service_container
+    with _service_container_lock:
+        _service_container = ServiceContainer(db_session_factory=db_session_factory)
+    return _service_container
+
+
+def get_service_container(db_session_factory: Optional[Callable] = None) -> ServiceContainer:
+    """
+    Get global service container, building it on first use if startup did not.
+
+    Args:
+        db_session_factory: Database session factory (only used when building)
+
+    Returns:
+        ServiceContainer instance
+    """
+    global _service_container
+    if _service_container is None:
+        with _service_container_lock:
+            if _service_container is None:
+                _service_container = ServiceContainer(db_session_factory=db_session_factory)
+    return _service_container
+
+
+def reset_service_container() -> None:
+    """Drop the global service container (application shutdown, tests)."""
+    global _service_container
+    _service_container = None
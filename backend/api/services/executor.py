@@ -0,0 +1,222 @@
+"""
+Stage Executor
+Runs blocking ML, database and cache work off the event loop in bounded per-stage pools.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from ..config import APISettings, get_settings
+from ..errors import ServiceOverloadedError
+from ..middleware.timing import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Stage names
+STAGE_ENCODE = "encode"  # CLIP inference (when not micro-batched)
+STAGE_SEARCH = "search"  # FAISS search, filtering and ranking
+STAGE_DB = "db"  # SQLAlchemy queries and blocking Redis calls
+
+
+class _StageStats:
+    """Counters and latency windows for one stage."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_time = LatencyTracker()
+        self.run_time = LatencyTracker()
+
+
+class StageExecutor:
+    """
+    Bounded thread pools for the blocking stages of a request.
+
+    Each stage gets its own pool, so its worker count is its concurrency limit.
+    A slow CLIP encode then occupies an encode worker rather than the event loop
+    or the pool serving database calls. Work waiting for a worker is counted
+    against ``max_queue``; beyond it requests fail fast with 503.
+
+    Queue time (submit -> start) and run time are tracked per stage.
+    """
+
+    def __init__(self, settings: Optional[APISettings] = None):
+        """
+        Initialize stage pools.
+
+        Args:
+            settings: API settings (worker counts and queue limit)
+        """
+        settings = settings or get_settings()
+
+        self.max_queue = settings.executor_max_queue
+        self._workers = {
+            STAGE_ENCODE: settings.executor_encode_workers,
+            STAGE_SEARCH: settings.executor_search_workers,
+            STAGE_DB: settings.executor_db_workers,
+        }
+        self._pools: Dict[str, ThreadPoolExecutor] = {
+            stage: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stage-{stage}")
+            for stage, workers in self._workers.items()
+        }
+        self._stats = {stage: _StageStats() for stage in self._pools}
+
+        logger.info(f"Stage executor initialized: {self._workers}")
+
+    async def run(self, stage: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function in a stage pool and await its result.
+
+        Args:
+            stage: Stage name (STAGE_ENCODE, STAGE_SEARCH or STAGE_DB)
+            func: Blocking function
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Return value of func
+
+        Raises:
+            ServiceOverloadedError: If the stage queue is full
+        """
+        pool = self._pools[stage]
+        stats = self._stats[stage]
+
+        with stats.lock:
+            if stats.queued >= self.max_queue:
+                stats.rejected += 1
+                raise ServiceOverloadedError(stage=stage, queued=stats.queued)
+            stats.queued += 1
+
+        submitted_at = time.perf_counter()
+        # Copy context so request-scoped context variables survive the thread hop
+        context = contextvars.copy_context()
+        dequeued = False
+
+        def dequeue(start: bool) -> None:
+            # Leave the queue exactly once: when the job starts, or when it is
+            # cancelled before starting (the awaiting request went away)
+            nonlocal dequeued
+            with stats.lock:
+                if dequeued:
+                    return
+                dequeued = True
+                stats.queued -= 1
+                if start:
+                    stats.in_flight += 1
+
+        def call() -> T:
+            started_at = time.perf_counter()
+            dequeue(start=True)
+            stats.queue_time.record((started_at - submitted_at) * 1000)
+
+            try:
+                result = context.run(func, *args, **kwargs)
+            except BaseException:
+                with stats.lock:
+                    stats.failed += 1
+                raise
+            finally:
+                stats.run_time.record((time.perf_counter() - started_at) * 1000)
+                with stats.lock:
+                    stats.in_flight -= 1
+                    stats.completed += 1
+
+            return result
+
+        try:
+            future = pool.submit(call)
+        except BaseException:
+            dequeue(start=False)
+            raise
+        future.add_done_callback(lambda _: dequeue(start=False))
+        # Cancelling the awaiting task cancels the pool future if it has not started
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-stage concurrency and queue-time statistics."""
+        stages = {}
+
+        for stage, stats in self._stats.items():
+            queue_time = stats.queue_time.get_stats()
+            run_time = stats.run_time.get_stats()
+            stages[stage] = {
+                "workers": self._workers[stage],
+                "queued": stats.queued,
+                "in_flight": stats.in_flight,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "rejected": stats.rejected,
+                "queue_time_p50_ms": round(queue_time["p50"], 2),
+                "queue_time_p95_ms": round(queue_time["p95"], 2),
+                "queue_time_max_ms": round(queue_time["max"], 2),
+                "run_time_p50_ms": round(run_time["p50"], 2),
+                "run_time_p95_ms": round(run_time["p95"], 2),
+            }
+
+        return {"max_queue": self.max_queue, "stages": stages}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down all stage pools."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+
+
+def run_in_stage(stage: str) -> Callable[[Callable[..., T]], Callable[..., Any]]:
+    """
+    Decorator turning a synchronous route handler into an async one that runs
+    in the given stage pool.
+
+    FastAPI resolves dependencies from the wrapped function's signature, so the
+    handler keeps its ``Depends`` parameters unchanged.
+
+    Args:
+        stage: Stage name
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await get_stage_executor().run(stage, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Singleton instance
+_stage_executor: Optional[StageExecutor] = None
+_stage_executor_lock = threading.Lock()
+
+
+def get_stage_executor() -> StageExecutor:
+    """Get global stage executor instance."""
+    global _stage_executor
+    if _stage_executor is None:
+        with _stage_executor_lock:
+            if _stage_executor is None:
+                _stage_executor = StageExecutor()
+    return _stage_executor
+
+
+def shutdown_stage_executor() -> None:
+    """Shut down the global stage executor (application shutdown)."""
+    global _stage_executor
+    if _stage_executor is not None:
+        _stage_executor.shutdown(wait=False)
+        _stage_executor = None
@@ -9,7 +9,7 @@ from typing import Dict, List, Optional
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from ...ml.caching import EmbeddingCache
+from ...ml.caching import EmbeddingCache, ProductMetadataCache
 from ..models.search import ProductResult
 
 logger = logging.getLogger(__name__)
@@ -19,7 +19,7 @@ class MetadataService:
     """
     Service for fetching product metadata from database.
 
-    Handles batch fetching and caching of product details.
+    Handles batch fetching and caching of product details (see ProductMetadataCache).
     """
 
     def __init__(self, cache: Optional[EmbeddingCache] = None):
@@ -30,6 +30,7 @@ class MetadataService:
             cache: Embedding cache instance (for caching product metadata)
         """
         self.cache = cache or EmbeddingCache()
+        self.metadata_cache = ProductMetadataCache(self.cache.config, self.cache.redis)
 
         logger.info("Metadata service initialized")
 
@@ -53,6 +54,53 @@ class MetadataService:
         # Fetch product metadata from database
         products_data = self._fetch_products_batch(product_ids, db)
 
+        return self._build_results(product_ids, scores, products_data)
+
+    def enrich_results_batch(
+        self,
+        product_id_lists: List[List[int]],
+        score_lists: List[Dict[int, Dict[str, float]]],
+        db: Session,
+    ) -> List[List[ProductResult]]:
+        """
+        Enrich the results of several queries with a single metadata fetch.
+
+        Product IDs are de-duplicated across queries, so overlapping result
+        sets cost one cache lookup / DB row each.
+
+        Args:
+            product_id_lists: Product IDs per query (in rank order)
+            score_lists: Score dicts per query (product_id -> score dict)
+            db: Database session
+
+        Returns:
+            List of enriched ProductResult lists, one per query
+        """
+        unique_ids = list(dict.fromkeys(pid for ids in product_id_lists for pid in ids))
+        products_data = self._fetch_products_batch(unique_ids, db) if unique_ids else {}
+
+        return [
+            self._build_results(product_ids, scores, products_data)
+            for product_ids, scores in zip(product_id_lists, score_lists)
+        ]
+
+    def _build_results(
+        self,
+        product_ids: List[int],
+        scores: Dict[int, Dict[str, float]],
+        products_data: Dict[int, Dict],
+    ) -> List[ProductResult]:
+        """
+        Build ProductResult objects from fetched metadata.
+
+        Args:
+            product_ids: List of product IDs (in rank order)
+            scores: Dict mapping product_id -> score dict
+            products_data: Dict mapping product_id -> product_data
+
+        Returns:
+            List of enriched ProductResult objects
+        """
         # Build enriched results
         enriched_results = []
 
@@ -108,7 +156,9 @@ class MetadataService:
         """
         Fetch product metadata in batch.
 
-        Performs efficient batch query with caching support.
+        Cached products come from the in-process tier or one Redis MGET; the
+        rest are loaded with one database query and cached with one pipelined
+        write.
 
         Args:
             product_ids: List of product IDs
@@ -123,15 +173,8 @@ class MetadataService:
         logger.debug(f"Fetching metadata for {len(product_ids)} products")
 
         # Check cache first
-        products_data = {}
-        uncached_ids = []
-
-        for product_id in product_ids:
-            cached = self.get_cached_metadata(product_id)
-            if cached:
-                products_data[product_id] = cached
-            else:
-                uncached_ids.append(product_id)
+        products_data = self.metadata_cache.get_many(product_ids)
+        uncached_ids = [pid for pid in dict.fromkeys(product_ids) if pid not in products_data]
 
         # Fetch uncached products from database
         if uncached_ids:
@@ -173,6 +216,8 @@ class MetadataService:
             """
             )
 
+            fetched = {}
+
             try:
                 result = db.execute(query, {"product_ids": uncached_ids})
                 rows = result.fetchall()
@@ -206,10 +251,7 @@ class MetadataService:
                         "review_count": None,
                     }
 
-                    products_data[product_id] = product_data
-
-                    # Cache the product metadata (1 hour TTL)
-                    self.cache_product_metadata(product_id, product_data, ttl=3600)
+                    fetched[product_id] = product_data
 
                 logger.info(f"Fetched {len(rows)} products from database")
 
@@ -217,6 +259,10 @@ class MetadataService:
                 logger.error(f"Failed to fetch products from database: {e}")
                 # Return empty dict on error - caller will handle missing products
 
+            # Cache the product metadata (both tiers, one Redis pipeline)
+            products_data.update(fetched)
+            self.metadata_cache.set_many(fetched)
+
         return products_data
 
     def cache_product_metadata(self, product_id: int, metadata: Dict, ttl: int = 3600) -> bool:
@@ -234,6 +280,7 @@ class MetadataService:
         cache_key = f"product_metadata:{product_id}"
 
         try:
+            self.metadata_cache.drop_local([str(product_id)])
             return self.cache.redis.set(cache_key, metadata, ttl=ttl)
         except Exception as e:
             logger.error(f"Failed to cache product metadata: {e}")
@@ -249,10 +296,8 @@ class MetadataService:
         Returns:
             Product metadata or None if not cached
         """
-        cache_key = f"product_metadata:{product_id}"
-
         try:
-            return self.cache.redis.get(cache_key)
+            return self.metadata_cache.get_many([product_id]).get(product_id)
         except Exception as e:
             logger.error(f"Failed to get cached metadata: {e}")
             return None
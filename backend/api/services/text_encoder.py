@@ -3,14 +3,18 @@ Text Encoder Service
 Converts search query text to embeddings using CLIP text encoder.
 """
 
+import asyncio
 import logging
 import re
 from typing import Optional
 
 import numpy as np
 
+from ...ml.caching import QueryEmbeddingCache, get_query_embedding_cache
 from ...ml.config import MLConfig, get_ml_config
+from ...ml.encoder_scheduler import TextEncodingScheduler, get_text_encoding_scheduler
 from ...ml.model_loader import model_registry
+from .executor import STAGE_DB, STAGE_ENCODE, get_stage_executor
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +27,33 @@ class TextEncoderService:
     that can be used for similarity search.
     """
 
-    def __init__(self, config: Optional[MLConfig] = None):
+    def __init__(
+        self,
+        config: Optional[MLConfig] = None,
+        scheduler: Optional[TextEncodingScheduler] = None,
+        embedding_cache: Optional[QueryEmbeddingCache] = None,
+    ):
         """
         Initialize text encoder service.
 
         Args:
             config: ML configuration
+            scheduler: Micro-batching scheduler for single queries
+                       (defaults to the global scheduler when batching is enabled)
+            embedding_cache: Query embedding cache
+                             (defaults to the global cache when caching is enabled)
         """
         self.config = config or get_ml_config()
         self.model_registry = model_registry
 
+        if scheduler is None and self.config.performance.text_encoder_batching_enabled:
+            scheduler = get_text_encoding_scheduler()
+        self.scheduler = scheduler
+
+        if embedding_cache is None and self.config.performance.query_embedding_cache_enabled:
+            embedding_cache = get_query_embedding_cache()
+        self.embedding_cache = embedding_cache
+
         logger.info("Text encoder service initialized")
 
     def encode_query(self, query: str) -> np.ndarray:
@@ -54,9 +75,76 @@ class TextEncoderService:
         # Clean and preprocess query
         cleaned_query = self._preprocess_query(query)
 
-        # Encode with CLIP text encoder
+        cached = self._get_cached(cleaned_query)
+        if cached is not None:
+            return cached
+
+        # Encode with CLIP text encoder (batched with concurrent queries if enabled)
+        try:
+            if self.scheduler is not None:
+                embedding = self.scheduler.encode(cleaned_query)
+            else:
+                embedding = self.model_registry.encode_text(cleaned_query)
+
+            embedding = self._cache_embedding(cleaned_query, embedding)
+
+            logger.debug(
+                f"Encoded query: '{cleaned_query[:50]}...' -> "
+                f"embedding shape: {embedding.shape}"
+            )
+
+            return embedding
+
+        except Exception as e:
+            logger.error(f"Failed to encode query: {e}")
+            raise ValueError(f"Failed to encode query: {e}")
+
+    async def encode_query_async(self, query: str) -> np.ndarray:
+        """
+        Encode search query text without blocking the event loop.
+
+        With micro-batching enabled the query joins the scheduler's next batch,
+        so concurrent requests handled by this worker share one forward pass.
+        Otherwise encoding runs in the encode stage pool. Redis cache lookups and
+        writes run in the db stage pool.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Embedding vector (normalized)
+
+        Raises:
+            ValueError: If query is empty or invalid
+        """
+        if not query or not query.strip():
+            raise ValueError("Query cannot be empty")
+
+        cleaned_query = self._preprocess_query(query)
+
+        executor = get_stage_executor()
+
+        # Check the in-process tier inline; only the Redis lookup needs a thread
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get_local(cleaned_query)
+            if cached is None:
+                remote = await executor.run(
+                    STAGE_DB, self.embedding_cache.get_many_from_redis, [cleaned_query]
+                )
+                cached = remote.get(cleaned_query)
+            if cached is not None:
+                return cached
+
         try:
-            embedding = self.model_registry.encode_text(cleaned_query)
+            if self.scheduler is not None:
+                embedding = await asyncio.wrap_future(self.scheduler.submit(cleaned_query))
+            else:
+                embedding = await executor.run(
+                    STAGE_ENCODE, self.model_registry.encode_text, cleaned_query
+                )
+
+            if self.embedding_cache is not None:
+                await executor.run(STAGE_DB, self._cache_embedding, cleaned_query, embedding)
 
             logger.debug(
                 f"Encoded query: '{cleaned_query[:50]}...' -> "
@@ -85,11 +173,24 @@ class TextEncoderService:
         # Clean queries
         cleaned_queries = [self._preprocess_query(q) for q in queries]
 
+        # Only encode queries missing from the cache (each distinct query once)
+        cached = self.embedding_cache.get_many(cleaned_queries) if self.embedding_cache else {}
+        to_encode = [q for q in dict.fromkeys(cleaned_queries) if q not in cached]
+
         # Batch encode
         try:
-            embeddings = self.model_registry.encode_text_batch(cleaned_queries)
+            if to_encode:
+                encoded = self.model_registry.encode_text_batch(to_encode)
+                if self.embedding_cache is not None:
+                    self.embedding_cache.set_many(dict(zip(to_encode, encoded)))
+                cached.update(zip(to_encode, encoded))
 
-            logger.debug(f"Encoded {len(queries)} queries in batch")
+            embeddings = np.stack([cached[q] for q in cleaned_queries])
+
+            logger.debug(
+                f"Encoded {len(queries)} queries in batch "
+                f"({len(queries) - len(to_encode)} from cache)"
+            )
 
             return embeddings
 
@@ -97,6 +198,22 @@ class TextEncoderService:
             logger.error(f"Failed to encode queries batch: {e}")
             raise ValueError(f"Failed to encode queries: {e}")
 
+    def _get_cached(self, cleaned_query: str) -> Optional[np.ndarray]:
+        """Look up a preprocessed query in the embedding cache."""
+        if self.embedding_cache is None:
+            return None
+
+        embedding = self.embedding_cache.get(cleaned_query)
+        if embedding is not None:
+            logger.debug(f"Query embedding cache HIT: '{cleaned_query[:50]}'")
+        return embedding
+
+    def _cache_embedding(self, cleaned_query: str, embedding: np.ndarray) -> np.ndarray:
+        """Store a freshly encoded query embedding in the cache."""
+        if self.embedding_cache is not None:
+            self.embedding_cache.set(cleaned_query, embedding)
+        return embedding
+
     def _preprocess_query(self, query: str) -> str:
         """
         Preprocess query text.
@@ -0,0 +1,252 @@
+"""
+Warm-up Pipeline
+Loads the index and model and primes caches before the instance reports ready.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..config import APISettings, get_settings
+from .container import ServiceContainer
+
+logger = logging.getLogger(__name__)
+
+# Pipeline states
+WARMUP_PENDING = "pending"
+WARMUP_RUNNING = "running"
+WARMUP_READY = "ready"
+WARMUP_FAILED = "failed"
+
+
+class WarmupPipeline:
+    """
+    Background warm-up run once per process at startup.
+
+    Steps:
+    1. Load the FAISS index (GCS download, disk load or DB rebuild)
+    2. Load the CLIP model
+    3. Run synthetic encodes so the first real request does not pay for
+       torch first-call overhead
+    4. Run synthetic FAISS searches to warm the index
+    5. Encode popular queries and fetch metadata for their top results, filling
+       the query embedding and product metadata caches
+
+    The index is required: a failed load (e.g. GCS or the database briefly
+    unavailable) is retried with exponential backoff until it succeeds, so the
+    instance becomes ready once the dependency recovers instead of staying
+    unready until restarted. The other steps degrade to on-demand loading and
+    are reported in ``get_status``.
+    """
+
+    def __init__(
+        self,
+        services: ServiceContainer,
+        settings: Optional[APISettings] = None,
+        db_session_factory: Optional[Callable] = None,
+    ):
+        """
+        Initialize warm-up pipeline.
+
+        Args:
+            services: Application service container
+            settings: API settings
+            db_session_factory: Database session factory
+        """
+        self.services = services
+        self.settings = settings or get_settings()
+        self.db_session_factory = db_session_factory or services.db_session_factory
+
+        self.state = WARMUP_PENDING
+        self.step_times_ms: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.index_attempts = 0
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == WARMUP_READY
+
+    def start(self) -> None:
+        """Run the pipeline in a background thread."""
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Skip any remaining steps (application shutdown)."""
+        self._stop_event.set()
+
+    def run(self) -> None:
+        """Run all warm-up steps (blocking)."""
+        self.state = WARMUP_RUNNING
+        self.started_at = time.time()
+        logger.info("Warm-up started")
+
+        if not self._load_index_with_retry():
+            self.state = WARMUP_FAILED
+            self.completed_at = time.time()
+            logger.error("Warm-up stopped: FAISS index could not be loaded")
+            return
+
+        for name, step in [
+            ("model", self._load_model),
+            ("encoder", self._warm_encoder),
+            ("search", self._warm_search),
+            ("caches", self._warm_caches),
+        ]:
+            if self._stop_event.is_set():
+                return
+            self._run_step(name, step)
+
+        self.state = WARMUP_READY
+        self.completed_at = time.time()
+        logger.info(
+            f"Warm-up completed in {(self.completed_at - self.started_at) * 1000:.0f}ms: "
+            f"{self.step_times_ms}"
+        )
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get warm-up state, per-step timings and errors."""
+        return {
+            "state": self.state,
+            "steps_ms": {name: round(ms, 1) for name, ms in self.step_times_ms.items()},
+            "errors": dict(self.errors),
+            "index_attempts": self.index_attempts,
+            "duration_ms": (
+                round((self.completed_at - self.started_at) * 1000, 1)
+                if self.started_at and self.completed_at
+                else None
+            ),
+        }
+
+    # ========== Steps ==========
+
+    def _run_step(self, name: str, step: Callable[[], None]) -> bool:
+        start_time = time.time()
+        try:
+            step()
+            return True
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+            return False
+        finally:
+            self.step_times_ms[name] = (time.time() - start_time) * 1000
+
+    def _load_index_with_retry(self) -> bool:
+        """Load the index, retrying with backoff; False only if stopped first."""
+        delay = self.settings.warmup_index_retry_seconds
+        while True:
+            self.index_attempts += 1
+            if self._run_step("index", self._load_index):
+                self.errors.pop("index", None)
+                return True
+
+            logger.error(
+                f"Warm-up: FAISS index could not be loaded (attempt {self.index_attempts}), "
+                f"retrying in {delay:.0f}s"
+            )
+            if self._stop_event.wait(delay):
+                return False
+            delay = min(delay * 2, self.settings.warmup_index_retry_max_seconds)
+
+    def _load_index(self) -> None:
+        session = self.db_session_factory() if self.db_session_factory else None
+        try:
+            self.services.index_manager.ensure_index_loaded(session=session)
+        finally:
+            if session is not None:
+                session.close()
+
+    def _load_model(self) -> None:
+        self.services.text_encoder.model_registry.get_clip_model()
+
+    def _warm_encoder(self) -> None:
+        model_registry = self.services.text_encoder.model_registry
+        queries = self.settings.warmup_queries
+        if not queries:
+            return
+
+        # Call the model directly; the query cache would skip inference
+        for _ in range(self.settings.warmup_iterations):
+            model_registry.encode_text_batch(queries)
+            model_registry.encode_text(queries[0])
+
+    def _warm_search(self) -> None:
+        similarity_search = self.services.similarity_search
+        dimension = self.services.index_manager.index.d
+        rng = np.random.default_rng(0)
+
+        for _ in range(self.settings.warmup_iterations):
+            vectors = rng.standard_normal((8, dimension)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            similarity_search.search_batch(vectors, k=50)
+            similarity_search.search(vectors[0], k=50)
+
+    def _warm_caches(self) -> None:
+        queries = self._get_warmup_queries()
+        if not queries:
+            return
+
+        embeddings = self.services.text_encoder.encode_batch(queries)
+        results = self.services.similarity_search.search_batch(embeddings, k=20)
+
+        session = self.db_session_factory() if self.db_session_factory else None
+        if session is None:
+            return
+        try:
+            self.services.metadata_service.enrich_results_batch(
+                product_id_lists=[query_results.get_product_ids() for query_results in results],
+                score_lists=[query_results.to_score_dicts() for query_results in results],
+                db=session,
+            )
+        finally:
+            session.close()
+
+        logger.info(f"Warm-up primed caches for {len(queries)} queries")
+
+    def _get_warmup_queries(self) -> List[str]:
+        popular = self.services.cache_service.load_popular_queries(
+            self.settings.warmup_popular_queries
+        )
+        return list(dict.fromkeys(self.settings.warmup_queries + popular))
+
+
+# Singleton instance
+_warmup_pipeline: Optional[WarmupPipeline] = None
+
+
+def start_warmup(
+    services: ServiceContainer,
+    settings: Optional[APISettings] = None,
+    db_session_factory: Optional[Callable] = None,
+) -> WarmupPipeline:
+    """
+    Create the global warm-up pipeline and start it in the background.
+
+    Args:
+        services: Application service container
+        settings: API settings
+        db_session_factory: Database session factory
+
+    Returns:
+        WarmupPipeline instance
+    """
+    global _warmup_pipeline
+    _warmup_pipeline = WarmupPipeline(
+        services, settings=settings, db_session_factory=db_session_factory
+    )
+    _warmup_pipeline.start()
+    return _warmup_pipeline
+
+
+def get_warmup_pipeline() -> Optional[WarmupPipeline]:
+    """Get the global warm-up pipeline (None if warm-up is disabled)."""
+    return _warmup_pipeline
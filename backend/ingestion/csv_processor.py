@@ -268,11 +268,19 @@ class CSVIngestionPipeline:
                     unique_products = validated_products
 
                 # Save to database first (commits per product internally)
-                self._save_products(session, unique_products, ingestion_log_id)
+                changed_ids = self._save_products(session, unique_products, ingestion_log_id)
 
                 # After insert, link duplicates using database UUIDs
+                deactivated_ids = []
                 if duplicate_clusters:
-                    self._link_duplicate_products(session, duplicate_clusters)
+                    deactivated_ids = self._link_duplicate_products(session, duplicate_clusters)
+                    changed_ids += deactivated_ids
+
+                # Stop the API serving cached metadata of changed products
+                self._invalidate_product_metadata(changed_ids)
+
+                # Deactivated duplicates must leave the live search indices too
+                self._publish_index_deletes(deactivated_ids)
 
         except Exception as e:
             logger.error(f"Chunk processing failed: {str(e)}")
@@ -313,11 +321,15 @@ class CSVIngestionPipeline:
         # Return both unique products and clusters (will link after insert)
         return unique_products, duplicate_clusters
 
-    def _link_duplicate_products(self, session: Session, duplicate_clusters: List):
+    def _link_duplicate_products(self, session: Session, duplicate_clusters: List) -> List[str]:
         """
         Link duplicate products after they've been inserted into the database.
         Uses database UUIDs instead of merchant_product_ids.
+
+        Returns the IDs of the products marked as duplicates (deactivated).
         """
+        deactivated_ids = []
+
         for cluster in duplicate_clusters:
             try:
                 canonical = cluster.canonical_product
@@ -355,7 +367,7 @@ class CSVIngestionPipeline:
 
                 if duplicate_merchant_ids:
                     # Update duplicates to point to canonical using UUID
-                    session.execute(
+                    result = session.execute(
                         text(
                             """
                             UPDATE products
@@ -364,6 +376,7 @@ class CSVIngestionPipeline:
                                 is_active = false
                             WHERE merchant_product_id = ANY(:duplicate_ids)
                             AND merchant_id = :merchant_id
+                            RETURNING id
                         """
                         ),
                         {
@@ -372,7 +385,9 @@ class CSVIngestionPipeline:
                             "merchant_id": canonical["merchant_id"],
                         },
                     )
+                    linked_ids = [str(row[0]) for row in result]
                     session.commit()  # Commit per cluster
+                    deactivated_ids.extend(linked_ids)
 
                     # Increment duplicates counter
                     self.stats["duplicates"] += len(duplicate_merchant_ids)
@@ -387,6 +402,8 @@ class CSVIngestionPipeline:
                 )
                 continue  # Keep processing other clusters
 
+        return deactivated_ids
+
     def _get_existing_hashes(self, session: Session, hashes: List[str]) -> set:
         """Get existing product hashes from database."""
         if not hashes:
@@ -407,8 +424,14 @@ class CSVIngestionPipeline:
 
     def _save_products(
         self, session: Session, products: List[ProductIngestion], ingestion_log_id: str
-    ):
-        """Save products to database with per-product error handling."""
+    ) -> List[str]:
+        """
+        Save products to database with per-product error handling.
+
+        Returns the IDs of the existing products that were updated.
+        """
+        updated_ids = []
+
         for product in products:
             try:
                 # Convert to canonical model
@@ -442,6 +465,9 @@ class CSVIngestionPipeline:
                 # Commit after each successful product
                 session.commit()
 
+                if existing:
+                    updated_ids.append(str(existing[0]))
+
             except Exception as e:
                 # Rollback this product and continue with next
                 session.rollback()
@@ -463,6 +489,35 @@ class CSVIngestionPipeline:
                     )
                 continue
 
+        return updated_ids
+
+    def _invalidate_product_metadata(self, product_ids: List[str]) -> None:
+        """Drop changed products from the API's metadata cache (best effort)."""
+        if not product_ids:
+            return
+
+        try:
+            from backend.ml.caching.product_metadata_cache import invalidate_product_metadata
+
+            invalidate_product_metadata(product_ids)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cached product metadata: {e}")
+
+    def _publish_index_deletes(self, product_ids: List[str]) -> None:
+        """Remove deactivated products from live FAISS indices (best effort)."""
+        if not product_ids:
+            return
+
+        try:
+            from backend.ml.config import get_ml_config
+            from backend.ml.retrieval.index_updates import publish_index_delta
+
+            config = get_ml_config()
+            if config.storage.faiss_delta_updates_enabled:
+                publish_index_delta(deletes=product_ids, config=config)
+        except Exception as e:
+            logger.warning(f"Failed to publish index deletes: {e}")
+
     def _insert_product(self, session: Session, product: ProductCanonical, ingestion_log_id: str):
         """Insert a new product."""
         product_id = str(uuid4())
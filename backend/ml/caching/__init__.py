@@ -3,11 +3,35 @@ Caching Module
 Redis-based caching for embeddings and search results.
 """
 
+from .clear_jobs import CacheClearJob, CacheClearJobError, patterns_for_cache_type
+from .codecs import CacheCodec, CacheCodecError
 from .embedding_cache import EmbeddingCache
+from .lru_cache import LRUTTLCache
+from .product_metadata_cache import (
+    ProductMetadataCache,
+    invalidate_product_metadata,
+    publish_invalidate_all,
+)
+from .query_embedding_cache import QueryEmbeddingCache, get_query_embedding_cache
 from .redis_cache import RedisCache, get_redis_cache
+from .single_flight import SingleFlight
+from .user_generations import UserCacheGenerations
 
 __all__ = [
     "RedisCache",
     "get_redis_cache",
+    "CacheCodec",
+    "CacheCodecError",
     "EmbeddingCache",
+    "LRUTTLCache",
+    "QueryEmbeddingCache",
+    "ProductMetadataCache",
+    "invalidate_product_metadata",
+    "publish_invalidate_all",
+    "get_query_embedding_cache",
+    "UserCacheGenerations",
+    "CacheClearJob",
+    "CacheClearJobError",
+    "patterns_for_cache_type",
+    "SingleFlight",
 ]
@@ -0,0 +1,273 @@
+"""
+Cache Clear Jobs
+Resumable, incremental deletion of cache namespaces.
+
+A job deletes the keys matching a list of patterns, one SCAN step at a time
+with batched UNLINK (see RedisCache.delete_pattern_step). Its progress
+(pattern, SCAN cursor, keys deleted) is saved in Redis after every step, so
+a job interrupted by a worker restart or a Redis error continues where it
+stopped when it is run again. SCAN cursors are stateless on the server, so a
+resumed scan still visits every key that existed when the job started.
+
+Jobs that clear product metadata also tell API processes to drop their
+in-process metadata tier once they complete.
+"""
+
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .product_metadata_cache import publish_invalidate_all
+from .redis_cache import SCAN_BATCH_SIZE, RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Key patterns per cache type. FLUSHDB is never used: the same database holds
+# state that is not a cache (e.g. the FAISS index delta stream).
+CACHE_NAMESPACES: Dict[str, List[str]] = {
+    "embeddings": ["embedding:*", "product_embedding:*", "stats:keys:embedding:*"],
+    "search": ["search:*"],
+    "recommendations": ["recommend:*"],
+    "metadata": ["product_metadata:*"],
+}
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class CacheClearJobError(Exception):
+    """Exception raised for cache clear job errors."""
+
+    pass
+
+
+def patterns_for_cache_type(cache_type: str) -> List[str]:
+    """
+    Key patterns to delete for a cache type.
+
+    Args:
+        cache_type: "all" or a key of CACHE_NAMESPACES
+
+    Returns:
+        Key patterns
+
+    Raises:
+        CacheClearJobError: If the cache type is unknown
+    """
+    if cache_type == "all":
+        return [pattern for patterns in CACHE_NAMESPACES.values() for pattern in patterns]
+    if cache_type not in CACHE_NAMESPACES:
+        raise CacheClearJobError(f"Invalid cache_type: {cache_type}")
+    return list(CACHE_NAMESPACES[cache_type])
+
+
+class CacheClearJob:
+    """
+    Incremental deletion of the keys matching a list of patterns.
+
+    Create a job with create(), run it (in a Celery task or a background task)
+    with run(), and read its progress from anywhere with load().
+    """
+
+    STATE_PREFIX = "cache:clear_job:"
+    STATE_TTL_SECONDS = 7 * 86400
+
+    def __init__(
+        self,
+        redis_cache: RedisCache,
+        job_id: str,
+        patterns: List[str],
+        pattern_index: int = 0,
+        cursor: int = 0,
+        deleted: int = 0,
+        status: str = STATUS_PENDING,
+        error: Optional[str] = None,
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None,
+    ):
+        """
+        Initialize cache clear job (use create() or load()).
+
+        Args:
+            redis_cache: Redis cache client
+            job_id: Job ID
+            patterns: Key patterns to delete, in order
+            pattern_index: Pattern being scanned
+            cursor: SCAN cursor within that pattern
+            deleted: Keys deleted so far
+            status: pending, running, completed or failed
+            error: Last error (failed jobs)
+            created_at: Creation time (ISO format)
+            updated_at: Time of the last saved step (ISO format)
+        """
+        self.redis = redis_cache
+        self.job_id = job_id
+        self.patterns = patterns
+        self.pattern_index = pattern_index
+        self.cursor = cursor
+        self.deleted = deleted
+        self.status = status
+        self.error = error
+        self.created_at = created_at or datetime.utcnow().isoformat()
+        self.updated_at = updated_at or self.created_at
+
+    @classmethod
+    def create(cls, redis_cache: RedisCache, patterns: List[str]) -> "CacheClearJob":
+        """
+        Create and save a new job.
+
+        Args:
+            redis_cache: Redis cache client
+            patterns: Key patterns to delete
+
+        Returns:
+            Pending job
+        """
+        job = cls(redis_cache, uuid.uuid4().hex, list(patterns))
+        job.save()
+        logger.info(f"Created cache clear job {job.job_id} for {job.patterns}")
+        return job
+
+    @classmethod
+    def load(cls, redis_cache: RedisCache, job_id: str) -> Optional["CacheClearJob"]:
+        """
+        Load a saved job.
+
+        Args:
+            redis_cache: Redis cache client
+            job_id: Job ID
+
+        Returns:
+            Job, or None if it does not exist (or has expired)
+        """
+        state = redis_cache._get_client().hgetall(cls._state_key(job_id))
+        if not state:
+            return None
+
+        state = {k.decode(): v.decode() for k, v in state.items()}
+        return cls(
+            redis_cache,
+            job_id,
+            patterns=json.loads(state["patterns"]),
+            pattern_index=int(state["pattern_index"]),
+            cursor=int(state["cursor"]),
+            deleted=int(state["deleted"]),
+            status=state["status"],
+            error=state.get("error") or None,
+            created_at=state["created_at"],
+            updated_at=state["updated_at"],
+        )
+
+    @property
+    def done(self) -> bool:
+        return self.status == STATUS_COMPLETED
+
+    def run(
+        self,
+        count: int = SCAN_BATCH_SIZE,
+        progress: Optional[Callable[["CacheClearJob"], None]] = None,
+    ) -> "CacheClearJob":
+        """
+        Run (or resume) the job until every pattern is scanned.
+
+        Args:
+            count: Keys per SCAN step
+            progress: Optional callback, called with the job after each step
+
+        Returns:
+            The job (completed)
+
+        Raises:
+            RedisCacheError: If Redis fails (other errors propagate unchanged);
+                progress up to the last step is saved and running the job again
+                resumes there
+        """
+        if self.done:
+            return self
+
+        self.status = STATUS_RUNNING
+        self.error = None
+        self.save()
+
+        try:
+            while self.pattern_index < len(self.patterns):
+                pattern = self.patterns[self.pattern_index]
+                self.cursor, step_deleted = self.redis.delete_pattern_step(
+                    pattern, self.cursor, count
+                )
+                self.deleted += step_deleted
+                if self.cursor == 0:
+                    self.pattern_index += 1
+                self.save()
+
+                if progress is not None:
+                    progress(self)
+
+        except Exception as e:
+            self.status = STATUS_FAILED
+            self.error = str(e)
+            self._save_quietly()
+            raise
+
+        self.status = STATUS_COMPLETED
+        self.save()
+        logger.info(f"Cache clear job {self.job_id} deleted {self.deleted} keys")
+
+        if set(CACHE_NAMESPACES["metadata"]) & set(self.patterns):
+            # Best effort: the local tiers' TTL bounds staleness if this fails
+            publish_invalidate_all(self.redis.config, self.redis)
+        return self
+
+    def save(self) -> None:
+        """Save the job state (refreshes its expiry)."""
+        self.updated_at = datetime.utcnow().isoformat()
+        key = self._state_key(self.job_id)
+
+        pipe = self.redis._get_client().pipeline(transaction=False)
+        pipe.hset(
+            key,
+            mapping={
+                "patterns": json.dumps(self.patterns),
+                "pattern_index": self.pattern_index,
+                "cursor": self.cursor,
+                "deleted": self.deleted,
+                "status": self.status,
+                "error": self.error or "",
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            },
+        )
+        pipe.expire(key, self.STATE_TTL_SECONDS)
+        pipe.execute()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable job state (for API responses)."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "patterns": self.patterns,
+            "patterns_done": self.pattern_index,
+            "current_pattern": (
+                self.patterns[self.pattern_index]
+                if self.pattern_index < len(self.patterns)
+                else None
+            ),
+            "keys_deleted": self.deleted,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def _save_quietly(self) -> None:
+        try:
+            self.save()
+        except Exception as e:
+            logger.warning(f"Failed to save cache clear job {self.job_id}: {e}")
+
+    @classmethod
+    def _state_key(cls, job_id: str) -> str:
+        return f"{cls.STATE_PREFIX}{job_id}"
@@ -0,0 +1,288 @@
+"""
+Cache Codecs
+Typed binary encoding for Redis cache values (replaces pickle).
+
+Every encoded value starts with a 3-byte prefix: a magic byte, the format
+version and a type tag. The magic byte (0xC1) never starts a pickle (0x80) or
+an INCR counter (ASCII digits), so untagged legacy values are still recognized.
+
+    ndarray   dtype code, ndim, ndim x uint32 shape, raw little-endian data
+    json      orjson (stdlib json fallback); dicts with str keys, lists,
+              strings, numbers, booleans and None, nested only in each other
+    bytes     raw bytes
+    pickle    anything else, only if pickle writes are enabled
+
+Values JSON would silently change (tuples, nested arrays, non-str dict keys,
+datetimes, ...) are not JSON-encoded: they are pickled when pickle writes are
+enabled and rejected with CacheCodecError otherwise. NumPy scalars are stored
+as the equal Python number.
+
+Integers are stored as plain ASCII so values written with set() and counters
+maintained with INCRBY share one representation. Arrays are decoded with
+np.frombuffer: no copy, and the result is read-only.
+"""
+
+import json
+import logging
+import pickle
+import struct
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xC1
+FORMAT_VERSION = 1
+
+TAG_NDARRAY = 1
+TAG_JSON = 2
+TAG_BYTES = 3
+TAG_PICKLE = 4
+
+PREFIX = struct.Struct("<BBB")  # magic, format version, tag
+ARRAY_HEADER = struct.Struct("<BB")  # dtype code, ndim
+
+# Stable on-the-wire dtype codes (never renumber)
+DTYPE_CODES = {
+    np.dtype("<f4"): 1,
+    np.dtype("<f2"): 2,
+    np.dtype("<f8"): 3,
+    np.dtype("<i8"): 4,
+    np.dtype("<i4"): 5,
+    np.dtype("u1"): 6,
+    np.dtype("bool"): 7,
+}
+CODE_DTYPES = {code: dtype for dtype, code in DTYPE_CODES.items()}
+
+_SHAPE_STRUCTS: Dict[int, struct.Struct] = {}
+
+# Scalars JSON round-trips (NumPy scalars are stored as the equal Python value)
+_JSON_SCALARS = (str, int, float, bool, type(None), np.integer, np.floating, np.bool_)
+
+
+class CacheCodecError(Exception):
+    """Exception raised when a cache value cannot be encoded or decoded."""
+
+    pass
+
+
+def encode_array(array: np.ndarray, dtype: Any = None) -> bytes:
+    """
+    Encode an array as header + raw little-endian bytes.
+
+    Args:
+        array: Array to encode
+        dtype: Store as this dtype (e.g. np.float16 for embeddings); default: keep
+
+    Returns:
+        Encoded value
+
+    Raises:
+        CacheCodecError: If the dtype has no wire code
+    """
+    target = np.dtype(dtype) if dtype is not None else array.dtype
+    target = target.newbyteorder("<") if target.byteorder == ">" else target
+    code = DTYPE_CODES.get(target)
+    if code is None:
+        raise CacheCodecError(f"Unsupported array dtype for cache encoding: {array.dtype}")
+
+    array = np.asarray(array, dtype=target, order="C")
+    shape = _shape_struct(array.ndim).pack(*array.shape)
+    return (
+        PREFIX.pack(MAGIC, FORMAT_VERSION, TAG_NDARRAY)
+        + ARRAY_HEADER.pack(code, array.ndim)
+        + shape
+        + array.tobytes()
+    )
+
+
+def decode_array(data: bytes) -> np.ndarray:
+    """Decode an encoded array (zero-copy view of data, read-only)."""
+    code, ndim = ARRAY_HEADER.unpack_from(data, PREFIX.size)
+    dtype = CODE_DTYPES.get(code)
+    if dtype is None:
+        raise CacheCodecError(f"Unknown array dtype code {code}")
+
+    shape_struct = _shape_struct(ndim)
+    offset = PREFIX.size + ARRAY_HEADER.size
+    shape = shape_struct.unpack_from(data, offset)
+    array = np.frombuffer(data, dtype=dtype, offset=offset + shape_struct.size)
+    return array if ndim == 1 else array.reshape(shape)
+
+
+def _shape_struct(ndim: int) -> struct.Struct:
+    if ndim not in _SHAPE_STRUCTS:
+        _SHAPE_STRUCTS[ndim] = struct.Struct(f"<{ndim}I")
+    return _SHAPE_STRUCTS[ndim]
+
+
+def is_encoded(data: bytes) -> bool:
+    """Whether a stored value was written by this codec."""
+    return len(data) >= PREFIX.size and data[0] == MAGIC
+
+
+class CacheCodec:
+    """
+    Encodes values for Redis and decodes them back.
+
+    Pickle is only a migration path: with ``allow_pickle`` the codec still
+    reads untagged (pre-codec) and tagged pickles, otherwise they raise
+    CacheCodecError. Values without a type of their own are only pickled with
+    ``pickle_writes``; by default they raise CacheCodecError, so a new caller
+    caching an unsupported type fails loudly instead of growing the pickle
+    traffic. The counters show how much pickle traffic remains before the
+    fallback can be turned off.
+    """
+
+    def __init__(self, allow_pickle: bool = True, pickle_writes: bool = False):
+        """
+        Initialize cache codec.
+
+        Args:
+            allow_pickle: Read legacy pickles
+            pickle_writes: Pickle values of other types (requires allow_pickle)
+        """
+        self.allow_pickle = allow_pickle
+        self.pickle_writes = pickle_writes and allow_pickle
+        self.legacy_decodes = 0
+        self.pickle_encodes = 0
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Encode a value for storage.
+
+        Args:
+            value: Value to encode
+
+        Returns:
+            Encoded bytes
+
+        Raises:
+            CacheCodecError: If the value cannot be encoded
+        """
+        if isinstance(value, np.ndarray) and value.dtype.newbyteorder("<") in DTYPE_CODES:
+            return encode_array(value)
+        if isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+            return str(int(value)).encode()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return PREFIX.pack(MAGIC, FORMAT_VERSION, TAG_BYTES) + bytes(value)
+        if isinstance(value, np.floating):
+            value = float(value)
+        if value is None or isinstance(value, (dict, list, str, float, bool)):
+            reason = _json_round_trip_error(value)
+            if reason is None:
+                return PREFIX.pack(MAGIC, FORMAT_VERSION, TAG_JSON) + _json_dumps(value)
+            return self._encode_pickle(value, reason)
+        return self._encode_pickle(value, None)
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Decode a stored value.
+
+        Args:
+            data: Bytes read from Redis
+
+        Returns:
+            Decoded value
+
+        Raises:
+            CacheCodecError: If the value cannot be decoded
+        """
+        if not is_encoded(data):
+            return self._decode_untagged(data)
+
+        _, version, tag = PREFIX.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise CacheCodecError(f"Unsupported cache format version {version}")
+
+        if tag == TAG_NDARRAY:
+            return decode_array(data)
+        if tag == TAG_JSON:
+            return _json_loads(memoryview(data)[PREFIX.size :])
+        if tag == TAG_BYTES:
+            return data[PREFIX.size :]
+        if tag == TAG_PICKLE:
+            if not self.allow_pickle:
+                raise CacheCodecError("Pickled cache value found but pickle is disabled")
+            return pickle.loads(memoryview(data)[PREFIX.size :])
+        raise CacheCodecError(f"Unknown cache value tag {tag}")
+
+    def get_stats(self) -> dict:
+        """Pickle usage counters."""
+        return {
+            "allow_pickle": self.allow_pickle,
+            "pickle_writes": self.pickle_writes,
+            "legacy_decodes": self.legacy_decodes,
+            "pickle_encodes": self.pickle_encodes,
+        }
+
+    def _encode_pickle(self, value: Any, reason: Optional[str]) -> bytes:
+        if not self.pickle_writes:
+            reason = f": {reason}" if reason else ""
+            raise CacheCodecError(f"Cannot encode {type(value).__name__} for caching{reason}")
+        self.pickle_encodes += 1
+        return PREFIX.pack(MAGIC, FORMAT_VERSION, TAG_PICKLE) + pickle.dumps(
+            value, protocol=pickle.HIGHEST_PROTOCOL
+        )
+
+    def _decode_untagged(self, data: bytes) -> Any:
+        """Counters (ASCII integers) and values written before the codec (pickles)."""
+        if data[:1].isdigit() or data[:1] == b"-":
+            return int(data)
+        if not self.allow_pickle:
+            raise CacheCodecError("Untagged cache value found but pickle is disabled")
+        self.legacy_decodes += 1
+        return pickle.loads(data)
+
+
+def _json_round_trip_error(value: Any) -> Optional[str]:
+    """Why JSON would not decode value back unchanged (None if it would)."""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _JSON_SCALARS):
+            continue
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            for key in item:
+                if not isinstance(key, str):
+                    return f"dict key {key!r} is not a string"
+            stack.extend(item.values())
+        else:
+            return f"JSON does not round-trip nested {type(item).__name__} values"
+    return None
+
+
+def _json_default(value: Any) -> Any:
+    """NumPy scalars for the stdlib encoder (orjson handles them natively)."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+if ORJSON_AVAILABLE:
+
+    def _json_dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def _json_loads(data) -> Any:
+        return orjson.loads(data)
+
+else:
+
+    def _json_dumps(value: Any) -> bytes:
+        return json.dumps(
+            value, separators=(",", ":"), ensure_ascii=False, default=_json_default
+        ).encode("utf-8")
+
+    def _json_loads(data) -> Any:
+        return json.loads(bytes(data))
@@ -24,8 +24,21 @@ class EmbeddingCache:
     - User embedding caching (long-term and session)
     - Hot product tracking
     - Automatic cache invalidation
+
+    Embeddings are stored as raw float32 (or float16, see
+    config.storage.redis_embedding_dtype) arrays by the cache codec and read
+    back as read-only float32 arrays. Embedding keys carry KEY_VERSION, so
+    pickled entries written before the codec are never read; purge them with
+    purge_legacy_keys().
+
+    Every embedding key is also recorded in a key index per namespace (see
+    RedisCache.count_indexed), so cache statistics never enumerate keys.
     """
 
+    KEY_VERSION = "v2"
+    KEY_INDEX_PREFIX = "stats:keys:"
+    LEGACY_PREFIXES = ("embedding:product:", "embedding:user:long_term:", "embedding:user:session:")
+
     def __init__(self, config: Optional[MLConfig] = None, redis_cache: Optional[RedisCache] = None):
         """
         Initialize embedding cache.
@@ -38,16 +51,23 @@ class EmbeddingCache:
         self.redis = redis_cache or get_redis_cache(self.config)
 
         # Cache key prefixes
-        self.PRODUCT_PREFIX = "embedding:product:"
-        self.USER_LONG_TERM_PREFIX = "embedding:user:long_term:"
-        self.USER_SESSION_PREFIX = "embedding:user:session:"
+        self.PRODUCT_PREFIX = f"embedding:{self.KEY_VERSION}:product:"
+        self.USER_LONG_TERM_PREFIX = f"embedding:{self.KEY_VERSION}:user:long_term:"
+        self.USER_SESSION_PREFIX = f"embedding:{self.KEY_VERSION}:user:session:"
         self.HOT_PRODUCTS_KEY = "hot:products"
         self.PRODUCT_VIEW_COUNT_PREFIX = "stats:product_views:"
 
+        # Key indexes (live key count per namespace)
+        self.PRODUCT_INDEX = f"{self.KEY_INDEX_PREFIX}{self.PRODUCT_PREFIX}"
+        self.USER_LONG_TERM_INDEX = f"{self.KEY_INDEX_PREFIX}{self.USER_LONG_TERM_PREFIX}"
+        self.USER_SESSION_INDEX = f"{self.KEY_INDEX_PREFIX}{self.USER_SESSION_PREFIX}"
+
         # TTL settings
         self.user_ttl = self.config.storage.redis_ttl_hours * 3600
         self.hot_product_ttl = 86400  # 24 hours
 
+        self.storage_dtype = np.dtype(self.config.storage.redis_embedding_dtype)
+
         logger.info("Embedding cache initialized")
 
     # ========== Product Embeddings ==========
@@ -67,7 +87,7 @@ class EmbeddingCache:
 
         if embedding is not None:
             logger.debug(f"Cache HIT for product {product_id}")
-            return embedding
+            return self._from_storage(embedding)
 
         logger.debug(f"Cache MISS for product {product_id}")
         return None
@@ -87,7 +107,9 @@ class EmbeddingCache:
             True if successful
         """
         key = f"{self.PRODUCT_PREFIX}{product_id}"
-        return self.redis.set(key, embedding, ttl=ttl)
+        return self.redis.set(
+            key, self._to_storage(embedding), ttl=ttl, index_key=self.PRODUCT_INDEX
+        )
 
     def get_product_embeddings_batch(self, product_ids: List[int]) -> Dict[int, np.ndarray]:
         """
@@ -109,7 +131,7 @@ class EmbeddingCache:
         result = {}
         for pid, key in zip(product_ids, keys):
             if key in cached_data:
-                result[pid] = cached_data[key]
+                result[pid] = self._from_storage(cached_data[key])
 
         logger.debug(
             f"Batch cache lookup: {len(result)}/{len(product_ids)} hits "
@@ -134,9 +156,11 @@ class EmbeddingCache:
         if not embeddings:
             return True
 
-        mapping = {f"{self.PRODUCT_PREFIX}{pid}": emb for pid, emb in embeddings.items()}
+        mapping = {
+            f"{self.PRODUCT_PREFIX}{pid}": self._to_storage(emb) for pid, emb in embeddings.items()
+        }
 
-        return self.redis.set_many(mapping, ttl=ttl)
+        return self.redis.set_many(mapping, ttl=ttl, index_key=self.PRODUCT_INDEX)
 
     def delete_product_embedding(self, product_id: int) -> bool:
         """
@@ -149,7 +173,7 @@ class EmbeddingCache:
             True if deleted
         """
         key = f"{self.PRODUCT_PREFIX}{product_id}"
-        return self.redis.delete(key)
+        return self.redis.delete(key, index_key=self.PRODUCT_INDEX)
 
     # ========== User Embeddings ==========
 
@@ -164,7 +188,7 @@ class EmbeddingCache:
             User embedding or None if not cached
         """
         key = f"{self.USER_LONG_TERM_PREFIX}{user_id}"
-        return self.redis.get(key)
+        return self._from_storage(self.redis.get(key))
 
     def set_user_long_term_embedding(self, user_id: str, embedding: np.ndarray) -> bool:
         """
@@ -178,7 +202,9 @@ class EmbeddingCache:
             True if successful
         """
         key = f"{self.USER_LONG_TERM_PREFIX}{user_id}"
-        return self.redis.set(key, embedding, ttl=self.user_ttl)
+        return self.redis.set(
+            key, self._to_storage(embedding), ttl=self.user_ttl, index_key=self.USER_LONG_TERM_INDEX
+        )
 
     def get_user_session_embedding(self, user_id: str) -> Optional[np.ndarray]:
         """
@@ -191,7 +217,7 @@ class EmbeddingCache:
             Session embedding or None if not cached
         """
         key = f"{self.USER_SESSION_PREFIX}{user_id}"
-        return self.redis.get(key)
+        return self._from_storage(self.redis.get(key))
 
     def set_user_session_embedding(
         self, user_id: str, embedding: np.ndarray, ttl: Optional[int] = None
@@ -209,7 +235,9 @@ class EmbeddingCache:
         """
         key = f"{self.USER_SESSION_PREFIX}{user_id}"
         session_ttl = ttl or 1800  # 30 minutes default for sessions
-        return self.redis.set(key, embedding, ttl=session_ttl)
+        return self.redis.set(
+            key, self._to_storage(embedding), ttl=session_ttl, index_key=self.USER_SESSION_INDEX
+        )
 
     def get_user_embeddings(self, user_id: str) -> Dict[str, Optional[np.ndarray]]:
         """
@@ -239,11 +267,11 @@ class EmbeddingCache:
         count = 0
 
         lt_key = f"{self.USER_LONG_TERM_PREFIX}{user_id}"
-        if self.redis.delete(lt_key):
+        if self.redis.delete(lt_key, index_key=self.USER_LONG_TERM_INDEX):
             count += 1
 
         sess_key = f"{self.USER_SESSION_PREFIX}{user_id}"
-        if self.redis.delete(sess_key):
+        if self.redis.delete(sess_key, index_key=self.USER_SESSION_INDEX):
             count += 1
 
         return count
@@ -339,6 +367,7 @@ class EmbeddingCache:
         """
         pattern = f"{self.PRODUCT_PREFIX}*"
         count = self.redis.delete_pattern(pattern)
+        self.redis.delete(self.PRODUCT_INDEX)
         logger.info(f"Invalidated {count} product embeddings")
         return count
 
@@ -352,23 +381,41 @@ class EmbeddingCache:
         count = 0
         count += self.redis.delete_pattern(f"{self.USER_LONG_TERM_PREFIX}*")
         count += self.redis.delete_pattern(f"{self.USER_SESSION_PREFIX}*")
+        self.redis.delete(self.USER_LONG_TERM_INDEX)
+        self.redis.delete(self.USER_SESSION_INDEX)
         logger.info(f"Invalidated {count} user embeddings")
         return count
 
+    def purge_legacy_keys(self) -> int:
+        """
+        Delete embedding keys written before KEY_VERSION (pickled values).
+
+        Returns:
+            Number of keys deleted
+        """
+        count = sum(self.redis.delete_pattern(f"{prefix}*") for prefix in self.LEGACY_PREFIXES)
+        logger.info(f"Purged {count} legacy embedding cache keys")
+        return count
+
     def get_cache_stats(self) -> Dict[str, any]:
         """
         Get cache statistics.
 
+        Key counts come from the key indexes (no key enumeration).
+
         Returns:
             Dict with cache stats
         """
         try:
             client = self.redis._get_client()
 
-            # Count keys by prefix
-            product_keys = len(client.keys(f"{self.PRODUCT_PREFIX}*"))
-            user_lt_keys = len(client.keys(f"{self.USER_LONG_TERM_PREFIX}*"))
-            user_sess_keys = len(client.keys(f"{self.USER_SESSION_PREFIX}*"))
+            # Count keys by namespace
+            counts = self.redis.count_indexed(
+                [self.PRODUCT_INDEX, self.USER_LONG_TERM_INDEX, self.USER_SESSION_INDEX]
+            )
+            product_keys = counts.get(self.PRODUCT_INDEX, 0)
+            user_lt_keys = counts.get(self.USER_LONG_TERM_INDEX, 0)
+            user_sess_keys = counts.get(self.USER_SESSION_INDEX, 0)
 
             # Get hot products count
             hot_products_count = client.zcard(self.HOT_PRODUCTS_KEY)
@@ -378,6 +425,8 @@ class EmbeddingCache:
                 "cached_user_long_term": user_lt_keys,
                 "cached_user_session": user_sess_keys,
                 "hot_products_tracked": hot_products_count,
+                "storage_dtype": self.storage_dtype.name,
+                "codec": self.redis.codec.get_stats(),
                 "redis_connected": self.redis.ping(),
             }
 
@@ -387,3 +436,16 @@ class EmbeddingCache:
                 "error": str(e),
                 "redis_connected": False,
             }
+
+    # ========== Encoding ==========
+
+    def _to_storage(self, embedding: np.ndarray) -> np.ndarray:
+        """Embedding in the configured storage dtype."""
+        return np.asarray(embedding, dtype=self.storage_dtype)
+
+    @staticmethod
+    def _from_storage(embedding: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Cached embedding as float32 (float16 entries are widened, a copy)."""
+        if embedding is None or embedding.dtype == np.float32:
+            return embedding
+        return embedding.astype(np.float32)
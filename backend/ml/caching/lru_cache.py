@@ -0,0 +1,173 @@
+"""
+LRU Cache
+Thread-safe, bounded in-process cache with per-entry TTL.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+def default_sizeof(value: Any) -> int:
+    """Approximate the memory footprint of a cached value in bytes."""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUTTLCache:
+    """
+    Least-recently-used cache bounded by entry count and total size.
+
+    Entries expire ``ttl_seconds`` after they are written and are dropped lazily
+    when next accessed. All operations take one lock, so the cache can be shared
+    between request threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[Any], int] = default_sizeof,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total size of cached values (None for no limit)
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+            sizeof: Function returning the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, record_stats=False) is not None
+
+    def get(self, key: Hashable, default: Any = None, record_stats: bool = True) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+            record_stats: Whether to count this lookup in hit/miss stats
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                if record_stats:
+                    self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            if record_stats:
+                self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Cache a value, evicting least-recently-used entries as needed.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Entry lifetime in seconds (defaults to the cache TTL)
+
+        Returns:
+            False if the value alone exceeds max_bytes (not cached), True otherwise
+        """
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        ttl = self.ttl_seconds if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self._evict()
+
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove an entry. Returns True if it was cached."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until within bounds (lock held)."""
+        while self._over_capacity():
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _over_capacity(self) -> bool:
+        return len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        )
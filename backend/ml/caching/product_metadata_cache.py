@@ -0,0 +1,312 @@
+"""
+Product Metadata Cache
+Two-tier cache for product display metadata (in-process LRU + shared Redis),
+with pub/sub invalidation of the in-process tier.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import MLConfig, get_ml_config
+from .lru_cache import LRUTTLCache
+from .redis_cache import RedisCache, get_redis_cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "product_metadata:"
+
+# Invalidation message meaning "drop every product"
+INVALIDATE_ALL = "*"
+
+
+def invalidate_product_metadata(
+    product_ids: Iterable[Any],
+    config: Optional[MLConfig] = None,
+    redis_cache: Optional[RedisCache] = None,
+) -> int:
+    """
+    Drop products from the metadata cache in every process.
+
+    Deletes the Redis entries and publishes the IDs on the invalidation
+    channel (one pipeline), so API processes drop them from their
+    in-process tier. Call after committing product changes.
+
+    Args:
+        product_ids: Changed product IDs
+        config: ML configuration
+        redis_cache: Redis cache client (uses global if not provided)
+
+    Returns:
+        Number of products invalidated (0 if Redis is unavailable)
+    """
+    config = config or get_ml_config()
+    ids = list(dict.fromkeys(str(pid) for pid in product_ids))
+    if not ids:
+        return 0
+
+    try:
+        client = (redis_cache or get_redis_cache(config))._get_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.unlink(*[f"{KEY_PREFIX}{pid}" for pid in ids])
+        pipe.publish(config.performance.product_metadata_invalidation_channel, json.dumps(ids))
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to invalidate product metadata: {e}")
+        return 0
+
+    logger.info(f"Invalidated metadata of {len(ids)} products")
+    return len(ids)
+
+
+def publish_invalidate_all(
+    config: Optional[MLConfig] = None, redis_cache: Optional[RedisCache] = None
+) -> bool:
+    """
+    Tell every process to clear its in-process metadata tier.
+
+    Call after the Redis entries were deleted in bulk (e.g. a metadata cache
+    clear job), so local tiers do not keep serving them until their TTL.
+
+    Args:
+        config: ML configuration
+        redis_cache: Redis cache client (uses global if not provided)
+
+    Returns:
+        True if the message was published
+    """
+    config = config or get_ml_config()
+    try:
+        client = (redis_cache or get_redis_cache(config))._get_client()
+        client.publish(
+            config.performance.product_metadata_invalidation_channel,
+            json.dumps([INVALIDATE_ALL]),
+        )
+    except Exception as e:
+        logger.error(f"Failed to publish product metadata invalidation: {e}")
+        return False
+
+    logger.info("Published invalidation of all product metadata")
+    return True
+
+
+class ProductMetadataCache:
+    """
+    Caches product metadata dicts keyed on product ID.
+
+    Lookups check a bounded in-process LRU first, then Redis with one MGET
+    for all remaining IDs; Redis hits are promoted into the local tier.
+    Writes go to both tiers, with one pipelined SETEX for Redis.
+
+    The local tier has a short TTL. Product changes published with
+    invalidate_product_metadata() are applied to it immediately by the
+    invalidation listener (start_invalidation_listener()); the TTL bounds
+    staleness if a message is missed.
+
+    Cached dicts are shared between callers and must not be modified.
+    """
+
+    def __init__(self, config: Optional[MLConfig] = None, redis_cache: Optional[RedisCache] = None):
+        """
+        Initialize product metadata cache.
+
+        Args:
+            config: ML configuration
+            redis_cache: Redis cache client (uses global if not provided)
+        """
+        self.config = config or get_ml_config()
+        self._redis = redis_cache
+
+        performance = self.config.performance
+        self.local = LRUTTLCache(
+            max_entries=performance.product_metadata_cache_max_entries,
+            ttl_seconds=performance.product_metadata_cache_ttl_seconds,
+        )
+        self.redis_ttl = performance.product_metadata_redis_ttl_seconds
+        self.channel = performance.product_metadata_invalidation_channel
+
+        self._listener_stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+        # Statistics (Redis tier and invalidations)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.invalidations_received = 0
+
+    @property
+    def redis(self) -> RedisCache:
+        if self._redis is None:
+            self._redis = get_redis_cache(self.config)
+        return self._redis
+
+    def get_many(self, product_ids: List[Any]) -> Dict[Any, Dict]:
+        """
+        Get cached metadata for several products (at most one Redis round trip).
+
+        Args:
+            product_ids: Product IDs
+
+        Returns:
+            Dict mapping product_id -> metadata (only cached ones)
+        """
+        found = {}
+        remote = []
+
+        for product_id in dict.fromkeys(product_ids):
+            metadata = self.local.get(str(product_id))
+            if metadata is not None:
+                found[product_id] = metadata
+            else:
+                remote.append(product_id)
+
+        if not remote:
+            return found
+
+        try:
+            values = self.redis.get_many([self._key(product_id) for product_id in remote])
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Product metadata cache Redis lookup failed: {e}")
+            return found
+
+        for product_id in remote:
+            metadata = values.get(self._key(product_id))
+            if metadata is None:
+                self.redis_misses += 1
+                continue
+
+            self.redis_hits += 1
+            self.local.set(str(product_id), metadata)
+            found[product_id] = metadata
+
+        return found
+
+    def set_many(self, metadata: Dict[Any, Dict]) -> bool:
+        """
+        Cache metadata for several products in both tiers (one Redis round trip).
+
+        Args:
+            metadata: Dict mapping product_id -> metadata
+
+        Returns:
+            True if the Redis write succeeded
+        """
+        if not metadata:
+            return True
+
+        for product_id, product_metadata in metadata.items():
+            self.local.set(str(product_id), product_metadata)
+
+        try:
+            success = self.redis.set_many(
+                {self._key(product_id): value for product_id, value in metadata.items()},
+                ttl=self.redis_ttl,
+            )
+        except Exception as e:
+            success = False
+            logger.warning(f"Product metadata cache Redis write failed: {e}")
+
+        if not success:
+            self.redis_errors += 1
+        return success
+
+    def invalidate(self, product_ids: Iterable[Any]) -> int:
+        """
+        Drop products from this process and, via Redis, from every other process.
+
+        Args:
+            product_ids: Changed product IDs
+
+        Returns:
+            Number of products invalidated in Redis
+        """
+        ids = [str(pid) for pid in product_ids]
+        self.drop_local(ids)
+        return invalidate_product_metadata(ids, self.config, self.redis)
+
+    def drop_local(self, product_ids: Iterable[str]) -> None:
+        """Drop products from the in-process tier (INVALIDATE_ALL clears it)."""
+        for product_id in product_ids:
+            if product_id == INVALIDATE_ALL:
+                self.local.clear()
+                return
+            self.local.delete(str(product_id))
+
+    def start_invalidation_listener(self) -> None:
+        """Apply published invalidations to the local tier in a daemon thread."""
+        if self._listener is not None and self._listener.is_alive():
+            return
+
+        self._listener_stop.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="product-metadata-invalidation", daemon=True
+        )
+        self._listener.start()
+        logger.info(f"Product metadata invalidation listener started ({self.channel})")
+
+    def stop_invalidation_listener(self, timeout: float = 5.0) -> None:
+        """Stop the invalidation listener thread."""
+        self._listener_stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=timeout)
+            self._listener = None
+        logger.info("Product metadata invalidation listener stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for both tiers."""
+        local_stats = self.local.get_stats()
+        redis_lookups = self.redis_hits + self.redis_misses
+
+        return {
+            "local": local_stats,
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors,
+                "hit_rate": self.redis_hits / redis_lookups if redis_lookups else 0.0,
+            },
+            "invalidations_received": self.invalidations_received,
+            "listener_running": self._listener is not None and self._listener.is_alive(),
+        }
+
+    def _listen(self) -> None:
+        while not self._listener_stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.redis._get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Messages published while disconnected were missed
+                self.local.clear()
+
+                while not self._listener_stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._apply_message(message["data"])
+
+            except Exception as e:
+                logger.warning(f"Product metadata invalidation listener error: {e}")
+                self._listener_stop.wait(5.0)
+
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _apply_message(self, data: Any) -> None:
+        try:
+            product_ids = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed product metadata invalidation: {data!r}")
+            return
+
+        if isinstance(product_ids, str):
+            product_ids = [product_ids]
+        self.drop_local(product_ids)
+        self.invalidations_received += 1
+
+    def _key(self, product_id: Any) -> str:
+        return f"{KEY_PREFIX}{product_id}"
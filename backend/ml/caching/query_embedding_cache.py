@@ -0,0 +1,218 @@
+"""
+Query Embedding Cache
+Two-tier cache for text query embeddings (in-process LRU + shared Redis).
+"""
+
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..config import MLConfig, get_ml_config
+from .lru_cache import LRUTTLCache
+from .redis_cache import RedisCache, get_redis_cache
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Caches text embeddings keyed on the normalized query text.
+
+    Lookups check a bounded in-process LRU first, then Redis, where vectors are
+    stored as raw little-endian float32 bytes (no pickling). Redis hits are
+    promoted into the local tier. Keys include the model version, so switching
+    models never serves stale embeddings.
+
+    Cached arrays are read-only because they are shared between callers.
+    """
+
+    KEY_PREFIX = "embedding:query:"
+
+    def __init__(self, config: Optional[MLConfig] = None, redis_cache: Optional[RedisCache] = None):
+        """
+        Initialize query embedding cache.
+
+        Args:
+            config: ML configuration
+            redis_cache: Redis cache client (uses global if not provided)
+        """
+        self.config = config or get_ml_config()
+        self._redis = redis_cache
+
+        performance = self.config.performance
+        self.local = LRUTTLCache(
+            max_entries=performance.query_embedding_cache_max_entries,
+            max_bytes=performance.query_embedding_cache_max_mb * 1024 * 1024,
+            ttl_seconds=performance.query_embedding_cache_ttl_seconds,
+        )
+        self.redis_ttl = performance.query_embedding_redis_ttl_seconds
+
+        # Statistics (Redis tier)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+
+    @property
+    def redis(self) -> RedisCache:
+        if self._redis is None:
+            self._redis = get_redis_cache(self.config)
+        return self._redis
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """
+        Get a cached embedding.
+
+        Args:
+            query: Normalized query text
+
+        Returns:
+            Embedding or None if not cached
+        """
+        return self.get_many([query]).get(query)
+
+    def get_many(self, queries: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Get cached embeddings for several queries (one Redis round trip).
+
+        Args:
+            queries: Normalized query texts
+
+        Returns:
+            Dict mapping query -> embedding (only cached ones)
+        """
+        found = {}
+        remote = []
+
+        for query in dict.fromkeys(queries):
+            embedding = self.local.get(query)
+            if embedding is not None:
+                found[query] = embedding
+            else:
+                remote.append(query)
+
+        if remote:
+            found.update(self.get_many_from_redis(remote))
+        return found
+
+    def get_local(self, query: str) -> Optional[np.ndarray]:
+        """
+        Get a cached embedding from the in-process tier only (no I/O).
+
+        Args:
+            query: Normalized query text
+
+        Returns:
+            Embedding or None if not cached locally
+        """
+        return self.local.get(query)
+
+    def get_many_from_redis(self, queries: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Get embeddings from Redis only (one MGET), promoting hits to the local tier.
+
+        Use after a local miss (see get_local), so the lookup is counted once.
+
+        Args:
+            queries: Normalized query texts
+
+        Returns:
+            Dict mapping query -> embedding (only cached ones)
+        """
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return {}
+
+        try:
+            values = self.redis._get_client().mget([self._key(query) for query in queries])
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Query embedding cache Redis lookup failed: {e}")
+            return {}
+
+        found = {}
+        for query, data in zip(queries, values):
+            if data is None:
+                self.redis_misses += 1
+                continue
+
+            self.redis_hits += 1
+            embedding = np.frombuffer(data, dtype="<f4")
+            self.local.set(query, embedding)
+            found[query] = embedding
+
+        return found
+
+    def set(self, query: str, embedding: np.ndarray) -> None:
+        """
+        Cache an embedding in both tiers.
+
+        Args:
+            query: Normalized query text
+            embedding: Query embedding
+        """
+        self.set_many({query: embedding})
+
+    def set_many(self, embeddings: Dict[str, np.ndarray]) -> None:
+        """
+        Cache several embeddings in both tiers (one Redis round trip).
+
+        Args:
+            embeddings: Dict mapping normalized query -> embedding
+        """
+        if not embeddings:
+            return
+
+        encoded = {}
+        for query, embedding in embeddings.items():
+            embedding = np.array(embedding, dtype="<f4")
+            embedding.flags.writeable = False
+            self.local.set(query, embedding)
+            encoded[self._key(query)] = embedding.tobytes()
+
+        try:
+            pipe = self.redis._get_client().pipeline(transaction=False)
+            for key, data in encoded.items():
+                pipe.setex(key, self.redis_ttl, data)
+            pipe.execute()
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Query embedding cache Redis write failed: {e}")
+
+    def clear_local(self) -> None:
+        """Drop the in-process tier (Redis entries expire via TTL)."""
+        self.local.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics for both tiers."""
+        local_stats = self.local.get_stats()
+        redis_lookups = self.redis_hits + self.redis_misses
+        hits = local_stats["hits"] + self.redis_hits
+
+        return {
+            "local": local_stats,
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors,
+                "hit_rate": self.redis_hits / redis_lookups if redis_lookups else 0.0,
+            },
+            "overall_hit_rate": hits / (local_stats["hits"] + local_stats["misses"] or 1),
+        }
+
+    def _key(self, query: str) -> str:
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}{self.config.model_version}:{digest}"
+
+
+# Global cache instance
+_query_embedding_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get global query embedding cache (singleton pattern)."""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        _query_embedding_cache = QueryEmbeddingCache()
+    return _query_embedding_cache
@@ -1,12 +1,17 @@
 """
 Redis Cache Client
 Thread-safe Redis client with connection pooling.
+
+Pattern operations use incremental SCAN with batched UNLINK, never KEYS, so
+they do not block other clients on large keyspaces. Key counts per namespace
+come from key indexes: sorted sets of key -> expiry time maintained alongside
+writes, so counting is O(1) instead of a key enumeration.
 """
 
 import logging
-import pickle
 import threading
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     import redis
@@ -17,10 +22,15 @@ except ImportError:
     REDIS_AVAILABLE = False
 
 from ..config import MLConfig, get_ml_config
+from .codecs import CacheCodec
 
 logger = logging.getLogger(__name__)
 
 
+# Keys per SCAN step (a hint to Redis) and per UNLINK call
+SCAN_BATCH_SIZE = 1000
+
+
 class RedisCacheError(Exception):
     """Exception raised for Redis cache errors."""
 
@@ -70,13 +80,17 @@ class RedisCache:
             port=self.config.storage.redis_port,
             password=self.config.storage.redis_password,
             db=self.config.storage.redis_db,
-            decode_responses=False,  # We'll handle binary data (pickled embeddings)
+            decode_responses=False,  # Values are encoded by self.codec
             max_connections=20,
             socket_timeout=5,
             socket_connect_timeout=5,
         )
 
         self.client: Optional[redis.Redis] = None
+        self.codec = CacheCodec(
+            allow_pickle=self.config.storage.redis_pickle_fallback,
+            pickle_writes=self.config.storage.redis_pickle_writes,
+        )
         self._initialized = True
 
         logger.info(
@@ -122,8 +136,7 @@ class RedisCache:
             if data is None:
                 return None
 
-            # Unpickle the data
-            return pickle.loads(data)
+            return self.codec.decode(data)
 
         except redis.RedisError as e:
             logger.error(f"Redis GET error for key '{key}': {e}")
@@ -132,28 +145,39 @@ class RedisCache:
             logger.error(f"Error deserializing cached data for key '{key}': {e}")
             return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    def set(
+        self, key: str, value: Any, ttl: Optional[int] = None, index_key: Optional[str] = None
+    ) -> bool:
         """
         Set value in cache.
 
         Args:
             key: Cache key
-            value: Value to cache (will be pickled)
+            value: Value to cache (encoded by the cache codec)
             ttl: Time-to-live in seconds (None = no expiration)
+            index_key: Key index to record the key in (see count_indexed)
 
         Returns:
             True if successful, False otherwise
         """
         try:
             client = self._get_client()
+            data = self.codec.encode(value)
 
-            # Pickle the value
-            data = pickle.dumps(value)
+            if index_key is None:
+                if ttl is not None:
+                    client.setex(key, ttl, data)
+                else:
+                    client.set(key, data)
+                return True
 
+            pipe = client.pipeline(transaction=False)
             if ttl is not None:
-                client.setex(key, ttl, data)
+                pipe.setex(key, ttl, data)
             else:
-                client.set(key, data)
+                pipe.set(key, data)
+            self._index_add(pipe, index_key, [key], ttl)
+            pipe.execute()
 
             return True
 
@@ -164,47 +188,142 @@ class RedisCache:
             logger.error(f"Error serializing data for key '{key}': {e}")
             return False
 
-    def delete(self, key: str) -> bool:
+    def delete(self, key: str, index_key: Optional[str] = None) -> bool:
         """
         Delete key from cache.
 
         Args:
             key: Cache key
+            index_key: Key index the key is recorded in
 
         Returns:
             True if key was deleted, False otherwise
         """
         try:
             client = self._get_client()
-            result = client.delete(key)
-            return result > 0
+            if index_key is None:
+                return client.delete(key) > 0
+
+            pipe = client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.zrem(index_key, key)
+            deleted, _ = pipe.execute()
+            return deleted > 0
 
         except redis.RedisError as e:
             logger.error(f"Redis DELETE error for key '{key}': {e}")
             return False
 
-    def delete_pattern(self, pattern: str) -> int:
+    def scan_step(
+        self, pattern: str, cursor: int = 0, count: int = SCAN_BATCH_SIZE
+    ) -> Tuple[int, List[bytes]]:
+        """
+        One incremental SCAN step.
+
+        Args:
+            pattern: Key pattern (e.g., "search:*")
+            cursor: Cursor returned by the previous step (0 to start)
+            count: Keys to examine in this step (a hint to Redis)
+
+        Returns:
+            Tuple of (next cursor, 0 when the scan is complete; matching keys)
+
+        Raises:
+            RedisCacheError: If Redis is unavailable
+        """
+        try:
+            next_cursor, keys = self._get_client().scan(cursor=cursor, match=pattern, count=count)
+        except redis.RedisError as e:
+            raise RedisCacheError(f"Redis SCAN failed for pattern '{pattern}': {e}")
+        return int(next_cursor), keys
+
+    def delete_pattern_step(
+        self, pattern: str, cursor: int = 0, count: int = SCAN_BATCH_SIZE
+    ) -> Tuple[int, int]:
+        """
+        Delete the keys of one SCAN step (UNLINK: memory is freed in the background).
+
+        Args:
+            pattern: Key pattern
+            cursor: Cursor returned by the previous step (0 to start)
+            count: Keys to examine in this step
+
+        Returns:
+            Tuple of (next cursor, 0 when done; number of keys deleted)
+
+        Raises:
+            RedisCacheError: If Redis is unavailable
+        """
+        next_cursor, keys = self.scan_step(pattern, cursor, count)
+        if not keys:
+            return next_cursor, 0
+
+        try:
+            return next_cursor, self._get_client().unlink(*keys)
+        except redis.RedisError as e:
+            raise RedisCacheError(f"Redis UNLINK failed for pattern '{pattern}': {e}")
+
+    def delete_pattern(self, pattern: str, count: int = SCAN_BATCH_SIZE) -> int:
         """
         Delete all keys matching a pattern.
 
+        Runs incremental SCAN steps with one UNLINK per batch, so other clients
+        are served between steps. Keys written during the scan may survive.
+
         Args:
             pattern: Key pattern (e.g., "user:*")
+            count: Keys per SCAN step
 
         Returns:
             Number of keys deleted
         """
+        deleted = 0
+        cursor = 0
         try:
-            client = self._get_client()
-            keys = client.keys(pattern)
+            while True:
+                cursor, step_deleted = self.delete_pattern_step(pattern, cursor, count)
+                deleted += step_deleted
+                if cursor == 0:
+                    return deleted
+
+        except RedisCacheError as e:
+            logger.error(f"Redis DELETE PATTERN error for pattern '{pattern}': {e}")
+            return deleted
+
+    def count_indexed(self, index_keys: List[str]) -> Dict[str, int]:
+        """
+        Live key count of several key indexes (one round trip).
 
-            if len(keys) == 0:
-                return 0
+        Expired entries are dropped from each index before counting.
 
-            return client.delete(*keys)
+        Args:
+            index_keys: Key index names
+
+        Returns:
+            Dict mapping index key -> number of live keys
+        """
+        if not index_keys:
+            return {}
+
+        try:
+            pipe = self._get_client().pipeline(transaction=False)
+            for index_key in index_keys:
+                pipe.zremrangebyscore(index_key, "-inf", time.time())
+                pipe.zcard(index_key)
+            results = pipe.execute()
 
         except redis.RedisError as e:
-            logger.error(f"Redis DELETE PATTERN error for pattern '{pattern}': {e}")
-            return 0
+            logger.error(f"Redis key index count error: {e}")
+            return {}
+
+        return dict(zip(index_keys, results[1::2]))
+
+    def _index_add(self, pipe, index_key: str, keys: List[str], ttl: Optional[int]) -> None:
+        """Queue recording keys (and dropping expired entries) in a key index."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else "+inf"
+        pipe.zadd(index_key, {key: expires_at for key in keys})
+        pipe.zremrangebyscore(index_key, "-inf", now)
 
     def exists(self, key: str) -> bool:
         """
@@ -245,7 +364,7 @@ class RedisCache:
             for key, data in zip(keys, values):
                 if data is not None:
                     try:
-                        result[key] = pickle.loads(data)
+                        result[key] = self.codec.decode(data)
                     except Exception as e:
                         logger.error(f"Error deserializing cached data for key '{key}': {e}")
 
@@ -255,13 +374,16 @@ class RedisCache:
             logger.error(f"Redis MGET error: {e}")
             return {}
 
-    def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+    def set_many(
+        self, mapping: Dict[str, Any], ttl: Optional[int] = None, index_key: Optional[str] = None
+    ) -> bool:
         """
         Set multiple values in cache.
 
         Args:
             mapping: Dict mapping keys to values
             ttl: Time-to-live in seconds (applied to all keys)
+            index_key: Key index to record the keys in (see count_indexed)
 
         Returns:
             True if successful, False otherwise
@@ -272,15 +394,14 @@ class RedisCache:
         try:
             client = self._get_client()
 
-            # Pickle all values
-            pickled_mapping = {}
+            encoded_mapping = {}
             for key, value in mapping.items():
                 try:
-                    pickled_mapping[key] = pickle.dumps(value)
+                    encoded_mapping[key] = self.codec.encode(value)
                 except Exception as e:
                     logger.error(f"Error serializing data for key '{key}': {e}")
 
-            if not pickled_mapping:
+            if not encoded_mapping:
                 return False
 
             # Use pipeline for atomic operation
@@ -288,11 +409,14 @@ class RedisCache:
 
             if ttl is not None:
                 # Set with expiration
-                for key, data in pickled_mapping.items():
+                for key, data in encoded_mapping.items():
                     pipe.setex(key, ttl, data)
             else:
                 # Set without expiration
-                pipe.mset(pickled_mapping)
+                pipe.mset(encoded_mapping)
+
+            if index_key is not None:
+                self._index_add(pipe, index_key, list(encoded_mapping), ttl)
 
             pipe.execute()
 
@@ -0,0 +1,288 @@
+"""
+Single-Flight Cache Fill
+Request coalescing and stale-while-revalidate for expensive cached results.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .redis_cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Where a get_or_compute() result came from
+SOURCE_HIT = "hit"  # fresh cache entry
+SOURCE_STALE = "stale"  # expired entry served while another request refreshes it
+SOURCE_COALESCED = "coalesced"  # shared with a concurrent request in this process
+SOURCE_WAITED = "waited"  # stored by the lock holder in another process
+SOURCE_COMPUTED = "computed"  # computed by this request
+
+# Compare-and-delete, so a request never releases a lock that expired and was re-acquired
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+Lookup = Callable[[str], Tuple[Optional[Dict[str, Any]], bool]]
+Store = Callable[[str, Dict[str, Any]], Any]
+
+
+async def _to_thread(func: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.to_thread(func, *args)
+
+
+class SingleFlight:
+    """
+    Computes each missing cache entry once, however many requests miss it together.
+
+    Concurrent requests for the same key are coalesced at two levels:
+
+    - In-process: the first request (the leader) registers a future; concurrent
+      requests in the same process await it instead of computing.
+    - Across processes: the leader takes a short Redis lock (SET NX PX) before
+      computing. Leaders in other processes that lose the lock poll the cache
+      until the value appears, the lock is released or wait_seconds pass (then
+      they compute it themselves).
+
+    Entries are stored with a logical expiry (wrap()) and kept in Redis for
+    stale_seconds longer. An expired entry is stale-while-revalidate: the
+    request that wins the lock recomputes it, every other request is served
+    the stale value instead of waiting. The refresh runs inside the winning
+    request (request-scoped resources such as the DB session do not outlive
+    it), so only that request pays the miss latency.
+
+    Blocking Redis calls (and the lookup/store callables) run through
+    run_blocking, so the event loop never waits on Redis.
+    """
+
+    LOCK_PREFIX = "lock:"
+    FRESH_UNTIL_FIELD = "_fresh_until"
+
+    def __init__(
+        self,
+        redis_cache: RedisCache,
+        stale_seconds: int = 60,
+        lock_seconds: int = 10,
+        wait_seconds: float = 3.0,
+        poll_interval_seconds: float = 0.05,
+        run_blocking: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        """
+        Initialize single-flight cache fill.
+
+        Args:
+            redis_cache: Redis cache client
+            stale_seconds: How long an expired entry may be served while it is refreshed
+            lock_seconds: Expiry of the refresh lock (upper bound on a compute)
+            wait_seconds: How long to poll for another process's result before computing
+            poll_interval_seconds: Poll interval while waiting
+            run_blocking: Async callable(func, *args) running blocking calls off the
+                event loop (default: asyncio.to_thread)
+        """
+        self.redis = redis_cache
+        self.stale_seconds = stale_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._run_blocking = run_blocking or _to_thread
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {
+            "coalesced": 0,
+            "lock_waits": 0,
+            "waited_hits": 0,
+            "lock_timeouts": 0,
+            "stale_served": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+        }
+
+    def wrap(self, value: Dict[str, Any], ttl: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Prepare a value for storage.
+
+        Args:
+            value: Value to cache (not modified)
+            ttl: Freshness in seconds
+
+        Returns:
+            Tuple of (value with its logical expiry, Redis TTL including the stale window)
+        """
+        stored = dict(value)
+        stored[self.FRESH_UNTIL_FIELD] = time.time() + ttl
+        return stored, ttl + self.stale_seconds
+
+    def unwrap(self, stored: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Split a stored value from its logical expiry.
+
+        Args:
+            stored: Value read from the cache (None on miss)
+
+        Returns:
+            Tuple of (value, fresh); entries written without an expiry are fresh
+        """
+        if not isinstance(stored, dict):
+            return stored, stored is not None
+
+        fresh_until = stored.pop(self.FRESH_UNTIL_FIELD, None)
+        return stored, fresh_until is None or fresh_until > time.time()
+
+    async def get_or_compute(
+        self,
+        cache_key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        lookup: Lookup,
+        store: Store,
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Get a cached value, computing and storing it at most once on a miss.
+
+        Args:
+            cache_key: Cache key
+            compute: Coroutine function producing the value
+            lookup: Blocking callable(cache_key) -> (value or None, fresh)
+            store: Blocking callable(cache_key, value) storing a computed value
+
+        Returns:
+            Tuple of (value, source); source is one of the SOURCE_* constants.
+            Values shared with other requests are shallow copies.
+
+        Raises:
+            Exception: Whatever compute raises (also raised to coalesced requests)
+        """
+        leader = self._inflight.get(cache_key)
+        if leader is not None:
+            self.stats["coalesced"] += 1
+            try:
+                value, _ = await asyncio.shield(leader)
+            except asyncio.CancelledError:
+                if not leader.cancelled():
+                    raise
+                # The leader's request was cancelled: take over
+                return await self.get_or_compute(cache_key, compute, lookup, store)
+            return dict(value), SOURCE_COALESCED
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            value, source = await self._resolve(cache_key, compute, lookup, store, future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                future.exception()  # Retrieved: the leader re-raises it
+            raise
+        else:
+            if not future.done():
+                future.set_result((value, source))
+            return value, source
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get single-flight statistics."""
+        return {**self.stats, "inflight": len(self._inflight)}
+
+    async def _resolve(
+        self,
+        cache_key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        lookup: Lookup,
+        store: Store,
+        future: asyncio.Future,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Leader path: cache, then lock, then wait or compute."""
+        stale, fresh = await self._run_blocking(lookup, cache_key)
+        if stale is not None and fresh:
+            return stale, SOURCE_HIT
+
+        try:
+            token = await self._run_blocking(self._acquire_lock, cache_key)
+        except Exception as e:
+            # Redis unavailable: compute without coordination
+            logger.warning(f"Failed to acquire refresh lock for {cache_key}: {e}")
+            token = ""
+
+        if token is None:
+            if stale is not None:
+                self.stats["stale_served"] += 1
+                return stale, SOURCE_STALE
+
+            value = await self._wait_for_value(cache_key, lookup)
+            if value is not None:
+                self.stats["waited_hits"] += 1
+                return value, SOURCE_WAITED
+            self.stats["lock_timeouts"] += 1
+
+        if stale is not None:
+            self.stats["refreshes"] += 1
+            # Requests coalesced on this one get the stale value now, not after the refresh
+            future.set_result((stale, SOURCE_STALE))
+
+        # Store before releasing the lock: waiters treat "unlocked and no value"
+        # as the holder having given up (see _wait_for_value)
+        try:
+            try:
+                value = await compute()
+            except Exception as e:
+                if stale is None:
+                    raise
+                self.stats["refresh_failures"] += 1
+                logger.warning(f"Refresh of {cache_key} failed, serving stale value: {e}")
+                return stale, SOURCE_STALE
+
+            await self._run_blocking(store, cache_key, value)
+            return value, SOURCE_COMPUTED
+        finally:
+            if token:
+                await self._run_blocking(self._release_lock, cache_key, token)
+
+    async def _wait_for_value(self, cache_key: str, lookup: Lookup) -> Optional[Dict[str, Any]]:
+        """Poll for the value another process is computing."""
+        self.stats["lock_waits"] += 1
+        deadline = time.monotonic() + self.wait_seconds
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval_seconds)
+            # Lock before value: the holder stores before it releases, so a missing
+            # lock followed by a missing value means the holder gave up
+            locked = await self._run_blocking(self._is_locked, cache_key)
+            value, _ = await self._run_blocking(lookup, cache_key)
+            if value is not None:
+                return value
+            if not locked:
+                return None
+
+        return None
+
+    def _acquire_lock(self, cache_key: str) -> Optional[str]:
+        """Take the refresh lock; returns its token, or None if another request holds it."""
+        token = uuid.uuid4().hex
+        acquired = self.redis._get_client().set(
+            self._lock_key(cache_key), token, nx=True, px=int(self.lock_seconds * 1000)
+        )
+        return token if acquired else None
+
+    def _release_lock(self, cache_key: str, token: str) -> None:
+        try:
+            self.redis._get_client().eval(_RELEASE_LOCK_SCRIPT, 1, self._lock_key(cache_key), token)
+        except Exception as e:
+            # The lock expires by itself
+            logger.warning(f"Failed to release refresh lock for {cache_key}: {e}")
+
+    def _is_locked(self, cache_key: str) -> bool:
+        try:
+            return bool(self.redis._get_client().exists(self._lock_key(cache_key)))
+        except Exception:
+            return False
+
+    def _lock_key(self, cache_key: str) -> str:
+        return f"{self.LOCK_PREFIX}{cache_key}"
@@ -0,0 +1,110 @@
+"""
+User Cache Generations
+Per-user generation counters for O(1) invalidation of cached results.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+from ..config import MLConfig, get_ml_config
+from .redis_cache import RedisCache, get_redis_cache
+
+logger = logging.getLogger(__name__)
+
+
+class UserCacheGenerations:
+    """
+    Generation number per user, stored in Redis.
+
+    Search and recommendation cache keys include the user's current
+    generation. Invalidating a user is a single INCR: later lookups build
+    keys with the new generation and miss, and entries of older generations
+    are never read again and expire through their own TTL.
+
+    A user without a counter is at generation 0. Counters expire after
+    config.performance.user_cache_generation_ttl_seconds without a bump; that
+    must exceed the longest result TTL, so entries of a forgotten generation
+    have expired by the time the counter restarts at 0.
+    """
+
+    KEY_PREFIX = "cache:user_gen:"
+
+    def __init__(self, config: Optional[MLConfig] = None, redis_cache: Optional[RedisCache] = None):
+        """
+        Initialize user cache generations.
+
+        Args:
+            config: ML configuration
+            redis_cache: Redis cache client (uses global if not provided)
+        """
+        self.config = config or get_ml_config()
+        self._redis = redis_cache
+        self.ttl = self.config.performance.user_cache_generation_ttl_seconds
+
+    @property
+    def redis(self) -> RedisCache:
+        if self._redis is None:
+            self._redis = get_redis_cache(self.config)
+        return self._redis
+
+    def get(self, user_id) -> int:
+        """
+        Current generation of a user.
+
+        Args:
+            user_id: User ID (None for anonymous requests)
+
+        Returns:
+            Generation number (0 if never invalidated or Redis is unavailable)
+        """
+        if user_id is None:
+            return 0
+        return self.get_many([user_id]).get(str(user_id), 0)
+
+    def get_many(self, user_ids: Iterable) -> Dict[str, int]:
+        """
+        Current generations of several users (one MGET).
+
+        Args:
+            user_ids: User IDs (None entries are skipped)
+
+        Returns:
+            Dict mapping str(user_id) -> generation
+        """
+        ids = list(dict.fromkeys(str(uid) for uid in user_ids if uid is not None))
+        if not ids:
+            return {}
+
+        try:
+            values = self.redis._get_client().mget([self._key(uid) for uid in ids])
+        except Exception as e:
+            logger.warning(f"Failed to read user cache generations: {e}")
+            return {uid: 0 for uid in ids}
+
+        return {uid: int(value) if value is not None else 0 for uid, value in zip(ids, values)}
+
+    def bump(self, user_id) -> Optional[int]:
+        """
+        Invalidate all cached results of a user.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            New generation, or None if Redis is unavailable
+        """
+        key = self._key(str(user_id))
+        try:
+            pipe = self.redis._get_client().pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, self.ttl)
+            generation, _ = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to bump cache generation for user {user_id}: {e}")
+            return None
+
+        logger.debug(f"User {user_id} cache generation is now {generation}")
+        return generation
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
@@ -160,16 +160,60 @@ class StorageConfig:
 
     # FAISS configuration
     use_faiss: bool = True
-    faiss_index_type: Literal["Flat", "IVF", "HNSW"] = "Flat"  # Start simple for MVP
+    faiss_index_type: Literal["Flat", "IVF", "HNSW", "IVFPQ", "OPQ"] = field(
+        default_factory=lambda: os.getenv("FAISS_INDEX_TYPE", "Flat")  # Start simple for MVP
+    )
     faiss_index_path: Path = field(default_factory=lambda: Path("models/cache/faiss_index"))
+    faiss_artifact_keep_versions: int = 2  # Published index versions kept on disk and in GCS
+    faiss_download_workers: int = 8  # Parallel GCS range requests
+    faiss_download_chunk_mb: int = 32  # Range size for large artifact downloads
 
     # FAISS build configuration
     faiss_nprobe: int = 10  # Number of clusters to visit during search (IVF only)
     faiss_ef_search: int = 64  # Search depth for HNSW
+    faiss_build_chunk_size: int = 50000  # Embedding rows streamed per chunk during builds
+
+    # Product-quantized index types (IVFPQ, OPQ = OPQ rotation + IVFPQ)
+    faiss_ivf_nlist: int = 1024  # Upper bound; reduced for small catalogs
+    faiss_pq_m: int = 64  # Sub-quantizers (bytes per vector at 8 bits); must divide the dim
+    faiss_pq_nbits: int = 8
+    faiss_refine_factor: int = 4  # Re-rank k * factor PQ candidates against stored vectors
+
+    # Auto-tuning of IVF/HNSW parameters at build time (see IndexTuner)
+    faiss_auto_tune: bool = field(
+        default_factory=lambda: os.getenv("FAISS_AUTO_TUNE", "true").lower() == "true"
+    )
+    faiss_tune_target_recall: float = 0.95  # recall@k against an exact ground truth
+    faiss_tune_k: int = 10
+    faiss_tune_num_queries: int = 200  # Held-out query sample
 
     # Rebuild schedule
     rebuild_index_interval_hours: int = 6  # Rebuild FAISS index every 6 hours
 
+    # Incremental index updates (Redis stream of product vector changes)
+    faiss_delta_updates_enabled: bool = field(
+        default_factory=lambda: os.getenv("FAISS_DELTA_UPDATES", "true").lower() == "true"
+    )
+    faiss_delta_stream_key: str = "faiss:index_deltas"
+    faiss_delta_stream_maxlen: int = 100000  # Must cover changes between full rebuilds
+    faiss_delta_batch_size: int = 500  # Stream entries applied per delta
+    faiss_delta_poll_block_ms: int = 1000
+    faiss_delta_compaction_threshold: int = 10000  # Delta + tombstones before compacting
+
+    # In-memory product attributes for filtered search (no DB query per request)
+    faiss_attribute_filtering_enabled: bool = field(
+        default_factory=lambda: os.getenv("FAISS_ATTRIBUTE_FILTERING", "true").lower() == "true"
+    )
+    faiss_attribute_refresh_interval_seconds: int = 300  # Reload price/stock/active flags
+
+    # Partitioned index shards for scoped queries (requires attribute filtering)
+    faiss_shard_by: Optional[Literal["category_id", "merchant_id", "gender"]] = field(
+        default_factory=lambda: os.getenv("FAISS_SHARD_BY") or None
+    )
+    faiss_shard_min_size: int = 1000  # Smaller partitions share one "other" shard
+    faiss_shard_search_workers: int = 4  # Threads searching routed shards in parallel
+    faiss_shard_max_memory_mb: int = 2048  # Sharding is skipped if shards would need more
+
     # Redis configuration for user embeddings
     redis_host: str = field(default_factory=lambda: os.getenv("REDIS_HOST", "localhost"))
     redis_port: int = field(default_factory=lambda: int(os.getenv("REDIS_PORT", "6379")))
@@ -177,6 +221,19 @@ class StorageConfig:
     redis_db: int = 1  # Separate DB for embeddings
     redis_ttl_hours: int = 24  # Cache user embeddings for 24 hours
 
+    # Cache value encoding (see caching/codecs.py)
+    redis_embedding_dtype: Literal["float32", "float16"] = field(
+        default_factory=lambda: os.getenv("REDIS_EMBEDDING_DTYPE", "float32")
+    )
+    # Read pre-codec pickles; disable once legacy keys expired
+    redis_pickle_fallback: bool = field(
+        default_factory=lambda: os.getenv("REDIS_PICKLE_FALLBACK", "true").lower() == "true"
+    )
+    # Pickle values the codec has no type for (otherwise caching them raises CacheCodecError)
+    redis_pickle_writes: bool = field(
+        default_factory=lambda: os.getenv("REDIS_PICKLE_WRITES", "false").lower() == "true"
+    )
+
     def __post_init__(self):
         """Ensure FAISS index directory exists."""
         self.faiss_index_path = Path(self.faiss_index_path)
@@ -195,10 +252,44 @@ class PerformanceConfig:
     candidate_retrieval_k: int = 500  # Initial candidates from FAISS
     final_results_k: int = 50  # Final results after filtering/ranking
 
+    # Filtered search strategy (see FilteredSimilaritySearch)
+    filtered_search_subset_threshold: float = 0.1  # Exact scan below this selectivity
+    filtered_search_max_overfetch: int = 64  # Post-filter candidates per result before fallback
+    filtered_search_budget_ms: float = 20.0  # Time allowed for iterative deepening
+    filtered_search_stats_max_entries: int = 4096  # Filter signatures with recorded hit rates
+
     # Caching
     cache_hot_embeddings: bool = True
     hot_user_threshold: int = 10000  # Cache top 10k active users in Redis
 
+    # Query embedding cache (normalized query text -> text embedding)
+    query_embedding_cache_enabled: bool = True
+    query_embedding_cache_max_entries: int = 20000  # In-process LRU tier
+    query_embedding_cache_max_mb: int = 64
+    query_embedding_cache_ttl_seconds: int = 3600
+    query_embedding_redis_ttl_seconds: int = 7 * 86400  # Shared Redis tier
+
+    # Product metadata cache (product_id -> display fields, see ProductMetadataCache)
+    product_metadata_cache_max_entries: int = 50000  # In-process LRU tier
+    product_metadata_cache_ttl_seconds: int = 30  # Bounds staleness if an invalidation is missed
+    product_metadata_redis_ttl_seconds: int = 3600  # Shared Redis tier
+    product_metadata_invalidation_channel: str = "product_metadata:invalidate"  # Pub/sub
+
+    # Per-user generations in search/recommend cache keys (see UserCacheGenerations)
+    user_cache_generation_ttl_seconds: int = 7 * 86400  # Must exceed the longest result TTL
+
+    # Text encoder micro-batching (concurrent API queries share one forward pass)
+    text_encoder_batching_enabled: bool = field(
+        default_factory=lambda: os.getenv("TEXT_ENCODER_BATCHING", "true").lower() == "true"
+    )
+    text_encoder_batch_window_ms: float = field(
+        default_factory=lambda: float(os.getenv("TEXT_ENCODER_BATCH_WINDOW_MS", "5"))
+    )
+    text_encoder_max_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("TEXT_ENCODER_MAX_BATCH_SIZE", "32"))
+    )
+    text_encoder_max_queue_size: int = 1024  # Pending requests before rejecting
+
     # Model optimization
     use_torch_compile: bool = False  # PyTorch 2.0+ compilation (experimental)
     use_onnx: bool = False  # Export to ONNX for faster inference (post-MVP)
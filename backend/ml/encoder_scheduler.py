@@ -0,0 +1,263 @@
+"""
+Encoder Scheduler
+Micro-batches concurrent text encoding requests into single CLIP forward passes.
+
+Encoding one query at a time leaves the text transformer at its least efficient
+batch size. The scheduler queues requests from all threads/event loops, waits up
+to a short window (or until the batch is full) and runs one
+``encode_text_batch`` call, resolving each caller's future with its row.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import MLConfig, get_ml_config
+
+logger = logging.getLogger(__name__)
+
+
+class EncoderSchedulerError(Exception):
+    """Raised when an encode request cannot be scheduled."""
+
+    pass
+
+
+class TextEncodingScheduler:
+    """
+    Background micro-batcher for text encoding.
+
+    Usage:
+        scheduler = get_text_encoding_scheduler()
+        embedding = scheduler.encode("vintage dress")
+
+        # From async code, without blocking the event loop
+        embedding = await asyncio.wrap_future(scheduler.submit("vintage dress"))
+    """
+
+    def __init__(
+        self,
+        encode_batch_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        config: Optional[MLConfig] = None,
+    ):
+        """
+        Initialize encoder scheduler.
+
+        Args:
+            encode_batch_fn: Function encoding a list of texts to a 2D array
+                             (defaults to ModelRegistry.encode_text_batch)
+            config: ML configuration
+        """
+        self.config = config or get_ml_config()
+        self._encode_batch_fn = encode_batch_fn
+
+        performance = self.config.performance
+        self.batch_window_ms = performance.text_encoder_batch_window_ms
+        self.max_batch_size = performance.text_encoder_max_batch_size
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue(
+            maxsize=performance.text_encoder_max_queue_size
+        )
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.requests_total = 0
+        self.requests_rejected = 0
+        self.batches_total = 0
+        self.texts_encoded = 0
+        self.max_queue_depth = 0
+        self._recent_batches: deque = deque(maxlen=1000)  # (batch_size, encode_ms)
+
+    # ========== Lifecycle ==========
+
+    def start(self) -> None:
+        """Start the batching thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="text-encoder-scheduler", daemon=True
+            )
+            self._thread.start()
+
+        logger.info(
+            f"Text encoder scheduler started (window={self.batch_window_ms}ms, "
+            f"max_batch={self.max_batch_size})"
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the batching thread, failing any requests still queued."""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+            self._thread = None
+
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(EncoderSchedulerError("Encoder scheduler stopped"))
+
+        logger.info("Text encoder scheduler stopped")
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ========== Submission ==========
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for encoding.
+
+        Args:
+            text: Preprocessed text to encode
+
+        Returns:
+            Future resolving to the embedding vector (shape: [embedding_dim])
+
+        Raises:
+            EncoderSchedulerError: If the queue is full
+        """
+        if not self.is_running:
+            self.start()
+
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((text, future))
+        except queue.Full:
+            self.requests_rejected += 1
+            raise EncoderSchedulerError(
+                f"Text encoder queue full ({self._queue.maxsize} pending requests)"
+            )
+
+        self.requests_total += 1
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+        return future
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Encode a text, blocking until its batch has run.
+
+        Args:
+            text: Preprocessed text to encode
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            Embedding vector (shape: [embedding_dim])
+        """
+        return self.submit(text).result(timeout=timeout)
+
+    # ========== Batching loop ==========
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._encode(batch)
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        """Wait for a first request, then gather more until the window closes."""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _encode(self, batch: List[Tuple[str, Future]]) -> None:
+        # Skip requests whose callers gave up before the batch ran
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        # Identical texts in one batch are encoded once
+        rows: Dict[str, int] = {}
+        for text, _ in batch:
+            rows.setdefault(text, len(rows))
+
+        start_time = time.time()
+        try:
+            embeddings = self._get_encode_batch_fn()(list(rows))
+        except Exception as e:
+            logger.error(f"Batched text encoding failed ({len(rows)} texts): {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        encode_ms = (time.time() - start_time) * 1000
+        for text, future in batch:
+            future.set_result(embeddings[rows[text]])
+
+        self.batches_total += 1
+        self.texts_encoded += len(rows)
+        self._recent_batches.append((len(batch), encode_ms))
+
+    def _get_encode_batch_fn(self) -> Callable[[List[str]], np.ndarray]:
+        if self._encode_batch_fn is None:
+            from .model_loader import model_registry
+
+            self._encode_batch_fn = model_registry.encode_text_batch
+        return self._encode_batch_fn
+
+    # ========== Monitoring ==========
+
+    def get_stats(self) -> dict:
+        """Get scheduler statistics."""
+        recent = list(self._recent_batches)
+        batch_sizes = [size for size, _ in recent]
+        encode_times = [ms for _, ms in recent]
+
+        return {
+            "running": self.is_running,
+            "batch_window_ms": self.batch_window_ms,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "queue_capacity": self._queue.maxsize,
+            "requests_total": self.requests_total,
+            "requests_rejected": self.requests_rejected,
+            "batches_total": self.batches_total,
+            "texts_encoded": self.texts_encoded,
+            "avg_batch_size": float(np.mean(batch_sizes)) if batch_sizes else 0.0,
+            "avg_encode_ms": float(np.mean(encode_times)) if encode_times else 0.0,
+        }
+
+
+# Global scheduler instance
+_text_encoding_scheduler: Optional[TextEncodingScheduler] = None
+
+
+def get_text_encoding_scheduler() -> TextEncodingScheduler:
+    """Get global text encoding scheduler (singleton pattern)."""
+    global _text_encoding_scheduler
+    if _text_encoding_scheduler is None:
+        _text_encoding_scheduler = TextEncodingScheduler()
+    return _text_encoding_scheduler
@@ -3,6 +3,18 @@ Retrieval & Search Module
 FAISS-based vector similarity search with filtering and ranking.
 """
 
+from .artifacts import ArtifactManifest, ArtifactStore
+from .attribute_store import ProductAttributeStore
+from .build_pipeline import (
+    EmbeddingSource,
+    FallbackSource,
+    FileSource,
+    IndexBuildPipeline,
+    IndexBuildResult,
+    ProductColumnSource,
+    ProductEmbeddingsSource,
+    source_for_embedding_type,
+)
 from .filtered_search import FilteredSimilaritySearch
 from .filters import (
     FilteredSearcher,
@@ -14,8 +26,10 @@ from .filters import (
     create_merchant_filter,
     create_price_filter,
 )
+from .id_map import ProductIdMap
 from .index_builder import FAISSIndexBuilder
-from .index_manager import FAISSIndexManager, get_index_manager
+from .index_manager import FAISSIndexManager, IndexSnapshot, get_index_manager
+from .index_tuner import IndexTuner, TuningResult
 from .personalized_search import PersonalizedSearch, UserContext, create_user_context
 from .ranking import (
     BrandMatchScorer,
@@ -24,12 +38,29 @@ from .ranking import (
     PriceAffinityScorer,
     RankingConfig,
 )
+from .sharding import ShardedIndex
 from .similarity_search import SearchResult, SearchResults, SimilaritySearch
 
 __all__ = [
     "FAISSIndexBuilder",
+    "IndexBuildPipeline",
+    "ArtifactStore",
+    "ArtifactManifest",
+    "IndexBuildResult",
+    "EmbeddingSource",
+    "ProductColumnSource",
+    "ProductEmbeddingsSource",
+    "FileSource",
+    "FallbackSource",
+    "source_for_embedding_type",
+    "IndexTuner",
+    "TuningResult",
     "FAISSIndexManager",
     "get_index_manager",
+    "IndexSnapshot",
+    "ProductIdMap",
+    "ProductAttributeStore",
+    "ShardedIndex",
     "SimilaritySearch",
     "SearchResult",
     "SearchResults",
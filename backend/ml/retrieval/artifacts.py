@@ -0,0 +1,324 @@
+"""
+Index Artifacts
+Versioned, checksummed FAISS index directories with atomic publication.
+
+Layout of an index root (config.storage.faiss_index_path):
+
+    CURRENT                 Name of the published version (replaced atomically)
+    versions/<version>/     Immutable artifact set plus manifest.json
+    blobs/<sha256>          Content-addressed hard links to artifact files
+
+Readers resolve CURRENT once and only open files of that version, so a
+concurrent publish can never hand them a mix of old and new files. Files are
+never rewritten in place. Unchanged artifacts are shared between versions
+through blobs/, which also serves as the local cache for GCS downloads.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+BLOBS_DIR = "blobs"
+MANIFEST_FILE = "manifest.json"
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class ArtifactError(Exception):
+    """Exception raised for index artifact errors."""
+
+    pass
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_version() -> str:
+    """Version name for a new artifact set (sorts chronologically)."""
+    return datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def resolve_index_path(path: Path) -> Path:
+    """
+    Directory holding the artifacts of the published index under path.
+
+    Returns the CURRENT version directory, or path itself for a flat (legacy
+    or version) directory.
+    """
+    path = Path(path)
+    current = _read_current(path)
+    if current is not None and (path / VERSIONS_DIR / current).is_dir():
+        return path / VERSIONS_DIR / current
+    return path
+
+
+def _read_current(root: Path) -> Optional[str]:
+    try:
+        return (root / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+@dataclass
+class ArtifactManifest:
+    """Sizes and SHA-256 hashes of one version's artifact files."""
+
+    version: str
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    @classmethod
+    def from_directory(cls, directory: Path, version: str) -> "ArtifactManifest":
+        """Hash every artifact file in a directory."""
+        directory = Path(directory)
+        files = {
+            path.name: {"size": path.stat().st_size, "sha256": file_sha256(path)}
+            for path in sorted(directory.iterdir())
+            if path.is_file() and path.name != MANIFEST_FILE
+        }
+        return cls(version=version, files=files)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ArtifactManifest":
+        return cls(version=data["version"], files=data["files"], created_at=data["created_at"])
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["ArtifactManifest"]:
+        """Manifest of a version directory (None if it has none)."""
+        manifest_file = Path(directory) / MANIFEST_FILE
+        if not manifest_file.exists():
+            return None
+        return cls.from_dict(json.loads(manifest_file.read_text()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "created_at": self.created_at, "files": self.files}
+
+    def save(self, directory: Path) -> None:
+        (Path(directory) / MANIFEST_FILE).write_text(json.dumps(self.to_dict(), indent=2))
+
+    def verify(self, directory: Path, check_hashes: bool = False) -> List[str]:
+        """
+        Check a directory against the manifest.
+
+        Args:
+            directory: Version directory
+            check_hashes: Also re-hash every file (sizes only by default)
+
+        Returns:
+            Problems found (empty if the directory matches)
+        """
+        problems = []
+        for name, entry in self.files.items():
+            path = Path(directory) / name
+            if not path.exists():
+                problems.append(f"{name} is missing")
+            elif path.stat().st_size != entry["size"]:
+                problems.append(f"{name} has {path.stat().st_size} bytes, expected {entry['size']}")
+            elif check_hashes and file_sha256(path) != entry["sha256"]:
+                problems.append(f"{name} does not match its SHA-256")
+        return problems
+
+
+class ArtifactStore:
+    """
+    Versioned artifact directories under one index root.
+
+    New versions are assembled in a staging directory, hashed into a manifest,
+    renamed into versions/ (atomic) and then published by replacing CURRENT
+    (atomic). The newest ``keep_versions`` versions are kept, so a reader that
+    resolved CURRENT just before a publish can still open its files.
+    """
+
+    def __init__(self, root: Path, keep_versions: int = 2):
+        """
+        Initialize artifact store.
+
+        Args:
+            root: Index root directory
+            keep_versions: Published versions to keep (including the current one)
+        """
+        self.root = Path(root)
+        self.keep_versions = max(1, keep_versions)
+        self.versions_path = self.root / VERSIONS_DIR
+        self.blobs_path = self.root / BLOBS_DIR
+
+    # ========== Lookup ==========
+
+    def current_version(self) -> Optional[str]:
+        """Published version name (None if nothing was published)."""
+        return _read_current(self.root)
+
+    def version_path(self, version: str) -> Path:
+        return self.versions_path / version
+
+    def versions(self) -> List[str]:
+        """Version directories, oldest first."""
+        if not self.versions_path.exists():
+            return []
+        return sorted(
+            path.name
+            for path in self.versions_path.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+
+    def find_blob(self, sha256: str, size: Optional[int] = None) -> Optional[Path]:
+        """Locally cached file with this hash (and size), if any."""
+        path = self.blobs_path / sha256
+        if not path.exists() or (size is not None and path.stat().st_size != size):
+            return None
+        return path
+
+    # ========== Publishing ==========
+
+    def staging_dir(self) -> Path:
+        """New empty directory to assemble a version in."""
+        self.versions_path.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix=".staging-", dir=self.versions_path))
+
+    def link_from_cache(self, sha256: str, size: int, target: Path) -> bool:
+        """Place a cached blob at target (hard link, or copy); False if not cached."""
+        blob = self.find_blob(sha256, size)
+        if blob is None:
+            return False
+        try:
+            os.link(blob, target)
+        except OSError:
+            shutil.copyfile(blob, target)
+        return True
+
+    def publish(
+        self,
+        staging: Path,
+        version: Optional[str] = None,
+        manifest: Optional[ArtifactManifest] = None,
+    ) -> Path:
+        """
+        Publish a staged artifact set as the current version.
+
+        Args:
+            staging: Directory from staging_dir() holding the artifact files
+            version: Version name (default: manifest version or a new one)
+            manifest: Known manifest (e.g. downloaded); computed from the files if omitted
+
+        Returns:
+            Path of the published version directory
+
+        Raises:
+            ArtifactError: If the staged files do not match the manifest
+        """
+        staging = Path(staging)
+        try:
+            if manifest is None:
+                manifest = ArtifactManifest.from_directory(staging, version or new_version())
+            else:
+                problems = manifest.verify(staging)
+                if problems:
+                    raise ArtifactError(f"Staged artifacts are incomplete: {problems}")
+            version = manifest.version
+            manifest.save(staging)
+
+            for name, entry in manifest.files.items():
+                self._cache_blob(staging / name, entry["sha256"])
+            _fsync_directory(staging)
+
+            target = self.version_path(version)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # Published concurrently (e.g. another worker downloading the same version)
+                if not target.is_dir():
+                    raise
+                logger.info(f"Artifact version {version} already exists")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._write_current(version)
+        self._remove_flat_files(manifest)
+        self.prune()
+
+        logger.info(f"Published index artifacts {version} ({len(manifest.files)} files)")
+        return target
+
+    def activate(self, version: str) -> Path:
+        """Make an existing version current again (e.g. after a re-download)."""
+        target = self.version_path(version)
+        if not target.is_dir():
+            raise ArtifactError(f"Artifact version not found: {version}")
+        self._write_current(version)
+        return target
+
+    def prune(self) -> None:
+        """Remove old versions and cached blobs no version links to."""
+        current = self.current_version()
+        stale = [v for v in self.versions()[: -self.keep_versions] if v != current]
+        for version in stale:
+            shutil.rmtree(self.version_path(version), ignore_errors=True)
+            logger.info(f"Removed old index artifacts {version}")
+
+        if self.blobs_path.exists():
+            for blob in self.blobs_path.iterdir():
+                # Only the blobs/ link left: no version references the file
+                if blob.is_file() and blob.stat().st_nlink <= 1:
+                    blob.unlink(missing_ok=True)
+
+    def _cache_blob(self, path: Path, sha256: str) -> None:
+        """Share a staged file with blobs/ (deduplicating against an identical blob)."""
+        self.blobs_path.mkdir(parents=True, exist_ok=True)
+        blob = self.blobs_path / sha256
+        try:
+            if blob.exists():
+                if not os.path.samefile(blob, path):
+                    tmp = path.with_name(f".{path.name}.link")
+                    os.link(blob, tmp)
+                    os.replace(tmp, path)
+            else:
+                os.link(path, blob)
+        except OSError as e:
+            # Hard links unsupported (or a concurrent writer won): skip the cache
+            logger.debug(f"Not caching {path.name} as a blob: {e}")
+
+    def _write_current(self, version: str) -> None:
+        tmp = self.root / f".{CURRENT_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.root / CURRENT_FILE)
+        _fsync_directory(self.root)
+
+    def _remove_flat_files(self, manifest: ArtifactManifest) -> None:
+        """Remove artifacts of the pre-versioning flat layout from the root."""
+        for name in [*manifest.files, MANIFEST_FILE]:
+            path = self.root / name
+            if path.is_file():
+                path.unlink(missing_ok=True)
+
+
+def _fsync_directory(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
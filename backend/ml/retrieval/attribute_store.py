@@ -0,0 +1,296 @@
+"""
+Product Attribute Store
+Columnar product attributes aligned to FAISS positions for in-memory filtering.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy import text
+
+from .filters import FilterOperator, ProductFilter, ProductFilters
+from .id_map import ProductIdMap
+
+logger = logging.getLogger(__name__)
+
+# On-disk artifact name (written next to index.faiss)
+ATTRIBUTES_FILE = "attributes.npz"
+
+# Sentinel for missing integer attributes (IDs are never negative)
+MISSING_ID = -1
+
+# Gender codes (ProductFilters.gender values)
+GENDER_UNKNOWN = 0
+_GENDER_CODES = {"M": ord("M"), "F": ord("F"), "U": ord("U")}
+
+# Column name -> dtype
+ATTRIBUTE_COLUMNS = {
+    "price": np.float32,  # NaN when missing
+    "in_stock": np.bool_,
+    "stock_quantity": np.int32,  # MISSING_ID when missing
+    "merchant_id": np.int64,
+    "category_id": np.int64,
+    "brand_id": np.int64,
+    "gender": np.uint8,  # ord('M' / 'F' / 'U'), GENDER_UNKNOWN when missing
+    "is_active": np.bool_,
+}
+
+_ATTRIBUTES_QUERY = """
+    SELECT id, search_price, in_stock, stock_quantity, merchant_id, category_id,
+           brand_id, fashion_suitable_for, is_active
+    FROM products
+    WHERE id = ANY(:product_ids)
+"""
+
+
+class ProductAttributeStore:
+    """
+    Filterable product attributes stored as one NumPy column per attribute.
+
+    Row ``i`` describes the product at FAISS position ``i``, so evaluating
+    ``ProductFilters`` yields a boolean mask over index positions directly, with
+    no database round trip. A million products take about 30 MB.
+
+    Missing values follow SQL semantics: a NULL attribute never satisfies a
+    comparison, ``IN`` or ``NOT IN`` condition. Rows for products that were not
+    found in the database are inactive, so they never pass a filter.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Initialize attribute store from columns.
+
+        Args:
+            columns: Attribute columns of equal length (see ATTRIBUTE_COLUMNS)
+        """
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError(f"Attribute columns have different lengths: {sizes}")
+
+        self.columns = {
+            name: np.asarray(columns[name], dtype=dtype)
+            for name, dtype in ATTRIBUTE_COLUMNS.items()
+        }
+
+    # ========== Construction ==========
+
+    @classmethod
+    def empty(cls, size: int) -> "ProductAttributeStore":
+        """Create a store whose rows are all missing (inactive)."""
+        columns = {}
+        for name, dtype in ATTRIBUTE_COLUMNS.items():
+            if name == "price":
+                columns[name] = np.full(size, np.nan, dtype=dtype)
+            elif dtype == np.bool_ or name == "gender":
+                columns[name] = np.zeros(size, dtype=dtype)
+            else:
+                columns[name] = np.full(size, MISSING_ID, dtype=dtype)
+        return cls(columns)
+
+    @classmethod
+    def from_rows(
+        cls, id_mapping: ProductIdMap, rows: Iterable[Sequence[Any]]
+    ) -> "ProductAttributeStore":
+        """
+        Build a store from product rows, aligned to an ID map.
+
+        Args:
+            id_mapping: FAISS position -> product ID map
+            rows: Rows of (id, price, in_stock, stock_quantity, merchant_id,
+                  category_id, brand_id, suitable_for, is_active)
+
+        Returns:
+            ProductAttributeStore with one row per position in id_mapping
+        """
+        rows = list(rows)
+        store = cls.empty(len(id_mapping))
+        if not rows:
+            return store
+
+        positions = id_mapping.positions_of([row[0] for row in rows])
+        found = positions >= 0
+        positions = positions[found]
+        rows = [row for row, ok in zip(rows, found) if ok]
+
+        def column(i: int, missing: Any) -> List[Any]:
+            return [missing if row[i] is None else row[i] for row in rows]
+
+        columns = store.columns
+        columns["price"][positions] = np.array(column(1, np.nan), dtype=np.float64)
+        columns["in_stock"][positions] = column(2, False)
+        columns["stock_quantity"][positions] = column(3, MISSING_ID)
+        columns["merchant_id"][positions] = column(4, MISSING_ID)
+        columns["category_id"][positions] = column(5, MISSING_ID)
+        columns["brand_id"][positions] = column(6, MISSING_ID)
+        columns["gender"][positions] = [_gender_code(row[7]) for row in rows]
+        columns["is_active"][positions] = column(8, False)
+
+        return store
+
+    @classmethod
+    def load_from_db(
+        cls, session, id_mapping: ProductIdMap, batch_size: int = 50000
+    ) -> "ProductAttributeStore":
+        """
+        Load attributes for every product in an ID map from PostgreSQL.
+
+        Args:
+            session: SQLAlchemy database session
+            id_mapping: FAISS position -> product ID map
+            batch_size: Product IDs per query
+
+        Returns:
+            ProductAttributeStore aligned to id_mapping
+        """
+        product_ids = id_mapping.values()
+        rows = []
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start : start + batch_size]
+            rows.extend(session.execute(text(_ATTRIBUTES_QUERY), {"product_ids": batch}).fetchall())
+
+        store = cls.from_rows(id_mapping, ((str(row[0]), *row[1:]) for row in rows))
+        logger.info(f"Loaded attributes for {len(rows)}/{len(id_mapping)} indexed products")
+        return store
+
+    @classmethod
+    def concat(cls, stores: List["ProductAttributeStore"]) -> "ProductAttributeStore":
+        """Stack stores row-wise."""
+        return cls(
+            {
+                name: np.concatenate([store.columns[name] for store in stores])
+                for name in ATTRIBUTE_COLUMNS
+            }
+        )
+
+    def take(self, positions: np.ndarray) -> "ProductAttributeStore":
+        """Select rows by position."""
+        return ProductAttributeStore(
+            {name: column[positions] for name, column in self.columns.items()}
+        )
+
+    def assign(self, rows: np.ndarray, other: "ProductAttributeStore") -> None:
+        """Overwrite rows in place with the rows of another store (same order)."""
+        for name, column in self.columns.items():
+            column[rows] = other.columns[name]
+
+    # ========== Persistence ==========
+
+    def save(self, path: Path) -> None:
+        """Save columns to an uncompressed .npz file."""
+        with open(path, "wb") as f:
+            np.savez(f, **self.columns)
+
+    @classmethod
+    def load(cls, path: Path) -> "ProductAttributeStore":
+        """Load columns saved with ``save``."""
+        with np.load(path) as data:
+            return cls({name: data[name] for name in ATTRIBUTE_COLUMNS})
+
+    # ========== Filtering ==========
+
+    def __len__(self) -> int:
+        return len(self.columns["is_active"])
+
+    def nbytes(self) -> int:
+        """Total size of the columns in bytes."""
+        return int(sum(column.nbytes for column in self.columns.values()))
+
+    @staticmethod
+    def supports(filters: ProductFilters) -> bool:
+        """
+        Check whether filters can be evaluated in memory.
+
+        Custom filters on other fields, or using LIKE, need the database.
+        """
+        return all(
+            f.field in ATTRIBUTE_COLUMNS
+            and f.operator not in (FilterOperator.LIKE, FilterOperator.ILIKE)
+            for f in filters.custom_filters
+        )
+
+    def evaluate(self, filters: ProductFilters) -> np.ndarray:
+        """
+        Evaluate filters to a boolean mask over rows.
+
+        Args:
+            filters: Product filters (must pass ``supports``)
+
+        Returns:
+            Boolean array, True for rows matching every filter
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        for product_filter in filters.build_filters():
+            if product_filter.field == "embedding":
+                continue  # every indexed product has an embedding
+            mask &= self._evaluate_filter(product_filter)
+
+        return mask
+
+    def _evaluate_filter(self, product_filter: ProductFilter) -> np.ndarray:
+        column = self.columns.get(product_filter.field)
+        if column is None:
+            raise ValueError(f"Unsupported filter field: {product_filter.field}")
+
+        operator = product_filter.operator
+        value = self.encode_value(product_filter.field, product_filter.value)
+
+        present = self._present(product_filter.field, column)
+
+        if operator == FilterOperator.IN:
+            return present & np.isin(column, list(value))
+        if operator == FilterOperator.NOT_IN:
+            return present & ~np.isin(column, list(value))
+        if operator == FilterOperator.EQ:
+            return present & (column == value)
+        if operator == FilterOperator.NE:
+            return present & (column != value)
+        if operator == FilterOperator.GT:
+            return present & (column > value)
+        if operator == FilterOperator.GTE:
+            return present & (column >= value)
+        if operator == FilterOperator.LT:
+            return present & (column < value)
+        if operator == FilterOperator.LTE:
+            return present & (column <= value)
+
+        raise ValueError(f"Unsupported filter operator: {operator.value}")
+
+    @staticmethod
+    def encode_value(name: str, value: Any) -> Any:
+        """Convert a filter value (or list of values) to the column's encoding."""
+        if name != "gender":
+            return value
+        if isinstance(value, (list, tuple, set)):
+            return [_gender_code(v) for v in value]
+        return _gender_code(value)
+
+    @staticmethod
+    def _present(name: str, column: np.ndarray) -> np.ndarray:
+        """Mask of rows where the attribute is not NULL."""
+        if name == "price":
+            return ~np.isnan(column)
+        if name == "gender":
+            return column != GENDER_UNKNOWN
+        if column.dtype == np.bool_:
+            return np.ones(len(column), dtype=bool)
+        return column != MISSING_ID
+
+
+def _gender_code(value: Any) -> int:
+    """Map a gender value ('M'/'F'/'U' or a fashion_suitable_for label) to its code."""
+    if value is None:
+        return GENDER_UNKNOWN
+
+    label = str(value).strip().lower()
+    if label in ("m", "f", "u"):
+        return _GENDER_CODES[label.upper()]
+    if label.startswith(("women", "female", "ladies", "girl")):
+        return _GENDER_CODES["F"]
+    if label.startswith(("men", "male", "boy")):
+        return _GENDER_CODES["M"]
+    if label.startswith("unisex"):
+        return _GENDER_CODES["U"]
+    return GENDER_UNKNOWN
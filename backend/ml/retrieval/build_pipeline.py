@@ -0,0 +1,336 @@
+"""
+Index Build Pipeline
+Single load -> build -> save path for FAISS index builds, shared by the index
+manager, the Celery rebuild task and the admin rebuild endpoint.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ..config import MLConfig, get_ml_config
+from .attribute_store import ProductAttributeStore
+from .embedding_loader import (
+    BaseEmbeddingStream,
+    EmbeddingLoaderError,
+    EmbeddingStream,
+    FileEmbeddingStream,
+)
+from .id_map import ProductIdMap
+from .index_builder import FAISSIndexBuilder, FAISSIndexBuilderError
+
+logger = logging.getLogger(__name__)
+
+# product_embeddings vector: pgvector column, then the legacy float array
+PRODUCT_EMBEDDING_COLUMN = "COALESCE(embedding_vector, embedding::vector)"
+
+
+class IndexBuildPipelineError(Exception):
+    """Exception raised for index build pipeline errors."""
+
+    pass
+
+
+class NoEmbeddingsError(IndexBuildPipelineError):
+    """Raised when a source has no embeddings to index."""
+
+    pass
+
+
+# ========== Sources ==========
+
+
+class EmbeddingSource:
+    """Where index build embeddings come from; opens an embedding stream."""
+
+    name = "source"
+
+    def open(self, session, dimension: int, chunk_size: int) -> BaseEmbeddingStream:
+        """
+        Create a stream over the source's embeddings.
+
+        Args:
+            session: SQLAlchemy database session (None for file sources)
+            dimension: Embedding dimension
+            chunk_size: Rows per streamed chunk
+
+        Returns:
+            Embedding stream (not yet consumed)
+        """
+        raise NotImplementedError
+
+
+class ProductColumnSource(EmbeddingSource):
+    """A denormalized embedding column of the products table."""
+
+    def __init__(self, column: str = "text_embedding"):
+        self.column = column
+        self.name = f"products.{column}"
+
+    def open(self, session, dimension: int, chunk_size: int) -> BaseEmbeddingStream:
+        _require_session(session, self)
+        return EmbeddingStream.from_products(
+            session, self.column, dimension=dimension, chunk_size=chunk_size
+        )
+
+
+class ProductEmbeddingsSource(EmbeddingSource):
+    """One embedding type of the product_embeddings table."""
+
+    def __init__(self, embedding_type: str = "text", column: str = PRODUCT_EMBEDDING_COLUMN):
+        self.embedding_type = embedding_type
+        self.column = column
+        self.name = f"product_embeddings[{embedding_type}]"
+
+    def open(self, session, dimension: int, chunk_size: int) -> BaseEmbeddingStream:
+        _require_session(session, self)
+        return EmbeddingStream.from_product_embeddings(
+            session,
+            self.embedding_type,
+            column=self.column,
+            dimension=dimension,
+            chunk_size=chunk_size,
+        )
+
+
+class FileSource(EmbeddingSource):
+    """An NPY or Parquet embedding dump (see FileEmbeddingStream)."""
+
+    def __init__(self, path: Path, product_ids_path: Optional[Path] = None, **options: Any):
+        self.path = Path(path)
+        self.product_ids_path = product_ids_path
+        self.options = options
+        self.name = f"file:{self.path}"
+
+    def open(self, session, dimension: int, chunk_size: int) -> BaseEmbeddingStream:
+        return FileEmbeddingStream(
+            self.path,
+            product_ids_path=self.product_ids_path,
+            dimension=dimension,
+            chunk_size=chunk_size,
+            **self.options,
+        )
+
+
+class FallbackSource(EmbeddingSource):
+    """The first of several sources that has any embeddings."""
+
+    def __init__(self, sources: List[EmbeddingSource]):
+        self.sources = sources
+        self.name = " | ".join(source.name for source in sources)
+
+    def open(self, session, dimension: int, chunk_size: int) -> BaseEmbeddingStream:
+        for source in self.sources:
+            stream = source.open(session, dimension, chunk_size)
+            if stream.num_vectors > 0:
+                logger.info(f"Reading embeddings from {source.name}")
+                return stream
+            logger.info(f"No embeddings in {source.name}, trying the next source")
+        return stream
+
+
+def source_for_embedding_type(embedding_type: str = "text") -> EmbeddingSource:
+    """
+    Default database source for an embedding type.
+
+    Text embeddings are read from the denormalized products column, falling
+    back to the product_embeddings table; other types from product_embeddings.
+    """
+    if embedding_type == "text":
+        return FallbackSource([ProductColumnSource("text_embedding"), ProductEmbeddingsSource()])
+    return ProductEmbeddingsSource(embedding_type)
+
+
+def _require_session(session, source: EmbeddingSource) -> None:
+    if session is None:
+        raise IndexBuildPipelineError(f"{source.name} requires a database session")
+
+
+# ========== Pipeline ==========
+
+
+@dataclass
+class IndexBuildResult:
+    """Output of one pipeline run."""
+
+    index: Any
+    id_mapping: ProductIdMap
+    embeddings: np.ndarray
+    attributes: Optional[ProductAttributeStore]
+    save_path: Path
+    source: str
+    delta_stream_id: Optional[str]
+    stats: Dict[str, Any]
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable summary (for task results and API responses)."""
+        return {
+            "num_vectors": self.stats["num_vectors"],
+            "index_type": self.stats["index_type"],
+            "save_path": str(self.save_path),
+            "source": self.source,
+            "delta_stream_id": self.delta_stream_id,
+            "timings": {stage: round(seconds, 3) for stage, seconds in self.timings.items()},
+            "stats": self.stats,
+        }
+
+
+class IndexBuildPipeline:
+    """
+    Builds a FAISS index from an embedding source and saves it.
+
+    Stages:
+    1. open: record the delta stream head and count the source rows
+    2. build: stream embeddings into the index (see build_index_streaming)
+    3. attributes: load filterable product attributes (database builds only)
+    4. save: write the index directory; files are staged and moved into
+       place, metadata last (see FAISSIndexBuilder.save_index)
+
+    Memory stays bounded by the final embedding matrix plus one chunk. Each
+    stage is timed, and a progress callback receives (stage, done, total).
+    """
+
+    def __init__(
+        self,
+        config: Optional[MLConfig] = None,
+        builder: Optional[FAISSIndexBuilder] = None,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+    ):
+        """
+        Initialize build pipeline.
+
+        Args:
+            config: ML configuration
+            builder: Index builder (default: FAISSIndexBuilder(config))
+            progress: Optional callback, called with (stage, done, total)
+        """
+        self.config = config or get_ml_config()
+        self.builder = builder or FAISSIndexBuilder(self.config)
+        self.progress = progress
+
+    def run(
+        self,
+        source: EmbeddingSource,
+        session=None,
+        path: Optional[Path] = None,
+        extra_metadata: Optional[Dict[str, Any]] = None,
+    ) -> IndexBuildResult:
+        """
+        Build and save an index.
+
+        Args:
+            source: Embedding source
+            session: SQLAlchemy database session (database sources, attributes)
+            path: Output directory (default: config.storage.faiss_index_path)
+            extra_metadata: Additional fields to store in metadata.json
+
+        Returns:
+            IndexBuildResult
+
+        Raises:
+            NoEmbeddingsError: If the source is empty
+            IndexBuildPipelineError: If building or saving fails
+        """
+        timings: Dict[str, float] = {}
+        logger.info(f"Building FAISS index from {source.name}")
+
+        with self._stage("open", timings):
+            # Deltas published after this point are replayed onto the new index
+            delta_stream_id = self._delta_stream_head()
+            stream = source.open(
+                session, self.builder.dimension, self.config.storage.faiss_build_chunk_size
+            )
+            num_vectors = stream.num_vectors
+        if num_vectors == 0:
+            raise NoEmbeddingsError(f"No embeddings found in {source.name}")
+
+        with self._stage("build", timings):
+            try:
+                index, id_mapping = self.builder.build_index_streaming(
+                    stream, progress=lambda done, total: self._report("build", done, total)
+                )
+            except (EmbeddingLoaderError, FAISSIndexBuilderError) as e:
+                raise IndexBuildPipelineError(f"Index build from {source.name} failed: {e}")
+            embeddings = stream.embeddings
+
+        with self._stage("attributes", timings):
+            attributes = self._load_attributes(session, id_mapping)
+
+        with self._stage("save", timings):
+            save_path = self.builder.save_index(
+                index,
+                id_mapping,
+                path=path,
+                vectors=embeddings,
+                extra_metadata={
+                    "delta_stream_id": delta_stream_id,
+                    "source": source.name,
+                    "build_seconds": {k: round(v, 3) for k, v in timings.items()},
+                    **(extra_metadata or {}),
+                },
+                attributes=attributes,
+            )
+
+        result = IndexBuildResult(
+            index=index,
+            id_mapping=id_mapping,
+            embeddings=embeddings,
+            attributes=attributes,
+            save_path=save_path,
+            source=source.name,
+            delta_stream_id=delta_stream_id,
+            stats=self.builder.get_index_stats(index),
+            timings=timings,
+        )
+        logger.info(
+            f"FAISS index built from {source.name}: {index.ntotal} vectors, saved to "
+            f"{save_path} ("
+            + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in timings.items())
+            + ")"
+        )
+        return result
+
+    @contextmanager
+    def _stage(self, name: str, timings: Dict[str, float]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] = time.perf_counter() - start
+        logger.info(f"Index build stage '{name}' took {timings[name]:.2f}s")
+
+    def _report(self, stage: str, done: int, total: int) -> None:
+        logger.debug(f"Index build {stage}: {done}/{total}")
+        if self.progress is not None:
+            try:
+                self.progress(stage, done, total)
+            except Exception as e:
+                logger.warning(f"Index build progress callback failed: {e}")
+
+    def _delta_stream_head(self) -> Optional[str]:
+        """Current delta stream position (None if incremental updates are unavailable)."""
+        if not self.config.storage.faiss_delta_updates_enabled:
+            return None
+
+        from .index_updates import get_delta_stream_head
+
+        return get_delta_stream_head(self.config)
+
+    def _load_attributes(
+        self, session, id_mapping: ProductIdMap
+    ) -> Optional[ProductAttributeStore]:
+        """Load attributes for an ID map (None if disabled, no session or the query fails)."""
+        if session is None or not self.config.storage.faiss_attribute_filtering_enabled:
+            return None
+
+        try:
+            return ProductAttributeStore.load_from_db(session, id_mapping)
+        except Exception as e:
+            logger.warning(f"Failed to load product attributes, filtering will use the DB: {e}")
+            return None
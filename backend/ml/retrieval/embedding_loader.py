@@ -0,0 +1,532 @@
+"""
+Embedding Loader
+Streams product embeddings from PostgreSQL (or a file dump) into a preallocated
+float32 matrix for index builds.
+"""
+
+import logging
+import queue
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+try:
+    import pyarrow.parquet as pq
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+from .id_map import UUID_BYTES, ProductIdMap, _uuid_bytes
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL COPY BINARY framing
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER_SIZE = len(COPY_SIGNATURE) + 8  # + flags (int32) + extension length (int32)
+COPY_TRAILER = b"\xff\xff"
+
+# SQLAlchemy-style bind parameter (":name", not a "::type" cast)
+_BIND_PARAM = re.compile(r"(?<!:):(\w+)")
+
+# Capacity growth when more rows arrive than were counted
+GROWTH_FACTOR = 1.25
+
+
+class EmbeddingLoaderError(Exception):
+    """Exception raised for embedding loading errors."""
+
+    pass
+
+
+class BaseEmbeddingStream:
+    """
+    Common result handling of embedding streams.
+
+    Subclasses fill ``_matrix`` (and ``_keys`` or ``_product_ids``) while being
+    iterated, yielding each decoded chunk, and set ``_consumed`` at the end.
+    """
+
+    def __init__(self, dimension: int, chunk_size: int):
+        self.dimension = dimension
+        self.chunk_size = chunk_size
+
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        self._product_ids: Optional[List[Any]] = None  # Non-UUID fallback
+        self._filled = 0
+        self._consumed = False
+
+    @property
+    def num_vectors(self) -> int:
+        """Rows expected (exact once consumed)."""
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        raise NotImplementedError
+
+    # ========== Results ==========
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Decoded embeddings in row order, shape (N, dimension), float32."""
+        self._require_consumed()
+        return self._matrix[: self._filled]
+
+    @property
+    def id_mapping(self) -> ProductIdMap:
+        """FAISS position -> product ID map for the decoded rows."""
+        self._require_consumed()
+        if self._product_ids is not None:
+            return ProductIdMap.from_product_ids(self._product_ids)
+        return ProductIdMap(self._keys[: self._filled])
+
+    @property
+    def decoded(self) -> np.ndarray:
+        """Rows decoded so far (grows while the stream is being iterated)."""
+        if self._matrix is None:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return self._matrix[: self._filled]
+
+    def load(self) -> "BaseEmbeddingStream":
+        """Consume the whole stream."""
+        for _ in self:
+            pass
+        return self
+
+    def _require_consumed(self) -> None:
+        if not self._consumed:
+            raise EmbeddingLoaderError("Embedding stream has not been consumed yet")
+
+    def _require_unconsumed(self) -> None:
+        if self._consumed:
+            raise EmbeddingLoaderError("Embedding stream can only be consumed once")
+
+    def _reserve(self, n: int) -> int:
+        """Make room for n more rows; returns the start row."""
+        start = self._filled
+        if start + n > len(self._matrix):
+            capacity = max(start + n, int(len(self._matrix) * GROWTH_FACTOR) + 1)
+            self._matrix = np.resize(self._matrix, (capacity, self.dimension))
+            if self._keys is not None:
+                self._keys = np.resize(self._keys, (capacity, UUID_BYTES))
+        return start
+
+
+class EmbeddingStream(BaseEmbeddingStream):
+    """
+    Streams (product ID, embedding) rows into a preallocated float32 matrix.
+
+    The rows are counted first, so the matrix and the (N, 16) UUID key array
+    are allocated once at their final size. Rows are then decoded straight
+    into them chunk by chunk. Nothing is buffered as Python lists or per-row
+    arrays. Peak memory is the final matrix plus one chunk of wire data.
+
+    With psycopg2, rows are read with ``COPY ... TO STDOUT (FORMAT binary)``
+    and the vector column is cast to pgvector's ``vector`` type. Every tuple
+    then has the same width and a whole chunk decodes with one NumPy
+    structured-dtype view. Other drivers fall back to a server-side cursor
+    (``stream_results``) and parse each row's vector.
+
+    Iterating yields each decoded chunk (a view into the matrix) while the
+    next one is fetched in a background thread. Index builds can add vectors
+    while the rest of the table is still streaming (see
+    ``FAISSIndexBuilder.build_index_streaming``).
+    """
+
+    def __init__(
+        self,
+        session,
+        table: str,
+        id_column: str,
+        vector_column: str,
+        where: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        dimension: int = 512,
+        chunk_size: int = 50000,
+    ):
+        """
+        Initialize embedding stream.
+
+        Args:
+            session: SQLAlchemy database session
+            table: Table holding the embeddings
+            id_column: Product UUID column
+            vector_column: Embedding column (pgvector or float array)
+            where: Optional extra SQL condition (bind parameters allowed)
+            params: Bind parameters for where
+            dimension: Embedding dimension
+            chunk_size: Rows decoded per chunk
+        """
+        super().__init__(dimension, chunk_size)
+        self.session = session
+        self.params = params or {}
+
+        conditions = [f"{vector_column} IS NOT NULL"] + ([where] if where else [])
+        self._from = f"FROM {table} WHERE {' AND '.join(conditions)}"
+        self._id_column = id_column
+        self._vector_column = vector_column
+        self._num_vectors: Optional[int] = None
+
+    @classmethod
+    def from_product_embeddings(
+        cls, session, embedding_type: str = "text", column: str = "embedding", **kwargs
+    ) -> "EmbeddingStream":
+        """Stream one embedding type from the product_embeddings table."""
+        return cls(
+            session,
+            table="product_embeddings",
+            id_column="product_id",
+            vector_column=column,
+            where="embedding_type = :embedding_type",
+            params={"embedding_type": embedding_type},
+            **kwargs,
+        )
+
+    @classmethod
+    def from_products(cls, session, column: str = "text_embedding", **kwargs) -> "EmbeddingStream":
+        """Stream a denormalized embedding column of the products table."""
+        return cls(session, table="products", id_column="id", vector_column=column, **kwargs)
+
+    @property
+    def num_vectors(self) -> int:
+        """Rows expected (counted before streaming; exact once consumed)."""
+        if self._consumed:
+            return self._filled
+        if self._num_vectors is None:
+            self._num_vectors = int(
+                self.session.execute(text(f"SELECT count(*) {self._from}"), self.params).scalar()
+            )
+        return self._num_vectors
+
+    # ========== Streaming ==========
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """
+        Stream rows, yielding each decoded chunk of embeddings.
+
+        Raises:
+            EmbeddingLoaderError: If reading or decoding fails
+        """
+        self._require_unconsumed()
+
+        capacity = self.num_vectors
+        self._matrix = np.empty((capacity, self.dimension), dtype=np.float32)
+        self._keys = np.empty((capacity, UUID_BYTES), dtype=np.uint8)
+        self._filled = 0
+
+        # Chunk boundaries are handed over from the reader thread
+        chunks: "queue.Queue" = queue.Queue(maxsize=2)
+        cancelled = threading.Event()
+        done = object()
+
+        def put(item: Any) -> None:
+            # Stops the reader (and its COPY) if the consumer went away
+            while not cancelled.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            raise EmbeddingLoaderError("Embedding stream cancelled")
+
+        def read() -> None:
+            try:
+                cursor = self._copy_cursor()
+                if cursor is not None:
+                    self._read_copy(cursor, put)
+                else:
+                    self._read_rows(put)
+                put(done)
+            except Exception as e:
+                if not cancelled.is_set():
+                    put(e)
+
+        reader = threading.Thread(target=read, name="embedding-stream", daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise EmbeddingLoaderError(f"Embedding streaming failed: {item}") from item
+                start, end = item
+                yield self._matrix[start:end]
+        finally:
+            cancelled.set()
+            reader.join()
+
+        self._consumed = True
+        if self._filled != capacity:
+            logger.info(f"Streamed {self._filled} embeddings ({capacity} counted)")
+        logger.info(f"Streamed {self._filled} product embeddings from database")
+
+    def _copy_cursor(self):
+        """A psycopg2 cursor on the session's connection, or None for other drivers."""
+        connection = self.session.connection().connection
+        cursor = connection.cursor()
+        if hasattr(cursor, "copy_expert") and hasattr(cursor, "mogrify"):
+            return cursor
+        cursor.close()
+        return None
+
+    def _read_copy(self, cursor, emit: Callable) -> None:
+        """Read rows with COPY BINARY, decoding full chunks as they arrive."""
+        from_clause = _BIND_PARAM.sub(r"%(\1)s", self._from)  # psycopg2 paramstyle
+        query = f"SELECT {self._id_column}::uuid, {self._vector_column}::vector {from_clause}"
+        query = cursor.mogrify(query, self.params).decode()
+        decoder = CopyBinaryDecoder(self, emit)
+        try:
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", decoder)
+        finally:
+            cursor.close()
+        decoder.finish()
+
+    def _read_rows(self, emit: Callable) -> None:
+        """Fallback: server-side cursor, one vector parse per row."""
+        result = self.session.execute(
+            text(f"SELECT {self._id_column}, {self._vector_column} {self._from}"),
+            self.params,
+            execution_options={"stream_results": True, "yield_per": self.chunk_size},
+        )
+        product_ids = []
+        for rows in result.partitions(self.chunk_size):
+            start = self._reserve(len(rows))
+            for offset, (product_id, vector) in enumerate(rows):
+                if isinstance(vector, str):
+                    vector = np.fromstring(vector.strip("[]"), sep=",", dtype=np.float32)
+                self._matrix[start + offset] = vector
+                product_ids.append(product_id)
+            self._filled = start + len(rows)
+            emit((start, self._filled))
+
+        # Keep UUID keys when every ID is a UUID, so the ID map is built without objects
+        try:
+            self._keys[: self._filled] = np.frombuffer(
+                b"".join(_uuid_bytes(pid) for pid in product_ids), dtype=np.uint8
+            ).reshape(-1, UUID_BYTES)
+        except (ValueError, TypeError, AttributeError):
+            self._product_ids = product_ids
+
+
+class FileEmbeddingStream(BaseEmbeddingStream):
+    """
+    Streams embeddings from a file dump with the EmbeddingStream interface.
+
+    Supported dumps:
+    - NPY: an (N, dimension) embedding matrix plus a product ID array (.npy of
+      UUID strings, or the (N, 16) uint8 keys of a saved ProductIdMap). A
+      float32 matrix is memory-mapped and used as is, so no copy is made.
+    - Parquet: a product ID column and a list<float> vector column, read in
+      row batches (requires pyarrow).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        product_ids_path: Optional[Path] = None,
+        id_column: str = "product_id",
+        vector_column: str = "embedding",
+        dimension: int = 512,
+        chunk_size: int = 50000,
+    ):
+        """
+        Initialize file embedding stream.
+
+        Args:
+            path: .npy embedding matrix or .parquet file
+            product_ids_path: .npy product IDs (NPY dumps only; default:
+                              product_ids.npy next to the matrix)
+            id_column: Parquet product ID column
+            vector_column: Parquet embedding column
+            dimension: Embedding dimension
+            chunk_size: Rows yielded per chunk
+
+        Raises:
+            EmbeddingLoaderError: If the format is unsupported
+        """
+        super().__init__(dimension, chunk_size)
+        self.path = Path(path)
+        self.id_column = id_column
+        self.vector_column = vector_column
+
+        suffix = self.path.suffix.lower()
+        if suffix == ".npy":
+            self.format = "npy"
+            self.product_ids_path = Path(product_ids_path or self.path.parent / "product_ids.npy")
+        elif suffix == ".parquet":
+            if not PARQUET_AVAILABLE:
+                raise EmbeddingLoaderError("Reading Parquet dumps requires pyarrow")
+            self.format = "parquet"
+        else:
+            raise EmbeddingLoaderError(f"Unsupported embedding dump format: {self.path}")
+
+    @property
+    def num_vectors(self) -> int:
+        """Rows in the dump (exact once consumed)."""
+        if self._consumed:
+            return self._filled
+        if self.format == "npy":
+            return int(np.load(self.path, mmap_mode="r").shape[0])
+        return int(pq.ParquetFile(self.path).metadata.num_rows)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """
+        Read the dump, yielding each chunk of embeddings.
+
+        Raises:
+            EmbeddingLoaderError: If the dump does not match the dimension
+        """
+        self._require_unconsumed()
+        reader = self._read_npy if self.format == "npy" else self._read_parquet
+        yield from reader()
+
+        self._consumed = True
+        logger.info(f"Read {self._filled} product embeddings from {self.path}")
+
+    def _read_npy(self) -> Iterator[np.ndarray]:
+        source = np.load(self.path, mmap_mode="r")
+        if source.ndim != 2 or source.shape[1] != self.dimension:
+            raise EmbeddingLoaderError(
+                f"Expected ({len(source)}, {self.dimension}) embeddings, got {source.shape}"
+            )
+
+        keys = np.load(self.product_ids_path, mmap_mode="r")
+        if len(keys) != len(source):
+            raise EmbeddingLoaderError(
+                f"Mismatch between embeddings ({len(source)}) and product_ids ({len(keys)})"
+            )
+        if (keys.dtype == np.uint8 and keys.ndim == 2) or keys.dtype.kind == "U":
+            self._keys = keys
+        else:
+            self._product_ids = keys.tolist()
+
+        # float32 dumps are served straight from the page cache
+        if source.dtype == np.float32:
+            self._matrix = source
+        else:
+            self._matrix = np.empty(source.shape, dtype=np.float32)
+
+        for start in range(0, len(source), self.chunk_size):
+            end = min(start + self.chunk_size, len(source))
+            if self._matrix is not source:
+                self._matrix[start:end] = source[start:end]
+            self._filled = end
+            yield self._matrix[start:end]
+
+    def _read_parquet(self) -> Iterator[np.ndarray]:
+        parquet_file = pq.ParquetFile(self.path)
+        self._matrix = np.empty((parquet_file.metadata.num_rows, self.dimension), np.float32)
+
+        product_ids = []
+        for batch in parquet_file.iter_batches(
+            batch_size=self.chunk_size, columns=[self.id_column, self.vector_column]
+        ):
+            vectors = batch.column(self.vector_column)
+            values = vectors.flatten().to_numpy(zero_copy_only=False)
+            if vectors.null_count or len(values) != len(vectors) * self.dimension:
+                raise EmbeddingLoaderError(
+                    f"{self.path}: every {self.vector_column} must have {self.dimension} values"
+                )
+
+            start = self._reserve(len(vectors))
+            self._matrix[start : start + len(vectors)] = values.reshape(-1, self.dimension)
+            product_ids.extend(batch.column(self.id_column).to_pylist())
+            self._filled = start + len(vectors)
+            yield self._matrix[start : self._filled]
+
+        self._product_ids = product_ids
+
+
+class CopyBinaryDecoder:
+    """
+    File-like sink for ``copy_expert`` decoding (uuid, vector) COPY BINARY tuples.
+
+    Each tuple is a field count (int16), then per field its length (int32) and
+    bytes. pgvector's binary ``vector`` is dim (uint16), unused (uint16), then
+    dim big-endian float32 values. All tuples therefore have the same width,
+    and a chunk of them is decoded with one structured-dtype view.
+    """
+
+    def __init__(self, stream: EmbeddingStream, emit: Callable):
+        """
+        Initialize decoder.
+
+        Args:
+            stream: Stream whose matrix and keys receive decoded rows
+            emit: Called with (start, end) rows after each decoded chunk
+        """
+        self.stream = stream
+        self.emit = emit
+        self.dimension = stream.dimension
+        self.row_dtype = np.dtype(
+            [
+                ("num_fields", ">i2"),
+                ("id_length", ">i4"),
+                ("id", np.uint8, (UUID_BYTES,)),
+                ("vector_length", ">i4"),
+                ("dim", ">u2"),
+                ("unused", ">u2"),
+                ("vector", ">f4", (self.dimension,)),
+            ]
+        )
+        self.chunk_bytes = self.row_dtype.itemsize * stream.chunk_size
+        self.buffer = bytearray()
+        self.header_read = False
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        if len(self.buffer) >= self.chunk_bytes:
+            self._decode()
+        return len(data)
+
+    def finish(self) -> None:
+        """Decode the remaining rows and check the trailer."""
+        self._decode()
+        if bytes(self.buffer) != COPY_TRAILER:
+            raise EmbeddingLoaderError(
+                f"Unexpected COPY data after last row ({len(self.buffer)} bytes)"
+            )
+
+    def _decode(self) -> None:
+        if not self.header_read:
+            if len(self.buffer) < COPY_HEADER_SIZE:
+                return
+            if not self.buffer.startswith(COPY_SIGNATURE):
+                raise EmbeddingLoaderError("Not a PostgreSQL COPY BINARY stream")
+            extension_length = int.from_bytes(
+                self.buffer[COPY_HEADER_SIZE - 4 : COPY_HEADER_SIZE], "big"
+            )
+            del self.buffer[: COPY_HEADER_SIZE + extension_length]
+            self.header_read = True
+
+        n = len(self.buffer) // self.row_dtype.itemsize
+        if n == 0:
+            return
+        rows = np.frombuffer(self.buffer, dtype=self.row_dtype, count=n)
+        valid = (
+            (rows["num_fields"] == 2)
+            & (rows["id_length"] == UUID_BYTES)
+            & (rows["vector_length"] == 4 + 4 * self.dimension)
+            & (rows["dim"] == self.dimension)
+        )
+        if not valid.all():
+            bad = int(np.argmin(valid))
+            raise EmbeddingLoaderError(
+                f"Unexpected COPY tuple at row {self.stream._filled + bad}: expected "
+                f"(uuid, vector({self.dimension})), got dim={int(rows['dim'][bad])}"
+            )
+
+        stream = self.stream
+        start = stream._reserve(n)
+        stream._matrix[start : start + n] = rows["vector"]
+        stream._keys[start : start + n] = rows["id"]
+        stream._filled = start + n
+        del rows  # Release the view before resizing the buffer
+        del self.buffer[: n * self.row_dtype.itemsize]
+        self.emit((start, stream._filled))
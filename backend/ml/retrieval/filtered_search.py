@@ -1,11 +1,14 @@
 """
 Filtered Similarity Search
-Two-stage search: PostgreSQL filtering → FAISS similarity search
+Two-stage search: product filtering → FAISS similarity search over the matching labels
 """
 
 import logging
+import math
+import threading
 import time
-from typing import Dict, List, Optional, Set
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 
@@ -18,8 +21,8 @@ except ImportError:
 
 from ..config import MLConfig, get_ml_config
 from .filters import FilteredSearcher, ProductFilters
-from .index_manager import FAISSIndexManager, get_index_manager
-from .similarity_search import SearchResult, SearchResults, SimilaritySearch
+from .index_manager import FAISSIndexManager, IndexSnapshot, get_index_manager
+from .similarity_search import SearchResults, SimilaritySearch
 
 logger = logging.getLogger(__name__)
 
@@ -30,18 +33,75 @@ class FilteredSimilaritySearchError(Exception):
     pass
 
 
+class FilterSelectivityStats:
+    """
+    Observed post-filter hit rates per filter signature.
+
+    The hit rate is the fraction of nearest-neighbour candidates that pass a
+    filter. It often differs from the filter's global selectivity (a category
+    filter matches most neighbours of a query about that category), so it is
+    learned from past searches. Entries are kept in a bounded LRU.
+    """
+
+    def __init__(self, max_entries: int = 4096, alpha: float = 0.3):
+        """
+        Initialize selectivity statistics.
+
+        Args:
+            max_entries: Maximum number of filter signatures kept
+            alpha: Weight of the newest observation in the moving average
+        """
+        self.max_entries = max_entries
+        self.alpha = alpha
+        self._hit_rates: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, signature: str) -> Optional[float]:
+        """Get the learned hit rate for a filter signature (None if unseen)."""
+        with self._lock:
+            hit_rate = self._hit_rates.get(signature)
+            if hit_rate is not None:
+                self._hit_rates.move_to_end(signature)
+            return hit_rate
+
+    def record(self, signature: str, hit_rate: float) -> None:
+        """Fold an observed hit rate into the moving average."""
+        with self._lock:
+            previous = self._hit_rates.get(signature)
+            if previous is not None:
+                hit_rate = self.alpha * hit_rate + (1 - self.alpha) * previous
+            self._hit_rates[signature] = hit_rate
+            self._hit_rates.move_to_end(signature)
+            while len(self._hit_rates) > self.max_entries:
+                self._hit_rates.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._hit_rates)
+
+
 class FilteredSimilaritySearch:
     """
     Performs similarity search with pre-filtering.
 
-    Two search strategies:
-    1. Subset index: Build temporary FAISS index from filtered embeddings
+    Filters are first resolved to a mask over index labels: in memory from the
+    snapshot's product attributes, or from a product ID query against
+    PostgreSQL for filters the attribute store cannot evaluate. The mask then
+    drives one of two strategies:
+
+    1. Subset: exact scan over the already-loaded vectors of allowed labels
        - Best when filters are very restrictive (small result set)
-       - Requires DB query to get embeddings
 
-    2. Post-filter: Search full FAISS index, then filter results
+    2. Post-filter: search the full FAISS index and keep allowed labels
        - Best when filters are not very restrictive (large result set)
-       - More efficient for light filtering
+       - The over-fetch factor comes from the filter's learned hit rate (or its
+         selectivity when unseen) and is doubled until k matches are found
+       - Falls back to a search restricted with an ``IDSelectorBitmap`` when the
+         over-fetch limit or latency budget is exhausted
+       - Filters pinning the shard attribute (see ``ShardedIndex``) search only
+         the routed shards instead of the full index
+
+    Both return exactly ``min(k, matching products)`` results, never build an
+    index per request, and never transfer embeddings from the database.
     """
 
     def __init__(
@@ -68,7 +128,26 @@ class FilteredSimilaritySearch:
 
         # Strategy selection threshold
         # If filtered products < this %, use subset index strategy
-        self.subset_threshold_ratio = 0.1  # 10%
+        performance = self.config.performance
+        self.subset_threshold_ratio = performance.filtered_search_subset_threshold
+        self.max_overfetch = performance.filtered_search_max_overfetch
+        self.budget_ms = performance.filtered_search_budget_ms
+        self.selectivity_stats = FilterSelectivityStats(
+            max_entries=performance.filtered_search_stats_max_entries
+        )
+
+        # Statistics
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "searches": 0,
+            "subset": 0,
+            "postfilter": 0,
+            "selector": 0,
+            "sharded": 0,
+            "postfilter_rounds": 0,
+            "postfilter_candidates": 0,
+            "postfilter_fallbacks": 0,
+        }
 
         logger.info("Filtered similarity search initialized")
 
@@ -89,8 +168,8 @@ class FilteredSimilaritySearch:
             filters: ProductFilters object
             k: Number of results to return
             min_similarity: Optional minimum similarity threshold
-            strategy: Force strategy ('subset' or 'postfilter', or None for auto)
-            session: Database session (created if not provided)
+            strategy: Force strategy ('subset', 'postfilter' or 'selector', or None for auto)
+            session: Database session (only used if filters need the database)
 
         Returns:
             SearchResults object with filtered results
@@ -99,200 +178,183 @@ class FilteredSimilaritySearch:
             FilteredSimilaritySearchError: If search fails
         """
         start_time = time.time()
+        self._count("searches")
 
-        # Get or create session
-        session_created = False
-        if session is None:
-            if self.db_session_factory is None:
-                raise FilteredSimilaritySearchError(
-                    "No database session provided and no session factory configured"
-                )
-            session = self.db_session_factory()
-            session_created = True
-
-        try:
-            # Get total number of products in index
-            total_products = self.index_manager.get_index().ntotal
-
-            # Get filtered product IDs from database
-            filtered_product_ids = self.filtered_searcher.get_filtered_product_ids(
-                session=session, filters=filters
-            )
-
-            if len(filtered_product_ids) == 0:
-                logger.warning("No products match the specified filters")
-                return SearchResults(
-                    results=[],
-                    query_vector_shape=query_vector.shape,
-                    k=k,
-                    total_found=0,
-                    search_time_ms=(time.time() - start_time) * 1000,
-                )
-
-            # Decide on strategy
-            filter_ratio = len(filtered_product_ids) / total_products
-            use_subset = filter_ratio < self.subset_threshold_ratio
-
-            if strategy == "subset":
-                use_subset = True
-            elif strategy == "postfilter":
-                use_subset = False
+        # Pin one index snapshot for the whole request
+        snapshot = self.index_manager.get_snapshot()
 
-            logger.info(
-                f"Filtered to {len(filtered_product_ids)} products "
-                f"({filter_ratio*100:.1f}% of total), "
-                f"using {'subset' if use_subset else 'postfilter'} strategy"
-            )
+        # Evaluate filters in memory when the snapshot has attributes
+        allowed = snapshot.allowed_labels(filters)
+        if allowed is None:
+            allowed = self._get_allowed_labels_from_db(snapshot, filters, session)
 
-            # Execute search with chosen strategy
-            if use_subset:
-                results = self._search_subset_strategy(
-                    query_vector=query_vector,
-                    filtered_product_ids=filtered_product_ids,
-                    filters=filters,
-                    k=k,
-                    min_similarity=min_similarity,
-                    session=session,
-                )
-            else:
-                results = self._search_postfilter_strategy(
-                    query_vector=query_vector,
-                    filtered_product_ids=set(filtered_product_ids),
-                    k=k,
-                    min_similarity=min_similarity,
-                )
-
-            # Update search time
-            results.search_time_ms = (time.time() - start_time) * 1000
-
-            return results
-
-        finally:
-            if session_created:
-                session.close()
-
-    def _search_subset_strategy(
-        self,
-        query_vector: np.ndarray,
-        filtered_product_ids: List[int],
-        filters: ProductFilters,
-        k: int,
-        min_similarity: Optional[float],
-        session,
-    ) -> SearchResults:
-        """
-        Search using subset index strategy.
-
-        Build temporary FAISS index from filtered embeddings.
-        """
-        logger.debug("Using subset index strategy")
-
-        # Get embeddings for filtered products
-        embeddings, product_ids = self.filtered_searcher.get_filtered_embeddings(
-            session=session, filters=filters
-        )
-
-        if len(embeddings) == 0:
+        num_allowed = int(allowed.sum())
+        if num_allowed == 0:
+            logger.warning("No products match the specified filters")
             return SearchResults(
                 results=[],
                 query_vector_shape=query_vector.shape,
                 k=k,
                 total_found=0,
-                search_time_ms=0.0,
+                search_time_ms=(time.time() - start_time) * 1000,
             )
 
-        # Build temporary index
-        subset_index, id_mapping = self.filtered_searcher.build_subset_index(
-            embeddings=embeddings, product_ids=product_ids
+        # Decide on strategy
+        filter_ratio = num_allowed / max(snapshot.ntotal, 1)
+        use_subset = filter_ratio < self.subset_threshold_ratio
+
+        if strategy == "subset":
+            use_subset = True
+        elif strategy in ("postfilter", "selector"):
+            use_subset = False
+
+        logger.debug(
+            f"Filtered to {num_allowed} products ({filter_ratio*100:.1f}% of total), "
+            f"using {'subset' if use_subset else 'postfilter'} strategy"
         )
 
         # Prepare query vector
-        if query_vector.ndim == 1:
-            query_vector = query_vector.reshape(1, -1)
-        query_vector = query_vector.astype(np.float32)
-
-        # Normalize if configured
+        query = query_vector.reshape(1, -1).astype(np.float32)
         if self.config.embedding.normalize_embeddings:
-            norm = np.linalg.norm(query_vector)
-            if norm > 1e-8:
-                query_vector = query_vector / norm
-
-        # Search subset index
-        search_k = min(k, subset_index.ntotal)
-        distances, indices = subset_index.search(query_vector, search_k)
-
-        # Format results
-        results = []
-        for rank, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx == -1:
-                continue
-
-            product_id = id_mapping.get(int(idx))
-            if product_id is None:
-                continue
-
-            # Convert distance to similarity
-            similarity = self.similarity_search._distance_to_similarity(float(distance))
-
-            if min_similarity is not None and similarity < min_similarity:
-                continue
-
-            results.append(
-                SearchResult(
-                    product_id=product_id,
-                    distance=float(distance),
-                    similarity=similarity,
-                    rank=rank,
-                )
+            query = self.similarity_search._normalize_vector(query)
+
+        # Scoped queries only need the shards that can hold matching products
+        shard_keys = snapshot.shards.route(filters) if snapshot.shards is not None else None
+
+        if use_subset and snapshot.vectors is not None:
+            self._count("subset")
+            distances, labels = snapshot.brute_force_search(query, k, np.flatnonzero(allowed))
+        elif shard_keys is not None and strategy != "postfilter":
+            self._count("sharded")
+            distances, labels = snapshot.search_filtered(query, k, allowed, shard_keys=shard_keys)
+        elif strategy == "selector":
+            self._count("selector")
+            distances, labels = snapshot.search_filtered(query, k, allowed)
+        else:
+            distances, labels = self._search_postfilter(
+                query=query,
+                snapshot=snapshot,
+                allowed=allowed,
+                k=min(k, num_allowed),
+                selectivity=filter_ratio,
+                signature=filters.signature(),
+                deadline=start_time + self.budget_ms / 1000,
             )
 
-        return SearchResults(
-            results=results,
-            query_vector_shape=query_vector.shape,
-            k=k,
-            total_found=len(results),
-            search_time_ms=0.0,  # Will be updated by caller
+        results = self.similarity_search._format_results(
+            distances[0], labels[0], snapshot, min_similarity=min_similarity
         )
+        results.query_vector_shape = query_vector.shape
+        results.k = k
+        results.search_time_ms = (time.time() - start_time) * 1000
 
-    def _search_postfilter_strategy(
+        return results
+
+    def _search_postfilter(
         self,
-        query_vector: np.ndarray,
-        filtered_product_ids: Set[int],
+        query: np.ndarray,
+        snapshot: IndexSnapshot,
+        allowed: np.ndarray,
         k: int,
-        min_similarity: Optional[float],
-    ) -> SearchResults:
+        selectivity: float,
+        signature: str,
+        deadline: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Search using post-filter strategy.
+        Search the full index with iterative deepening, keeping allowed labels.
 
-        Search full index, then filter results.
+        The first round fetches ``k / expected_hit_rate`` candidates (with a
+        safety margin); each further round doubles the candidate count. Once
+        the over-fetch limit or the latency budget is reached (or an
+        approximate index returned every candidate it visits), the search is
+        restricted with an ID selector instead, so exactly k results are still
+        returned.
+
+        Returns:
+            Tuple of (distances, labels) of shape (1, <= k)
         """
-        logger.debug("Using post-filter strategy")
+        self._count("postfilter")
+        hit_rate = self.selectivity_stats.get(signature) or selectivity
+        max_k = min(k * self.max_overfetch, snapshot.ntotal)
+        search_k = min(max(math.ceil(1.5 * k / max(hit_rate, 1e-6)), k), max_k)
+
+        while True:
+            distances, labels = snapshot.search(query, search_k)
+            distances, labels = distances[0], labels[0]
+            valid = labels >= 0
+            hits = np.flatnonzero(valid & allowed[np.maximum(labels, 0)])
+            self._count("postfilter_rounds")
+            self._count("postfilter_candidates", search_k)
+
+            if valid.any():
+                self.selectivity_stats.record(signature, len(hits) / int(valid.sum()))
+
+            # Only a flat index returns every vector once search_k covers ntotal;
+            # approximate ones (IVF, HNSW) may still miss allowed products
+            if len(hits) >= k or (search_k >= snapshot.ntotal and snapshot.exhaustive):
+                hits = hits[:k]
+                return distances[hits][None, :], labels[hits][None, :]
+
+            if search_k >= max_k or time.time() >= deadline:
+                break
+            search_k = min(search_k * 2, max_k)
+
+        logger.debug(f"Post-filter found too few matches at k={search_k}, using ID selector")
+        self._count("postfilter_fallbacks")
+        return snapshot.search_filtered(query, k, allowed)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get strategy usage and post-filter over-fetch statistics."""
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+
+        postfilter = stats["postfilter"]
+        stats["avg_postfilter_candidates"] = (
+            round(stats["postfilter_candidates"] / postfilter, 1) if postfilter else 0.0
+        )
+        stats["avg_postfilter_rounds"] = (
+            round(stats["postfilter_rounds"] / postfilter, 2) if postfilter else 0.0
+        )
+        stats["tracked_filter_signatures"] = len(self.selectivity_stats)
+        return stats
 
-        # Search with larger k to account for filtering
-        # Heuristic: request 5x more results than needed
-        search_k = min(k * 5, self.index_manager.get_index().ntotal)
+    def _get_allowed_labels_from_db(
+        self, snapshot: IndexSnapshot, filters: ProductFilters, session=None
+    ) -> np.ndarray:
+        """
+        Resolve filters to a label mask with a product ID query.
 
-        # Perform search on full index
-        results = self.similarity_search.search(
-            query_vector=query_vector, k=search_k, min_similarity=min_similarity
-        )
+        Args:
+            snapshot: Index snapshot the search runs against
+            filters: ProductFilters object
+            session: Database session (created if not provided)
 
-        # Filter results to only allowed product IDs
-        filtered_results = [r for r in results.results if r.product_id in filtered_product_ids][
-            :k
-        ]  # Take top k after filtering
-
-        # Re-rank results
-        for i, result in enumerate(filtered_results):
-            result.rank = i
-
-        return SearchResults(
-            results=filtered_results,
-            query_vector_shape=query_vector.shape,
-            k=k,
-            total_found=len(filtered_results),
-            search_time_ms=0.0,  # Will be updated by caller
-        )
+        Returns:
+            Boolean mask over snapshot labels
+        """
+        session_created = False
+        if session is None:
+            if self.db_session_factory is None:
+                raise FilteredSimilaritySearchError(
+                    "No database session provided and no session factory configured"
+                )
+            session = self.db_session_factory()
+            session_created = True
+
+        try:
+            filtered_product_ids = self.filtered_searcher.get_filtered_product_ids(
+                session=session, filters=filters
+            )
+        finally:
+            if session_created:
+                session.close()
+
+        # Index IDs are strings; the database may return UUID objects
+        return snapshot.label_mask([str(pid) for pid in filtered_product_ids])
 
     def search_similar_with_filters(
         self,
@@ -334,12 +396,7 @@ class FilteredSimilaritySearch:
 
         # Filter out self if needed
         if exclude_self:
-            results.results = [r for r in results.results if r.product_id != product_id][:k]
-            results.total_found = len(results.results)
-
-            # Re-rank
-            for i, result in enumerate(results.results):
-                result.rank = i
+            results.exclude(product_id).truncate(k)
 
         return results
 
@@ -104,6 +104,9 @@ class ProductFilters:
     # Gender (for fashion)
     gender: Optional[str] = None  # 'M', 'F', 'U' (unisex)
 
+    # Only products that are still listed
+    active_only: bool = True
+
     # Custom filters
     custom_filters: List[ProductFilter] = field(default_factory=list)
 
@@ -159,6 +162,10 @@ class ProductFilters:
         if self.gender:
             filters.append(ProductFilter("gender", FilterOperator.EQ, self.gender))
 
+        # Listing status
+        if self.active_only:
+            filters.append(ProductFilter("is_active", FilterOperator.EQ, True))
+
         # Embedding requirement
         if self.require_embedding:
             filters.append(ProductFilter("embedding", FilterOperator.NE, None))
@@ -168,6 +175,19 @@ class ProductFilters:
 
         return filters
 
+    def signature(self) -> str:
+        """
+        Stable key for this filter combination (used for per-filter statistics).
+
+        Returns:
+            Canonical string; equal filters give equal signatures
+        """
+        parts = []
+        for f in self.build_filters():
+            value = sorted(f.value) if isinstance(f.value, (list, tuple, set)) else f.value
+            parts.append(f"{f.field}{f.operator.value}{value}")
+        return "&".join(sorted(parts))
+
     def to_sql_where_clause(self) -> Tuple[str, List[Any]]:
         """
         Build SQL WHERE clause from filters.
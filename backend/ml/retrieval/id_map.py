@@ -0,0 +1,340 @@
+"""
+Product ID Map
+Compact, memory-mappable mapping between FAISS positions and product IDs.
+"""
+
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# On-disk artifact names (written next to index.faiss)
+ID_MAP_FILE = "product_ids.npy"
+ID_MAP_SORTED_FILE = "product_ids.sorted.npy"
+ID_MAP_ORDER_FILE = "product_ids.order.npy"
+ID_MAP_FILES = [ID_MAP_FILE, ID_MAP_SORTED_FILE, ID_MAP_ORDER_FILE]
+
+UUID_BYTES = 16
+
+# Lookup tables for vectorized UUID formatting
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_UUID_HEX_COLUMNS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+
+class ProductIdMap:
+    """
+    FAISS position -> product ID mapping stored as fixed-width NumPy arrays.
+
+    Product IDs are UUIDs, so they are stored as an (N, 16) uint8 array instead of
+    a dict of N Python strings. The reverse direction (product ID -> position) uses
+    a sorted copy of the keys plus binary search, so no second dict is built.
+
+    All three arrays can be memory-mapped, letting every API worker on a host share
+    the same page-cache pages. Non-UUID IDs (e.g. integer IDs from test scripts)
+    fall back to a fixed-width unicode array with the same lookup semantics.
+
+    The class implements the read-only parts of the dict interface used by older
+    callers (``get``, ``[]``, ``len``, ``items``) so it can replace the old dict.
+    """
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        sorted_keys: Optional[np.ndarray] = None,
+        sorted_positions: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialize ID map from encoded keys.
+
+        Args:
+            keys: Encoded product IDs in FAISS position order
+                  ((N, 16) uint8 for UUIDs, (N,) unicode otherwise)
+            sorted_keys: Keys sorted for binary search (computed if not provided)
+            sorted_positions: Positions matching sorted_keys (computed if not provided)
+        """
+        self.encoded_ids = keys
+        self.is_uuid = keys.dtype == np.uint8 and keys.ndim == 2
+
+        if sorted_keys is None or sorted_positions is None:
+            order = np.argsort(self._lookup_view(keys), kind="stable")
+            sorted_keys = keys[order]
+            sorted_positions = order.astype(np.int64)
+
+        self.sorted_keys = sorted_keys
+        self.sorted_positions = sorted_positions
+        self._sorted_view = self._lookup_view(sorted_keys)
+
+    # ========== Construction ==========
+
+    @classmethod
+    def from_product_ids(cls, product_ids: Sequence[Any]) -> "ProductIdMap":
+        """
+        Build ID map from product IDs in FAISS position order.
+
+        Args:
+            product_ids: Product IDs (UUIDs, UUID strings, or any str-able ID)
+
+        Returns:
+            ProductIdMap instance
+        """
+        try:
+            keys = np.frombuffer(
+                b"".join(_uuid_bytes(pid) for pid in product_ids), dtype=np.uint8
+            ).reshape(-1, UUID_BYTES)
+        except (ValueError, AttributeError, TypeError):
+            keys = np.array([str(pid) for pid in product_ids], dtype=str)
+            if keys.dtype.kind != "U":
+                keys = keys.astype("U1")
+
+        return cls(keys.copy() if keys.dtype == np.uint8 else keys)
+
+    @classmethod
+    def coerce(
+        cls, mapping: Union["ProductIdMap", Dict[int, Any], Sequence[Any]]
+    ) -> "ProductIdMap":
+        """
+        Convert a legacy position -> product_id dict (or ID list) into a ProductIdMap.
+
+        Args:
+            mapping: ProductIdMap, dict keyed by position, or list of IDs
+
+        Returns:
+            ProductIdMap instance
+        """
+        if isinstance(mapping, ProductIdMap):
+            return mapping
+
+        if isinstance(mapping, dict):
+            positions = sorted(mapping.keys())
+            if positions and positions != list(range(len(positions))):
+                raise ValueError("ID mapping positions must be contiguous and start at 0")
+            return cls.from_product_ids([mapping[pos] for pos in positions])
+
+        return cls.from_product_ids(list(mapping))
+
+    # ========== Persistence ==========
+
+    def save(self, directory: Path) -> None:
+        """
+        Save ID map arrays to a directory.
+
+        Args:
+            directory: Target directory (must exist)
+        """
+        directory = Path(directory)
+        np.save(directory / ID_MAP_FILE, np.ascontiguousarray(self.encoded_ids))
+        np.save(directory / ID_MAP_SORTED_FILE, np.ascontiguousarray(self.sorted_keys))
+        np.save(directory / ID_MAP_ORDER_FILE, np.ascontiguousarray(self.sorted_positions))
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "ProductIdMap":
+        """
+        Load ID map arrays from a directory.
+
+        Args:
+            directory: Directory containing the ID map files
+            mmap: Memory-map the arrays instead of reading them into RAM
+
+        Returns:
+            ProductIdMap instance
+
+        Raises:
+            FileNotFoundError: If the ID map files are missing
+        """
+        directory = Path(directory)
+        mmap_mode = "r" if mmap else None
+
+        keys = np.load(directory / ID_MAP_FILE, mmap_mode=mmap_mode)
+        sorted_keys = np.load(directory / ID_MAP_SORTED_FILE, mmap_mode=mmap_mode)
+        sorted_positions = np.load(directory / ID_MAP_ORDER_FILE, mmap_mode=mmap_mode)
+
+        return cls(keys, sorted_keys=sorted_keys, sorted_positions=sorted_positions)
+
+    @classmethod
+    def load_legacy(cls, mapping_file: Path) -> "ProductIdMap":
+        """
+        Load the legacy ``id_mapping.npz`` format (pickled object array of IDs).
+
+        Args:
+            mapping_file: Path to id_mapping.npz
+
+        Returns:
+            ProductIdMap instance
+        """
+        mapping_data = np.load(mapping_file, allow_pickle=True)
+        positions = mapping_data["positions"]
+        product_ids = mapping_data["product_ids"]
+        order = np.argsort(positions, kind="stable")
+        return cls.from_product_ids([str(product_ids[i]) for i in order])
+
+    # ========== Lookups ==========
+
+    def __len__(self) -> int:
+        return int(self.encoded_ids.shape[0])
+
+    def __contains__(self, position: Any) -> bool:
+        try:
+            return 0 <= int(position) < len(self)
+        except (TypeError, ValueError):
+            return False
+
+    def __getitem__(self, position: int) -> str:
+        product_id = self.get(position)
+        if product_id is None:
+            raise KeyError(position)
+        return product_id
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self)))
+
+    def get(self, position: int, default: Optional[str] = None) -> Optional[str]:
+        """
+        Get product ID for a FAISS position.
+
+        Args:
+            position: FAISS index position
+            default: Value returned when position is out of range
+
+        Returns:
+            Product ID string or default
+        """
+        position = int(position)
+        if position < 0 or position >= len(self):
+            return default
+        return self._decode(self.encoded_ids[position : position + 1])[0]
+
+    def product_ids_at(self, positions: np.ndarray) -> List[str]:
+        """
+        Decode product IDs for many positions at once.
+
+        Args:
+            positions: Array of valid FAISS positions
+
+        Returns:
+            List of product ID strings (same order as positions)
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if positions.size == 0:
+            return []
+        return self._decode(self.encoded_ids[positions])
+
+    def position_of(self, product_id: Any) -> Optional[int]:
+        """
+        Get FAISS position for a product ID.
+
+        Args:
+            product_id: Product ID (UUID or string)
+
+        Returns:
+            FAISS position or None if not found
+        """
+        positions = self.positions_of([product_id])
+        return int(positions[0]) if positions[0] >= 0 else None
+
+    def positions_of(self, product_ids: Iterable[Any]) -> np.ndarray:
+        """
+        Get FAISS positions for many product IDs.
+
+        Args:
+            product_ids: Product IDs to look up
+
+        Returns:
+            int64 array of positions (-1 for IDs not in the map)
+        """
+        product_ids = list(product_ids)
+        if not product_ids or len(self) == 0:
+            return np.full(len(product_ids), -1, dtype=np.int64)
+
+        queries, valid = self._encode_queries(product_ids)
+        query_view = self._lookup_view(queries)
+        idx = np.searchsorted(self._sorted_view, query_view)
+        idx_clipped = np.minimum(idx, len(self) - 1)
+        found = valid & (idx < len(self)) & (self._sorted_view[idx_clipped] == query_view)
+
+        return np.where(found, self.sorted_positions[idx_clipped], -1).astype(np.int64)
+
+    def keys(self) -> range:
+        """Positions covered by this map (dict-style ``keys``)."""
+        return range(len(self))
+
+    def values(self) -> List[str]:
+        """All product IDs in position order."""
+        return self.product_ids_at(np.arange(len(self)))
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        """Iterate (position, product_id) pairs."""
+        return enumerate(self.values())
+
+    def nbytes(self) -> int:
+        """Total size of the backing arrays in bytes."""
+        return int(self.encoded_ids.nbytes + self.sorted_keys.nbytes + self.sorted_positions.nbytes)
+
+    # ========== Encoding helpers ==========
+
+    @staticmethod
+    def _lookup_view(keys: np.ndarray) -> np.ndarray:
+        """View keys as a 1-D array of comparable scalars."""
+        if keys.dtype == np.uint8 and keys.ndim == 2:
+            return np.ascontiguousarray(keys).view(f"V{UUID_BYTES}").ravel()
+        return keys
+
+    def _encode_queries(self, product_ids: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode lookup keys in the map's key format.
+
+        Returns:
+            Tuple of (encoded keys, mask of keys that can match). Keys that cannot
+            be encoded exactly (unparseable UUIDs, strings wider than the map's
+            fixed width) are placeholders that must be treated as misses.
+        """
+        valid = np.ones(len(product_ids), dtype=bool)
+
+        if self.is_uuid:
+            encoded = bytearray()
+            for i, pid in enumerate(product_ids):
+                try:
+                    encoded += _uuid_bytes(pid)
+                except (ValueError, AttributeError, TypeError):
+                    # Placeholder only: an all-zero key would match a nil-UUID row
+                    encoded += bytes(UUID_BYTES)
+                    valid[i] = False
+            keys = np.frombuffer(bytes(encoded), dtype=np.uint8).reshape(-1, UUID_BYTES)
+            return keys, valid
+
+        # Casting to the map's width would truncate longer queries into false matches
+        max_chars = self.encoded_ids.dtype.itemsize // np.dtype("U1").itemsize
+        strings = [str(pid) for pid in product_ids]
+        for i, product_id in enumerate(strings):
+            if len(product_id) > max_chars:
+                strings[i] = ""
+                valid[i] = False
+
+        return np.array(strings, dtype=self.encoded_ids.dtype), valid
+
+    def _decode(self, keys: np.ndarray) -> List[str]:
+        if not self.is_uuid:
+            return [str(k) for k in keys]
+
+        # Vectorized hex encoding into canonical 8-4-4-4-12 UUID strings
+        keys = np.ascontiguousarray(keys)
+        hex_digits = np.empty((len(keys), 2 * UUID_BYTES), dtype=np.uint8)
+        hex_digits[:, 0::2] = _HEX_DIGITS[keys >> 4]
+        hex_digits[:, 1::2] = _HEX_DIGITS[keys & 0x0F]
+
+        chars = np.full((len(keys), 36), ord("-"), dtype=np.uint8)
+        chars[:, _UUID_HEX_COLUMNS] = hex_digits
+
+        return chars.view("S36").ravel().astype("U36").tolist()
+
+
+def _uuid_bytes(product_id: Any) -> bytes:
+    """Encode a UUID or UUID string as 16 raw bytes."""
+    if isinstance(product_id, uuid.UUID):
+        return product_id.bytes
+    if not isinstance(product_id, str):
+        raise TypeError(f"Not a UUID: {product_id!r}")
+    return uuid.UUID(product_id).bytes
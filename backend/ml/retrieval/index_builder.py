@@ -5,10 +5,12 @@ Builds and configures FAISS indices from product embeddings stored in PostgreSQL
 
 from __future__ import annotations
 
+import json
 import logging
+import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -24,10 +26,28 @@ if TYPE_CHECKING:
     import faiss
 
 from ..config import MLConfig, get_ml_config
+from .artifacts import ArtifactManifest, ArtifactStore, new_version, resolve_index_path
+from .attribute_store import ATTRIBUTES_FILE, ProductAttributeStore
+from .embedding_loader import BaseEmbeddingStream
+from .id_map import ID_MAP_FILE, ID_MAP_FILES, ProductIdMap
+from .index_tuner import IndexTuner, TuningResult
 
 logger = logging.getLogger(__name__)
 
 
+# On-disk artifact names
+INDEX_FILE = "index.faiss"
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.json"
+LEGACY_ID_MAPPING_FILE = "id_mapping.npz"
+LEGACY_METADATA_FILE = "metadata.npy"
+
+# Files written by save_index (vectors.npy is only present for non-Flat indices,
+# and holds float16 for product-quantized indices)
+INDEX_ARTIFACT_FILES = [INDEX_FILE, *ID_MAP_FILES, METADATA_FILE]
+OPTIONAL_INDEX_ARTIFACT_FILES = [VECTORS_FILE, ATTRIBUTES_FILE]
+
+
 class FAISSIndexBuilderError(Exception):
     """Exception raised for FAISS index building errors."""
 
@@ -42,6 +62,15 @@ class FAISSIndexBuilder:
     - Flat: Exact nearest neighbor search (brute force, best quality)
     - IVF: Inverted file index (faster, slight quality tradeoff)
     - HNSW: Hierarchical navigable small world (fast approximate search)
+    - IVFPQ: IVF with product-quantized codes (``faiss_pq_m`` bytes per vector)
+    - OPQ: IVFPQ behind a learned OPQ rotation (better recall at the same size)
+
+    Product-quantized indices keep no float32 vectors in memory. Their exact
+    vectors are saved as float16 in vectors.npy and memory-mapped for the
+    re-ranking stage (see ``IndexSnapshot``).
+
+    With ``faiss_auto_tune`` enabled, IVF/HNSW parameters are chosen per build
+    by ``IndexTuner`` and recorded in metadata.json under ``tuning``.
     """
 
     def __init__(self, config: Optional[MLConfig] = None):
@@ -62,29 +91,46 @@ class FAISSIndexBuilder:
         self.config = config or get_ml_config()
         self.dimension = self.config.embedding.product_embedding_dim
         self.index_type = self.config.storage.faiss_index_type
+        self.tuner = IndexTuner(self.config)
+
+        # Parameters chosen for the most recent build_index call (saved with it)
+        self.last_tuning: Optional[TuningResult] = None
 
         logger.info(
             f"Initialized FAISS index builder: type={self.index_type}, dim={self.dimension}"
         )
 
-    def create_index(self, index_type: Optional[str] = None) -> "faiss.Index":
+    def create_index(
+        self,
+        index_type: Optional[str] = None,
+        num_vectors: Optional[int] = None,
+        params: Optional[Dict[str, int]] = None,
+    ) -> "faiss.Index":
         """
         Create a new FAISS index based on configuration.
 
         Args:
-            index_type: Override default index type ('Flat', 'IVF', 'HNSW')
+            index_type: Override default index type ('Flat', 'IVF', 'HNSW', 'IVFPQ', 'OPQ')
+            num_vectors: Number of vectors the index will hold (sizes IVFPQ lists)
+            params: Build parameters (``nlist``, or ``M``/``ef_construction``),
+                    e.g. from ``IndexTuner.build_params``
 
         Returns:
             Initialized FAISS index
         """
         index_type = index_type or self.index_type
+        params = params or {}
 
         if index_type == "Flat":
             return self._create_flat_index()
         elif index_type == "IVF":
-            return self._create_ivf_index()
+            return self._create_ivf_index(nlist=params.get("nlist"))
         elif index_type == "HNSW":
-            return self._create_hnsw_index()
+            return self._create_hnsw_index(**params)
+        elif index_type in ("IVFPQ", "OPQ"):
+            return self._create_ivfpq_index(
+                num_vectors=num_vectors, opq=index_type == "OPQ", nlist=params.get("nlist")
+            )
         else:
             raise FAISSIndexBuilderError(f"Unsupported index type: {index_type}")
 
@@ -120,25 +166,70 @@ class FAISSIndexBuilder:
 
         return index
 
-    def _create_hnsw_index(self, M: int = 32) -> "faiss.Index":
+    def _create_hnsw_index(
+        self, M: int = 32, ef_construction: Optional[int] = None
+    ) -> "faiss.Index":
         """
         Create an HNSW (Hierarchical Navigable Small World) index.
         Best for: Large datasets (>1M), very fast approximate search
 
         Args:
             M: Number of connections per layer (higher = better quality, more memory)
+            ef_construction: Search depth while building the graph (default: FAISS's 40)
         """
         logger.info(f"Creating IndexHNSWFlat with dimension {self.dimension}, M={M}")
         index = faiss.IndexHNSWFlat(self.dimension, M)
+        if ef_construction is not None:
+            index.hnsw.efConstruction = ef_construction
 
         # Set search parameters
         index.hnsw.efSearch = self.config.storage.faiss_ef_search
 
         return index
 
+    def _create_ivfpq_index(
+        self, num_vectors: Optional[int] = None, opq: bool = False, nlist: Optional[int] = None
+    ) -> "faiss.Index":
+        """
+        Create an IVFPQ index, optionally behind an OPQ rotation.
+        Best for: Large catalogs where float32 vectors no longer fit in memory
+
+        Args:
+            num_vectors: Number of vectors to index; nlist is capped so every
+                         list gets enough training points
+            opq: Learn an OPQ rotation before quantization
+            nlist: Number of clusters (default: faiss_ivf_nlist)
+        """
+        storage = self.config.storage
+        if self.dimension % storage.faiss_pq_m != 0:
+            raise FAISSIndexBuilderError(
+                f"faiss_pq_m={storage.faiss_pq_m} must divide the dimension {self.dimension}"
+            )
+
+        nlist = nlist or storage.faiss_ivf_nlist
+        if num_vectors is not None:
+            # FAISS wants ~39 training points per centroid
+            nlist = max(1, min(nlist, num_vectors // 39))
+
+        quantizer = faiss.IndexFlatL2(self.dimension)
+        ivf = faiss.IndexIVFPQ(
+            quantizer, self.dimension, nlist, storage.faiss_pq_m, storage.faiss_pq_nbits
+        )
+        ivf.nprobe = min(storage.faiss_nprobe, nlist)
+
+        logger.info(
+            f"Creating {'OPQ+' if opq else ''}IndexIVFPQ with dimension {self.dimension}, "
+            f"nlist={nlist}, m={storage.faiss_pq_m}, nbits={storage.faiss_pq_nbits}"
+        )
+        if not opq:
+            return ivf
+
+        rotation = faiss.OPQMatrix(self.dimension, storage.faiss_pq_m)
+        return faiss.IndexPreTransform(rotation, ivf)
+
     def build_index(
         self, embeddings: np.ndarray, product_ids: List[int], train_ratio: float = 1.0
-    ) -> Tuple[faiss.Index, Dict[int, int]]:
+    ) -> Tuple[faiss.Index, ProductIdMap]:
         """
         Build and train FAISS index from product embeddings.
 
@@ -150,7 +241,7 @@ class FAISSIndexBuilder:
         Returns:
             Tuple of (trained_index, id_mapping)
             - trained_index: Trained FAISS index ready for search
-            - id_mapping: Dict mapping FAISS index position -> product_id
+            - id_mapping: ProductIdMap mapping FAISS index position <-> product_id
 
         Raises:
             FAISSIndexBuilderError: If building fails
@@ -170,82 +261,243 @@ class FAISSIndexBuilder:
 
         logger.info(f"Building FAISS index with {len(embeddings)} embeddings")
 
-        # Ensure embeddings are float32 (FAISS requirement)
-        embeddings = embeddings.astype(np.float32)
+        # Ensure embeddings are float32 (FAISS requirement); no copy if they already are
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
-        # Create index
-        index = self.create_index()
+        # Create index (build parameters sized to the catalog when auto-tuning)
+        build_params = (
+            self.tuner.build_params(self.index_type, len(embeddings)) if self.tuner.enabled else {}
+        )
+        index = self.create_index(num_vectors=len(embeddings), params=build_params)
 
-        # Train index if needed (IVF and HNSW require training)
-        if isinstance(index, faiss.IndexIVFFlat):
-            logger.info(f"Training IVF index on {int(len(embeddings) * train_ratio)} samples...")
-            train_size = int(len(embeddings) * train_ratio)
-            train_embeddings = embeddings[:train_size]
-            index.train(train_embeddings)
-            logger.info("IVF index training complete")
+        # Train index if needed (IVF and PQ variants require training)
+        if not index.is_trained:
+            self._train(index, embeddings[: int(len(embeddings) * train_ratio)])
 
         # Add all embeddings to index
         logger.info("Adding embeddings to index...")
         index.add(embeddings)
         logger.info(f"Index built successfully: {index.ntotal} vectors indexed")
 
+        # Pick nprobe / efSearch for the recall target
+        self.last_tuning = None
+        if self.tuner.enabled:
+            self.last_tuning = self.tuner.tune(index, embeddings, self.index_type, build_params)
+
         # Create ID mapping (FAISS position -> product_id)
-        id_mapping = {i: pid for i, pid in enumerate(product_ids)}
+        id_mapping = ProductIdMap.from_product_ids(product_ids)
 
         return index, id_mapping
 
+    def build_index_streaming(
+        self,
+        stream: BaseEmbeddingStream,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[faiss.Index, ProductIdMap]:
+        """
+        Build FAISS index while embeddings stream in from the database.
+
+        Indices that need no training (Flat, HNSW) add every chunk as soon as it
+        is decoded, overlapping index construction with the transfer. IVF and PQ
+        indices wait until enough rows for training have arrived (FAISS samples
+        at most 256 points per centroid anyway), train, add the rows received so
+        far and keep adding as the stream continues.
+
+        Args:
+            stream: Embedding stream (see EmbeddingStream); consumed by this call.
+                    Its ``embeddings`` hold the vectors in FAISS position order.
+            progress: Optional callback, called with (rows_received, rows_expected)
+                      after each chunk
+
+        Returns:
+            Tuple of (trained_index, id_mapping)
+
+        Raises:
+            FAISSIndexBuilderError: If the stream is empty or building fails
+        """
+        if stream.dimension != self.dimension:
+            raise FAISSIndexBuilderError(
+                f"Embedding dimension mismatch: expected {self.dimension}, got {stream.dimension}"
+            )
+
+        num_vectors = stream.num_vectors
+        if num_vectors == 0:
+            raise FAISSIndexBuilderError("Cannot build index with empty embeddings")
+
+        logger.info(f"Building FAISS index while streaming {num_vectors} embeddings")
+
+        build_params = (
+            self.tuner.build_params(self.index_type, num_vectors) if self.tuner.enabled else {}
+        )
+        index = self.create_index(num_vectors=num_vectors, params=build_params)
+        train_rows = min(num_vectors, self._training_rows(index))
+
+        added = 0
+        for _ in stream:
+            decoded = stream.decoded
+            if not index.is_trained:
+                if len(decoded) < train_rows:
+                    if progress is not None:
+                        progress(len(decoded), num_vectors)
+                    continue
+                self._train(index, decoded[:train_rows])
+            index.add(decoded[added:])
+            added = len(decoded)
+            if progress is not None:
+                progress(added, num_vectors)
+
+        # Fewer rows arrived than were counted
+        embeddings = stream.embeddings
+        if len(embeddings) == 0:
+            raise FAISSIndexBuilderError("Cannot build index with empty embeddings")
+        if not index.is_trained:
+            self._train(index, embeddings)
+        if added < len(embeddings):
+            index.add(embeddings[added:])
+        logger.info(f"Index built successfully: {index.ntotal} vectors indexed")
+
+        self.last_tuning = None
+        if self.tuner.enabled:
+            self.last_tuning = self.tuner.tune(index, embeddings, self.index_type, build_params)
+
+        return index, stream.id_mapping
+
+    def _train(self, index: faiss.Index, train_embeddings: np.ndarray) -> None:
+        """Train an IVF / PQ index."""
+        train_size = len(train_embeddings)
+        if self.is_compressed(index) and train_size < 2**self.config.storage.faiss_pq_nbits:
+            raise FAISSIndexBuilderError(
+                f"{self.index_type} needs at least {2**self.config.storage.faiss_pq_nbits} "
+                f"training vectors, got {train_size}"
+            )
+        logger.info(f"Training {self.index_type} index on {train_size} samples...")
+        index.train(train_embeddings)
+        logger.info(f"{self.index_type} index training complete")
+
+    def _training_rows(self, index: faiss.Index) -> int:
+        """Rows needed to train index (0 if it needs no training)."""
+        if index.is_trained:
+            return 0
+        ivf = faiss.try_extract_index_ivf(index)
+        # FAISS k-means subsamples to 256 points per centroid
+        rows = 256 * ivf.nlist if ivf is not None else 0
+        if self.is_compressed(index):
+            rows = max(rows, 256 * 2**self.config.storage.faiss_pq_nbits)
+        return rows
+
     def save_index(
-        self, index: faiss.Index, id_mapping: Dict[int, int], path: Optional[Path] = None
+        self,
+        index: faiss.Index,
+        id_mapping: ProductIdMap | Dict[int, Any],
+        path: Optional[Path] = None,
+        vectors: Optional[np.ndarray] = None,
+        extra_metadata: Optional[Dict[str, Any]] = None,
+        attributes: Optional[ProductAttributeStore] = None,
     ) -> Path:
         """
-        Save FAISS index and ID mapping to disk.
+        Save FAISS index, ID map, and metadata to disk.
+
+        The layout is designed to be memory-mapped on load:
+        - index.faiss: FAISS index
+        - product_ids*.npy: Fixed-width ID map (see ProductIdMap)
+        - vectors.npy: Raw float32 vectors (non-Flat indices only; a Flat index
+          already stores them contiguously)
+        - attributes.npz: Filterable product attributes (see ProductAttributeStore)
+        - metadata.json: Build metadata
+        - manifest.json: Sizes and SHA-256 hashes of the files above
+
+        The files form a new version under ``<path>/versions/`` that is
+        published by atomically replacing ``<path>/CURRENT`` (see ArtifactStore).
 
         Args:
             index: FAISS index to save
-            id_mapping: ID mapping dict
-            path: Directory to save to (default: config.storage.faiss_index_path)
+            id_mapping: ProductIdMap (or legacy position -> product_id dict)
+            path: Index root to save to (default: config.storage.faiss_index_path)
+            vectors: Embeddings in FAISS position order, used for vectors.npy.
+                     Reconstructed from the index if omitted.
+            extra_metadata: Additional fields to store in metadata.json
+            attributes: Product attributes in FAISS position order
 
         Returns:
-            Path where index was saved
+            Path of the published version directory
         """
-        save_path = path or self.config.storage.faiss_index_path
-        save_path = Path(save_path)
-        save_path.mkdir(parents=True, exist_ok=True)
-
-        # Save FAISS index
-        index_file = save_path / "index.faiss"
-        faiss.write_index(index, str(index_file))
-        logger.info(f"Saved FAISS index to {index_file}")
-
-        # Save ID mapping as numpy array for efficiency
-        mapping_file = save_path / "id_mapping.npz"
-        # Convert dict to two arrays: positions and product_ids
-        positions = np.array(list(id_mapping.keys()), dtype=np.int32)
-        # Product IDs are UUIDs (strings), save as object array
-        product_ids = np.array([str(pid) for pid in id_mapping.values()], dtype=object)
-        np.savez(mapping_file, positions=positions, product_ids=product_ids)
-        logger.info(f"Saved ID mapping to {mapping_file}")
-
-        # Save metadata
-        metadata_file = save_path / "metadata.npy"
-        metadata = {
-            "index_type": self.index_type,
-            "dimension": self.dimension,
-            "num_vectors": index.ntotal,
-            "created_at": datetime.utcnow().isoformat(),
-            "model_version": self.config.model_version,
-        }
-        np.save(metadata_file, metadata, allow_pickle=True)
-        logger.info(f"Saved metadata to {metadata_file}")
+        root = Path(path or self.config.storage.faiss_index_path)
+        root.mkdir(parents=True, exist_ok=True)
+        store = ArtifactStore(root, keep_versions=self.config.storage.faiss_artifact_keep_versions)
+        version = new_version()
+
+        id_map = ProductIdMap.coerce(id_mapping)
+        tuning = self.last_tuning
+        if tuning is not None and tuning.num_vectors != index.ntotal:
+            tuning = None  # Tuned for a different build
+
+        # Assemble the version in a staging directory; it is renamed into place
+        # whole, so readers never see a partially written index
+        staging_path = store.staging_dir()
+
+        try:
+            # Save FAISS index
+            faiss.write_index(index, str(staging_path / INDEX_FILE))
+
+            # Save ID map as fixed-width arrays
+            id_map.save(staging_path)
+            logger.info(f"Saved ID map ({len(id_map)} ids, {id_map.nbytes()} bytes)")
+
+            # Save raw vectors for indices that do not store them in a flat layout
+            if not self._is_flat(index):
+                if vectors is None:
+                    vectors = self._reconstruct_all(index)
+                if vectors is not None:
+                    np.save(
+                        staging_path / VECTORS_FILE,
+                        np.ascontiguousarray(vectors, dtype=self.stored_vectors_dtype(index)),
+                    )
+
+            # Save product attributes for in-memory filtering
+            if attributes is not None:
+                attributes.save(staging_path / ATTRIBUTES_FILE)
+
+            # Save metadata
+            metadata = {
+                "index_type": self.index_type,
+                "dimension": self.dimension,
+                "num_vectors": int(index.ntotal),
+                "created_at": datetime.utcnow().isoformat(),
+                "model_version": self.config.model_version,
+                "id_map_format": "uuid16" if id_map.is_uuid else "unicode",
+                "version": version,
+                **({"tuning": tuning.to_dict()} if tuning else {}),
+                **(extra_metadata or {}),
+            }
+            (staging_path / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+
+            save_path = store.publish(staging_path, version)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+        # Remove legacy artifacts so they are never mixed with the new format
+        for legacy_file in (LEGACY_ID_MAPPING_FILE, LEGACY_METADATA_FILE):
+            (root / legacy_file).unlink(missing_ok=True)
+
+        logger.info(f"Saved FAISS index ({index.ntotal} vectors) to {save_path}")
 
         return save_path
 
-    def load_index(self, path: Optional[Path] = None) -> Tuple["faiss.Index", Dict[int, int], dict]:
+    def load_index(
+        self, path: Optional[Path] = None, mmap: bool = True
+    ) -> Tuple["faiss.Index", ProductIdMap, dict]:
         """
-        Load FAISS index and ID mapping from disk.
+        Load FAISS index and ID map from disk.
+
+        With ``mmap=True`` the index and ID map are memory-mapped rather than
+        copied into process memory, so multiple workers share the page cache.
+        The current version of a versioned index root is loaded, after checking
+        the files against its manifest. Flat directories and indices saved in
+        the legacy format (id_mapping.npz, metadata.npy) are still readable.
 
         Args:
-            path: Directory to load from (default: config.storage.faiss_index_path)
+            path: Index root or version directory (default: config.storage.faiss_index_path)
+            mmap: Memory-map artifacts instead of reading them into RAM
 
         Returns:
             Tuple of (index, id_mapping, metadata)
@@ -253,43 +505,193 @@ class FAISSIndexBuilder:
         Raises:
             FAISSIndexBuilderError: If loading fails
         """
-        load_path = path or self.config.storage.faiss_index_path
-        load_path = Path(load_path)
-
+        load_path = Path(path or self.config.storage.faiss_index_path)
         if not load_path.exists():
             raise FAISSIndexBuilderError(f"Index path does not exist: {load_path}")
+        load_path = resolve_index_path(load_path)
+
+        # Catch truncated or partially synced artifacts before mapping them
+        manifest = ArtifactManifest.load(load_path)
+        if manifest is not None:
+            problems = manifest.verify(load_path)
+            if problems:
+                raise FAISSIndexBuilderError(
+                    f"Index artifacts in {load_path} are corrupt: {problems}"
+                )
 
         # Load FAISS index
-        index_file = load_path / "index.faiss"
+        index_file = load_path / INDEX_FILE
         if not index_file.exists():
             raise FAISSIndexBuilderError(f"Index file not found: {index_file}")
 
-        logger.info(f"Loading FAISS index from {index_file}")
-        index = faiss.read_index(str(index_file))
+        logger.info(f"Loading FAISS index from {index_file} (mmap={mmap})")
+        index = self._read_index(index_file, mmap=mmap)
 
-        # Load ID mapping
-        mapping_file = load_path / "id_mapping.npz"
-        if not mapping_file.exists():
-            raise FAISSIndexBuilderError(f"ID mapping file not found: {mapping_file}")
+        # Load ID map
+        if (load_path / ID_MAP_FILE).exists():
+            id_mapping = ProductIdMap.load(load_path, mmap=mmap)
+        elif (load_path / LEGACY_ID_MAPPING_FILE).exists():
+            logger.info("Loading legacy ID mapping (id_mapping.npz)")
+            id_mapping = ProductIdMap.load_legacy(load_path / LEGACY_ID_MAPPING_FILE)
+        else:
+            raise FAISSIndexBuilderError(f"ID map not found in {load_path}")
 
-        logger.info(f"Loading ID mapping from {mapping_file}")
-        mapping_data = np.load(mapping_file, allow_pickle=True)
-        positions = mapping_data["positions"]
-        product_ids = mapping_data["product_ids"]
-        # Product IDs are UUIDs (strings), keep as strings
-        id_mapping = {int(pos): str(pid) for pos, pid in zip(positions, product_ids)}
+        if len(id_mapping) != index.ntotal:
+            raise FAISSIndexBuilderError(
+                f"ID map size ({len(id_mapping)}) does not match index size ({index.ntotal})"
+            )
 
         # Load metadata
-        metadata_file = load_path / "metadata.npy"
         metadata = {}
-        if metadata_file.exists():
-            metadata = np.load(metadata_file, allow_pickle=True).item()
+        if (load_path / METADATA_FILE).exists():
+            metadata = json.loads((load_path / METADATA_FILE).read_text())
             logger.info(f"Loaded index metadata: {metadata}")
+        elif (load_path / LEGACY_METADATA_FILE).exists():
+            metadata = np.load(load_path / LEGACY_METADATA_FILE, allow_pickle=True).item()
+            logger.info(f"Loaded legacy index metadata: {metadata}")
 
         logger.info(f"Successfully loaded FAISS index: {index.ntotal} vectors")
 
         return index, id_mapping, metadata
 
+    def load_vectors(
+        self, index: "faiss.Index", path: Optional[Path] = None, mmap: bool = True
+    ) -> Optional[np.ndarray]:
+        """
+        Get raw vectors for an index without copying them.
+
+        For Flat indices this is a view over the index's own storage (which is
+        itself memory-mapped when loaded with ``mmap=True``). Other index types
+        read vectors.npy if present. The returned array is only valid while the
+        index object is alive.
+
+        Args:
+            index: Loaded FAISS index
+            path: Index root or version directory (default: config.storage.faiss_index_path)
+            mmap: Memory-map vectors.npy
+
+        Returns:
+            (ntotal, dimension) float32 array, or None if vectors are unavailable
+        """
+        if self._is_flat(index):
+            if index.ntotal == 0:
+                return np.zeros((0, index.d), dtype=np.float32)
+            flat = faiss.downcast_index(index)
+            return faiss.rev_swig_ptr(flat.get_xb(), index.ntotal * index.d).reshape(
+                index.ntotal, index.d
+            )
+
+        vectors_file = (
+            resolve_index_path(Path(path or self.config.storage.faiss_index_path)) / VECTORS_FILE
+        )
+        if not vectors_file.exists():
+            return None
+
+        vectors = np.load(vectors_file, mmap_mode="r" if mmap else None)
+        if vectors.shape != (index.ntotal, index.d):
+            logger.warning(
+                f"Ignoring {vectors_file}: shape {vectors.shape} does not match index "
+                f"({index.ntotal}, {index.d})"
+            )
+            return None
+        return vectors
+
+    def in_memory_vectors(self, index: "faiss.Index", embeddings: np.ndarray) -> np.ndarray:
+        """
+        Raw vectors for an index built in memory rather than loaded from disk.
+
+        Flat indices expose a view over their own storage; other index types
+        keep ``embeddings`` in the dtype vectors.npy would use.
+
+        Args:
+            index: Freshly built FAISS index
+            embeddings: Vectors the index was built from, in position order
+
+        Returns:
+            (ntotal, dimension) array
+        """
+        if self._is_flat(index):
+            return self.load_vectors(index)
+        return np.ascontiguousarray(embeddings, dtype=self.stored_vectors_dtype(index))
+
+    def load_attributes(
+        self, num_vectors: int, path: Optional[Path] = None
+    ) -> Optional[ProductAttributeStore]:
+        """
+        Load product attributes saved alongside an index.
+
+        Args:
+            num_vectors: Number of vectors in the loaded index
+            path: Index root or version directory (default: config.storage.faiss_index_path)
+
+        Returns:
+            ProductAttributeStore, or None if attributes are missing or stale
+        """
+        attributes_file = (
+            resolve_index_path(Path(path or self.config.storage.faiss_index_path)) / ATTRIBUTES_FILE
+        )
+        if not attributes_file.exists():
+            return None
+
+        attributes = ProductAttributeStore.load(attributes_file)
+        if len(attributes) != num_vectors:
+            logger.warning(
+                f"Ignoring {attributes_file}: {len(attributes)} rows do not match index "
+                f"({num_vectors} vectors)"
+            )
+            return None
+        return attributes
+
+    def _read_index(self, index_file: Path, mmap: bool = True) -> "faiss.Index":
+        """
+        Read a FAISS index, memory-mapping it when the index type supports it.
+
+        Flat and HNSW indices support in-place mapping (IO_FLAG_MMAP_IFC); IVF
+        inverted lists support IO_FLAG_MMAP. Falls back to a regular read.
+        """
+        if mmap:
+            mmap_flags = []
+            if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+                mmap_flags.append(faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            if hasattr(faiss, "IO_FLAG_MMAP"):
+                mmap_flags.append(faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+            for flags in mmap_flags:
+                try:
+                    return faiss.read_index(str(index_file), flags)
+                except RuntimeError as e:
+                    logger.debug(f"mmap read with flags {flags} failed: {e}")
+
+            logger.info("Index type does not support mmap, reading into memory")
+
+        return faiss.read_index(str(index_file))
+
+    @staticmethod
+    def is_compressed(index: "faiss.Index") -> bool:
+        """Whether the index only stores product-quantized codes (IVFPQ / OPQ)."""
+        ivf = faiss.try_extract_index_ivf(index)
+        return ivf is not None and isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ)
+
+    def stored_vectors_dtype(self, index: "faiss.Index") -> type:
+        """Dtype of vectors.npy for an index (float16 re-ranking store for PQ indices)."""
+        return np.float16 if self.is_compressed(index) else np.float32
+
+    @staticmethod
+    def _is_flat(index: "faiss.Index") -> bool:
+        """Whether the index stores raw vectors contiguously (IndexFlat family)."""
+        return isinstance(faiss.downcast_index(index), faiss.IndexFlat)
+
+    @staticmethod
+    def _reconstruct_all(index: "faiss.Index") -> Optional[np.ndarray]:
+        """Reconstruct all vectors from an index, if the index supports it."""
+        try:
+            if isinstance(index, faiss.IndexIVF):
+                index.make_direct_map()
+            return index.reconstruct_n(0, index.ntotal)
+        except RuntimeError as e:
+            logger.warning(f"Could not reconstruct vectors from index: {e}")
+            return None
+
     def get_index_stats(self, index: "faiss.Index") -> dict:
         """
         Get statistics about the FAISS index.
@@ -307,13 +709,22 @@ class FAISSIndexBuilder:
         }
 
         # Add index-specific stats
-        if isinstance(index, faiss.IndexIVFFlat):
+        if self.is_compressed(index):
+            ivf = faiss.downcast_index(faiss.try_extract_index_ivf(index))
+            stats["index_type"] = "OPQ" if isinstance(index, faiss.IndexPreTransform) else "IVFPQ"
+            stats["nlist"] = ivf.nlist
+            stats["nprobe"] = ivf.nprobe
+            stats["pq_m"] = ivf.pq.M
+            stats["pq_nbits"] = ivf.pq.nbits
+            stats["code_bytes_per_vector"] = ivf.code_size
+        elif isinstance(index, faiss.IndexIVFFlat):
             stats["index_type"] = "IVF"
             stats["nlist"] = index.nlist
             stats["nprobe"] = index.nprobe
         elif isinstance(index, faiss.IndexHNSWFlat):
             stats["index_type"] = "HNSW"
-            stats["M"] = index.hnsw.M
+            stats["M"] = index.hnsw.nb_neighbors(1)  # Layer 0 holds 2 * M
+            stats["efConstruction"] = index.hnsw.efConstruction
             stats["efSearch"] = index.hnsw.efSearch
         elif isinstance(index, faiss.IndexFlatL2):
             stats["index_type"] = "Flat"
@@ -5,15 +5,17 @@ Manages FAISS index lifecycle: loading from DB, building, rebuilding, and servin
 
 from __future__ import annotations
 
+import itertools
 import logging
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import numpy as np
-from sqlalchemy import text
 
 try:
     import faiss
@@ -23,10 +25,34 @@ except ImportError:
     FAISS_AVAILABLE = False
 
 from ..config import MLConfig, get_ml_config
+from .artifacts import resolve_index_path
+from .attribute_store import ProductAttributeStore
+from .build_pipeline import (
+    EmbeddingSource,
+    IndexBuildPipeline,
+    IndexBuildPipelineError,
+    NoEmbeddingsError,
+    source_for_embedding_type,
+)
+from .embedding_loader import BaseEmbeddingStream
+from .id_map import ProductIdMap
 from .index_builder import FAISSIndexBuilder, FAISSIndexBuilderError
+from .sharding import ShardedIndex
+
+if TYPE_CHECKING:
+    from .filters import ProductFilters
+    from .index_updates import IndexDelta
 
 logger = logging.getLogger(__name__)
 
+# Candidate vector elements gathered per re-ranking chunk (16 MB as float32)
+RERANK_CHUNK_ELEMENTS = 1 << 22
+
+NO_EMBEDDINGS_MESSAGE = (
+    "No product embeddings found in database. "
+    "Run embedding generation first: python scripts/ml/generate_embeddings.py"
+)
+
 
 class FAISSIndexManagerError(Exception):
     """Exception raised for index manager errors."""
@@ -34,6 +60,559 @@ class FAISSIndexManagerError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """
+    Immutable, self-consistent view of a loaded FAISS index.
+
+    A snapshot bundles the index with the ID map, raw vectors, and metadata it
+    was built with. Snapshots are never mutated after publication: a rebuild
+    creates a new snapshot and swaps it in, and an old snapshot (with its mmaps)
+    is released once the last request holding it finishes.
+
+    Incremental updates are layered on top of the main index:
+    - ``delta_index``: small IndexIDMap2 holding added/changed products, labelled
+      ``main_size + slot`` so labels never collide with main index positions
+    - ``tombstones``: boolean mask over main positions that were changed or deleted
+
+    Searches merge both layers, so callers only ever see labels and product IDs.
+
+    ``attributes`` and ``delta_attributes`` hold filterable product attributes
+    aligned to main positions and delta slots, so filters are evaluated to a
+    label mask without querying the database.
+    """
+
+    index: "faiss.Index"
+    id_mapping: ProductIdMap
+    vectors: Optional[np.ndarray] = None
+    metadata: dict = field(default_factory=dict)
+    version: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    # Incremental update layer
+    delta_index: Optional["faiss.Index"] = None
+    delta_id_mapping: Optional[ProductIdMap] = None
+    delta_vectors: Optional[np.ndarray] = None
+    tombstones: Optional[np.ndarray] = None
+
+    # Product attributes for in-memory filtering (None if not loaded)
+    attributes: Optional[ProductAttributeStore] = None
+    delta_attributes: Optional[ProductAttributeStore] = None
+
+    # Main index partitioned by an attribute (None if sharding is disabled)
+    shards: Optional[ShardedIndex] = None
+
+    # Product-quantized main index: candidates per result re-ranked against
+    # ``vectors`` (0 = results are used as returned by FAISS)
+    refine_factor: int = 0
+
+    # Last index delta stream entry reflected in this snapshot
+    delta_stream_id: Optional[str] = None
+
+    @property
+    def main_size(self) -> int:
+        """Number of vectors in the main (immutable) index."""
+        return int(self.index.ntotal)
+
+    @property
+    def delta_size(self) -> int:
+        """Number of vectors in the delta index."""
+        return len(self.delta_id_mapping) if self.delta_id_mapping is not None else 0
+
+    @property
+    def num_tombstones(self) -> int:
+        """Number of main index positions hidden by updates or deletes."""
+        return int(self.tombstones.sum()) if self.tombstones is not None else 0
+
+    @property
+    def ntotal(self) -> int:
+        """Number of live (searchable) vectors."""
+        return self.main_size - self.num_tombstones + self.delta_size
+
+    @property
+    def exhaustive(self) -> bool:
+        """Whether searches scan every vector (flat main index), so top-k is exact."""
+        index = faiss.downcast_index(self.index)
+        if isinstance(index, faiss.IndexIDMap):
+            index = faiss.downcast_index(index.index)
+        return isinstance(index, faiss.IndexFlat)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search main and delta indices and merge the results.
+
+        Args:
+            queries: Query vectors of shape (n_queries, dimension), float32
+            k: Number of neighbors per query
+
+        Returns:
+            Tuple of (distances, labels), each of shape (n_queries, min(k, ntotal)).
+            Missing results have label -1.
+        """
+        if self.delta_size == 0 and self.num_tombstones == 0:
+            return self._search_main(queries, k)
+
+        distance_parts, label_parts = [], []
+
+        live_main = self.main_size - self.num_tombstones
+        if live_main > 0:
+            params, _selector_refs = None, None
+            if self.tombstones is not None:
+                # Tombstoned vectors are skipped inside the index, not over-fetched and dropped
+                params, _selector_refs = self._selector_params(~self.tombstones, index=self.index)
+            distances, labels = self._search_main(queries, min(k, live_main), params=params)
+            distance_parts.append(distances)
+            label_parts.append(labels)
+
+        if self.delta_size > 0:
+            distances, labels = self.delta_index.search(queries, min(k, self.delta_size))
+            distance_parts.append(distances)
+            label_parts.append(labels)
+
+        if not label_parts:
+            return (
+                np.zeros((len(queries), 0), dtype=np.float32),
+                np.zeros((len(queries), 0), dtype=np.int64),
+            )
+
+        distances = np.hstack(distance_parts).astype(np.float32)
+        labels = np.hstack(label_parts)
+        distances[labels < 0] = np.inf
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        distances = np.take_along_axis(distances, order, axis=1)
+        labels = np.take_along_axis(labels, order, axis=1)
+
+        return distances, labels
+
+    def _search_main(
+        self, queries: np.ndarray, k: int, params: Optional["faiss.SearchParameters"] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the main index, re-ranking PQ candidates with the stored vectors.
+
+        Product-quantized distances are approximate, so ``k * refine_factor``
+        candidates are fetched and re-scored exactly against ``vectors`` (the
+        memory-mapped float16 store), and the best k are kept.
+        """
+        if self.refine_factor <= 1 or self.vectors is None:
+            return self.index.search(queries, k, params=params)
+
+        num_candidates = min(k * self.refine_factor, self.main_size)
+        _, candidates = self.index.search(queries, num_candidates, params=params)
+        return self._rerank(queries, candidates, k)
+
+    def _rerank(
+        self, queries: np.ndarray, candidates: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Re-score candidate main positions exactly and keep the best k per query.
+
+        Queries are processed in chunks of at most ``RERANK_CHUNK_ELEMENTS``
+        gathered vector elements, and distances are computed as
+        ``|x|^2 - 2 x.q + |q|^2``, so no (n_queries, candidates, dimension)
+        difference tensor is materialised.
+        """
+        n_queries, num_candidates = candidates.shape
+        k = min(k, num_candidates)
+        distances = np.empty((n_queries, k), dtype=np.float32)
+        labels = np.empty((n_queries, k), dtype=np.int64)
+
+        rows = max(1, RERANK_CHUNK_ELEMENTS // max(1, num_candidates * self.index.d))
+        for start in range(0, n_queries, rows):
+            chunk = slice(start, start + rows)
+            chunk_queries = queries[chunk]
+            chunk_candidates = candidates[chunk]
+
+            vectors = np.asarray(
+                self.vectors[np.maximum(chunk_candidates, 0).ravel()], dtype=np.float32
+            ).reshape(chunk_candidates.shape + (-1,))
+            chunk_distances = (
+                np.einsum("qcd,qcd->qc", vectors, vectors)
+                - 2.0 * np.einsum("qcd,qd->qc", vectors, chunk_queries)
+                + np.einsum("qd,qd->q", chunk_queries, chunk_queries)[:, None]
+            )
+            np.maximum(chunk_distances, 0.0, out=chunk_distances)
+            chunk_distances[chunk_candidates < 0] = np.inf
+
+            order = np.argsort(chunk_distances, axis=1, kind="stable")[:, :k]
+            distances[chunk] = np.take_along_axis(chunk_distances, order, axis=1)
+            labels[chunk] = np.take_along_axis(chunk_candidates, order, axis=1)
+
+        labels[~np.isfinite(distances)] = -1
+        return distances, labels
+
+    def get_product_id(self, faiss_idx: int) -> Optional[str]:
+        """Get product ID for a FAISS label (main position or delta label)."""
+        faiss_idx = int(faiss_idx)
+        if faiss_idx < self.main_size:
+            return self.id_mapping.get(faiss_idx)
+        if self.delta_id_mapping is None:
+            return None
+        return self.delta_id_mapping.get(faiss_idx - self.main_size)
+
+    def product_ids_at(self, labels: np.ndarray) -> List[str]:
+        """
+        Get product IDs for many valid FAISS labels at once.
+
+        Args:
+            labels: Non-negative FAISS labels (main positions or delta labels)
+
+        Returns:
+            List of product IDs in label order
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if self.delta_size == 0:
+            return self.id_mapping.product_ids_at(labels)
+
+        in_main = labels < self.main_size
+        product_ids = np.empty(len(labels), dtype=object)
+        product_ids[in_main] = self.id_mapping.product_ids_at(labels[in_main])
+        product_ids[~in_main] = self.delta_id_mapping.product_ids_at(
+            labels[~in_main] - self.main_size
+        )
+        return product_ids.tolist()
+
+    def get_faiss_position(self, product_id: str) -> Optional[int]:
+        """Get live FAISS label for a product ID (None if absent or deleted)."""
+        if self.delta_id_mapping is not None:
+            slot = self.delta_id_mapping.position_of(product_id)
+            if slot is not None:
+                return self.main_size + slot
+
+        position = self.id_mapping.position_of(product_id)
+        if position is not None and self.tombstones is not None and self.tombstones[position]:
+            return None
+        return position
+
+    def get_vector(self, faiss_idx: int) -> Optional[np.ndarray]:
+        """
+        Get the stored vector for a FAISS label.
+
+        Reads from the memory-mapped vector store when available and falls back
+        to ``index.reconstruct``.
+
+        Args:
+            faiss_idx: FAISS label (main position or delta label)
+
+        Returns:
+            Vector of shape (dimension,) or None if not available
+        """
+        faiss_idx = int(faiss_idx)
+        if faiss_idx < 0 or faiss_idx >= self.main_size + self.delta_size:
+            return None
+        if faiss_idx >= self.main_size:
+            return np.array(self.delta_vectors[faiss_idx - self.main_size], dtype=np.float32)
+        if self.vectors is not None:
+            return np.array(self.vectors[faiss_idx], dtype=np.float32)
+        try:
+            return self.index.reconstruct(faiss_idx)
+        except RuntimeError:
+            return None
+
+    def get_vectors(self, labels: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Gather stored vectors for many valid FAISS labels.
+
+        Args:
+            labels: Non-negative FAISS labels (main positions or delta labels)
+
+        Returns:
+            (len(labels), dimension) float32 array, or None if main vectors are unavailable
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        in_main = labels < self.main_size
+        if in_main.any() and self.vectors is None:
+            return None
+
+        vectors = np.empty((len(labels), self.index.d), dtype=np.float32)
+        if in_main.any():
+            vectors[in_main] = self.vectors[labels[in_main]]
+        if not in_main.all():
+            vectors[~in_main] = self.delta_vectors[labels[~in_main] - self.main_size]
+        return vectors
+
+    def allowed_labels(self, filters: "ProductFilters") -> Optional[np.ndarray]:
+        """
+        Evaluate filters against the in-memory attributes.
+
+        Args:
+            filters: Product filters
+
+        Returns:
+            Boolean mask over labels (main positions, then delta labels) that are
+            live and match the filters, or None if the filters need the database
+        """
+        if self.attributes is None or not self.attributes.supports(filters):
+            return None
+        if self.delta_size > 0 and self.delta_attributes is None:
+            return None
+
+        allowed = self.attributes.evaluate(filters)
+        if self.tombstones is not None:
+            allowed &= ~self.tombstones
+        if self.delta_size > 0:
+            allowed = np.concatenate([allowed, self.delta_attributes.evaluate(filters)])
+        return allowed
+
+    def label_mask(self, product_ids: List[str]) -> np.ndarray:
+        """
+        Build a mask of the live labels holding the given products.
+
+        Args:
+            product_ids: Product IDs (unknown IDs are ignored)
+
+        Returns:
+            Boolean mask over labels (main positions, then delta labels)
+        """
+        mask = np.zeros(self.main_size + self.delta_size, dtype=bool)
+
+        positions = self.id_mapping.positions_of(product_ids)
+        mask[positions[positions >= 0]] = True
+        if self.tombstones is not None:
+            mask[: self.main_size] &= ~self.tombstones
+
+        if self.delta_size > 0:
+            slots = self.delta_id_mapping.positions_of(product_ids)
+            mask[self.main_size + slots[slots >= 0]] = True
+
+        return mask
+
+    def search_filtered(
+        self,
+        queries: np.ndarray,
+        k: int,
+        allowed: np.ndarray,
+        shard_keys: Optional[List[int]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search only the labels allowed by a mask.
+
+        The main index is searched with a FAISS ``IDSelectorBitmap``, so
+        disallowed vectors are skipped inside the index instead of being
+        over-fetched and dropped. Delta vectors are scanned directly. When an
+        approximate index (IVF, HNSW) cannot reach k allowed neighbours, the
+        allowed vectors are scanned exactly, so ``min(k, allowed.sum())``
+        results are always returned.
+
+        With ``shard_keys``, only those shards are searched instead of the main
+        index; every allowed main position must belong to one of them (see
+        ``ShardedIndex.route``).
+
+        Args:
+            queries: Query vectors of shape (n_queries, dimension), float32
+            k: Number of neighbors per query
+            allowed: Boolean mask over labels (see ``allowed_labels``)
+            shard_keys: Shards holding the allowed main positions
+
+        Returns:
+            Tuple of (distances, labels), each of shape (n_queries, min(k, allowed.sum()))
+        """
+        labels = np.flatnonzero(allowed)
+        k = min(k, len(labels))
+        if k == 0:
+            return (
+                np.zeros((len(queries), 0), dtype=np.float32),
+                np.zeros((len(queries), 0), dtype=np.int64),
+            )
+
+        main_mask = allowed[: self.main_size]
+        delta_labels = labels[labels >= self.main_size]
+        distance_parts, label_parts = [], []
+
+        num_main = len(labels) - len(delta_labels)
+        if num_main > 0 and shard_keys is not None and self.shards is not None:
+            params, _selector_refs = self._selector_params(main_mask, index=self.shards.prototype)
+            main_k = min(k, num_main)
+            if self.refine_factor > 1 and self.vectors is not None:
+                # Shards are product-quantized like the main index: re-rank them too
+                _, candidates = self.shards.search(
+                    queries, min(main_k * self.refine_factor, num_main), shard_keys, params=params
+                )
+                distances, main_labels = self._rerank(queries, candidates, main_k)
+            else:
+                distances, main_labels = self.shards.search(
+                    queries, main_k, shard_keys, params=params
+                )
+            distance_parts.append(distances)
+            label_parts.append(main_labels)
+        elif num_main > 0:
+            params, _selector_refs = self._selector_params(main_mask, index=self.index)
+            distances, main_labels = self._search_main(queries, min(k, num_main), params=params)
+            distance_parts.append(distances)
+            label_parts.append(main_labels)
+
+        if len(delta_labels) > 0:
+            distances, delta_result_labels = self.brute_force_search(queries, k, delta_labels)
+            distance_parts.append(distances)
+            label_parts.append(delta_result_labels)
+
+        distances = np.hstack(distance_parts).astype(np.float32, copy=False)
+        result_labels = np.hstack(label_parts)
+        distances[result_labels < 0] = np.inf
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        distances = np.take_along_axis(distances, order, axis=1)
+        result_labels = np.take_along_axis(result_labels, order, axis=1)
+
+        # Approximate indices only visit part of the data; fall back to an exact scan
+        if (result_labels < 0).any() and self.vectors is not None:
+            return self.brute_force_search(queries, k, labels)
+
+        return distances, result_labels
+
+    def brute_force_search(
+        self, queries: np.ndarray, k: int, labels: np.ndarray, chunk_size: int = 65536
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact L2 search over the stored vectors of the given labels.
+
+        Vectors are gathered in chunks, so memory stays bounded however many
+        labels are allowed. Distances are squared L2, matching IndexFlatL2.
+
+        Args:
+            queries: Query vectors of shape (n_queries, dimension), float32
+            k: Number of neighbors per query
+            labels: Live FAISS labels to search
+            chunk_size: Labels gathered per chunk
+
+        Returns:
+            Tuple of (distances, labels), each of shape (n_queries, min(k, len(labels)))
+
+        Raises:
+            FAISSIndexManagerError: If the main index vectors are not available
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        k = min(k, len(labels))
+        best_distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        best_labels = np.full((len(queries), k), -1, dtype=np.int64)
+        if k == 0:
+            return best_distances, best_labels
+
+        query_norms = (queries**2).sum(axis=1, keepdims=True)
+
+        for start in range(0, len(labels), chunk_size):
+            chunk_labels = labels[start : start + chunk_size]
+            vectors = self.get_vectors(chunk_labels)
+            if vectors is None:
+                raise FAISSIndexManagerError("Main index vectors are not available")
+
+            distances = query_norms - 2.0 * (queries @ vectors.T) + (vectors**2).sum(axis=1)
+            np.maximum(distances, 0.0, out=distances)
+
+            candidate_distances = np.hstack([best_distances, distances])
+            candidate_labels = np.hstack(
+                [best_labels, np.broadcast_to(chunk_labels, distances.shape)]
+            )
+            top = np.argpartition(candidate_distances, k - 1, axis=1)[:, :k]
+            best_distances = np.take_along_axis(candidate_distances, top, axis=1)
+            best_labels = np.take_along_axis(candidate_labels, top, axis=1)
+
+        order = np.argsort(best_distances, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_distances, order, axis=1),
+            np.take_along_axis(best_labels, order, axis=1),
+        )
+
+    @staticmethod
+    def _selector_params(
+        main_mask: np.ndarray, index: Optional["faiss.Index"]
+    ) -> Tuple["faiss.SearchParameters", tuple]:
+        """
+        Build search parameters restricting a search to a main position mask.
+
+        The index's own nprobe / efSearch are carried over, since search
+        parameters replace them (``index=None`` for a plain selector). The second
+        value holds the bitmap and selector; callers must keep it alive until
+        the search returns.
+        """
+        bitmap = np.packbits(main_mask, bitorder="little")
+        selector = faiss.IDSelectorBitmap(len(main_mask), faiss.swig_ptr(bitmap))
+        if index is None:
+            return faiss.SearchParameters(sel=selector), (bitmap, selector)
+
+        ivf = faiss.try_extract_index_ivf(index)
+        index = faiss.downcast_index(index)
+        if ivf is not None:
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        elif isinstance(index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+
+        return params, (bitmap, selector)
+
+    def lookup_attributes(self, product_ids: List[str]) -> Tuple[ProductAttributeStore, np.ndarray]:
+        """
+        Get attributes for products by ID from the main and delta layers.
+
+        Args:
+            product_ids: Product IDs
+
+        Returns:
+            Tuple of (attributes, found), where found marks the products whose
+            attributes were known (other rows are missing/inactive)
+        """
+        attributes = ProductAttributeStore.empty(len(product_ids))
+        found = np.zeros(len(product_ids), dtype=bool)
+
+        # Delta rows are newer, so they are applied last
+        for id_mapping, source in (
+            (self.id_mapping, self.attributes),
+            (self.delta_id_mapping, self.delta_attributes),
+        ):
+            if id_mapping is None or source is None:
+                continue
+            positions = id_mapping.positions_of(product_ids)
+            rows = np.flatnonzero(positions >= 0)
+            attributes.assign(rows, source.take(positions[rows]))
+            found[rows] = True
+
+        return attributes, found
+
+    def live_attributes(self) -> Optional[ProductAttributeStore]:
+        """Attributes in ``live_vectors`` order (None if not loaded)."""
+        if self.attributes is None or (self.delta_size > 0 and self.delta_attributes is None):
+            return None
+
+        keep = (
+            np.flatnonzero(~self.tombstones)
+            if self.tombstones is not None
+            else np.arange(self.main_size)
+        )
+        parts = [self.attributes.take(keep)]
+        if self.delta_size > 0:
+            parts.append(self.delta_attributes)
+        return ProductAttributeStore.concat(parts)
+
+    def live_vectors(self) -> Tuple[np.ndarray, List[str]]:
+        """
+        Materialize all live vectors and product IDs (main minus tombstones, plus delta).
+
+        Returns:
+            Tuple of (vectors, product_ids)
+
+        Raises:
+            FAISSIndexManagerError: If the main index vectors are not available
+        """
+        if self.vectors is None:
+            raise FAISSIndexManagerError(
+                "Main index vectors are not available; rebuild the index from the database"
+            )
+
+        keep = (
+            np.flatnonzero(~self.tombstones)
+            if self.tombstones is not None
+            else np.arange(self.main_size)
+        )
+        vectors = [np.asarray(self.vectors[keep], dtype=np.float32)]
+        product_ids = self.id_mapping.product_ids_at(keep)
+
+        if self.delta_size > 0:
+            vectors.append(np.asarray(self.delta_vectors, dtype=np.float32))
+            product_ids.extend(self.delta_id_mapping.values())
+
+        return np.vstack(vectors), product_ids
+
+
 class FAISSIndexManager:
     """
     Manages FAISS index lifecycle with automatic rebuilding.
@@ -42,7 +621,11 @@ class FAISSIndexManager:
     - Loads product embeddings from PostgreSQL
     - Builds and maintains FAISS index
     - Handles index rebuilding on a schedule
-    - Provides thread-safe access to the index
+    - Provides lock-free access to the index via immutable snapshots
+
+    Readers call ``get_snapshot()`` once per request and use that snapshot for
+    every lookup. Builders construct a new snapshot off to the side and publish
+    it with a single reference assignment, so a rebuild never blocks searches.
     """
 
     _instance: Optional["FAISSIndexManager"] = None
@@ -72,18 +655,30 @@ class FAISSIndexManager:
         self.builder = FAISSIndexBuilder(self.config)
         self.db_session_factory = db_session_factory
 
-        # Index state
-        self.index: Optional[faiss.Index] = None
-        self.id_mapping: Dict[int, int] = {}  # FAISS position -> product_id
-        self.reverse_mapping: Dict[int, int] = {}  # product_id -> FAISS position
-        self.metadata: dict = {}
+        # Index state (published snapshot; replaced wholesale, never mutated)
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._versions = itertools.count(1)
 
         # Rebuild scheduling
         self.last_rebuild: Optional[datetime] = None
         self.rebuild_interval = timedelta(hours=self.config.storage.rebuild_index_interval_hours)
 
-        # Thread safety
-        self.index_lock = threading.RLock()
+        # Attribute refresh scheduling (prices, stock and listing status change
+        # far more often than embeddings)
+        self.last_attribute_refresh: Optional[datetime] = None
+        self.attribute_refresh_interval = timedelta(
+            seconds=self.config.storage.faiss_attribute_refresh_interval_seconds
+        )
+
+        # Serializes builders/loaders only; readers never take this lock
+        self.build_lock = threading.Lock()
+
+        # Background compaction of incremental updates
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        # Threads searching index shards in parallel (created with the first shards)
+        self._shard_executor: Optional[ThreadPoolExecutor] = None
 
         self._initialized = True
         logger.info("FAISS Index Manager initialized")
@@ -95,7 +690,21 @@ class FAISSIndexManager:
             cls._instance = cls(config=config, db_session_factory=db_session_factory)
         return cls._instance
 
-    def load_embeddings_from_db(self, session) -> Tuple[np.ndarray, List[int]]:
+    def stream_embeddings_from_db(self, session) -> BaseEmbeddingStream:
+        """
+        Create a stream over product text embeddings in PostgreSQL.
+
+        Args:
+            session: SQLAlchemy database session
+
+        Returns:
+            Embedding stream (not yet consumed)
+        """
+        return source_for_embedding_type("text").open(
+            session, self.builder.dimension, self.config.storage.faiss_build_chunk_size
+        )
+
+    def load_embeddings_from_db(self, session) -> Tuple[np.ndarray, List[str]]:
         """
         Load product embeddings from PostgreSQL.
 
@@ -109,49 +718,17 @@ class FAISSIndexManager:
             FAISSIndexManagerError: If loading fails
         """
         try:
-            # Query product embeddings from product_embeddings table
-            query = text(
-                """
-                SELECT product_id, embedding
-                FROM product_embeddings
-                WHERE embedding_type = 'text' AND embedding IS NOT NULL
-                ORDER BY product_id
-            """
-            )
-
-            result = session.execute(query)
-            rows = result.fetchall()
-
-            if len(rows) == 0:
-                raise FAISSIndexManagerError(
-                    "No product embeddings found in database. "
-                    "Run embedding generation first: python scripts/ml/generate_embeddings.py"
-                )
-
-            # Extract embeddings and IDs
-            product_ids = []
-            embeddings_list = []
-
-            for row in rows:
-                product_id = row[0]
-                embedding = row[1]  # This is a pgvector column, should be list/array
+            stream = self.stream_embeddings_from_db(session)
+            if stream.num_vectors == 0:
+                raise FAISSIndexManagerError(NO_EMBEDDINGS_MESSAGE)
 
-                # Convert pgvector to numpy array
-                if isinstance(embedding, str):
-                    # If stored as string, parse it
-                    embedding = np.fromstring(embedding.strip("[]"), sep=",")
-                elif isinstance(embedding, (list, tuple)):
-                    embedding = np.array(embedding)
+            stream.load()
+            logger.info(f"Loaded {len(stream.embeddings)} product embeddings from database")
 
-                product_ids.append(product_id)
-                embeddings_list.append(embedding)
-
-            embeddings = np.vstack(embeddings_list).astype(np.float32)
-
-            logger.info(f"Loaded {len(product_ids)} product embeddings from database")
-
-            return embeddings, product_ids
+            return stream.embeddings, stream.id_mapping.values()
 
+        except FAISSIndexManagerError:
+            raise
         except Exception as e:
             logger.error(f"Failed to load embeddings from database: {e}")
             raise FAISSIndexManagerError(f"Database loading failed: {e}")
@@ -160,52 +737,101 @@ class FAISSIndexManager:
         """
         Build FAISS index from database embeddings.
 
+        The new index is built and saved without blocking readers, then
+        published atomically.
+
         Args:
             session: SQLAlchemy database session
         """
         logger.info("Building FAISS index from database...")
+        self.build_index_from_source(source_for_embedding_type("text"), session=session)
 
-        # Load embeddings
-        embeddings, product_ids = self.load_embeddings_from_db(session)
-
-        # Build index
-        with self.index_lock:
-            index, id_mapping = self.builder.build_index(embeddings, product_ids)
-
-            # Create reverse mapping
-            reverse_mapping = {pid: idx for idx, pid in id_mapping.items()}
+    def build_index_from_source(self, source: EmbeddingSource, session=None) -> None:
+        """
+        Build FAISS index with the build pipeline, save it and publish it.
 
-            # Update instance state
-            self.index = index
-            self.id_mapping = id_mapping
-            self.reverse_mapping = reverse_mapping
-            self.last_rebuild = datetime.utcnow()
+        Args:
+            source: Embedding source (database table or file dump)
+            session: SQLAlchemy database session (database sources, attributes)
 
-            # Save to disk
-            self.builder.save_index(index, id_mapping)
+        Raises:
+            FAISSIndexManagerError: If the source is empty or the build fails
+        """
+        with self.build_lock:
+            try:
+                result = IndexBuildPipeline(self.config, builder=self.builder).run(
+                    source, session=session
+                )
+            except NoEmbeddingsError:
+                raise FAISSIndexManagerError(NO_EMBEDDINGS_MESSAGE)
+            except IndexBuildPipelineError as e:
+                raise FAISSIndexManagerError(str(e))
+
+            # Flat indices expose their own storage; others map the saved vectors.npy
+            vectors = self.builder.load_vectors(result.index, result.save_path)
+            if vectors is None:
+                vectors = self.builder.in_memory_vectors(result.index, result.embeddings)
+
+            snapshot = self._publish(
+                index=result.index,
+                id_mapping=result.id_mapping,
+                vectors=vectors,
+                metadata={},
+                attributes=result.attributes,
+                shards=self._build_shards(result.index, vectors, result.attributes),
+                delta_stream_id=result.delta_stream_id,
+            )
+            self.last_rebuild = snapshot.created_at
+            self.last_attribute_refresh = (
+                snapshot.created_at if result.attributes is not None else None
+            )
 
-        logger.info(f"FAISS index built successfully: {self.index.ntotal} products indexed")
+        logger.info(
+            f"FAISS index built successfully: {snapshot.ntotal} products indexed "
+            f"(snapshot v{snapshot.version})"
+        )
 
     def load_index_from_disk(self, path: Optional[Path] = None) -> None:
         """
         Load FAISS index from disk.
 
+        The index, ID map, and raw vectors are memory-mapped when the index type
+        allows it, so loading is near-instant and pages are shared across workers.
+
         Args:
             path: Directory to load from (default: config path)
         """
         logger.info("Loading FAISS index from disk...")
 
-        with self.index_lock:
+        with self.build_lock:
+            # Resolve the current artifact version once, so every file comes from it
+            path = resolve_index_path(Path(path or self.config.storage.faiss_index_path))
             index, id_mapping, metadata = self.builder.load_index(path)
+            vectors = self.builder.load_vectors(index, path)
+            attributes = (
+                self.builder.load_attributes(index.ntotal, path)
+                if self.config.storage.faiss_attribute_filtering_enabled
+                else None
+            )
 
-            # Create reverse mapping
-            reverse_mapping = {pid: idx for idx, pid in id_mapping.items()}
-
-            # Update instance state
-            self.index = index
-            self.id_mapping = id_mapping
-            self.reverse_mapping = reverse_mapping
-            self.metadata = metadata
+            # Replay deltas published since this index was built
+            delta_stream_id = metadata.get("delta_stream_id")
+            if delta_stream_id is None and "created_at" in metadata:
+                from .index_updates import stream_id_from_timestamp
+
+                delta_stream_id = stream_id_from_timestamp(metadata["created_at"])
+
+            snapshot = self._publish(
+                index=index,
+                id_mapping=id_mapping,
+                vectors=vectors,
+                metadata=metadata,
+                attributes=attributes,
+                shards=self._build_shards(index, vectors, attributes),
+                delta_stream_id=delta_stream_id,
+            )
+            # Attributes on disk are as old as the index; refresh on the next check
+            self.last_attribute_refresh = None
 
             # Check if metadata has created_at timestamp
             if "created_at" in metadata:
@@ -213,7 +839,379 @@ class FAISSIndexManager:
             else:
                 self.last_rebuild = datetime.utcnow()
 
-        logger.info(f"FAISS index loaded from disk: {self.index.ntotal} products indexed")
+        logger.info(
+            f"FAISS index loaded from disk: {snapshot.ntotal} products indexed "
+            f"(snapshot v{snapshot.version})"
+        )
+
+    def _publish(
+        self,
+        index: "faiss.Index",
+        id_mapping: ProductIdMap,
+        vectors: Optional[np.ndarray],
+        metadata: dict,
+        attributes: Optional[ProductAttributeStore] = None,
+        shards: Optional[ShardedIndex] = None,
+        **delta_state,
+    ) -> IndexSnapshot:
+        """
+        Create a new snapshot and make it visible to readers.
+
+        Publication is a single reference assignment (atomic under the GIL).
+        Requests already holding the previous snapshot keep using it until they
+        finish; it is then garbage collected along with its mmaps.
+
+        Args:
+            index: Main FAISS index
+            id_mapping: ID map for the main index
+            vectors: Raw vectors for the main index
+            metadata: Index metadata
+            attributes: Product attributes for the main index
+            shards: Main index partitioned by an attribute
+            **delta_state: Delta layer fields of IndexSnapshot
+        """
+        snapshot = IndexSnapshot(
+            index=index,
+            id_mapping=id_mapping,
+            vectors=vectors,
+            metadata=metadata,
+            attributes=attributes,
+            shards=shards,
+            refine_factor=(
+                self.config.storage.faiss_refine_factor if self.builder.is_compressed(index) else 0
+            ),
+            version=next(self._versions),
+            **delta_state,
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    def apply_delta(
+        self,
+        delta: "IndexDelta",
+        stream_id: Optional[str] = None,
+        base_version: Optional[int] = None,
+    ) -> Optional[IndexSnapshot]:
+        """
+        Apply added, changed, and deleted products to the live index.
+
+        The main index is left untouched: changed and deleted products are
+        tombstoned and current vectors go into a small delta index. The merged
+        result is published as a new snapshot. Compaction is scheduled in the
+        background once the delta grows past the configured threshold.
+
+        Args:
+            delta: Product changes to apply
+            stream_id: Delta stream entry ID this change brings the index up to
+            base_version: Snapshot version the delta was read against; if the
+                snapshot has changed since, nothing is applied
+
+        Returns:
+            New snapshot, or None if base_version no longer matches
+
+        Raises:
+            FAISSIndexManagerError: If index is not loaded
+        """
+        with self.build_lock:
+            current = self.get_snapshot()
+            if base_version is not None and current.version != base_version:
+                return None
+
+            # Current delta contents as product_id -> vector, then apply changes
+            pending: Dict[str, np.ndarray] = {}
+            if current.delta_size > 0:
+                pending = dict(zip(current.delta_id_mapping.values(), current.delta_vectors))
+            for product_id in delta.deletes:
+                pending.pop(product_id, None)
+            pending.update(delta.upserts)
+
+            # Hide main index copies of every changed or deleted product
+            tombstones = (
+                current.tombstones.copy()
+                if current.tombstones is not None
+                else np.zeros(current.main_size, dtype=bool)
+            )
+            positions = current.id_mapping.positions_of(list(delta.upserts) + delta.deletes)
+            tombstones[positions[positions >= 0]] = True
+
+            delta_state = self._build_delta(current.main_size, pending)
+            delta_state["delta_attributes"] = self._build_delta_attributes(
+                current, list(pending.keys())
+            )
+            snapshot = self._publish(
+                index=current.index,
+                id_mapping=current.id_mapping,
+                vectors=current.vectors,
+                metadata=current.metadata,
+                attributes=current.attributes,
+                shards=current.shards,
+                tombstones=tombstones if tombstones.any() else None,
+                delta_stream_id=stream_id or current.delta_stream_id,
+                **delta_state,
+            )
+
+        logger.info(
+            f"Applied index delta ({len(delta.upserts)} upserts, {len(delta.deletes)} deletes): "
+            f"delta={snapshot.delta_size}, tombstones={snapshot.num_tombstones} "
+            f"(snapshot v{snapshot.version})"
+        )
+
+        if (
+            snapshot.delta_size + snapshot.num_tombstones
+            >= self.config.storage.faiss_delta_compaction_threshold
+        ):
+            self.compact_async()
+
+        return snapshot
+
+    def _build_delta(self, main_size: int, pending: Dict[str, np.ndarray]) -> dict:
+        """Build delta layer fields (IndexIDMap2 labelled main_size + slot)."""
+        if not pending:
+            return {"delta_index": None, "delta_id_mapping": None, "delta_vectors": None}
+
+        product_ids = list(pending.keys())
+        delta_vectors = np.vstack([pending[pid] for pid in product_ids]).astype(np.float32)
+
+        delta_index = faiss.IndexIDMap2(faiss.IndexFlatL2(delta_vectors.shape[1]))
+        delta_index.add_with_ids(
+            delta_vectors, np.arange(main_size, main_size + len(product_ids), dtype=np.int64)
+        )
+
+        return {
+            "delta_index": delta_index,
+            "delta_id_mapping": ProductIdMap.from_product_ids(product_ids),
+            "delta_vectors": delta_vectors,
+        }
+
+    def _build_delta_attributes(
+        self, current: IndexSnapshot, product_ids: List[str]
+    ) -> Optional[ProductAttributeStore]:
+        """
+        Attributes for delta products, aligned to their delta slots.
+
+        Attributes of products already in the index are carried over; new
+        products are looked up in the database when a session factory is set.
+        """
+        if current.attributes is None or not product_ids:
+            return None
+
+        attributes, found = current.lookup_attributes(product_ids)
+        missing = np.flatnonzero(~found)
+        if len(missing) == 0 or self.db_session_factory is None:
+            return attributes
+
+        session = self.db_session_factory()
+        try:
+            new_attributes = ProductAttributeStore.load_from_db(
+                session, ProductIdMap.from_product_ids([product_ids[i] for i in missing])
+            )
+            attributes.assign(missing, new_attributes)
+        except Exception as e:
+            # New products stay unfilterable (never match) until the next refresh
+            logger.warning(f"Failed to load attributes for new products: {e}")
+        finally:
+            session.close()
+
+        return attributes
+
+    def _load_attributes(
+        self, session, id_mapping: ProductIdMap
+    ) -> Optional[ProductAttributeStore]:
+        """Load attributes for an ID map (None if disabled or the query fails)."""
+        if not self.config.storage.faiss_attribute_filtering_enabled:
+            return None
+
+        try:
+            return ProductAttributeStore.load_from_db(session, id_mapping)
+        except Exception as e:
+            logger.warning(f"Failed to load product attributes, filtering will use the DB: {e}")
+            return None
+
+    def _build_shards(
+        self,
+        index: "faiss.Index",
+        vectors: Optional[np.ndarray],
+        attributes: Optional[ProductAttributeStore],
+    ) -> Optional[ShardedIndex]:
+        """Partition the main index vectors (None if sharding is disabled or impossible)."""
+        storage = self.config.storage
+        shard_by = storage.faiss_shard_by
+        if not shard_by or vectors is None or attributes is None:
+            return None
+
+        if self._shard_executor is None:
+            self._shard_executor = ThreadPoolExecutor(
+                max_workers=self.config.storage.faiss_shard_search_workers,
+                thread_name_prefix="faiss-shard",
+            )
+
+        try:
+            return ShardedIndex.build(
+                vectors,
+                attributes,
+                shard_by,
+                min_shard_size=storage.faiss_shard_min_size,
+                executor=self._shard_executor,
+                main_index=index,
+                max_memory_bytes=storage.faiss_shard_max_memory_mb * 2**20,
+            )
+        except ValueError as e:
+            logger.warning(f"Index sharding disabled: {e}")
+            return None
+
+    def refresh_attributes(self, session) -> Optional[IndexSnapshot]:
+        """
+        Reload product attributes from the database and publish them.
+
+        The vectors are unchanged. The main attributes are read without holding
+        the build lock; if a rebuild swaps the main index meanwhile, the result
+        is discarded (the rebuild loaded fresh attributes itself). Shards are
+        only rebuilt when a product moved to another partition.
+
+        Args:
+            session: SQLAlchemy database session
+
+        Returns:
+            New snapshot, or None if attributes could not be refreshed
+        """
+        current = self.get_snapshot()
+        attributes = self._load_attributes(session, current.id_mapping)
+        if attributes is None:
+            return None
+
+        with self.build_lock:
+            latest = self.get_snapshot()
+            if latest.id_mapping is not current.id_mapping:
+                return None
+
+            delta_attributes = None
+            if latest.delta_size > 0:
+                delta_attributes = self._load_attributes(session, latest.delta_id_mapping)
+                if delta_attributes is None:
+                    delta_attributes = latest.delta_attributes
+
+            snapshot = self._publish(
+                index=latest.index,
+                id_mapping=latest.id_mapping,
+                vectors=latest.vectors,
+                metadata=latest.metadata,
+                attributes=attributes,
+                shards=(
+                    latest.shards
+                    if latest.shards is not None and latest.shards.matches(attributes)
+                    else self._build_shards(latest.index, latest.vectors, attributes)
+                ),
+                delta_index=latest.delta_index,
+                delta_id_mapping=latest.delta_id_mapping,
+                delta_vectors=latest.delta_vectors,
+                delta_attributes=delta_attributes,
+                tombstones=latest.tombstones,
+                delta_stream_id=latest.delta_stream_id,
+            )
+            self.last_attribute_refresh = datetime.utcnow()
+
+        logger.info(
+            f"Refreshed product attributes ({attributes.nbytes() / 1e6:.1f} MB, "
+            f"snapshot v{snapshot.version})"
+        )
+        return snapshot
+
+    def refresh_attributes_if_due(self) -> bool:
+        """
+        Refresh attributes if the refresh interval has passed.
+
+        Returns:
+            True if attributes were refreshed
+        """
+        if (
+            self._snapshot is None
+            or self.db_session_factory is None
+            or not self.config.storage.faiss_attribute_filtering_enabled
+        ):
+            return False
+        if (
+            self.last_attribute_refresh is not None
+            and datetime.utcnow() - self.last_attribute_refresh < self.attribute_refresh_interval
+        ):
+            return False
+
+        session = self.db_session_factory()
+        try:
+            refreshed = self.refresh_attributes(session) is not None
+        finally:
+            session.close()
+
+        if not refreshed:
+            # Back off for a full interval instead of retrying on every check
+            self.last_attribute_refresh = datetime.utcnow()
+        return refreshed
+
+    def compact(self) -> IndexSnapshot:
+        """
+        Fold the delta layer into a new main index.
+
+        Live vectors (main minus tombstones, plus delta) are rebuilt into a fresh
+        index in memory and published; no database read is needed. The on-disk
+        index is left to the scheduled full rebuild, and a restarted process
+        catches up by replaying the delta stream.
+
+        Returns:
+            Compacted snapshot
+
+        Raises:
+            FAISSIndexManagerError: If index is not loaded or vectors are unavailable
+        """
+        with self.build_lock:
+            current = self.get_snapshot()
+            if current.delta_size == 0 and current.num_tombstones == 0:
+                return current
+
+            start_time = datetime.utcnow()
+            embeddings, product_ids = current.live_vectors()
+            live_attributes = current.live_attributes()
+            index, id_mapping = self.builder.build_index(embeddings, product_ids)
+            # Not saved to disk, so never read vectors.npy (it belongs to the old index)
+            vectors = self.builder.in_memory_vectors(index, embeddings)
+
+            snapshot = self._publish(
+                index=index,
+                id_mapping=id_mapping,
+                vectors=vectors,
+                metadata={**current.metadata, "compacted_at": start_time.isoformat()},
+                attributes=live_attributes,
+                shards=self._build_shards(index, vectors, live_attributes),
+                delta_stream_id=current.delta_stream_id,
+            )
+
+        elapsed = (datetime.utcnow() - start_time).total_seconds()
+        logger.info(
+            f"Compacted FAISS index: {snapshot.ntotal} vectors in {elapsed:.1f}s "
+            f"(snapshot v{snapshot.version})"
+        )
+        return snapshot
+
+    def compact_async(self) -> bool:
+        """
+        Run compaction in a background thread (no-op if one is already running).
+
+        Returns:
+            True if a compaction thread was started
+        """
+        with self._compaction_lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return False
+
+            self._compaction_thread = threading.Thread(
+                target=self._compact_safely, name="faiss-compaction", daemon=True
+            )
+            self._compaction_thread.start()
+            return True
+
+    def _compact_safely(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"FAISS index compaction failed: {e}", exc_info=True)
 
     def ensure_index_loaded(self, session=None) -> None:
         """
@@ -224,7 +1222,7 @@ class FAISSIndexManager:
         Args:
             session: SQLAlchemy database session (required for DB build)
         """
-        if self.index is not None:
+        if self._snapshot is not None:
             return  # Already loaded
 
         # Try downloading from GCS if configured
@@ -242,7 +1240,12 @@ class FAISSIndexManager:
                 # Download to the configured local path
                 local_path = self.config.storage.faiss_index_path
                 success = download_faiss_index_from_gcs(
-                    bucket_name=gcs_bucket, gcs_path=gcs_path, local_path=local_path
+                    bucket_name=gcs_bucket,
+                    gcs_path=gcs_path,
+                    local_path=local_path,
+                    max_workers=self.config.storage.faiss_download_workers,
+                    chunk_size=self.config.storage.faiss_download_chunk_mb * 1024 * 1024,
+                    keep_versions=self.config.storage.faiss_artifact_keep_versions,
                 )
 
                 if success:
@@ -309,9 +1312,45 @@ class FAISSIndexManager:
         self.build_index_from_db(session)
         return True
 
+    def get_snapshot(self) -> IndexSnapshot:
+        """
+        Get the current index snapshot.
+
+        Callers should fetch the snapshot once per request and use it for all
+        lookups so that index, ID map, and vectors stay consistent across a swap.
+
+        Returns:
+            Current IndexSnapshot
+
+        Raises:
+            FAISSIndexManagerError: If index is not loaded
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise FAISSIndexManagerError("Index not loaded. Call ensure_index_loaded() first.")
+        return snapshot
+
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        """Current FAISS index (None if not loaded)."""
+        snapshot = self._snapshot
+        return snapshot.index if snapshot is not None else None
+
+    @property
+    def id_mapping(self) -> ProductIdMap:
+        """Current ID map (empty if not loaded)."""
+        snapshot = self._snapshot
+        return snapshot.id_mapping if snapshot is not None else ProductIdMap.from_product_ids([])
+
+    @property
+    def metadata(self) -> dict:
+        """Metadata of the current index."""
+        snapshot = self._snapshot
+        return snapshot.metadata if snapshot is not None else {}
+
     def get_index(self) -> faiss.Index:
         """
-        Get the FAISS index (thread-safe).
+        Get the FAISS index.
 
         Returns:
             Current FAISS index
@@ -319,18 +1358,18 @@ class FAISSIndexManager:
         Raises:
             FAISSIndexManagerError: If index is not loaded
         """
-        if self.index is None:
-            raise FAISSIndexManagerError("Index not loaded. Call ensure_index_loaded() first.")
+        return self.get_snapshot().index
 
-        with self.index_lock:
-            return self.index
+    def get_id_mapping(self) -> ProductIdMap:
+        """
+        Get ID mapping (FAISS position -> product_id).
 
-    def get_id_mapping(self) -> Dict[int, int]:
-        """Get ID mapping (FAISS position -> product_id)."""
-        with self.index_lock:
-            return self.id_mapping.copy()
+        The map is immutable and replaced wholesale on rebuild, so it is returned
+        without copying.
+        """
+        return self.id_mapping
 
-    def get_product_id(self, faiss_idx: int) -> Optional[int]:
+    def get_product_id(self, faiss_idx: int) -> Optional[str]:
         """
         Get product ID from FAISS index position.
 
@@ -340,10 +1379,10 @@ class FAISSIndexManager:
         Returns:
             Product ID or None if not found
         """
-        with self.index_lock:
-            return self.id_mapping.get(faiss_idx)
+        snapshot = self._snapshot
+        return snapshot.get_product_id(faiss_idx) if snapshot is not None else None
 
-    def get_faiss_position(self, product_id: int) -> Optional[int]:
+    def get_faiss_position(self, product_id: str) -> Optional[int]:
         """
         Get FAISS position from product ID.
 
@@ -353,8 +1392,21 @@ class FAISSIndexManager:
         Returns:
             FAISS index position or None if not found
         """
-        with self.index_lock:
-            return self.reverse_mapping.get(product_id)
+        snapshot = self._snapshot
+        return snapshot.get_faiss_position(product_id) if snapshot is not None else None
+
+    def get_vector(self, faiss_idx: int) -> Optional[np.ndarray]:
+        """
+        Get the stored vector for a FAISS position.
+
+        Args:
+            faiss_idx: Position in FAISS index
+
+        Returns:
+            Vector of shape (dimension,) or None if not available
+        """
+        snapshot = self._snapshot
+        return snapshot.get_vector(faiss_idx) if snapshot is not None else None
 
     def get_stats(self) -> dict:
         """
@@ -363,35 +1415,46 @@ class FAISSIndexManager:
         Returns:
             Dictionary with index stats
         """
-        with self.index_lock:
-            if self.index is None:
-                return {"status": "not_loaded"}
-
-            stats = self.builder.get_index_stats(self.index)
-            stats.update(
-                {
-                    "status": "loaded",
-                    "num_products": len(self.id_mapping),
-                    "last_rebuild": self.last_rebuild.isoformat() if self.last_rebuild else None,
-                    "rebuild_interval_hours": self.rebuild_interval.total_seconds() / 3600,
-                    "next_rebuild": (
-                        (self.last_rebuild + self.rebuild_interval).isoformat()
-                        if self.last_rebuild
-                        else None
-                    ),
-                }
-            )
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"status": "not_loaded"}
+
+        stats = self.builder.get_index_stats(snapshot.index)
+        stats.update(
+            {
+                "status": "loaded",
+                "num_products": len(snapshot.id_mapping),
+                "snapshot_version": snapshot.version,
+                "num_live_vectors": snapshot.ntotal,
+                "delta_size": snapshot.delta_size,
+                "num_tombstones": snapshot.num_tombstones,
+                "delta_stream_id": snapshot.delta_stream_id,
+                "attributes_loaded": snapshot.attributes is not None,
+                "shards": snapshot.shards.get_stats() if snapshot.shards is not None else None,
+                "attributes_bytes": (
+                    snapshot.attributes.nbytes() if snapshot.attributes is not None else 0
+                ),
+                "last_attribute_refresh": (
+                    self.last_attribute_refresh.isoformat() if self.last_attribute_refresh else None
+                ),
+                "last_rebuild": self.last_rebuild.isoformat() if self.last_rebuild else None,
+                "rebuild_interval_hours": self.rebuild_interval.total_seconds() / 3600,
+                "next_rebuild": (
+                    (self.last_rebuild + self.rebuild_interval).isoformat()
+                    if self.last_rebuild
+                    else None
+                ),
+            }
+        )
 
-            return stats
+        return stats
 
     def reset(self) -> None:
         """Reset the manager (useful for testing)."""
-        with self.index_lock:
-            self.index = None
-            self.id_mapping = {}
-            self.reverse_mapping = {}
-            self.metadata = {}
+        with self.build_lock:
+            self._snapshot = None
             self.last_rebuild = None
+            self.last_attribute_refresh = None
 
         logger.info("FAISS Index Manager reset")
 
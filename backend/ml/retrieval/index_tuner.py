@@ -0,0 +1,221 @@
+"""
+FAISS Index Tuner
+Chooses IVF/HNSW build and search parameters from catalog size and a recall target.
+"""
+
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import faiss
+
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+from ..config import MLConfig, get_ml_config
+
+logger = logging.getLogger(__name__)
+
+# FAISS wants ~39 training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+
+# HNSW graph degree by catalog size (upper bound of the tier, M)
+_HNSW_M_TIERS = [(100_000, 16), (1_000_000, 32), (math.inf, 48)]
+
+# Search-time parameter sweeps (smallest value reaching the target wins)
+_EF_SEARCH_SWEEP = [16, 32, 64, 128, 256, 512, 1024]
+
+
+@dataclass
+class TuningResult:
+    """Parameters chosen for one index build and the recall they reached."""
+
+    index_type: str
+    num_vectors: int
+    params: Dict[str, int] = field(default_factory=dict)
+    target_recall: Optional[float] = None
+    recall: Optional[float] = None
+    k: Optional[int] = None
+    num_queries: int = 0
+    latency_ms: Optional[float] = None
+    sweep: List[Dict[str, float]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for metadata.json."""
+        return asdict(self)
+
+
+class IndexTuner:
+    """
+    Picks FAISS index parameters for the catalog being indexed.
+
+    Build-time parameters (``nlist`` for IVF, ``M``/``efConstruction`` for
+    HNSW) follow from the number of vectors. Search-time parameters
+    (``nprobe``/``efSearch``) are measured: a held-out sample of catalog
+    vectors is searched against an exact brute-force ground truth, and the cheapest
+    setting reaching ``faiss_tune_target_recall`` at ``faiss_tune_k`` is kept.
+
+    Each query's own vector is excluded from both result lists, so the sample
+    behaves like unseen queries even though it is part of the index.
+
+    For product-quantized indices recall is measured on the candidate list
+    (``k * faiss_refine_factor``) that the exact re-ranking stage receives.
+    """
+
+    def __init__(self, config: Optional[MLConfig] = None):
+        """
+        Initialize index tuner.
+
+        Args:
+            config: ML configuration object
+        """
+        self.config = config or get_ml_config()
+        storage = self.config.storage
+        self.enabled = storage.faiss_auto_tune
+        self.target_recall = storage.faiss_tune_target_recall
+        self.k = storage.faiss_tune_k
+        self.num_queries = storage.faiss_tune_num_queries
+
+    def build_params(self, index_type: str, num_vectors: int) -> Dict[str, int]:
+        """
+        Choose build-time parameters from the catalog size.
+
+        Args:
+            index_type: 'IVF', 'HNSW', 'IVFPQ' or 'OPQ'
+            num_vectors: Number of vectors the index will hold
+
+        Returns:
+            Keyword arguments for the builder's index constructor (empty for Flat)
+        """
+        if index_type in ("IVF", "IVFPQ", "OPQ"):
+            # nlist ~ 4 * sqrt(N), with enough training points per centroid
+            nlist = int(4 * math.sqrt(num_vectors))
+            nlist = max(1, min(nlist, num_vectors // MIN_POINTS_PER_CENTROID))
+            if index_type != "IVF":
+                nlist = min(nlist, self.config.storage.faiss_ivf_nlist)
+            return {"nlist": nlist}
+
+        if index_type == "HNSW":
+            tier = next(i for i, (limit, _) in enumerate(_HNSW_M_TIERS) if num_vectors < limit)
+            # Higher recall targets need a denser graph
+            if self.target_recall >= 0.98:
+                tier = min(tier + 1, len(_HNSW_M_TIERS) - 1)
+            M = _HNSW_M_TIERS[tier][1]
+            return {"M": M, "ef_construction": max(40, 4 * M)}
+
+        return {}
+
+    def tune(
+        self,
+        index: "faiss.Index",
+        embeddings: np.ndarray,
+        index_type: str,
+        build_params: Optional[Dict[str, int]] = None,
+    ) -> Optional[TuningResult]:
+        """
+        Set the cheapest search parameters reaching the recall target on index.
+
+        Args:
+            index: Trained and populated index (positions match embeddings)
+            embeddings: Indexed vectors, float32
+            index_type: Index type name
+            build_params: Build-time parameters, recorded in the result
+
+        Returns:
+            TuningResult, or None for index types without search parameters
+        """
+        ivf = faiss.try_extract_index_ivf(index)
+        hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+        if ivf is None and hnsw is None:
+            return None
+
+        num_vectors = len(embeddings)
+        compressed = ivf is not None and isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ)
+        k = min(self.k, num_vectors - 1)
+        depth = k * self.config.storage.faiss_refine_factor if compressed else k
+        depth = min(depth, num_vectors - 1)
+
+        result = TuningResult(
+            index_type=index_type,
+            num_vectors=num_vectors,
+            params=dict(build_params or {}),
+            target_recall=self.target_recall,
+            k=k,
+        )
+        if k < 1:
+            return result
+
+        # Held-out query sample and exact ground truth
+        rng = np.random.default_rng(0)
+        sample = rng.choice(num_vectors, min(self.num_queries, num_vectors), replace=False)
+        queries = np.ascontiguousarray(embeddings[sample], dtype=np.float32)
+        result.num_queries = len(sample)
+
+        # Brute-force scan of the loaded matrix (no copy into a second Flat index)
+        _, exact_labels = faiss.knn(
+            queries, np.ascontiguousarray(embeddings, dtype=np.float32), k + 1
+        )
+        truth = self._drop_self(exact_labels, sample, k)
+
+        if ivf is not None:
+            name, values = "nprobe", self._nprobe_sweep(ivf.nlist)
+        else:
+            name, values = "efSearch", [v for v in _EF_SEARCH_SWEEP if v >= depth + 1]
+            values = values or [depth + 1]
+
+        for value in values:
+            if ivf is not None:
+                ivf.nprobe = value
+            else:
+                hnsw.efSearch = value
+
+            start = time.perf_counter()
+            labels = index.search(queries, depth + 1)[1]
+            latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            recall = self._recall(self._drop_self(labels, sample, depth), truth)
+            result.sweep.append({name: value, "recall": recall, "latency_ms": latency_ms})
+            result.params[name] = value
+            result.recall, result.latency_ms = recall, latency_ms
+            if recall >= self.target_recall:
+                break
+        else:
+            logger.warning(
+                f"{index_type} index reached recall@{k}={result.recall:.3f} at "
+                f"{name}={result.params[name]}, below target {self.target_recall}"
+            )
+
+        logger.info(
+            f"Tuned {index_type} index for {num_vectors} vectors: {result.params} "
+            f"(recall@{k}={result.recall:.3f}, {result.latency_ms:.3f} ms/query)"
+        )
+        return result
+
+    @staticmethod
+    def _nprobe_sweep(nlist: int) -> List[int]:
+        """Powers of two up to nlist (nlist itself is an exhaustive scan)."""
+        values = [2**i for i in range(int(math.log2(max(nlist, 1))) + 1)]
+        return values if values[-1] == nlist else values + [nlist]
+
+    @staticmethod
+    def _drop_self(labels: np.ndarray, sample: np.ndarray, depth: int) -> np.ndarray:
+        """Remove each query's own position from its results, keeping depth labels."""
+        rows = []
+        for row, own in zip(labels, sample):
+            row = row[(row != own) & (row >= 0)]
+            rows.append(np.pad(row[:depth], (0, max(0, depth - len(row))), constant_values=-1))
+        return np.array(rows)
+
+    @staticmethod
+    def _recall(labels: np.ndarray, truth: np.ndarray) -> float:
+        """Fraction of true neighbors found in labels."""
+        hits = sum(
+            len(set(row.tolist()) & set(expected.tolist())) for row, expected in zip(labels, truth)
+        )
+        return hits / truth.size
@@ -0,0 +1,305 @@
+"""
+Incremental Index Updates
+Propagates product embedding changes to live FAISS indices via a Redis stream.
+
+Producers (e.g. the embedding generation task) append one stream entry per
+changed product. Each API process runs an IndexDeltaConsumer that reads the
+stream from the position recorded in its current index snapshot and applies the
+changes as a delta, so new products become searchable within seconds instead
+of waiting for the next full rebuild.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..caching.redis_cache import get_redis_cache
+from ..config import MLConfig, get_ml_config
+
+if TYPE_CHECKING:
+    from .index_manager import FAISSIndexManager
+
+logger = logging.getLogger(__name__)
+
+OP_UPSERT = b"upsert"
+OP_DELETE = b"delete"
+
+
+@dataclass
+class IndexDelta:
+    """Batch of product vector changes to apply to a live index."""
+
+    upserts: Dict[str, np.ndarray] = field(default_factory=dict)
+    deletes: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.upserts) + len(self.deletes)
+
+    def add_upsert(self, product_id: str, vector: np.ndarray) -> None:
+        """Record an added or changed product (later changes win)."""
+        product_id = str(product_id)
+        if product_id in self.deletes:
+            self.deletes.remove(product_id)
+        self.upserts[product_id] = np.asarray(vector, dtype=np.float32)
+
+    def add_delete(self, product_id: str) -> None:
+        """Record a deleted product."""
+        product_id = str(product_id)
+        self.upserts.pop(product_id, None)
+        if product_id not in self.deletes:
+            self.deletes.append(product_id)
+
+
+def publish_index_delta(
+    upserts: Optional[Dict[str, np.ndarray]] = None,
+    deletes: Optional[Iterable[str]] = None,
+    config: Optional[MLConfig] = None,
+) -> int:
+    """
+    Append product changes to the index delta stream.
+
+    Vectors are stored as raw little-endian float32 bytes.
+
+    Args:
+        upserts: Mapping of product_id -> embedding for added/changed products
+        deletes: Product IDs to remove from the index
+        config: ML configuration
+
+    Returns:
+        Number of stream entries written (0 if Redis is unavailable)
+    """
+    config = config or get_ml_config()
+    upserts = upserts or {}
+    deletes = list(deletes or [])
+
+    if not upserts and not deletes:
+        return 0
+
+    try:
+        client = get_redis_cache(config)._get_client()
+        pipe = client.pipeline(transaction=False)
+
+        for product_id, vector in upserts.items():
+            pipe.xadd(
+                config.storage.faiss_delta_stream_key,
+                {
+                    "op": OP_UPSERT,
+                    "product_id": str(product_id),
+                    "vector": np.asarray(vector, dtype="<f4").tobytes(),
+                },
+                maxlen=config.storage.faiss_delta_stream_maxlen,
+                approximate=True,
+            )
+
+        for product_id in deletes:
+            pipe.xadd(
+                config.storage.faiss_delta_stream_key,
+                {"op": OP_DELETE, "product_id": str(product_id)},
+                maxlen=config.storage.faiss_delta_stream_maxlen,
+                approximate=True,
+            )
+
+        pipe.execute()
+
+    except Exception as e:
+        logger.error(f"Failed to publish index delta: {e}")
+        return 0
+
+    logger.info(f"Published index delta: {len(upserts)} upserts, {len(deletes)} deletes")
+    return len(upserts) + len(deletes)
+
+
+def get_delta_stream_head(config: Optional[MLConfig] = None) -> Optional[str]:
+    """
+    Get the ID of the newest entry in the index delta stream.
+
+    Record this before reading embeddings for a full rebuild: entries after it
+    are replayed onto the rebuilt index (replays are idempotent).
+
+    Args:
+        config: ML configuration
+
+    Returns:
+        Stream entry ID, "0-0" for an empty stream, or None if Redis is unavailable
+    """
+    config = config or get_ml_config()
+
+    try:
+        client = get_redis_cache(config)._get_client()
+        entries = client.xrevrange(config.storage.faiss_delta_stream_key, count=1)
+    except Exception as e:
+        logger.warning(f"Could not read index delta stream head: {e}")
+        return None
+
+    if not entries:
+        return "0-0"
+    entry_id = entries[0][0]
+    return entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)
+
+
+def stream_id_from_timestamp(created_at: str) -> str:
+    """
+    Convert an ISO timestamp into the first stream ID at or after it.
+
+    Index metadata timestamps are naive UTC (datetime.utcnow()), so naive values
+    are read as UTC rather than local time; stream IDs are Unix milliseconds.
+    """
+    timestamp = datetime.fromisoformat(created_at)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    millis = int(timestamp.timestamp() * 1000)
+    return f"{millis}-0"
+
+
+def decode_delta_entries(
+    entries: List[Tuple[bytes, Dict[bytes, bytes]]], dimension: Optional[int] = None
+) -> Tuple[IndexDelta, int]:
+    """
+    Decode raw stream entries into an IndexDelta.
+
+    Entries that cannot be applied (missing fields, undecodable vectors, or
+    vectors of the wrong dimension) are logged and skipped, so one bad entry
+    cannot stall every consumer on the stream.
+
+    Args:
+        entries: Entries as returned by XREAD (id, fields)
+        dimension: Expected vector dimension (not checked if None)
+
+    Returns:
+        Tuple of (IndexDelta with entries applied in stream order, entries skipped)
+    """
+    delta = IndexDelta()
+    skipped = 0
+
+    for entry_id, fields in entries:
+        try:
+            product_id = fields[b"product_id"].decode()
+            if fields[b"op"] == OP_DELETE:
+                delta.add_delete(product_id)
+                continue
+
+            vector = np.frombuffer(fields[b"vector"], dtype="<f4")
+            if dimension is not None and len(vector) != dimension:
+                raise ValueError(f"vector dimension {len(vector)}, expected {dimension}")
+            delta.add_upsert(product_id, vector)
+
+        except (KeyError, ValueError, AttributeError) as e:
+            skipped += 1
+            logger.error(f"Skipping unusable index delta entry {entry_id!r}: {e}")
+
+    return delta, skipped
+
+
+class IndexDeltaConsumer:
+    """
+    Background thread applying index delta stream entries to a FAISSIndexManager.
+
+    The read position is taken from the current snapshot on every poll, so a
+    snapshot reloaded from disk automatically replays the entries it is missing.
+    Between polls it also refreshes the in-memory product attributes once they
+    are older than ``faiss_attribute_refresh_interval_seconds``.
+    """
+
+    def __init__(self, index_manager: "FAISSIndexManager", config: Optional[MLConfig] = None):
+        """
+        Initialize delta consumer.
+
+        Args:
+            index_manager: Index manager to apply deltas to
+            config: ML configuration
+        """
+        self.index_manager = index_manager
+        self.config = config or get_ml_config()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.entries_applied = 0
+        self.entries_skipped = 0
+        self.last_applied_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        """Start consuming in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="faiss-delta-consumer", daemon=True)
+        self._thread.start()
+        logger.info("Index delta consumer started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the consumer thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info("Index delta consumer stopped")
+
+    def poll_once(self) -> int:
+        """
+        Read and apply one batch of stream entries.
+
+        Returns:
+            Number of entries read (including skipped ones)
+        """
+        snapshot = self.index_manager._snapshot
+        if snapshot is None:
+            self._stop_event.wait(1.0)
+            return 0
+
+        storage = self.config.storage
+        client = get_redis_cache(self.config)._get_client()
+        # Without a recorded position, replay the whole (capped) stream: replays are
+        # idempotent, while "$" would drop entries published since the build
+        response = client.xread(
+            {storage.faiss_delta_stream_key: snapshot.delta_stream_id or "0-0"},
+            count=storage.faiss_delta_batch_size,
+            block=storage.faiss_delta_poll_block_ms,
+        )
+        if not response:
+            return 0
+
+        entries = response[0][1]
+        last_id = entries[-1][0]
+        last_id = last_id.decode() if isinstance(last_id, bytes) else str(last_id)
+
+        # Skipped entries are still consumed: the position moves past them
+        delta, skipped = decode_delta_entries(entries, dimension=snapshot.index.d)
+        applied = self.index_manager.apply_delta(
+            delta,
+            stream_id=last_id,
+            base_version=snapshot.version,
+        )
+        if applied is None:
+            # Snapshot was swapped while reading; re-read from its position
+            return 0
+
+        self.entries_applied += len(entries) - skipped
+        self.entries_skipped += skipped
+        self.last_applied_at = datetime.utcnow()
+        return len(entries)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.poll_once()
+                # Prices and stock change without new vectors; keep filters current
+                self.index_manager.refresh_attributes_if_due()
+            except Exception as e:
+                logger.error(f"Index delta consumer error: {e}")
+                self._stop_event.wait(5.0)
+
+    def get_stats(self) -> dict:
+        """Get consumer statistics."""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "entries_applied": self.entries_applied,
+            "entries_skipped": self.entries_skipped,
+            "last_applied_at": self.last_applied_at.isoformat() if self.last_applied_at else None,
+        }
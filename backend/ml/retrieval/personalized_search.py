@@ -129,7 +129,7 @@ class PersonalizedSearch:
             )
 
         # Apply heuristic ranking if enabled
-        if use_ranking and len(results.results) > 0:
+        if use_ranking and len(results) > 0:
             results = self._apply_ranking(
                 results=results,
                 user_context=user_context,
@@ -138,8 +138,7 @@ class PersonalizedSearch:
             )
 
             # Trim to requested k
-            results.results = results.results[:k]
-            results.total_found = len(results.results)
+            results.truncate(k)
 
         logger.info(
             f"Generated {results.total_found} recommendations for "
@@ -242,19 +241,16 @@ class PersonalizedSearch:
             )
 
         # Remove the query product from results
-        results.results = [r for r in results.results if r.product_id != product_id]
+        results.exclude(product_id)
 
         # Apply ranking
-        if use_ranking and len(results.results) > 0:
+        if use_ranking and len(results) > 0:
             results = self._apply_ranking(
                 results=results, user_context=user_context, session=session
             )
 
-        # Trim to k and re-rank
-        results.results = results.results[:k]
-        results.total_found = len(results.results)
-        for i, result in enumerate(results.results):
-            result.rank = i
+        # Trim to k (ranks follow row order)
+        results.truncate(k)
 
         return results
 
@@ -405,42 +405,36 @@ class HeuristicRanker:
         Returns:
             Re-ranked SearchResults
         """
-        if len(search_results.results) == 0:
+        if len(search_results) == 0:
             return search_results
 
-        # Calculate combined scores
-        for result in search_results.results:
-            pid = result.product_id
-
-            # Get individual signal scores
-            similarity = result.similarity
-            popularity = popularity_scores.get(pid, 0.5) if popularity_scores else 0.5
-            price_affinity = price_affinity_scores.get(pid, 0.5) if price_affinity_scores else 0.5
-            brand_match = brand_match_scores.get(pid, 0.5) if brand_match_scores else 0.5
-
-            # Calculate weighted score
-            final_score = (
-                self.config.similarity_weight * similarity
-                + self.config.popularity_weight * popularity
-                + self.config.price_affinity_weight * price_affinity
-                + self.config.brand_match_weight * brand_match
-            )
+        product_ids = search_results.product_ids
+
+        # Gather individual signal scores as columns
+        similarity = search_results.similarities
+        popularity = _score_column(product_ids, popularity_scores)
+        price_affinity = _score_column(product_ids, price_affinity_scores)
+        brand_match = _score_column(product_ids, brand_match_scores)
 
-            # Store scores in metadata
-            result.metadata["final_score"] = final_score
-            result.metadata["similarity_score"] = similarity
-            result.metadata["popularity_score"] = popularity
-            result.metadata["price_affinity_score"] = price_affinity
-            result.metadata["brand_match_score"] = brand_match
+        # Calculate weighted score
+        final_score = (
+            self.config.similarity_weight * similarity
+            + self.config.popularity_weight * popularity
+            + self.config.price_affinity_weight * price_affinity
+            + self.config.brand_match_weight * brand_match
+        )
 
-        # Sort by final score (descending)
-        search_results.results.sort(key=lambda r: r.metadata["final_score"], reverse=True)
+        # Store scores as result columns
+        search_results.set_score("final_score", final_score)
+        search_results.set_score("similarity_score", similarity)
+        search_results.set_score("popularity_score", popularity)
+        search_results.set_score("price_affinity_score", price_affinity)
+        search_results.set_score("brand_match_score", brand_match)
 
-        # Update ranks
-        for i, result in enumerate(search_results.results):
-            result.rank = i
+        # Sort by final score (descending); ranks follow row order
+        search_results.sort_by("final_score")
 
-        logger.debug(f"Re-ranked {len(search_results.results)} results")
+        logger.debug(f"Re-ranked {len(search_results)} results")
 
         return search_results
 
@@ -466,3 +460,14 @@ class HeuristicRanker:
         explanation += f"    Brand Match:    {result.metadata['brand_match_score']:.4f} × {self.config.brand_match_weight} = {result.metadata['brand_match_score'] * self.config.brand_match_weight:.4f}\n"
 
         return explanation
+
+
+def _score_column(
+    product_ids: np.ndarray, scores: Optional[Dict[Any, float]], default: float = 0.5
+) -> np.ndarray:
+    """Look up per-product scores as a float32 column (missing products get default)."""
+    if not scores:
+        return np.full(len(product_ids), default, dtype=np.float32)
+    return np.fromiter(
+        (scores.get(pid, default) for pid in product_ids), dtype=np.float32, count=len(product_ids)
+    )
@@ -0,0 +1,290 @@
+"""
+Index Sharding
+Partitions the main index by a product attribute so scoped queries only search
+the shards that can hold matching products.
+"""
+
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+from .attribute_store import ProductAttributeStore
+from .filters import FilterOperator, ProductFilters
+
+logger = logging.getLogger(__name__)
+
+# Attributes an index can be partitioned by
+SHARD_ATTRIBUTES = ("category_id", "merchant_id", "gender")
+
+# Key of the shard collecting partition values too small for their own shard
+OTHER_SHARD = -1
+
+
+@dataclass(frozen=True)
+class IndexShard:
+    """One partition of the main index (labelled with main index positions)."""
+
+    key: int
+    index: "faiss.Index"
+    size: int
+
+
+class ShardedIndex:
+    """
+    Main index vectors partitioned by one product attribute.
+
+    Every partition value with at least ``min_shard_size`` products gets its own
+    shard; smaller values share the ``OTHER_SHARD``. Shards are labelled with
+    main index positions, so their results plug straight into the snapshot's
+    tombstones, attributes and ID map.
+
+    Shards hold a second copy of every main vector, in the main index's family:
+    for IVF indices (IVF, IVFPQ, OPQ) each shard is an empty clone of the
+    trained main index, so shards cost the main index's code size (a few bytes
+    per vector for PQ) and need no training. Other indices get exact flat
+    shards (IndexIDMap2 over IndexFlatL2, ``4 * d + 8`` bytes per vector).
+    ``build`` refuses to exceed ``max_memory_bytes``.
+
+    Queries whose filters pin the partition attribute (``category_ids``,
+    ``merchant_ids`` or ``gender``) are routed to the matching shards only.
+    Those are searched in parallel (FAISS releases the GIL) and merged into a
+    single top-k. Other queries keep using the main index.
+    """
+
+    def __init__(
+        self,
+        attribute: str,
+        shards: Dict[int, IndexShard],
+        partition_keys: np.ndarray,
+        executor: Optional[Executor] = None,
+        prototype: Optional["faiss.Index"] = None,
+    ):
+        """
+        Initialize sharded index.
+
+        Args:
+            attribute: Attribute the index is partitioned by
+            shards: Shard key -> shard
+            partition_keys: Encoded attribute value per main position
+            executor: Thread pool for searching shards in parallel
+            prototype: Empty index of the shards' family (for search parameters)
+        """
+        self.attribute = attribute
+        self.shards = shards
+        self.partition_keys = partition_keys
+        self.executor = executor
+        self.prototype = prototype
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        attributes: ProductAttributeStore,
+        attribute: str,
+        min_shard_size: int = 1000,
+        executor: Optional[Executor] = None,
+        main_index: Optional["faiss.Index"] = None,
+        max_memory_bytes: Optional[int] = None,
+    ) -> "ShardedIndex":
+        """
+        Build shards from main index vectors.
+
+        Args:
+            vectors: Main index vectors in position order
+            attributes: Product attributes aligned to the main index
+            attribute: Attribute to partition by (see SHARD_ATTRIBUTES)
+            min_shard_size: Minimum products for a partition value to get its own shard
+            executor: Thread pool for searching shards in parallel
+            main_index: Trained main index; IVF indices are cloned for the shards
+            max_memory_bytes: Upper bound on the memory the shards may add
+
+        Returns:
+            ShardedIndex
+
+        Raises:
+            ValueError: If the attribute cannot be sharded by, or the shards
+                would exceed max_memory_bytes
+        """
+        if attribute not in SHARD_ATTRIBUTES:
+            raise ValueError(f"Cannot shard by {attribute}; expected one of {SHARD_ATTRIBUTES}")
+
+        prototype = _empty_shard_index(main_index, vectors.shape[1])
+        memory_bytes = len(vectors) * _bytes_per_vector(prototype)
+        if max_memory_bytes is not None and memory_bytes > max_memory_bytes:
+            raise ValueError(
+                f"Shards would use {memory_bytes / 2**20:.0f} MB, "
+                f"above the {max_memory_bytes / 2**20:.0f} MB limit"
+            )
+
+        column = attributes.columns[attribute].astype(np.int64)
+        values, counts = np.unique(column, return_counts=True)
+        large = set(values[counts >= min_shard_size].tolist())
+        partition_keys = np.where(np.isin(column, list(large)), column, OTHER_SHARD)
+
+        # Group positions by shard key with one sort
+        order = np.argsort(partition_keys, kind="stable")
+        keys, starts = np.unique(partition_keys[order], return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+
+        shards = {}
+        for key, start, end in zip(keys.tolist(), starts, bounds):
+            positions = order[start:end]
+            index = faiss.clone_index(prototype)
+            index.add_with_ids(np.asarray(vectors[positions], dtype=np.float32), positions)
+            shards[key] = IndexShard(key=key, index=index, size=len(positions))
+
+        logger.info(
+            f"Built {len(shards)} index shards by {attribute} "
+            f"(largest {max((s.size for s in shards.values()), default=0)} vectors, "
+            f"~{memory_bytes / 2**20:.0f} MB)"
+        )
+        return cls(attribute, shards, partition_keys, executor=executor, prototype=prototype)
+
+    def matches(self, attributes: ProductAttributeStore) -> bool:
+        """Check whether the shards still agree with (refreshed) attributes."""
+        column = attributes.columns[self.attribute].astype(np.int64)
+        if len(column) != len(self.partition_keys):
+            return False
+        in_own_shard = self.partition_keys != OTHER_SHARD
+        return bool(
+            np.array_equal(column[in_own_shard], self.partition_keys[in_own_shard])
+            and not np.isin(column[~in_own_shard], list(self.shards)).any()
+        )
+
+    def route(self, filters: ProductFilters) -> Optional[List[int]]:
+        """
+        Get the shards that can hold products matching filters.
+
+        Args:
+            filters: Product filters
+
+        Returns:
+            Shard keys, or None if the filters do not pin the partition attribute
+        """
+        for product_filter in filters.build_filters():
+            if product_filter.field != self.attribute:
+                continue
+            if product_filter.operator == FilterOperator.IN:
+                values = product_filter.value
+            elif product_filter.operator == FilterOperator.EQ:
+                values = [product_filter.value]
+            else:
+                continue
+
+            encoded = ProductAttributeStore.encode_value(self.attribute, list(values))
+            return sorted(
+                {value if value in self.shards else OTHER_SHARD for value in encoded}
+                & set(self.shards)
+            )
+
+        return None
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        keys: List[int],
+        params: Optional["faiss.SearchParameters"] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the given shards and merge their results.
+
+        Args:
+            queries: Query vectors of shape (n_queries, dimension), float32
+            k: Number of neighbors per query
+            keys: Shard keys (see ``route``)
+            params: Search parameters (e.g. an ID selector over main positions)
+
+        Returns:
+            Tuple of (distances, labels), each of shape (n_queries, k).
+            Missing results have label -1.
+        """
+        shards = [self.shards[key] for key in keys]
+
+        def search_shard(shard: IndexShard) -> Tuple[np.ndarray, np.ndarray]:
+            return shard.index.search(queries, min(k, shard.size), params=params)
+
+        if len(shards) > 1 and self.executor is not None:
+            results = list(self.executor.map(search_shard, shards))
+        else:
+            results = [search_shard(shard) for shard in shards]
+
+        if not results:
+            return (
+                np.full((len(queries), k), np.inf, dtype=np.float32),
+                np.full((len(queries), k), -1, dtype=np.int64),
+            )
+        return merge_topk([r[0] for r in results], [r[1] for r in results], k)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get shard count and sizes."""
+        sizes = [shard.size for shard in self.shards.values()]
+        return {
+            "attribute": self.attribute,
+            "index_type": (
+                type(faiss.downcast_index(self.prototype)).__name__
+                if self.prototype is not None
+                else None
+            ),
+            "num_shards": len(sizes),
+            "largest_shard": max(sizes, default=0),
+            "smallest_shard": min(sizes, default=0),
+            "other_shard_size": (
+                self.shards[OTHER_SHARD].size if OTHER_SHARD in self.shards else 0
+            ),
+        }
+
+
+def _empty_shard_index(main_index: Optional["faiss.Index"], dimension: int) -> "faiss.Index":
+    """Empty, trained index of the family shards are built with."""
+    if main_index is not None and faiss.try_extract_index_ivf(main_index) is not None:
+        # Shares the trained quantizers; nprobe is carried over by the clone
+        shard = faiss.clone_index(main_index)
+        shard.reset()
+        return shard
+    return faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+
+
+def _bytes_per_vector(index: "faiss.Index") -> int:
+    """Approximate memory per added vector (codes plus the int64 label)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return int(ivf.code_size) + 8
+    return index.d * 4 + 8
+
+
+def merge_topk(
+    distance_lists: List[np.ndarray], label_lists: List[np.ndarray], k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge per-shard top-k results into a global top-k.
+
+    Args:
+        distance_lists: Per-shard distances, each (n_queries, k_i)
+        label_lists: Per-shard labels, each (n_queries, k_i)
+        k: Number of results to keep
+
+    Returns:
+        Tuple of (distances, labels) of shape (n_queries, k), padded with -1 labels
+    """
+    distances = np.hstack(distance_lists).astype(np.float32, copy=True)
+    labels = np.hstack(label_lists)
+    distances[labels < 0] = np.inf
+
+    if distances.shape[1] < k:
+        pad = k - distances.shape[1]
+        distances = np.hstack([distances, np.full((len(distances), pad), np.inf, np.float32)])
+        labels = np.hstack([labels, np.full((len(labels), pad), -1, dtype=np.int64)])
+
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(labels, order, axis=1)
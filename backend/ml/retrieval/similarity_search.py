@@ -5,7 +5,7 @@ k-NN vector similarity search using FAISS with result formatting.
 
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -17,7 +17,7 @@ except ImportError:
     FAISS_AVAILABLE = False
 
 from ..config import MLConfig, get_ml_config
-from .index_manager import FAISSIndexManager, get_index_manager
+from .index_manager import FAISSIndexManager, IndexSnapshot, get_index_manager
 
 logger = logging.getLogger(__name__)
 
@@ -53,17 +53,203 @@ class SearchResult:
         }
 
 
-@dataclass
 class SearchResults:
     """
     Collection of search results with query metadata.
+
+    Results are stored column-wise as NumPy arrays (product IDs, distances,
+    similarities, plus named score columns such as ``final_score``). Filtering,
+    ranking, and pagination operate on the columns; per-item ``SearchResult``
+    objects are only created when ``results`` is accessed, typically at the
+    API boundary.
+
+    The row order of the columns is the result order, so a result's rank is its
+    row position.
     """
 
-    results: List[SearchResult]
-    query_vector_shape: Tuple[int, ...]
-    k: int  # Number of results requested
-    total_found: int  # Actual number of results found
-    search_time_ms: float  # Search latency
+    def __init__(
+        self,
+        results: Optional[List[SearchResult]] = None,
+        query_vector_shape: Tuple[int, ...] = (0,),
+        k: int = 0,
+        total_found: Optional[int] = None,
+        search_time_ms: float = 0.0,
+        product_ids: Optional[np.ndarray] = None,
+        distances: Optional[np.ndarray] = None,
+        similarities: Optional[np.ndarray] = None,
+        scores: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """
+        Initialize search results from columns or from a list of SearchResult.
+
+        Args:
+            results: Per-item results (converted to columns)
+            query_vector_shape: Shape of the query vector(s)
+            k: Number of results requested
+            total_found: Actual number of results found (defaults to row count)
+            search_time_ms: Search latency
+            product_ids: Product ID column
+            distances: Distance column
+            similarities: Similarity column
+            scores: Named score columns aligned with product_ids
+        """
+        self.query_vector_shape = query_vector_shape
+        self.k = k
+        self.search_time_ms = search_time_ms
+
+        if results is not None:
+            self._set_from_results(results)
+        else:
+            n = 0 if product_ids is None else len(product_ids)
+            self.product_ids = _object_array(product_ids if product_ids is not None else [])
+            self.distances = _float_column(distances, n)
+            self.similarities = _float_column(similarities, n)
+            self.scores = {name: np.asarray(col) for name, col in (scores or {}).items()}
+            self._results_cache: Optional[List[SearchResult]] = None
+
+        self.total_found = len(self) if total_found is None else total_found
+
+    @classmethod
+    def empty(cls, k: int = 0, query_vector_shape: Tuple[int, ...] = (0,)) -> "SearchResults":
+        """Create an empty result set."""
+        return cls(query_vector_shape=query_vector_shape, k=k, total_found=0)
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    # ========== Per-item view ==========
+
+    @property
+    def results(self) -> List[SearchResult]:
+        """Per-item view of the columns (materialized on first access)."""
+        if self._results_cache is None:
+            score_columns = {name: col.tolist() for name, col in self.scores.items()}
+            self._results_cache = [
+                SearchResult(
+                    product_id=pid,
+                    distance=distance,
+                    similarity=similarity,
+                    rank=rank,
+                    metadata={name: col[rank] for name, col in score_columns.items()},
+                )
+                for rank, (pid, distance, similarity) in enumerate(
+                    zip(self.product_ids, self.distances.tolist(), self.similarities.tolist())
+                )
+            ]
+        return self._results_cache
+
+    @results.setter
+    def results(self, results: List[SearchResult]) -> None:
+        self._set_from_results(results)
+        self.total_found = len(self)
+
+    def _set_from_results(self, results: List[SearchResult]) -> None:
+        self.product_ids = _object_array([r.product_id for r in results])
+        self.distances = np.array([r.distance for r in results], dtype=np.float32)
+        self.similarities = np.array([r.similarity for r in results], dtype=np.float32)
+
+        score_names = {name for r in results for name, value in r.metadata.items()}
+        self.scores = {
+            name: np.array([r.metadata.get(name, np.nan) for r in results], dtype=np.float32)
+            for name in score_names
+            if all(isinstance(r.metadata.get(name, 0.0), (int, float)) for r in results)
+        }
+        self._results_cache = None
+
+    def copy(self) -> "SearchResults":
+        """Shallow copy (columns are shared until an in-place operation replaces them)."""
+        return SearchResults(
+            query_vector_shape=self.query_vector_shape,
+            k=self.k,
+            total_found=self.total_found,
+            search_time_ms=self.search_time_ms,
+            product_ids=self.product_ids,
+            distances=self.distances,
+            similarities=self.similarities,
+            scores=dict(self.scores),
+        )
+
+    # ========== Column operations (in place) ==========
+
+    def select(self, rows: Union[np.ndarray, slice, List[int]]) -> "SearchResults":
+        """
+        Keep only the given rows, in the given order.
+
+        Args:
+            rows: Row indices, boolean mask, or slice
+
+        Returns:
+            self (for chaining)
+        """
+        if isinstance(rows, slice):
+            index = rows
+        else:
+            index = np.asarray(rows)
+            if index.dtype == bool:
+                index = np.flatnonzero(index)
+            index = index.astype(np.int64, copy=False)
+
+        self.product_ids = self.product_ids[index]
+        self.distances = self.distances[index]
+        self.similarities = self.similarities[index]
+        self.scores = {name: col[index] for name, col in self.scores.items()}
+        self._results_cache = None
+        self.total_found = len(self)
+        return self
+
+    def truncate(self, n: int) -> "SearchResults":
+        """Keep the first n rows."""
+        return self.select(slice(0, max(n, 0)))
+
+    def exclude(self, product_ids: Union[Any, List[Any]]) -> "SearchResults":
+        """Remove rows whose product ID is in product_ids."""
+        if not isinstance(product_ids, (list, tuple, set, np.ndarray)):
+            product_ids = [product_ids]
+        return self.select(~np.isin(self.product_ids, list(product_ids)))
+
+    def keep(self, product_ids: Union[set, List[Any]]) -> "SearchResults":
+        """Keep only rows whose product ID is in product_ids (order preserved)."""
+        return self.select(np.isin(self.product_ids, list(product_ids)))
+
+    def set_score(self, name: str, values: np.ndarray) -> "SearchResults":
+        """Add or replace a named score column."""
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != (len(self),):
+            raise ValueError(
+                f"Score column '{name}' has shape {values.shape}, expected ({len(self)},)"
+            )
+        self.scores[name] = values
+        self._results_cache = None
+        return self
+
+    def sort_by(self, name: str, descending: bool = True) -> "SearchResults":
+        """
+        Stable-sort rows by a column ('similarity', 'distance', or a score name).
+
+        Args:
+            name: Column name
+            descending: Sort high-to-low
+
+        Returns:
+            self (for chaining)
+        """
+        if name == "similarity":
+            column = self.similarities
+        elif name == "distance":
+            column = self.distances
+        else:
+            column = self.scores[name]
+
+        order = np.argsort(-column if descending else column, kind="stable")
+        return self.select(order)
+
+    def get_score(self, name: str, default: Optional[float] = None) -> np.ndarray:
+        """Get a score column, or a column filled with default if missing."""
+        if name in self.scores:
+            return self.scores[name]
+        return np.full(len(self), np.nan if default is None else default, dtype=np.float32)
+
+    # ========== Output ==========
 
     def to_dict(self) -> dict:
         """Convert to dictionary for API responses."""
@@ -74,9 +260,51 @@ class SearchResults:
             "search_time_ms": float(self.search_time_ms),
         }
 
-    def get_product_ids(self) -> List[int]:
+    def to_score_dicts(self) -> Dict[Any, Dict[str, Any]]:
+        """
+        Build the per-product score dicts used for result enrichment.
+
+        Returns:
+            Dict mapping product_id -> {similarity, rank, final_score, ...}
+        """
+        similarities = self.similarities.tolist()
+        final_scores = (
+            self.scores["final_score"].tolist() if "final_score" in self.scores else similarities
+        )
+        optional = {
+            name: self.scores[name].tolist() if name in self.scores else None
+            for name in ("popularity_score", "price_affinity_score", "brand_match_score")
+        }
+
+        return {
+            pid: {
+                "similarity": similarities[rank],
+                "rank": rank,
+                "final_score": final_scores[rank],
+                **{
+                    name: column[rank] if column is not None else None
+                    for name, column in optional.items()
+                },
+            }
+            for rank, pid in enumerate(self.product_ids)
+        }
+
+    def get_product_ids(self) -> List[Any]:
         """Get list of product IDs from results."""
-        return [r.product_id for r in self.results]
+        return self.product_ids.tolist()
+
+
+def _object_array(values) -> np.ndarray:
+    """Build a 1-D object array (safe for IDs of any type, including tuples)."""
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def _float_column(values: Optional[np.ndarray], n: int) -> np.ndarray:
+    if values is None:
+        return np.zeros(n, dtype=np.float32)
+    return np.asarray(values, dtype=np.float32)
 
 
 class SimilaritySearch:
@@ -144,33 +372,27 @@ class SimilaritySearch:
         if self.config.embedding.normalize_embeddings:
             query_vector = self._normalize_vector(query_vector)
 
-        # Get FAISS index
-        index = self.index_manager.get_index()
-        id_mapping = self.index_manager.get_id_mapping()
+        # Pin one index snapshot for the whole request
+        snapshot = self.index_manager.get_snapshot()
 
         # Limit k to available vectors
-        max_k = index.ntotal
+        max_k = snapshot.ntotal
         if k > max_k:
             logger.warning(f"Requested k={k} but only {max_k} vectors available")
             k = max_k
 
         # Perform search
-        distances, indices = index.search(query_vector, k)
+        distances, indices = snapshot.search(query_vector, k)
 
         # Convert to SearchResults
         results = self._format_results(
-            distances[0], indices[0], id_mapping, min_similarity=min_similarity
+            distances[0], indices[0], snapshot, min_similarity=min_similarity
         )
+        results.query_vector_shape = query_vector.shape
+        results.k = k
+        results.search_time_ms = (time.time() - start_time) * 1000
 
-        search_time_ms = (time.time() - start_time) * 1000
-
-        return SearchResults(
-            results=results,
-            query_vector_shape=query_vector.shape,
-            k=k,
-            total_found=len(results),
-            search_time_ms=search_time_ms,
-        )
+        return results
 
     def search_batch(
         self, query_vectors: np.ndarray, k: int = 50, min_similarity: Optional[float] = None
@@ -208,37 +430,29 @@ class SimilaritySearch:
         if self.config.embedding.normalize_embeddings:
             query_vectors = self._normalize_vectors(query_vectors)
 
-        # Get FAISS index
-        index = self.index_manager.get_index()
-        id_mapping = self.index_manager.get_id_mapping()
+        # Pin one index snapshot for the whole request
+        snapshot = self.index_manager.get_snapshot()
 
         # Limit k to available vectors
-        max_k = index.ntotal
+        max_k = snapshot.ntotal
         if k > max_k:
             logger.warning(f"Requested k={k} but only {max_k} vectors available")
             k = max_k
 
         # Perform batch search
-        distances, indices = index.search(query_vectors, k)
+        distances, indices = snapshot.search(query_vectors, k)
 
         # Convert to list of SearchResults
+        search_time_ms = (time.time() - start_time) * 1000 / len(query_vectors)
         batch_results = []
         for i in range(len(query_vectors)):
             results = self._format_results(
-                distances[i], indices[i], id_mapping, min_similarity=min_similarity
-            )
-
-            search_time_ms = (time.time() - start_time) * 1000 / len(query_vectors)
-
-            batch_results.append(
-                SearchResults(
-                    results=results,
-                    query_vector_shape=query_vectors[i : i + 1].shape,
-                    k=k,
-                    total_found=len(results),
-                    search_time_ms=search_time_ms,
-                )
+                distances[i], indices[i], snapshot, min_similarity=min_similarity
             )
+            results.query_vector_shape = query_vectors[i : i + 1].shape
+            results.k = k
+            results.search_time_ms = search_time_ms
+            batch_results.append(results)
 
         return batch_results
 
@@ -265,14 +479,17 @@ class SimilaritySearch:
             SimilaritySearchError: If product not found in index
         """
         # Get FAISS position for this product
-        faiss_idx = self.index_manager.get_faiss_position(product_id)
+        snapshot = self.index_manager.get_snapshot()
+        faiss_idx = snapshot.get_faiss_position(product_id)
 
         if faiss_idx is None:
             raise SimilaritySearchError(f"Product ID {product_id} not found in FAISS index")
 
-        # Get vector for this product from index
-        index = self.index_manager.get_index()
-        vector = index.reconstruct(faiss_idx).reshape(1, -1)
+        # Get stored vector for this product
+        vector = snapshot.get_vector(faiss_idx)
+        if vector is None:
+            raise SimilaritySearchError(f"Vector for product {product_id} is not available")
+        vector = vector.reshape(1, -1)
 
         # Search for similar vectors
         # Request k+1 if excluding self to ensure we get k results
@@ -281,12 +498,7 @@ class SimilaritySearch:
 
         # Filter out self if needed
         if exclude_self:
-            results.results = [r for r in results.results if r.product_id != product_id][:k]
-            results.total_found = len(results.results)
-
-            # Re-rank results
-            for i, result in enumerate(results.results):
-                result.rank = i
+            results.exclude(product_id).truncate(k)
 
         return results
 
@@ -294,82 +506,78 @@ class SimilaritySearch:
         self,
         distances: np.ndarray,
         indices: np.ndarray,
-        id_mapping: Dict[int, int],
+        snapshot: IndexSnapshot,
         min_similarity: Optional[float] = None,
-    ) -> List[SearchResult]:
+    ) -> SearchResults:
         """
-        Format raw FAISS results into SearchResult objects.
+        Format raw FAISS results into columnar SearchResults.
 
         Args:
             distances: Array of distances from FAISS
             indices: Array of indices from FAISS
-            id_mapping: Mapping from FAISS index -> product_id
+            snapshot: Index snapshot the search ran against (maps labels -> product_id)
             min_similarity: Optional minimum similarity threshold
 
         Returns:
-            List of SearchResult objects
+            SearchResults (query metadata is filled in by the caller)
         """
-        results = []
+        # Skip invalid indices (FAISS returns -1 for missing results)
+        valid = indices >= 0
 
-        for rank, (distance, faiss_idx) in enumerate(zip(distances, indices)):
-            # Skip invalid indices (FAISS returns -1 for missing results)
-            if faiss_idx == -1:
-                continue
+        similarities = self._distances_to_similarities(distances)
+        if min_similarity is not None:
+            valid &= similarities >= min_similarity
 
-            # Get product ID
-            product_id = id_mapping.get(int(faiss_idx))
-            if product_id is None:
-                logger.warning(f"FAISS index {faiss_idx} not found in ID mapping")
-                continue
+        rows = np.flatnonzero(valid)
 
-            # Convert distance to similarity
-            similarity = self._distance_to_similarity(float(distance))
+        return SearchResults(
+            product_ids=snapshot.product_ids_at(indices[rows]),
+            distances=distances[rows],
+            similarities=similarities[rows],
+        )
 
-            # Apply similarity threshold
-            if min_similarity is not None and similarity < min_similarity:
-                continue
+    def _distance_to_similarity(self, distance: float) -> float:
+        """
+        Convert a single L2 distance to a similarity score in [0, 1].
 
-            results.append(
-                SearchResult(
-                    product_id=product_id,
-                    distance=float(distance),
-                    similarity=similarity,
-                    rank=rank,
-                )
-            )
+        Args:
+            distance: L2 distance from FAISS
 
-        return results
+        Returns:
+            Similarity score in [0, 1] where 1 is most similar
+        """
+        return float(self._distances_to_similarities(np.array([distance], dtype=np.float32))[0])
 
-    def _distance_to_similarity(self, distance: float) -> float:
+    def _distances_to_similarities(self, distances: np.ndarray) -> np.ndarray:
         """
-        Convert L2 distance to similarity score in [0, 1].
+        Convert L2 distances to similarity scores in [0, 1].
 
         For normalized vectors (L2 norm = 1):
         - L2 distance = sqrt(2 * (1 - cosine_similarity))
         - cosine_similarity = 1 - (distance^2 / 2)
 
         Args:
-            distance: L2 distance from FAISS
+            distances: L2 distances from FAISS
 
         Returns:
-            Similarity score in [0, 1] where 1 is most similar
+            Similarity scores in [0, 1] where 1 is most similar
         """
+        distances = np.asarray(distances, dtype=np.float32)
+
         if not self.config.embedding.normalize_embeddings:
             # If not normalized, use inverse distance
             # similarity = 1 / (1 + distance)
-            return 1.0 / (1.0 + distance)
+            return 1.0 / (1.0 + distances)
 
         # For normalized vectors, convert L2 to cosine similarity
         # Cosine similarity is in [-1, 1], we map it to [0, 1]
-        cosine_sim = 1.0 - (distance**2 / 2.0)
+        cosine_sim = 1.0 - (np.square(distances) / 2.0)
 
         # Clamp to [-1, 1] to handle numerical errors
-        cosine_sim = max(-1.0, min(1.0, cosine_sim))
+        cosine_sim = np.clip(cosine_sim, -1.0, 1.0)
 
         # Map [-1, 1] to [0, 1]
-        similarity = (cosine_sim + 1.0) / 2.0
-
-        return similarity
+        return (cosine_sim + 1.0) / 2.0
 
     def _normalize_vector(self, vector: np.ndarray) -> np.ndarray:
         """
@@ -414,10 +622,10 @@ class SimilaritySearch:
         Returns:
             Embedding vector or None if not found
         """
-        faiss_idx = self.index_manager.get_faiss_position(product_id)
+        snapshot = self.index_manager.get_snapshot()
+        faiss_idx = snapshot.get_faiss_position(product_id)
 
         if faiss_idx is None:
             return None
 
-        index = self.index_manager.get_index()
-        return index.reconstruct(faiss_idx)
+        return snapshot.get_vector(faiss_idx)
@@ -191,7 +191,7 @@ class SearchService:
             raise ValueError(f"Unsupported search mode: {request.mode}")
 
         # Apply diversity if enabled
-        if request.enable_diversity and len(results.results) > 0:
+        if request.enable_diversity and len(results) > 0:
             results = self._apply_diversity(results, request.diversity_weight)
             diversity_applied = True
         else:
@@ -208,7 +208,7 @@ class SearchService:
         response = SearchResponse(
             results=paginated_results,
             mode=request.mode,
-            total_results=len(results.results),
+            total_results=len(results),
             offset=request.offset,
             limit=request.limit,
             search_time_ms=results.search_time_ms,
@@ -418,27 +418,14 @@ class SearchService:
         Returns:
             Diversified search results
         """
-        if len(results.results) <= 1:
+        if len(results) <= 1:
             return results
 
-        # Simple diversity: ensure no duplicate products
-        seen_products = set()
-        unique_results = []
+        # Simple diversity: ensure no duplicate products (first occurrence wins)
+        _, first_rows = np.unique(results.product_ids.astype(str), return_index=True)
+        results.select(np.sort(first_rows))
 
-        for result in results.results:
-            if result.product_id not in seen_products:
-                seen_products.add(result.product_id)
-                unique_results.append(result)
-
-        # Update results
-        results.results = unique_results
-        results.total_found = len(unique_results)
-
-        # Re-rank
-        for i, result in enumerate(results.results):
-            result.rank = i
-
-        logger.debug(f"Applied diversity: {len(unique_results)} unique results")
+        logger.debug(f"Applied diversity: {len(results)} unique results")
 
         return results
 
@@ -454,27 +441,11 @@ class SearchService:
         Returns:
             Paginated search results
         """
-        if offset >= len(results.results):
-            # Offset beyond results
-            results.results = []
-            results.total_found = 0
-            return results
-
-        # Slice results
-        paginated = results.results[offset : offset + limit]
+        # Slice a copy so the full result set stays intact for the caller
+        paginated = results.copy().select(slice(offset, offset + limit))
+        paginated.k = limit
 
-        # Update ranks
-        for i, result in enumerate(paginated):
-            result.rank = i
-
-        # Create new SearchResults
-        return SearchResults(
-            results=paginated,
-            query_vector_shape=results.query_vector_shape,
-            k=limit,
-            total_found=len(paginated),
-            search_time_ms=results.search_time_ms,
-        )
+        return paginated
 
     def record_interaction(
         self,
@@ -5,9 +5,20 @@ This module provides functions to interact with GCS for downloading
 and uploading ML artifacts like FAISS indices.
 """
 
+import json
 import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..retrieval.artifacts import (
+    ArtifactManifest,
+    ArtifactStore,
+    file_sha256,
+    resolve_index_path,
+)
 
 try:
     from google.api_core import exceptions as gcp_exceptions
@@ -21,6 +32,32 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+# FAISS index artifacts (see ml.retrieval.index_builder.save_index)
+FAISS_INDEX_FILES = [
+    "index.faiss",
+    "product_ids.npy",
+    "product_ids.sorted.npy",
+    "product_ids.order.npy",
+    "metadata.json",
+]
+# vectors.npy is only written for non-Flat index types; attributes.npz only when
+# attribute filtering is enabled
+OPTIONAL_FAISS_INDEX_FILES = ["vectors.npy", "attributes.npz"]
+# Pre-mmap index format, removed alongside current artifacts
+LEGACY_FAISS_INDEX_FILES = ["id_mapping.npz", "metadata.npy"]
+
+# Versioned layout (mirrors ml.retrieval.artifacts):
+#   <gcs_path>/CURRENT                    published version name, written last
+#   <gcs_path>/manifests/<version>.json   sizes and SHA-256 hashes per file
+#   <gcs_path>/blobs/<sha256>             artifact contents, shared across versions
+GCS_CURRENT_BLOB = "CURRENT"
+GCS_MANIFESTS_PREFIX = "manifests"
+GCS_BLOBS_PREFIX = "blobs"
+
+DEFAULT_DOWNLOAD_WORKERS = 8
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+
+
 class GCSError(Exception):
     """Base exception for GCS operations."""
 
@@ -28,16 +65,34 @@ class GCSError(Exception):
 
 
 def download_faiss_index_from_gcs(
-    bucket_name: str, gcs_path: str, local_path: Path, required_files: list | None = None
+    bucket_name: str,
+    gcs_path: str,
+    local_path: Path,
+    required_files: list | None = None,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+    keep_versions: int = 2,
 ) -> bool:
     """
     Download FAISS index files from GCS to local directory.
 
+    The published version is read from ``<gcs_path>/CURRENT`` and its manifest.
+    Nothing is downloaded if that version is already current locally. Files
+    whose hash is in the local blob cache (any version still on disk) are
+    hard-linked instead of downloaded. The rest are fetched in parallel,
+    large files as concurrent byte ranges of chunk_size, and checked against
+    their SHA-256. The result is published atomically (see ArtifactStore).
+    Buckets still holding the flat pre-versioning layout are downloaded
+    file by file and published the same way.
+
     Args:
         bucket_name: Name of the GCS bucket
         gcs_path: Path prefix in GCS bucket (e.g., 'faiss_index')
-        local_path: Local directory to download files to
-        required_files: List of required files. Defaults to FAISS index files.
+        local_path: Local index root to download into
+        required_files: Flat-layout files to download. Defaults to FAISS index files.
+        max_workers: Parallel download requests
+        chunk_size: Byte range size for large files
+        keep_versions: Local versions to keep
 
     Returns:
         True if all files downloaded successfully, False otherwise
@@ -49,25 +104,149 @@ def download_faiss_index_from_gcs(
         logger.error("google-cloud-storage library not available")
         return False
 
-    if required_files is None:
-        required_files = ["index.faiss", "id_mapping.npz", "metadata.npy"]
-
     try:
         # Initialize GCS client
         client = storage.Client()
         bucket = client.bucket(bucket_name)
 
         # Create local directory if it doesn't exist
+        local_path = Path(local_path)
         local_path.mkdir(parents=True, exist_ok=True)
+        store = ArtifactStore(local_path, keep_versions=keep_versions)
 
         logger.info(f"Downloading FAISS index from gs://{bucket_name}/{gcs_path}/ to {local_path}")
 
+        current_blob = bucket.blob(_blob_path(gcs_path, GCS_CURRENT_BLOB))
+        if required_files is None and current_blob.exists():
+            version = current_blob.download_as_text().strip()
+            return _download_version(
+                bucket, gcs_path, store, version, max_workers=max_workers, chunk_size=chunk_size
+            )
+
+        return _download_flat(bucket, bucket_name, gcs_path, store, required_files)
+
+    except gcp_exceptions.NotFound:
+        logger.error(f"Bucket not found: {bucket_name}")
+        return False
+    except gcp_exceptions.Forbidden:
+        logger.error(f"Access denied to bucket: {bucket_name}")
+        return False
+    except Exception as e:
+        logger.error(f"Unexpected error downloading FAISS index from GCS: {e}", exc_info=True)
+        return False
+
+
+def _download_version(
+    bucket, gcs_path: str, store: ArtifactStore, version: str, max_workers: int, chunk_size: int
+) -> bool:
+    """Download one published version into the local artifact store."""
+    local_manifest = ArtifactManifest.load(store.version_path(version))
+    if local_manifest is not None and not local_manifest.verify(store.version_path(version)):
+        if store.current_version() != version:
+            store.activate(version)
+        logger.info(f"FAISS index {version} is already available locally, skipping download")
+        return True
+
+    manifest_blob = bucket.blob(_blob_path(gcs_path, GCS_MANIFESTS_PREFIX, f"{version}.json"))
+    manifest = ArtifactManifest.from_dict(json.loads(manifest_blob.download_as_text()))
+
+    staging = store.staging_dir()
+    try:
+        # Reuse unchanged artifacts from the local cache
+        missing = []
+        for name, entry in manifest.files.items():
+            if not store.link_from_cache(entry["sha256"], entry["size"], staging / name):
+                missing.append((name, entry))
+        reused = len(manifest.files) - len(missing)
+
+        _download_blobs(bucket, gcs_path, staging, missing, max_workers, chunk_size)
+
+        for name, entry in missing:
+            if file_sha256(staging / name) != entry["sha256"]:
+                logger.error(f"Checksum mismatch for downloaded {name}")
+                return False
+
+        store.publish(staging, manifest=manifest)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    downloaded_bytes = sum(entry["size"] for _, entry in missing)
+    logger.info(
+        f"Downloaded FAISS index {version}: {len(missing)} files "
+        f"({downloaded_bytes / 1024 / 1024:.1f} MB), {reused} reused from local cache"
+    )
+    return True
+
+
+def _download_blobs(
+    bucket,
+    gcs_path: str,
+    directory: Path,
+    files: List[Tuple[str, Dict[str, Any]]],
+    max_workers: int,
+    chunk_size: int,
+) -> None:
+    """
+    Download content blobs into directory, splitting large ones into byte ranges.
+
+    At most max_workers ranges (chunk_size bytes each) are held in memory.
+    """
+    tasks = []
+    for name, entry in files:
+        blob = bucket.blob(_blob_path(gcs_path, GCS_BLOBS_PREFIX, entry["sha256"]))
+        path = directory / name
+        size = entry["size"]
+        if size <= chunk_size:
+            tasks.append((blob, path, None, None))
+            continue
+
+        # Preallocate, then fill ranges in place
+        with open(path, "wb") as f:
+            f.truncate(size)
+        for start in range(0, size, chunk_size):
+            tasks.append((blob, path, start, min(start + chunk_size, size)))
+
+    if not tasks:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_download_range, *task) for task in tasks]
+        for future in futures:
+            future.result()
+
+
+def _download_range(blob, path: Path, start: Optional[int], end: Optional[int]) -> None:
+    if start is None:
+        blob.download_to_filename(str(path))
+        return
+
+    data = blob.download_as_bytes(start=start, end=end - 1)  # GCS ranges are inclusive
+    if len(data) != end - start:
+        raise GCSError(f"Short read for {path.name} bytes {start}-{end}: got {len(data)}")
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        os.pwrite(fd, data, start)
+    finally:
+        os.close(fd)
+
+
+def _download_flat(
+    bucket, bucket_name: str, gcs_path: str, store: ArtifactStore, required_files: list | None
+) -> bool:
+    """Download the flat (pre-versioning) layout and publish it as a local version."""
+    optional_files = []
+    if required_files is None:
+        required_files = FAISS_INDEX_FILES
+        optional_files = OPTIONAL_FAISS_INDEX_FILES
+
+    staging = store.staging_dir()
+    try:
         # Download each required file
         downloaded_files = []
         for filename in required_files:
-            blob_path = f"{gcs_path}/{filename}" if gcs_path else filename
+            blob_path = _blob_path(gcs_path, filename)
             blob = bucket.blob(blob_path)
-            local_file_path = local_path / filename
+            local_file_path = staging / filename
 
             try:
                 # Check if blob exists
@@ -98,18 +277,20 @@ def download_faiss_index_from_gcs(
                 logger.error(f"Failed to download {filename}: {e}")
                 return False
 
+        for filename in optional_files:
+            blob = bucket.blob(_blob_path(gcs_path, filename))
+            if not blob.exists():
+                continue
+
+            logger.info(f"Downloading {filename}...")
+            blob.download_to_filename(str(staging / filename))
+            downloaded_files.append(filename)
+
+        store.publish(staging)
         logger.info(f"Successfully downloaded {len(downloaded_files)} files from GCS")
         return True
-
-    except gcp_exceptions.NotFound:
-        logger.error(f"Bucket not found: {bucket_name}")
-        return False
-    except gcp_exceptions.Forbidden:
-        logger.error(f"Access denied to bucket: {bucket_name}")
-        return False
-    except Exception as e:
-        logger.error(f"Unexpected error downloading FAISS index from GCS: {e}", exc_info=True)
-        return False
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
 
 
 def upload_faiss_index_to_gcs(
@@ -118,8 +299,13 @@ def upload_faiss_index_to_gcs(
     """
     Upload FAISS index files from local directory to GCS.
 
+    Versioned indices (with a manifest) are uploaded as content blobs, skipping
+    blobs that already exist, then the manifest, then CURRENT. Downloaders
+    therefore only ever see complete versions. Directories without a manifest
+    are uploaded in the flat layout.
+
     Args:
-        local_path: Local directory containing index files
+        local_path: Local index root or version directory
         bucket_name: Name of the GCS bucket
         gcs_path: Path prefix in GCS bucket (e.g., 'faiss_index')
         files_to_upload: List of files to upload. Defaults to FAISS index files.
@@ -134,14 +320,18 @@ def upload_faiss_index_to_gcs(
         logger.error("google-cloud-storage library not available")
         return False
 
-    if files_to_upload is None:
-        files_to_upload = ["index.faiss", "id_mapping.npz", "metadata.npy"]
-
     try:
         # Initialize GCS client
         client = storage.Client()
         bucket = client.bucket(bucket_name)
 
+        if files_to_upload is None:
+            version_path = resolve_index_path(Path(local_path))
+            manifest = ArtifactManifest.load(version_path)
+            if manifest is not None:
+                return _upload_version(bucket, bucket_name, gcs_path, version_path, manifest)
+            files_to_upload = FAISS_INDEX_FILES + OPTIONAL_FAISS_INDEX_FILES
+
         logger.info(f"Uploading FAISS index from {local_path} to gs://{bucket_name}/{gcs_path}/")
 
         # Upload each file
@@ -153,7 +343,7 @@ def upload_faiss_index_to_gcs(
                 logger.warning(f"Local file not found, skipping: {local_file_path}")
                 continue
 
-            blob_path = f"{gcs_path}/{filename}" if gcs_path else filename
+            blob_path = _blob_path(gcs_path, filename)
             blob = bucket.blob(blob_path)
 
             try:
@@ -183,9 +373,113 @@ def upload_faiss_index_to_gcs(
         return False
 
 
+def _upload_version(
+    bucket, bucket_name: str, gcs_path: str, version_path: Path, manifest: ArtifactManifest
+) -> bool:
+    """Upload one local version in the versioned layout."""
+    logger.info(
+        f"Uploading FAISS index {manifest.version} from {version_path} "
+        f"to gs://{bucket_name}/{gcs_path}/"
+    )
+
+    uploaded = skipped = 0
+    for name, entry in manifest.files.items():
+        blob = bucket.blob(_blob_path(gcs_path, GCS_BLOBS_PREFIX, entry["sha256"]))
+        if blob.exists():
+            skipped += 1
+            continue
+
+        try:
+            logger.info(f"Uploading {name}...")
+            blob.upload_from_filename(str(version_path / name))
+            logger.info(f"✓ Uploaded {name} ({entry['size'] / 1024:.1f} KB)")
+            uploaded += 1
+        except Exception as e:
+            logger.error(f"Failed to upload {name}: {e}")
+            return False
+
+    bucket.blob(
+        _blob_path(gcs_path, GCS_MANIFESTS_PREFIX, f"{manifest.version}.json")
+    ).upload_from_string(json.dumps(manifest.to_dict(), indent=2), content_type="application/json")
+    # Publish last: downloads only ever see complete versions
+    bucket.blob(_blob_path(gcs_path, GCS_CURRENT_BLOB)).upload_from_string(manifest.version)
+
+    logger.info(
+        f"Successfully uploaded FAISS index {manifest.version} to GCS "
+        f"({uploaded} files uploaded, {skipped} unchanged)"
+    )
+    return True
+
+
+def prune_faiss_index_versions_in_gcs(
+    bucket_name: str, gcs_path: str, keep_versions: int = 2
+) -> bool:
+    """
+    Remove old index versions, unreferenced blobs and flat-layout files from GCS.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        gcs_path: Path prefix in GCS bucket
+        keep_versions: Newest versions to keep (the current one is always kept)
+
+    Returns:
+        True if pruning succeeded, False otherwise
+    """
+    if not GCS_AVAILABLE:
+        logger.error("google-cloud-storage library not available")
+        return False
+
+    try:
+        client = storage.Client()
+        bucket = client.bucket(bucket_name)
+
+        current_blob = bucket.blob(_blob_path(gcs_path, GCS_CURRENT_BLOB))
+        if not current_blob.exists():
+            logger.info("No versioned FAISS index in GCS, nothing to prune")
+            return True
+        current = current_blob.download_as_text().strip()
+
+        manifests = sorted(
+            client.list_blobs(bucket, prefix=_blob_path(gcs_path, GCS_MANIFESTS_PREFIX) + "/"),
+            key=lambda blob: blob.name,
+        )
+        kept = manifests[-max(1, keep_versions) :]
+        kept += [m for m in manifests if m.name.endswith(f"/{current}.json") and m not in kept]
+        for blob in manifests:
+            if blob not in kept:
+                blob.delete()
+                logger.info(f"Deleted old FAISS index manifest {blob.name}")
+
+        referenced = set()
+        for blob in kept:
+            manifest = ArtifactManifest.from_dict(json.loads(blob.download_as_text()))
+            referenced.update(entry["sha256"] for entry in manifest.files.values())
+
+        for blob in client.list_blobs(bucket, prefix=_blob_path(gcs_path, GCS_BLOBS_PREFIX) + "/"):
+            if blob.name.rsplit("/", 1)[-1] not in referenced:
+                blob.delete()
+                logger.info(f"Deleted unreferenced FAISS index blob {blob.name}")
+
+        # The flat layout is superseded once a version is published
+        for filename in FAISS_INDEX_FILES + OPTIONAL_FAISS_INDEX_FILES + LEGACY_FAISS_INDEX_FILES:
+            blob = bucket.blob(_blob_path(gcs_path, filename))
+            if blob.exists():
+                blob.delete()
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error pruning FAISS index versions in GCS: {e}", exc_info=True)
+        return False
+
+
+def _blob_path(gcs_path: str, *parts: str) -> str:
+    return "/".join([gcs_path, *parts]) if gcs_path else "/".join(parts)
+
+
 def delete_faiss_index_from_gcs(bucket_name: str, gcs_path: str) -> bool:
     """
-    Delete FAISS index files from GCS.
+    Delete FAISS index files (flat and versioned layout) from GCS.
 
     Args:
         bucket_name: Name of the GCS bucket
@@ -202,11 +496,11 @@ def delete_faiss_index_from_gcs(bucket_name: str, gcs_path: str) -> bool:
         client = storage.Client()
         bucket = client.bucket(bucket_name)
 
-        required_files = ["index.faiss", "id_mapping.npz", "metadata.npy"]
+        required_files = FAISS_INDEX_FILES + OPTIONAL_FAISS_INDEX_FILES + LEGACY_FAISS_INDEX_FILES
         deleted_files = []
 
         for filename in required_files:
-            blob_path = f"{gcs_path}/{filename}" if gcs_path else filename
+            blob_path = _blob_path(gcs_path, filename)
             blob = bucket.blob(blob_path)
 
             try:
@@ -219,6 +513,16 @@ def delete_faiss_index_from_gcs(bucket_name: str, gcs_path: str) -> bool:
             except Exception as e:
                 logger.warning(f"Failed to delete {filename}: {e}")
 
+        # Versioned layout
+        for prefix in (GCS_MANIFESTS_PREFIX, GCS_BLOBS_PREFIX):
+            for blob in client.list_blobs(bucket, prefix=_blob_path(gcs_path, prefix) + "/"):
+                blob.delete()
+                deleted_files.append(blob.name)
+        current_blob = bucket.blob(_blob_path(gcs_path, GCS_CURRENT_BLOB))
+        if current_blob.exists():
+            current_blob.delete()
+            deleted_files.append(GCS_CURRENT_BLOB)
+
         if deleted_files:
             logger.info(f"Deleted {len(deleted_files)} files from GCS: {deleted_files}")
 
@@ -231,14 +535,14 @@ def delete_faiss_index_from_gcs(bucket_name: str, gcs_path: str) -> bool:
 
 def check_gcs_index_exists(bucket_name: str, gcs_path: str) -> bool:
     """
-    Check if FAISS index files exist in GCS.
+    Check if a FAISS index (versioned, or all flat-layout files) exists in GCS.
 
     Args:
         bucket_name: Name of the GCS bucket
         gcs_path: Path prefix in GCS bucket
 
     Returns:
-        True if all required files exist, False otherwise
+        True if the index exists, False otherwise
     """
     if not GCS_AVAILABLE:
         return False
@@ -247,10 +551,13 @@ def check_gcs_index_exists(bucket_name: str, gcs_path: str) -> bool:
         client = storage.Client()
         bucket = client.bucket(bucket_name)
 
-        required_files = ["index.faiss", "id_mapping.npz", "metadata.npy"]
+        if bucket.blob(_blob_path(gcs_path, GCS_CURRENT_BLOB)).exists():
+            return True
+
+        required_files = FAISS_INDEX_FILES
 
         for filename in required_files:
-            blob_path = f"{gcs_path}/{filename}" if gcs_path else filename
+            blob_path = _blob_path(gcs_path, filename)
             blob = bucket.blob(blob_path)
 
             if not blob.exists():
@@ -0,0 +1,48 @@
+"""
+Cache Maintenance Tasks
+Background tasks for clearing cache namespaces
+"""
+
+import logging
+from typing import Any, Dict
+
+from .celery_app import app
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(bind=True, name="tasks.clear_cache", max_retries=5, default_retry_delay=30)
+def clear_cache(self, job_id: str) -> Dict[str, Any]:
+    """
+    Run (or resume) a cache clear job created with CacheClearJob.create().
+
+    Keys are deleted with incremental SCAN + UNLINK and the job's progress is
+    saved after every step, so a retry after a Redis error continues where the
+    failed attempt stopped. Progress is reported as the PROGRESS task state.
+
+    Args:
+        job_id: Cache clear job ID
+
+    Returns:
+        Dictionary with the job state
+    """
+    # Import here to avoid circular dependencies and early loading
+    from ..ml.caching import CacheClearJob
+    from ..ml.caching.redis_cache import RedisCacheError, get_redis_cache
+
+    job = CacheClearJob.load(get_redis_cache(), job_id)
+    if job is None:
+        logger.error(f"Cache clear job not found: {job_id}")
+        return {"status": "error", "job_id": job_id, "error": "Job not found"}
+
+    def report_progress(current: CacheClearJob) -> None:
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=current.to_dict())
+
+    try:
+        job.run(progress=report_progress)
+    except RedisCacheError as e:
+        logger.warning(f"Cache clear job {job_id} interrupted, retrying: {e}")
+        raise self.retry(exc=e)
+
+    return job.to_dict()
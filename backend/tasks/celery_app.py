@@ -48,6 +48,7 @@ app = Celery(
     include=[
         "backend.tasks.ingestion",
         "backend.tasks.embeddings",
+        "backend.tasks.cache",
     ],
 )
 
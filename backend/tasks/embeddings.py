@@ -54,7 +54,11 @@ def generate_product_embeddings(
         # Import here to avoid circular dependencies and early model loading
         from ..db.models import Product, ProductEmbedding
         from ..db.session import SessionLocal
+        from ..ml.config import get_ml_config
         from ..ml.model_loader import TORCH_AVAILABLE, model_registry
+        from ..ml.retrieval.index_updates import publish_index_delta
+
+        index_config = get_ml_config()
 
         if not TORCH_AVAILABLE:
             logger.error("PyTorch not available - cannot generate embeddings")
@@ -89,6 +93,17 @@ def generate_product_embeddings(
             products = db.execute(query).scalars().all()
             total = len(products)
 
+            # Requested products that were removed or marked duplicate leave live indices
+            if (
+                product_ids
+                and embedding_type == "text"
+                and index_config.storage.faiss_delta_updates_enabled
+            ):
+                found_ids = {str(product.id) for product in products}
+                removed_ids = [str(pid) for pid in uuid_list if str(pid) not in found_ids]
+                if removed_ids:
+                    publish_index_delta(deletes=removed_ids, config=index_config)
+
             logger.info(f"Found {total} products to process")
 
             if total == 0:
@@ -132,6 +147,7 @@ def generate_product_embeddings(
                     embeddings = model_registry.encode_text_batch(texts)
 
                     # Store in database
+                    stored_embeddings = {}
                     for product, embedding in zip(batch, embeddings):
                         try:
                             # Store in ProductEmbedding table
@@ -159,6 +175,7 @@ def generate_product_embeddings(
                             # Commit each product immediately to avoid transaction abort issues
                             db.commit()
                             successful += 1
+                            stored_embeddings[str(product.id)] = embedding
 
                         except Exception as e:
                             # Rollback this specific product's transaction
@@ -167,6 +184,14 @@ def generate_product_embeddings(
                             error_msg = f"Product {product.id}: {str(e)}"
                             error_details.append(error_msg)
                             logger.error(error_msg)
+
+                    # Push the batch into live FAISS indices as an incremental update
+                    if (
+                        embedding_type == "text"
+                        and index_config.storage.faiss_delta_updates_enabled
+                    ):
+                        publish_index_delta(upserts=stored_embeddings, config=index_config)
+
                     logger.info(f"Batch {batch_num} complete ({successful}/{total} processed)")
 
                 except Exception as e:
@@ -248,11 +273,12 @@ def rebuild_faiss_index(self, embedding_type: str = "text") -> Dict[str, Any]:
     """
     Rebuild the FAISS index from all product embeddings in database.
 
-    This task:
-    1. Fetches all product embeddings from PostgreSQL
-    2. Builds a new FAISS index using FAISSIndexBuilder
-    3. Saves the index to disk with metadata
-    4. Returns statistics about the rebuild
+    This task runs the shared index build pipeline:
+    1. Streams all product embeddings from PostgreSQL into the index
+    2. Saves the index to disk with metadata
+    3. Returns statistics and per-stage timings about the rebuild
+
+    Progress is reported as the PROGRESS task state ({"stage", "done", "total"}).
 
     Args:
         embedding_type: Type of embedding to index ('text', 'image', or 'multimodal')
@@ -260,73 +286,31 @@ def rebuild_faiss_index(self, embedding_type: str = "text") -> Dict[str, Any]:
     Returns:
         Dictionary with rebuild results
     """
-    import numpy as np
-    from sqlalchemy import select
-
     try:
         logger.info(f"Starting FAISS index rebuild for {embedding_type} embeddings")
 
         # Import here to avoid circular dependencies and early loading
-        from ..db.models import Product, ProductEmbedding
         from ..db.session import SessionLocal
-        from ..ml.retrieval.index_builder import FAISSIndexBuilder
+        from ..ml.retrieval.build_pipeline import (
+            IndexBuildPipeline,
+            NoEmbeddingsError,
+            source_for_embedding_type,
+        )
+
+        def report_progress(stage: str, done: int, total: int) -> None:
+            if self.request.id:
+                self.update_state(
+                    state="PROGRESS", meta={"stage": stage, "done": done, "total": total}
+                )
 
         # Create database session
         db = SessionLocal()
 
         try:
-            # Fetch all product embeddings from database
-            logger.info("Fetching product embeddings from database...")
-
-            # Query products with embeddings
-            if embedding_type == "text":
-                # Use denormalized column on Product table for performance
-                query = select(Product).where(Product.text_embedding.isnot(None))
-                results = db.execute(query).scalars().all()
-
-                embeddings_list = []
-                product_ids = []
-
-                for product in results:
-                    if product.text_embedding is not None:
-                        # Handle both list and array formats
-                        if isinstance(product.text_embedding, (list, tuple)):
-                            emb = np.array(product.text_embedding, dtype=np.float32)
-                        else:
-                            emb = np.array(product.text_embedding, dtype=np.float32)
-
-                        embeddings_list.append(emb)
-                        product_ids.append(str(product.id))
-
-            else:
-                # For other types, use ProductEmbedding table
-                query = select(ProductEmbedding).where(
-                    ProductEmbedding.embedding_type == embedding_type
-                )
-                results = db.execute(query).scalars().all()
-
-                embeddings_list = []
-                product_ids = []
-
-                for prod_emb in results:
-                    # Try embedding_vector first (pgvector), then embedding (legacy)
-                    emb_data = (
-                        prod_emb.embedding_vector
-                        if hasattr(prod_emb, "embedding_vector")
-                        and prod_emb.embedding_vector is not None
-                        else prod_emb.embedding
-                    )
-
-                    if emb_data is not None:
-                        if isinstance(emb_data, (list, tuple)):
-                            emb = np.array(emb_data, dtype=np.float32)
-                        else:
-                            emb = np.array(emb_data, dtype=np.float32)
-
-                        embeddings_list.append(emb)
-                        product_ids.append(str(prod_emb.product_id))
-
-            if len(embeddings_list) == 0:
+            pipeline = IndexBuildPipeline(progress=report_progress)
+            try:
+                result = pipeline.run(source_for_embedding_type(embedding_type), session=db)
+            except NoEmbeddingsError:
                 logger.error(f"No {embedding_type} embeddings found in database")
                 return {
                     "status": "error",
@@ -334,36 +318,10 @@ def rebuild_faiss_index(self, embedding_type: str = "text") -> Dict[str, Any]:
                     "embedding_type": embedding_type,
                 }
 
-            # Convert to numpy array
-            embeddings = np.vstack(embeddings_list)
-            logger.info(f"Fetched {len(embeddings)} embeddings from database")
-
-            # Build FAISS index
-            logger.info("Building FAISS index...")
-            builder = FAISSIndexBuilder()
-            index, id_mapping = builder.build_index(embeddings=embeddings, product_ids=product_ids)
-
-            # Save index to disk
-            logger.info("Saving FAISS index to disk...")
-            save_path = builder.save_index(index, id_mapping)
-
-            # Get index stats
-            stats = builder.get_index_stats(index)
-
-            logger.info(
-                f"FAISS index rebuilt successfully: "
-                f"{stats['num_vectors']} vectors, "
-                f"type={stats['index_type']}, "
-                f"saved to {save_path}"
-            )
-
             return {
                 "status": "success",
                 "embedding_type": embedding_type,
-                "num_vectors": stats["num_vectors"],
-                "index_type": stats["index_type"],
-                "save_path": str(save_path),
-                "stats": stats,
+                **result.to_dict(),
             }
 
         finally:
@@ -413,7 +371,7 @@ def update_user_embedding(self, user_id: str, max_interactions: int = 50) -> Dic
         # Import here to avoid circular dependencies and early loading
         from ..db.models import User
         from ..db.session import SessionLocal
-        from ..ml.caching import EmbeddingCache
+        from ..ml.caching import EmbeddingCache, UserCacheGenerations
         from ..ml.user_modeling import get_embedding_builder
 
         # Create database session
@@ -454,34 +412,12 @@ def update_user_embedding(self, user_id: str, max_interactions: int = 50) -> Dic
                     f"processed={metadata.get('processed_count', 0)}/{metadata.get('interaction_count', 0)}"
                 )
 
-                # Invalidate recommendation cache for this user
-                # Note: Cache keys are hashed, so we need to check each one
-                try:
-                    if cache:
-                        # Get all recommendation cache keys
-                        # Access the Redis client through cache.redis._get_client()
-                        redis_client = cache.redis._get_client()
-                        all_keys = redis_client.keys("recommend:*")
-                        deleted = 0
-
-                        for key in all_keys:
-                            # Check if this key belongs to this user
-                            # Keys contain "user:{user_id}" in the string before hashing
-                            # For now, we'll just delete all recommend keys (simple but effective)
-                            # TODO: Add user_id to cache key prefix for efficient invalidation
-                            key_str = key.decode("utf-8") if isinstance(key, bytes) else key
-                            if key_str.startswith("recommend:"):
-                                try:
-                                    redis_client.delete(key)
-                                    deleted += 1
-                                except:
-                                    pass
-
-                        logger.info(
-                            f"✓ Invalidated {deleted} recommendation cache entries after embedding update for user {user_id}"
-                        )
-                except Exception as e:
-                    logger.warning(f"Failed to invalidate cache for user {user_id}: {e}")
+                # Invalidate cached recommendations and search results for this user
+                # (one INCR of the user's cache generation, see UserCacheGenerations)
+                if cache and UserCacheGenerations(cache.config, cache.redis).bump(user_id):
+                    logger.info(
+                        f"✓ Invalidated cached results after embedding update for user {user_id}"
+                    )
 
                 return {
                     "status": "success",
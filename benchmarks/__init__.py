@@ -0,0 +1,7 @@
+"""
+Retrieval Benchmarks
+Reproducible recall/latency benchmarks for the retrieval stack on synthetic catalogs.
+
+Usage:
+    python -m benchmarks.run --sizes 10000 100000 --output results.json
+"""
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Cache Codec Benchmark
+Compares pickle with the typed cache codec (backend/ml/caching/codecs.py) on
+the payloads the API caches in Redis: bytes per key, encode and decode time.
+
+Runs offline (no Redis needed); decode time is what every cache hit pays.
+
+Usage:
+    python -m benchmarks.cache_codecs [--dim 512] [--results 50] [--repeat 2000]
+        [--output codecs.json]
+"""
+
+import argparse
+import json
+import pickle
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# Add repository root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ml.caching.codecs import CacheCodec
+
+
+def make_payloads(dim: int, num_results: int, seed: int = 0) -> Dict[str, Any]:
+    """Representative cache values, keyed by payload name."""
+    rng = np.random.default_rng(seed)
+    embedding = rng.standard_normal(dim).astype(np.float32)
+    embedding /= np.linalg.norm(embedding)
+
+    metadata = {
+        "id": str(uuid.UUID(int=int(rng.integers(1 << 62)))),
+        "title": "Relaxed fit organic cotton t-shirt",
+        "description": "Soft jersey tee with a crew neck and dropped shoulders. " * 3,
+        "price": 24.99,
+        "currency": "GBP",
+        "image_url": "https://images.example.com/products/123456/main.jpg",
+        "merchant_id": 1042,
+        "merchant_name": "Example Store",
+        "brand": "Example",
+        "brand_id": 77,
+        "in_stock": True,
+        "stock_quantity": 12,
+        "category_id": 5,
+        "category_name": "T-Shirts",
+        "product_url": "https://www.example.com/p/123456",
+        "rrp_price": 29.99,
+        "colour": "White",
+        "fashion_category": "Tops",
+        "fashion_size": "S,M,L,XL",
+        "quality_score": 0.82,
+        "rating": None,
+        "review_count": None,
+    }
+    response = {
+        "results": [
+            # Distinct string objects per result, as when rows come from the database
+            {
+                **{k: f"{v} {i}" if isinstance(v, str) else v for k, v in metadata.items()},
+                "product_id": str(uuid.UUID(int=i)),
+                "score": float(rng.random()),
+            }
+            for i in range(num_results)
+        ],
+        "total": num_results,
+        "page": 1,
+        "cached": False,
+        "search_time_ms": 12.5,
+    }
+
+    return {
+        "embedding_float32": embedding,
+        "embedding_float16": embedding.astype(np.float16),
+        "product_metadata": metadata,
+        f"response_{num_results}_results": response,
+        "counter": 1234,
+    }
+
+
+def time_per_call(func: Callable[[], Any], repeat: int) -> float:
+    """Best-of-3 mean time per call, in microseconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+
+def benchmark(payloads: Dict[str, Any], repeat: int) -> List[Dict[str, Any]]:
+    """Measure pickle and the cache codec on every payload."""
+    codec = CacheCodec(allow_pickle=False)
+    codecs = {
+        "pickle": (
+            lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+        ),
+        "codec": (codec.encode, codec.decode),
+    }
+
+    rows = []
+    for name, value in payloads.items():
+        for codec_name, (encode, decode) in codecs.items():
+            data = encode(value)
+            rows.append(
+                {
+                    "payload": name,
+                    "codec": codec_name,
+                    "bytes": len(data),
+                    "encode_us": time_per_call(lambda: encode(value), repeat),
+                    "decode_us": time_per_call(lambda: decode(data), repeat),
+                }
+            )
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    """Print results with the codec's change relative to pickle."""
+    baseline = {row["payload"]: row for row in rows if row["codec"] == "pickle"}
+
+    print(
+        f"{'payload':<24} {'codec':<7} {'bytes':>8} {'encode us':>10} {'decode us':>10}"
+        f" {'decode vs pickle':>17}"
+    )
+    for row in rows:
+        pickle_row = baseline[row["payload"]]
+        speedup = pickle_row["decode_us"] / row["decode_us"] if row["decode_us"] else 0.0
+        print(
+            f"{row['payload']:<24} {row['codec']:<7} {row['bytes']:>8} "
+            f"{row['encode_us']:>10.2f} {row['decode_us']:>10.2f} {speedup:>16.2f}x"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark Redis cache value codecs")
+    parser.add_argument("--dim", type=int, default=512, help="Embedding dimension")
+    parser.add_argument(
+        "--results", type=int, default=50, help="Results in the cached response payload"
+    )
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per timing")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    rows = benchmark(make_payloads(args.dim, args.results), args.repeat)
+    print_table(rows)
+
+    if args.output:
+        args.output.write_text(json.dumps(rows, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Cache Invalidation Replay
+Replays a traffic log against a simulated search/recommend result cache and
+compares invalidation strategies by hit rate.
+
+Strategies:
+    flush       Previous behavior: every feedback event queues
+                update_user_embedding, which deleted all recommend:* keys
+                (KEYS scan); per-user patterns in the feedback router never
+                matched the hashed keys, so search entries were not invalidated.
+    generation  Feedback bumps the user's cache generation (one INCR); only
+                that user's search and recommend entries stop being served.
+
+Besides hit rates, the replay counts stale hits: cached results served to a
+user after their own feedback, which invalidation is meant to prevent.
+
+Traffic log format (JSONL, one event per line, ordered by ts):
+    {"ts": 12.5, "type": "search", "user_id": "42", "key": "red dress"}
+    {"ts": 13.0, "type": "recommend", "user_id": "42", "key": "feed"}
+    {"ts": 14.2, "type": "feedback", "user_id": "42"}
+
+Usage:
+    python -m benchmarks.cache_invalidation --log traffic.jsonl
+    python -m benchmarks.cache_invalidation --generate 200000 [--users 5000]
+        [--feedback-rate 0.05] [--save-log traffic.jsonl] [--output results.json]
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+STRATEGIES = ("flush", "generation")
+CACHED_TYPES = ("search", "recommend")
+
+# CacheConfig.TTL_SEARCH_RESULTS / TTL_RECOMMEND_RESULTS (not imported: the API
+# package loads the ML models)
+DEFAULT_TTLS = {"search": 300, "recommend": 120}
+
+
+@dataclass
+class ReplayResult:
+    """Hit rates of one strategy over one traffic log."""
+
+    strategy: str
+    lookups: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    hits: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    stale_hits: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    invalidations: int = 0
+    keys_deleted: int = 0
+    keys_scanned: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "strategy": self.strategy,
+            "lookups": dict(self.lookups),
+            "hits": dict(self.hits),
+            "stale_hits": dict(self.stale_hits),
+            "invalidations": self.invalidations,
+            "keys_deleted": self.keys_deleted,
+            "keys_scanned": self.keys_scanned,
+        }
+        data["hit_rate"] = {
+            kind: self.hits[kind] / self.lookups[kind] if self.lookups[kind] else 0.0
+            for kind in CACHED_TYPES
+        }
+        total = sum(self.lookups.values())
+        data["overall_hit_rate"] = sum(self.hits.values()) / total if total else 0.0
+        return data
+
+
+def replay(events: Iterable[Dict[str, Any]], strategy: str, ttls: Dict[str, int]) -> ReplayResult:
+    """
+    Replay events against a TTL cache using an invalidation strategy.
+
+    Args:
+        events: Traffic events, ordered by timestamp
+        strategy: "flush" or "generation"
+        ttls: Result TTL in seconds per cached request type
+
+    Returns:
+        ReplayResult
+    """
+    result = ReplayResult(strategy=strategy)
+    # (type, user_id, generation, key) -> (expires_at, written_at)
+    cache: Dict[Tuple, Tuple[float, float]] = {}
+    generations: Dict[str, int] = defaultdict(int)
+    last_feedback: Dict[str, float] = {}
+
+    for event in events:
+        ts, kind, user_id = event["ts"], event["type"], event.get("user_id")
+
+        if kind == "feedback":
+            last_feedback[user_id] = ts
+            result.invalidations += 1
+            if strategy == "generation":
+                generations[user_id] += 1
+            else:
+                result.keys_scanned += len(cache)
+                stale = [k for k in cache if k[0] == "recommend"]
+                for k in stale:
+                    del cache[k]
+                result.keys_deleted += len(stale)
+            continue
+
+        if kind not in CACHED_TYPES:
+            continue
+
+        cache_key = (kind, user_id, generations[user_id] if user_id else 0, event["key"])
+        result.lookups[kind] += 1
+        entry = cache.get(cache_key)
+
+        if entry is not None and entry[0] > ts:
+            result.hits[kind] += 1
+            if user_id in last_feedback and entry[1] < last_feedback[user_id]:
+                result.stale_hits[kind] += 1
+        else:
+            cache[cache_key] = (ts + ttls[kind], ts)
+
+    return result
+
+
+def generate_log(
+    num_events: int,
+    num_users: int,
+    feedback_rate: float,
+    events_per_second: float = 200.0,
+    num_queries: int = 2000,
+    seed: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Synthetic traffic: Zipf-distributed users and queries.
+
+    Args:
+        num_events: Events to generate
+        num_users: Distinct users (about a quarter of searches are anonymous)
+        feedback_rate: Fraction of events that are feedback
+        events_per_second: Mean request rate (Poisson arrivals)
+        num_queries: Distinct search queries
+        seed: Random seed
+
+    Yields:
+        Traffic events
+    """
+    rng = np.random.default_rng(seed)
+    ts = 0.0
+    contexts = ["feed", "similar", "category"]
+
+    for _ in range(num_events):
+        ts += rng.exponential(1.0 / events_per_second)
+        user_id = str(min(int(rng.zipf(1.3)), num_users))
+        roll = rng.random()
+
+        if roll < feedback_rate:
+            yield {"ts": ts, "type": "feedback", "user_id": user_id}
+        elif roll < feedback_rate + (1 - feedback_rate) * 0.6:
+            query = f"q{min(int(rng.zipf(1.2)), num_queries)}"
+            anonymous = rng.random() < 0.25
+            yield {
+                "ts": ts,
+                "type": "search",
+                "user_id": None if anonymous else user_id,
+                "key": query,
+            }
+        else:
+            yield {
+                "ts": ts,
+                "type": "recommend",
+                "user_id": user_id,
+                "key": contexts[int(rng.integers(len(contexts)))],
+            }
+
+
+def read_log(path: Path) -> List[Dict[str, Any]]:
+    """Read a JSONL traffic log."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_results(results: List[ReplayResult]) -> None:
+    """Print hit rates per strategy."""
+    print(
+        f"{'strategy':<11} {'search hit':>11} {'recommend hit':>14} {'overall':>8}"
+        f" {'stale hits':>11} {'keys scanned':>13} {'keys deleted':>13}"
+    )
+    for result in results:
+        data = result.to_dict()
+        print(
+            f"{result.strategy:<11} {data['hit_rate']['search']:>11.1%} "
+            f"{data['hit_rate']['recommend']:>14.1%} {data['overall_hit_rate']:>8.1%} "
+            f"{sum(result.stale_hits.values()):>11} {result.keys_scanned:>13} "
+            f"{result.keys_deleted:>13}"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Replay traffic against cache invalidation")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--log", type=Path, help="JSONL traffic log to replay")
+    source.add_argument("--generate", type=int, help="Generate a synthetic log of N events")
+    parser.add_argument("--users", type=int, default=5000, help="Users in the synthetic log")
+    parser.add_argument(
+        "--feedback-rate", type=float, default=0.05, help="Feedback share of synthetic events"
+    )
+    parser.add_argument("--rate", type=float, default=200.0, help="Synthetic requests per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-log", type=Path, help="Write the synthetic log as JSONL")
+    parser.add_argument("--search-ttl", type=int, default=DEFAULT_TTLS["search"], help="Seconds")
+    parser.add_argument(
+        "--recommend-ttl", type=int, default=DEFAULT_TTLS["recommend"], help="Seconds"
+    )
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    if args.log:
+        events = read_log(args.log)
+    else:
+        events = list(
+            generate_log(args.generate, args.users, args.feedback_rate, args.rate, seed=args.seed)
+        )
+        if args.save_log:
+            with open(args.save_log, "w") as f:
+                f.writelines(json.dumps(event) + "\n" for event in events)
+
+    ttls = {"search": args.search_ttl, "recommend": args.recommend_ttl}
+    results = [replay(events, strategy, ttls) for strategy in STRATEGIES]
+
+    print(
+        f"Replayed {len(events)} events (TTL search={ttls['search']}s, "
+        f"recommend={ttls['recommend']}s)\n"
+    )
+    print_results(results)
+
+    if args.output:
+        args.output.write_text(json.dumps([r.to_dict() for r in results], indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Cache Stampede Benchmark
+Simulates bursts of identical requests arriving as a popular cached result
+expires, and compares how many times the result is computed and the latency
+the burst sees.
+
+Strategies:
+    none           Previous behavior: every request that misses computes the
+                   result and writes the same key.
+    single_flight  SingleFlight (backend/ml/caching/single_flight.py): one
+                   computation per key across workers, expired entries served
+                   while it runs.
+
+Each simulated worker is its own SingleFlight instance (its own in-process
+coalescing) sharing one Redis, so cross-worker locking is exercised. Needs a
+running Redis (REDIS_HOST/REDIS_PORT/REDIS_DB); keys are written under
+bench:stampede: and deleted afterwards.
+
+Usage:
+    python -m benchmarks.cache_stampede [--workers 4] [--concurrency 50]
+        [--compute-ms 150] [--ttl 2] [--rounds 5] [--output stampede.json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add repository root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ml.caching.redis_cache import RedisCache
+from backend.ml.caching.single_flight import SingleFlight
+
+STRATEGIES = ("none", "single_flight")
+KEY_PREFIX = "bench:stampede:"
+
+
+async def run_strategy(
+    strategy: str,
+    redis_cache: RedisCache,
+    workers: int,
+    concurrency: int,
+    compute_ms: float,
+    ttl: int,
+    rounds: int,
+) -> Dict[str, Any]:
+    """
+    Fire a burst of identical requests each time the cached result expires.
+
+    Args:
+        strategy: "none" or "single_flight"
+        redis_cache: Redis cache client
+        workers: Simulated API workers
+        concurrency: Concurrent requests per worker per burst
+        compute_ms: Time to compute the result (encode + search + enrichment)
+        ttl: Result freshness in seconds
+        rounds: Bursts after the initial fill
+
+    Returns:
+        Computations and latency percentiles over all bursts
+    """
+    key = f"{KEY_PREFIX}{strategy}"
+    redis_cache.delete(key)
+    flights = [SingleFlight(redis_cache, stale_seconds=ttl * 10) for _ in range(workers)]
+    computations = 0
+
+    async def compute() -> Dict[str, Any]:
+        nonlocal computations
+        computations += 1
+        await asyncio.sleep(compute_ms / 1000)
+        return {"results": list(range(50)), "computed_at": time.time()}
+
+    async def request(flight: SingleFlight) -> float:
+        start = time.perf_counter()
+        if strategy == "none":
+            value = await asyncio.to_thread(redis_cache.get, key)
+            if value is None:
+                value = await compute()
+                await asyncio.to_thread(redis_cache.set, key, value, ttl)
+        else:
+            await flight.get_or_compute(
+                key,
+                compute,
+                lookup=lambda k: flight.unwrap(redis_cache.get(k)),
+                store=lambda k, v: redis_cache.set(k, *flight.wrap(v, ttl)),
+            )
+        return (time.perf_counter() - start) * 1000
+
+    async def burst() -> List[float]:
+        return await asyncio.gather(
+            *[request(flight) for flight in flights for _ in range(concurrency)]
+        )
+
+    await burst()  # Initial fill
+    computations = 0
+    latencies: List[float] = []
+
+    for _ in range(rounds):
+        await asyncio.sleep(ttl + 0.1)
+        latencies.extend(await burst())
+
+    redis_cache.delete(key)
+    return {
+        "strategy": strategy,
+        "requests": len(latencies),
+        "computations": computations,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(np.max(latencies)),
+        "single_flight": [flight.get_stats() for flight in flights] if strategy != "none" else [],
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark cache stampede protection")
+    parser.add_argument("--workers", type=int, default=4, help="Simulated API workers")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests per worker per burst")
+    parser.add_argument("--compute-ms", type=float, default=150.0, help="Result compute time")
+    parser.add_argument("--ttl", type=int, default=2, help="Result freshness in seconds")
+    parser.add_argument("--rounds", type=int, default=5, help="Bursts after expiry")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    redis_cache = RedisCache()
+    results = [
+        asyncio.run(
+            run_strategy(
+                strategy,
+                redis_cache,
+                args.workers,
+                args.concurrency,
+                args.compute_ms,
+                args.ttl,
+                args.rounds,
+            )
+        )
+        for strategy in STRATEGIES
+    ]
+
+    print(
+        f"{args.rounds} bursts of {args.workers}x{args.concurrency} requests "
+        f"(compute {args.compute_ms:.0f}ms, TTL {args.ttl}s)\n"
+    )
+    print(f"{'strategy':<14} {'computations':>13} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for result in results:
+        print(
+            f"{result['strategy']:<14} {result['computations']:>13} {result['p50_ms']:>9.1f} "
+            f"{result['p99_ms']:>9.1f} {result['max_ms']:>9.1f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
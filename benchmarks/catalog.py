@@ -0,0 +1,172 @@
+"""
+Synthetic Catalogs
+Clustered product embeddings and attributes standing in for a real catalog.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.ml.config import MLConfig
+from backend.ml.retrieval import FAISSIndexBuilder, ProductAttributeStore, ProductFilters
+from backend.ml.retrieval.sharding import merge_topk
+
+logger = logging.getLogger(__name__)
+
+# Vectors generated (and scanned for ground truth) per chunk
+CHUNK_SIZE = 262144
+
+NUM_CLUSTERS = 1024
+NUM_CATEGORIES = 200
+NUM_MERCHANTS = 50
+NUM_BRANDS = 500
+
+
+@dataclass
+class SyntheticCatalog:
+    """Embeddings, product IDs and attributes of a synthetic catalog."""
+
+    vectors: np.ndarray
+    product_ids: List[uuid.UUID]
+    attributes: ProductAttributeStore
+
+    @property
+    def size(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+
+def generate_catalog(size: int, dimension: int = 512, seed: int = 0) -> SyntheticCatalog:
+    """
+    Generate a clustered catalog of unit-norm embeddings with Zipf-like attributes.
+
+    Embeddings are drawn around NUM_CLUSTERS centers, so approximate indices
+    behave as they do on real product embeddings (uniform random vectors have
+    no neighborhood structure). Categories, merchants and brands follow a
+    power law, giving filters a realistic spread of selectivities.
+
+    Args:
+        size: Number of products
+        dimension: Embedding dimension
+        seed: Random seed (same seed, same catalog)
+
+    Returns:
+        SyntheticCatalog
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((NUM_CLUSTERS, dimension)).astype(np.float32)
+
+    vectors = np.empty((size, dimension), dtype=np.float32)
+    for start in range(0, size, CHUNK_SIZE):
+        end = min(start + CHUNK_SIZE, size)
+        chunk = centers[rng.integers(0, NUM_CLUSTERS, end - start)]
+        chunk += 0.6 * rng.standard_normal(chunk.shape, dtype=np.float32)
+        chunk /= np.linalg.norm(chunk, axis=1, keepdims=True)
+        vectors[start:end] = chunk
+
+    def zipf_ids(count: int) -> np.ndarray:
+        weights = 1.0 / np.arange(1, count + 1)
+        return rng.choice(np.arange(1, count + 1), size=size, p=weights / weights.sum())
+
+    attributes = ProductAttributeStore(
+        {
+            "price": rng.lognormal(mean=3.5, sigma=0.8, size=size),
+            "in_stock": rng.random(size) < 0.9,
+            "stock_quantity": rng.integers(0, 100, size),
+            "merchant_id": zipf_ids(NUM_MERCHANTS),
+            "category_id": zipf_ids(NUM_CATEGORIES),
+            "brand_id": zipf_ids(NUM_BRANDS),
+            "gender": rng.choice([ord("M"), ord("F"), ord("U")], size=size),
+            "is_active": rng.random(size) < 0.98,
+        }
+    )
+
+    product_ids = [uuid.UUID(int=i + 1) for i in range(size)]
+    return SyntheticCatalog(vectors=vectors, product_ids=product_ids, attributes=attributes)
+
+
+def filter_profiles() -> Dict[str, ProductFilters]:
+    """Filter mixes covering broad, scoped and highly selective queries."""
+    return {
+        "broad": ProductFilters(max_price=100.0),
+        "category": ProductFilters(category_ids=[1]),
+        "rare_category": ProductFilters(category_ids=[150, 151]),
+        "brand_price": ProductFilters(brand_ids=[3, 4, 5], min_price=20.0, max_price=80.0),
+    }
+
+
+def sample_queries(catalog: SyntheticCatalog, num_queries: int, seed: int = 1) -> np.ndarray:
+    """Queries near (not at) catalog products, like user and text embeddings."""
+    rng = np.random.default_rng(seed)
+    queries = catalog.vectors[rng.choice(catalog.size, num_queries, replace=False)].copy()
+    queries += 0.1 * rng.standard_normal(queries.shape, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries
+
+
+def exact_topk(
+    vectors: np.ndarray, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Exact top-k positions by squared L2 distance, scanning vectors in chunks.
+
+    Args:
+        vectors: Catalog vectors
+        queries: Query vectors
+        k: Number of neighbors
+        mask: Optional boolean mask of eligible positions
+
+    Returns:
+        Positions of shape (n_queries, k), padded with -1
+    """
+    query_norms = (queries**2).sum(axis=1, keepdims=True)
+    best_distances, best_labels = [], []
+
+    for start in range(0, len(vectors), CHUNK_SIZE):
+        chunk = vectors[start : start + CHUNK_SIZE]
+        distances = query_norms - 2 * queries @ chunk.T + (chunk**2).sum(axis=1)
+        if mask is not None:
+            distances[:, ~mask[start : start + CHUNK_SIZE]] = np.inf
+
+        top = min(k, chunk.shape[0])
+        part = np.argpartition(distances, top - 1, axis=1)[:, :top]
+        labels = part + start
+        labels[np.take_along_axis(distances, part, axis=1) == np.inf] = -1
+        best_distances.append(np.take_along_axis(distances, part, axis=1))
+        best_labels.append(labels)
+
+        merged = merge_topk(best_distances, best_labels, k)
+        best_distances, best_labels = [merged[0]], [merged[1]]
+
+    return best_labels[0]
+
+
+def write_index(catalog: SyntheticCatalog, path: Path, config: MLConfig) -> Dict:
+    """
+    Build the configured index type over a catalog and save it with its attributes.
+
+    Args:
+        catalog: Synthetic catalog
+        path: Index directory
+        config: ML configuration (index type and tuning settings)
+
+    Returns:
+        Index statistics
+    """
+    builder = FAISSIndexBuilder(config)
+    index, id_mapping = builder.build_index(catalog.vectors, catalog.product_ids)
+    builder.save_index(
+        index, id_mapping, path=path, vectors=catalog.vectors, attributes=catalog.attributes
+    )
+
+    stats = builder.get_index_stats(index)
+    if builder.last_tuning is not None:
+        stats["tuning"] = builder.last_tuning.to_dict()
+    return stats
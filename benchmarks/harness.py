@@ -0,0 +1,121 @@
+"""
+Benchmark Harness
+Times a callable over a query set and reports throughput, latency percentiles,
+recall@k and peak memory.
+"""
+
+import gc
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one scenario on one catalog."""
+
+    scenario: str
+    catalog_size: int
+    num_queries: int
+    batch_size: int
+    qps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    recall_at_k: Optional[float]
+    peak_rss_mb: float
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def recall_at_k(found: Sequence[Sequence[int]], truth: np.ndarray) -> float:
+    """
+    Fraction of exact top-k neighbors that were returned.
+
+    Args:
+        found: Returned positions per query
+        truth: Exact positions per query (-1 padded when fewer than k exist)
+
+    Returns:
+        Recall averaged over all true neighbors
+    """
+    hits = total = 0
+    for returned, expected in zip(found, truth):
+        expected = set(expected[expected >= 0].tolist())
+        hits += len(expected & set(returned))
+        total += len(expected)
+    return hits / total if total else 1.0
+
+
+def run_benchmark(
+    scenario: str,
+    func: Callable[[np.ndarray], Optional[List[List[int]]]],
+    queries: np.ndarray,
+    catalog_size: int,
+    truth: Optional[np.ndarray] = None,
+    batch_size: int = 1,
+    warmup: int = 10,
+    params: Optional[Dict[str, Any]] = None,
+) -> BenchmarkResult:
+    """
+    Run func over queries in batches and measure it.
+
+    Args:
+        scenario: Scenario name
+        func: Called with a (batch_size, dim) array; returns result positions per
+              query for recall, or None when recall does not apply
+        queries: Query vectors
+        catalog_size: Number of products in the catalog
+        truth: Exact top-k positions per query (enables recall)
+        batch_size: Queries per call
+        warmup: Untimed calls before measuring
+        params: Scenario parameters to record
+
+    Returns:
+        BenchmarkResult (latency percentiles are per call)
+    """
+    batches = [queries[i : i + batch_size] for i in range(0, len(queries), batch_size)]
+    for batch in batches[:warmup]:
+        func(batch)
+
+    gc.collect()
+    latencies = []
+    found: List[List[int]] = []
+    start = time.perf_counter()
+    for batch in batches:
+        call_start = time.perf_counter()
+        positions = func(batch)
+        latencies.append((time.perf_counter() - call_start) * 1000)
+        if positions is not None:
+            found.extend(positions)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    return BenchmarkResult(
+        scenario=scenario,
+        catalog_size=catalog_size,
+        num_queries=len(queries),
+        batch_size=batch_size,
+        qps=len(queries) / elapsed,
+        p50_ms=float(np.percentile(latencies, 50)),
+        p95_ms=float(np.percentile(latencies, 95)),
+        p99_ms=float(np.percentile(latencies, 99)),
+        mean_ms=float(latencies.mean()),
+        recall_at_k=recall_at_k(found, truth) if truth is not None and found else None,
+        peak_rss_mb=peak_rss_mb(),
+        params=params or {},
+    )
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+Builds synthetic catalogs, serves them through FAISSIndexManager and benchmarks
+the retrieval paths. Results are written as JSON for comparison across commits.
+
+Usage:
+    python -m benchmarks.run [--sizes 10000 100000 ...] [--dim 512] [--index-type Flat]
+        [--scenarios similarity filtered ...] [--queries 500] [--k 10]
+        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add repository root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ml.config import get_ml_config
+from backend.ml.retrieval import get_index_manager
+
+from .catalog import exact_topk, filter_profiles, generate_catalog, sample_queries, write_index
+from .harness import run_benchmark
+from .scenarios import SCENARIO_GROUPS, build_scenarios
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+QUERIES_FILE = "queries.npy"
+TRUTH_FILE = "truth.npz"
+BUILD_FILE = "build.json"
+
+# Metrics compared by --compare, and whether higher is better
+COMPARED_METRICS = {"qps": True, "p50_ms": False, "p99_ms": False, "recall_at_k": True}
+
+
+def configure(args: argparse.Namespace, index_path: Path):
+    """Benchmark configuration: the requested index type, no Redis delta stream."""
+    config = get_ml_config()
+    config.embedding.product_embedding_dim = args.dim
+    config.storage.faiss_index_type = args.index_type
+    config.storage.faiss_index_path = index_path
+    config.storage.faiss_delta_updates_enabled = False
+    return config
+
+
+def prepare_catalog(path: Path, size: int, args: argparse.Namespace) -> None:
+    """
+    Generate a catalog, build its index and exact ground truth into path.
+
+    Runs in a child process, so generation and index build memory does not
+    count towards the serving process's peak RSS.
+    """
+    logging.getLogger("backend").setLevel(logging.WARNING)
+    config = configure(args, path)
+
+    catalog = generate_catalog(size, dimension=args.dim, seed=args.seed)
+    queries = sample_queries(catalog, args.queries, seed=args.seed + 1)
+
+    truth = {"all": exact_topk(catalog.vectors, queries, args.k)}
+    for name, filters in filter_profiles().items():
+        truth[name] = exact_topk(
+            catalog.vectors, queries, args.k, mask=catalog.attributes.evaluate(filters)
+        )
+
+    start = time.perf_counter()
+    stats = write_index(catalog, path, config)
+    stats["build_seconds"] = time.perf_counter() - start
+
+    np.save(path / QUERIES_FILE, queries)
+    np.savez(path / TRUTH_FILE, **truth)
+    (path / BUILD_FILE).write_text(json.dumps(stats, indent=2, default=str))
+
+
+def benchmark_catalog(path: Path, size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Load a prepared catalog into the index manager and run the scenarios."""
+    config = configure(args, path)
+    index_manager = get_index_manager(config)
+    index_manager.load_index_from_disk(path)
+
+    queries = np.load(path / QUERIES_FILE)
+    truth = dict(np.load(path / TRUTH_FILE))
+    build = json.loads((path / BUILD_FILE).read_text())
+
+    results = []
+    for scenario in build_scenarios(
+        args.scenarios, config, index_manager, queries, truth, args.k, args.batch_size
+    ):
+        result = run_benchmark(
+            scenario.name,
+            scenario.func,
+            queries,
+            catalog_size=size,
+            truth=scenario.truth,
+            batch_size=scenario.batch_size,
+            params=scenario.params,
+        )
+        results.append(result.to_dict())
+        recall = "-" if result.recall_at_k is None else f"{result.recall_at_k:.3f}"
+        print(
+            f"{size:>9} {result.scenario:<40} {result.qps:>9.0f} {result.p50_ms:>8.2f} "
+            f"{result.p95_ms:>8.2f} {result.p99_ms:>8.2f} {recall:>7} {result.peak_rss_mb:>8.0f}"
+        )
+
+    return {"build": build, "results": results}
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and machine details recorded with the results."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    try:
+        import faiss
+
+        faiss_version = faiss.__version__
+    except ImportError:
+        faiss_version = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "faiss": faiss_version,
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path) -> None:
+    """Print relative changes against a previous results file."""
+    baseline = {
+        (r["catalog_size"], r["scenario"]): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+
+    print(f"\n=== Compared to {baseline_path} ===\n")
+    print(f"{'size':>9} {'scenario':<40} " + " ".join(f"{m:>12}" for m in COMPARED_METRICS))
+    for result in results:
+        before = baseline.get((result["catalog_size"], result["scenario"]))
+        if before is None:
+            continue
+
+        cells = []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                cells.append(f"{'-':>12}")
+            elif metric == "recall_at_k":
+                cells.append(f"{new - old:>+12.3f}")
+            else:
+                change = (new - old) / old * 100 if old else 0.0
+                marker = "+" if (change > 0) == higher_is_better else "-"
+                cells.append(f"{change:>+10.1f}%{marker if abs(change) >= 5 else ' '}")
+        print(f"{result['catalog_size']:>9} {result['scenario']:<40} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval recall/latency benchmarks")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000], help="Catalog sizes"
+    )
+    parser.add_argument("--dim", type=int, default=512, help="Embedding dimension")
+    parser.add_argument(
+        "--index-type",
+        default="Flat",
+        choices=["Flat", "IVF", "HNSW", "IVFPQ", "OPQ"],
+        help="FAISS index type",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=list(SCENARIO_GROUPS),
+        choices=SCENARIO_GROUPS,
+        help="Scenario groups to run",
+    )
+    parser.add_argument("--queries", type=int, default=500, help="Queries per scenario")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch search size")
+    parser.add_argument("--seed", type=int, default=0, help="Catalog random seed")
+    parser.add_argument("--work-dir", type=str, help="Directory for catalogs (default: temp)")
+    parser.add_argument(
+        "--reuse-catalogs",
+        action="store_true",
+        help="Reuse catalogs already prepared in --work-dir instead of rebuilding",
+    )
+    parser.add_argument("--output", type=str, help="Write JSON results to this file")
+    parser.add_argument("--compare", type=str, help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    logging.getLogger("backend").setLevel(logging.WARNING)
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="knytt-bench-"))
+    report = {"environment": environment(), "args": vars(args), "builds": {}, "results": []}
+
+    print(
+        f"\n{'size':>9} {'scenario':<40} {'qps':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'recall':>7} {'rss MB':>8}"
+    )
+    for size in args.sizes:
+        path = work_dir / f"{args.index_type}-{size}-{args.dim}-s{args.seed}-q{args.queries}"
+        if not (args.reuse_catalogs and (path / BUILD_FILE).exists()):
+            path.mkdir(parents=True, exist_ok=True)
+            process = multiprocessing.get_context("spawn").Process(
+                target=prepare_catalog, args=(path, size, args)
+            )
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                logger.error(f"Preparing the {size} product catalog failed")
+                sys.exit(1)
+
+        catalog_report = benchmark_catalog(path, size, args)
+        report["builds"][str(size)] = catalog_report["build"]
+        report["results"].extend(catalog_report["results"])
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(report["results"], Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
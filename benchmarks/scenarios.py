@@ -0,0 +1,178 @@
+"""
+Benchmark Scenarios
+Retrieval paths exercised by the benchmark, each wrapped as a batch -> positions callable.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.ml.config import MLConfig
+from backend.ml.retrieval import (
+    FAISSIndexManager,
+    FilteredSimilaritySearch,
+    HeuristicRanker,
+    ProductFilters,
+    SearchResults,
+    SimilaritySearch,
+    create_user_context,
+)
+from backend.ml.search import SearchMode, SearchRequest, SearchService
+
+from .catalog import filter_profiles
+
+# Scenario groups selectable with --scenarios
+SCENARIO_GROUPS = ("similarity", "similarity_batch", "filtered", "ranking", "service")
+
+# Forced FilteredSimilaritySearch strategies (None = automatic choice)
+FILTER_STRATEGIES = (None, "subset", "postfilter", "selector")
+
+
+@dataclass
+class Scenario:
+    """One benchmarked code path."""
+
+    name: str
+    func: Callable[[np.ndarray], Optional[List[List[int]]]]
+    truth: Optional[np.ndarray] = None
+    batch_size: int = 1
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def build_scenarios(
+    groups: List[str],
+    config: MLConfig,
+    index_manager: FAISSIndexManager,
+    queries: np.ndarray,
+    truth: Dict[str, np.ndarray],
+    k: int,
+    batch_size: int,
+) -> List[Scenario]:
+    """
+    Create the scenarios of the selected groups.
+
+    Args:
+        groups: Scenario groups (see SCENARIO_GROUPS)
+        config: ML configuration
+        index_manager: Index manager serving the synthetic catalog
+        queries: Query vectors (used to precompute ranking inputs)
+        truth: Exact top-k positions; "all" plus one entry per filter profile
+        k: Results per query
+        batch_size: Queries per call for batch scenarios
+
+    Returns:
+        Scenarios in execution order
+    """
+
+    def positions(results: SearchResults) -> List[int]:
+        snapshot = index_manager.get_snapshot()
+        return snapshot.id_mapping.positions_of(list(results.product_ids)).tolist()
+
+    scenarios = []
+    similarity = SimilaritySearch(config=config, index_manager=index_manager)
+
+    if "similarity" in groups:
+        scenarios.append(
+            Scenario(
+                "similarity_search",
+                lambda batch: [positions(similarity.search(batch[0], k=k))],
+                truth=truth["all"],
+            )
+        )
+
+    if "similarity_batch" in groups:
+        scenarios.append(
+            Scenario(
+                "similarity_search_batch",
+                lambda batch: [positions(r) for r in similarity.search_batch(batch, k=k)],
+                truth=truth["all"],
+                batch_size=batch_size,
+            )
+        )
+
+    if "filtered" in groups:
+        filtered = FilteredSimilaritySearch(config=config, index_manager=index_manager)
+        for (profile, filters), strategy in itertools.product(
+            filter_profiles().items(), FILTER_STRATEGIES
+        ):
+            scenarios.append(
+                Scenario(
+                    f"filtered_search[{profile}:{strategy or 'auto'}]",
+                    _filtered_func(filtered, filters, strategy, k, positions),
+                    truth=truth[profile],
+                    params={"filters": profile, "strategy": strategy or "auto"},
+                )
+            )
+
+    if "ranking" in groups:
+        scenarios.append(_ranking_scenario(similarity, queries, k))
+
+    if "service" in groups:
+        service = SearchService(config=config)
+        scenarios.append(
+            Scenario(
+                "search_service[feed]",
+                _service_func(service, None, k, positions),
+                truth=truth["all"],
+            )
+        )
+        scenarios.append(
+            Scenario(
+                "search_service[category]",
+                _service_func(service, filter_profiles()["category"], k, positions),
+                truth=truth["category"],
+                params={"filters": "category"},
+            )
+        )
+
+    return scenarios
+
+
+def _filtered_func(
+    filtered: FilteredSimilaritySearch,
+    filters: ProductFilters,
+    strategy: Optional[str],
+    k: int,
+    positions: Callable,
+) -> Callable:
+    def run(batch: np.ndarray) -> List[List[int]]:
+        return [positions(filtered.search_with_filters(batch[0], filters, k=k, strategy=strategy))]
+
+    return run
+
+
+def _ranking_scenario(similarity: SimilaritySearch, queries: np.ndarray, k: int) -> Scenario:
+    """Re-rank 2k candidates per query (as PersonalizedSearch does) with random signals."""
+    rng = np.random.default_rng(2)
+    inputs = []
+    for query in queries:
+        candidates = similarity.search(query, k=2 * k)
+        product_ids = list(candidates.product_ids)
+        signals = [dict(zip(product_ids, rng.random(len(product_ids)))) for _ in range(3)]
+        inputs.append((candidates, signals))
+
+    ranker = HeuristicRanker()
+    pending = itertools.cycle(inputs)
+
+    def run(batch: np.ndarray) -> None:
+        candidates, (popularity, price, brand) = next(pending)
+        ranker.rank_results(candidates.copy(), popularity, price, brand)
+
+    return Scenario("ranking", run, params={"candidates": 2 * k})
+
+
+def _service_func(
+    service: SearchService, filters: Optional[ProductFilters], k: int, positions: Callable
+) -> Callable:
+    def run(batch: np.ndarray) -> List[List[int]]:
+        request = SearchRequest(
+            user_context=create_user_context(user_id=1, long_term_embedding=batch[0]),
+            mode=SearchMode.PERSONALIZED_FEED,
+            filters=filters,
+            limit=k,
+        )
+        return [positions(service.search(request).results)]
+
+    return run
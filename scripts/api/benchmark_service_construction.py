@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark Service Construction
+Compares the per-request cost of building the search service graph (the old
+``get_search_service`` behaviour) with resolving it from the shared service container.
+
+Usage:
+    python scripts/api/benchmark_service_construction.py [--requests NUM]
+"""
+
+import argparse
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.services.container import ServiceContainer
+from backend.ml.retrieval import FilteredSimilaritySearch, SimilaritySearch
+from backend.ml.search import SearchService
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def per_request_construction():
+    """What every search/recommend request used to build."""
+    service = SearchService()
+    index_manager = service.personalized_search.index_manager
+    SimilaritySearch(index_manager=index_manager)
+    FilteredSimilaritySearch(index_manager=index_manager)
+    return service
+
+
+def shared_container_lookup(container: ServiceContainer):
+    """What a request does now: read members of the shared container."""
+    return container.search_service, container.similarity_search, container.filtered_search
+
+
+def measure(name: str, func, num_requests: int) -> dict:
+    """Time func over num_requests calls and record allocated memory."""
+    func()  # warm imports and singletons
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        func()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "name": name,
+        "us_per_request": elapsed / num_requests * 1e6,
+        "peak_kb": peak / 1024,
+    }
+    print(
+        f"{name:<32} {result['us_per_request']:>10.1f} us/request  peak {result['peak_kb']:>8.1f} KB"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request service construction")
+    parser.add_argument("--requests", type=int, default=1000, help="Simulated requests")
+    parser.add_argument(
+        "--with-logs",
+        action="store_true",
+        help="Keep constructor INFO logs enabled (they are part of the per-request cost)",
+    )
+    args = parser.parse_args()
+
+    if not args.with_logs:
+        logging.getLogger("backend").setLevel(logging.WARNING)
+
+    print(f"\n=== Service construction: {args.requests} simulated requests ===\n")
+
+    container = ServiceContainer()
+
+    before = measure("per-request construction", per_request_construction, args.requests)
+    after = measure(
+        "shared service container", lambda: shared_container_lookup(container), args.requests
+    )
+
+    print(f"\nSpeedup: {before['us_per_request'] / max(after['us_per_request'], 1e-9):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark Index Compression
+Recall-vs-memory report for the FAISS index types, including the product-quantized
+modes (IVFPQ, OPQ) with and without exact re-ranking.
+
+Usage:
+    python scripts/ml/benchmark_index_compression.py [--vectors PATH.npy] [--synthetic NUM]
+        [--types Flat IVF HNSW IVFPQ OPQ] [--queries NUM] [--k K] [--refine-factor N]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.ml.config import get_ml_config
+from backend.ml.retrieval.index_builder import INDEX_FILE, VECTORS_FILE, FAISSIndexBuilder
+from backend.ml.retrieval.index_manager import IndexSnapshot
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def load_vectors(args, dimension: int) -> np.ndarray:
+    """Load embeddings from a .npy file, or generate clustered synthetic ones."""
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+    else:
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((256, dimension)).astype(np.float32)
+        assignments = rng.integers(0, len(centers), args.synthetic)
+        vectors = centers[assignments] + 0.5 * rng.standard_normal(
+            (args.synthetic, dimension)
+        ).astype(np.float32)
+
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Ground-truth top-k labels by brute force."""
+    import faiss
+
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    return index.search(queries, k)[1]
+
+
+def recall_at_k(labels: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(expected)) for row, expected in zip(labels, truth))
+    return hits / truth.size
+
+
+def benchmark_type(index_type, vectors, queries, truth, k, refine_factor) -> list:
+    """Build, save, reload (mmap) and search one index type."""
+    config = get_ml_config()
+    config.storage.faiss_index_type = index_type
+    builder = FAISSIndexBuilder(config)
+
+    start = time.perf_counter()
+    index, id_mapping = builder.build_index(vectors, [str(i) for i in range(len(vectors))])
+    build_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as path:
+        saved = builder.save_index(index, id_mapping, path=Path(path), vectors=vectors)
+        index, id_mapping, _ = builder.load_index(saved)
+        stored = builder.load_vectors(index, saved)
+
+        index_bytes = (saved / INDEX_FILE).stat().st_size
+        vectors_file = saved / VECTORS_FILE
+        store_bytes = vectors_file.stat().st_size if vectors_file.exists() else 0
+
+        snapshot = IndexSnapshot(index=index, id_mapping=id_mapping, vectors=stored)
+        variants = [("", snapshot)]
+        if builder.is_compressed(index):
+            variants.append(
+                (f"+refine x{refine_factor}", replace(snapshot, refine_factor=refine_factor))
+            )
+
+        rows = []
+        for suffix, variant in variants:
+            latencies = []
+            labels = []
+            for query in queries:
+                start = time.perf_counter()
+                labels.append(variant.search(query[None, :], k)[1][0])
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            rows.append(
+                {
+                    "type": index_type + suffix,
+                    "recall": recall_at_k(np.array(labels), truth),
+                    "index_bytes_per_vector": index_bytes / len(vectors),
+                    "store_bytes_per_vector": store_bytes / len(vectors),
+                    "p50_ms": float(np.percentile(latencies, 50)),
+                    "p95_ms": float(np.percentile(latencies, 95)),
+                    "build_s": build_s,
+                }
+            )
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS index recall-vs-memory report")
+    parser.add_argument("--vectors", type=str, help=".npy file of embeddings (N x dim)")
+    parser.add_argument("--synthetic", type=int, default=50000, help="Synthetic vectors")
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        default=["Flat", "IVF", "HNSW", "IVFPQ", "OPQ"],
+        help="Index types to compare",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Queries to evaluate")
+    parser.add_argument("--k", type=int, default=10, help="Neighbors per query")
+    parser.add_argument(
+        "--refine-factor",
+        type=int,
+        default=None,
+        help="Re-ranked candidates per result (default: config faiss_refine_factor)",
+    )
+    args = parser.parse_args()
+
+    logging.getLogger("backend").setLevel(logging.WARNING)
+
+    config = get_ml_config()
+    refine_factor = args.refine_factor or config.storage.faiss_refine_factor
+    vectors = load_vectors(args, config.embedding.product_embedding_dim)
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = exact_neighbors(vectors, queries, args.k)
+
+    print(f"\n=== Recall vs memory: {len(vectors)} vectors, {args.queries} queries ===\n")
+    print(
+        f"{'type':<20} {'recall@' + str(args.k):>10} {'RAM B/vec':>10} {'disk B/vec':>11} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'build s':>8}"
+    )
+
+    for index_type in args.types:
+        for row in benchmark_type(index_type, vectors, queries, truth, args.k, refine_factor):
+            print(
+                f"{row['type']:<20} {row['recall']:>10.3f} "
+                f"{row['index_bytes_per_vector']:>10.0f} {row['store_bytes_per_vector']:>11.0f} "
+                f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['build_s']:>8.1f}"
+            )
+
+    print(
+        "\nRAM B/vec: index.faiss size per vector (resident index memory).\n"
+        "disk B/vec: vectors.npy per vector (memory-mapped, only touched pages are resident;\n"
+        "float16 for PQ types, used by the re-ranking stage)."
+    )
+
+
+if __name__ == "__main__":
+    main()
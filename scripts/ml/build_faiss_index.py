@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
 Build FAISS Index Script
-Builds FAISS index from product embeddings in PostgreSQL.
+Builds FAISS index from product embeddings in PostgreSQL (or an NPY/Parquet dump).
 
 Usage:
-    python scripts/ml/build_faiss_index.py [--index-type Flat|IVF|HNSW] [--force-rebuild]
+    python scripts/ml/build_faiss_index.py [--index-type Flat|IVF|HNSW|IVFPQ|OPQ] [--force-rebuild]
+        [--from-file embeddings.npy|embeddings.parquet [--product-ids product_ids.npy]]
 """
 
 import sys
@@ -16,6 +17,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from backend.ml.config import get_ml_config
+from backend.ml.retrieval.build_pipeline import FileSource
 from backend.ml.retrieval.index_manager import FAISSIndexManager
 
 # Configure logging
@@ -51,7 +53,7 @@ def main():
     parser.add_argument(
         '--index-type',
         type=str,
-        choices=['Flat', 'IVF', 'HNSW'],
+        choices=['Flat', 'IVF', 'HNSW', 'IVFPQ', 'OPQ'],
         help='FAISS index type (default: from config)'
     )
     parser.add_argument(
@@ -64,6 +66,16 @@ def main():
         action='store_true',
         help='Only load existing index from disk (do not rebuild)'
     )
+    parser.add_argument(
+        '--from-file',
+        type=str,
+        help='Build from an embedding dump (.npy matrix or .parquet) instead of the database'
+    )
+    parser.add_argument(
+        '--product-ids',
+        type=str,
+        help='Product IDs .npy for --from-file NPY dumps (default: product_ids.npy next to it)'
+    )
     parser.add_argument(
         '--stats',
         action='store_true',
@@ -114,9 +126,11 @@ def main():
     # Build from database
     logger.info("Building FAISS index from database...")
 
+    session = None
     try:
-        # Get database session
-        session = get_db_session()
+        # Get database session (file dumps need none)
+        if not args.from_file:
+            session = get_db_session()
 
         # Check if index exists and force rebuild not specified
         if not args.force_rebuild:
@@ -132,7 +146,10 @@ def main():
                 logger.info("No existing index found, building new one...")
 
         # Build index
-        manager.build_index_from_db(session)
+        if args.from_file:
+            manager.build_index_from_source(FileSource(args.from_file, args.product_ids))
+        else:
+            manager.build_index_from_db(session)
 
         logger.info("✓ FAISS index built successfully")
 
@@ -150,12 +167,18 @@ def main():
         elif stats['index_type'] == 'HNSW':
             print(f"M: {stats['M']}")
             print(f"efSearch: {stats['efSearch']}")
+        elif stats['index_type'] in ('IVFPQ', 'OPQ'):
+            print(f"nlist: {stats['nlist']}")
+            print(f"nprobe: {stats['nprobe']}")
+            print(f"PQ: m={stats['pq_m']}, nbits={stats['pq_nbits']}")
+            print(f"Code bytes per vector: {stats['code_bytes_per_vector']}")
 
     except Exception as e:
         logger.error(f"✗ Failed to build index: {e}", exc_info=True)
         sys.exit(1)
     finally:
-        session.close()
+        if session is not None:
+            session.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,211 @@
+"""
+Tests for the batch search and recommendation endpoints.
+"""
+
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.config import get_settings
+from backend.api.dependencies import (
+    get_db,
+    get_embedding_cache,
+    get_request_id,
+    get_search_service,
+)
+from backend.api.models.search import ProductResult
+from backend.api.routers import recommend_router, search_router
+from backend.api.services.cache_service import get_cache_service
+from backend.api.services.executor import StageExecutor, get_stage_executor
+from backend.api.services.metadata_service import get_metadata_service
+from backend.api.services.text_encoder import get_text_encoder_service
+from backend.ml.config import get_ml_config
+from backend.ml.retrieval.attribute_store import ProductAttributeStore
+from backend.ml.retrieval.filtered_search import FilteredSimilaritySearch
+from backend.ml.retrieval.id_map import ProductIdMap
+from backend.ml.retrieval.index_manager import IndexSnapshot
+from backend.ml.retrieval.similarity_search import SimilaritySearch
+
+DIMENSION = 16
+NUM_PRODUCTS = 200
+MAX_BATCH_SIZE = 4
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    vectors = np.random.default_rng(0).standard_normal((NUM_PRODUCTS, DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+@pytest.fixture
+def client(vectors):
+    """Batch endpoints over a flat index; even products are category 1, odd ones category 2."""
+    index = faiss.IndexFlatL2(DIMENSION)
+    index.add(vectors)
+    attributes = ProductAttributeStore.empty(NUM_PRODUCTS)
+    attributes.columns["is_active"][:] = True
+    attributes.columns["in_stock"][:] = True
+    attributes.columns["category_id"][:] = np.arange(NUM_PRODUCTS) % 2 + 1
+    snapshot = IndexSnapshot(
+        index=index,
+        id_mapping=ProductIdMap.from_product_ids([f"p{i}" for i in range(NUM_PRODUCTS)]),
+        vectors=vectors,
+        attributes=attributes,
+    )
+
+    config = get_ml_config()
+    index_manager = SimpleNamespace(
+        get_snapshot=lambda: snapshot, ensure_index_loaded=lambda session=None: None
+    )
+    search_service = SimpleNamespace(
+        personalized_search=SimpleNamespace(
+            index_manager=index_manager,
+            similarity_search=SimilaritySearch(config, index_manager),
+            filtered_search=FilteredSimilaritySearch(config, index_manager),
+        )
+    )
+
+    def enrich_results_batch(product_id_lists, score_lists, db):
+        return [
+            [
+                ProductResult(
+                    product_id=pid,
+                    title=pid,
+                    price=1.0,
+                    similarity=scores[pid]["similarity"],
+                    rank=rank,
+                )
+                for rank, pid in enumerate(product_ids, start=1)
+            ]
+            for product_ids, scores in zip(product_id_lists, score_lists)
+        ]
+
+    settings = SimpleNamespace(
+        max_batch_size=MAX_BATCH_SIZE,
+        enable_cache=False,
+        executor_max_queue=10,
+        executor_encode_workers=1,
+        executor_search_workers=1,
+        executor_db_workers=1,
+    )
+    executor = StageExecutor(settings)
+    noop = lambda *args, **kwargs: None  # noqa: E731
+
+    app = FastAPI()
+    app.include_router(search_router)
+    app.include_router(recommend_router)
+    app.dependency_overrides.update(
+        {
+            get_db: lambda: None,
+            get_request_id: lambda: "test",
+            get_settings: lambda: settings,
+            get_stage_executor: lambda: executor,
+            get_search_service: lambda: search_service,
+            # "pN" encodes to product N's vector; user "uN" has it as long-term profile
+            get_text_encoder_service: lambda: SimpleNamespace(
+                encode_batch=lambda queries: vectors[[int(q[1:]) for q in queries]]
+            ),
+            get_metadata_service: lambda: SimpleNamespace(
+                enrich_results_batch=enrich_results_batch
+            ),
+            get_embedding_cache: lambda: SimpleNamespace(
+                get_user_embeddings=lambda user_id: (
+                    {"long_term": vectors[int(user_id[1:])]} if user_id.startswith("u") else {}
+                )
+            ),
+            get_cache_service: lambda: SimpleNamespace(
+                get_user_generations=lambda user_ids: {},
+                track_query=noop,
+                track_user_activity=noop,
+            ),
+        }
+    )
+
+    yield TestClient(app)
+    executor.shutdown()
+
+
+def result_ids(response: dict) -> list:
+    return [result["product_id"] for result in response["results"]]
+
+
+def test_search_batch_mixes_filtered_and_unfiltered_in_order(client):
+    """Each response answers its own query, in request order, with its own filters."""
+    queries = [
+        {"query": "p7", "limit": 5},
+        {"query": "p4", "limit": 5, "filters": {"category_ids": [2]}},
+        {"query": "p12", "limit": 3},
+        {"query": "p9", "limit": 5, "filters": {"category_ids": [1]}},
+    ]
+
+    response = client.post("/api/v1/search/batch", json={"queries": queries})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 4
+    responses = body["responses"]
+
+    assert [r["query"] for r in responses] == ["p7", "p4", "p12", "p9"]
+    assert [r["filters_applied"] for r in responses] == [False, True, False, True]
+    assert result_ids(responses[0])[0] == "p7"
+    assert result_ids(responses[2])[0] == "p12"
+    assert len(result_ids(responses[2])) == 3
+
+    # Filtered queries only return products of the requested category
+    assert all(int(pid[1:]) % 2 == 1 for pid in result_ids(responses[1]))
+    assert all(int(pid[1:]) % 2 == 0 for pid in result_ids(responses[3]))
+    assert len(result_ids(responses[1])) == 5
+
+
+def test_search_batch_over_limit_is_rejected(client):
+    """Batches larger than the configured maximum are rejected with 400."""
+    queries = [{"query": f"p{i}"} for i in range(MAX_BATCH_SIZE + 1)]
+
+    response = client.post("/api/v1/search/batch", json={"queries": queries})
+
+    assert response.status_code == 400
+    assert str(MAX_BATCH_SIZE) in response.json()["detail"]
+
+
+def test_recommend_batch_mixes_filtered_and_unfiltered_in_order(client):
+    """Responses follow request order; failing items are reported by index."""
+    requests = [
+        {"user_id": "u3", "limit": 5},
+        {"user_id": "nobody", "limit": 5},
+        {"user_id": "u10", "limit": 5, "filters": {"category_ids": [2]}},
+        {"user_id": "u20", "limit": 4},
+    ]
+
+    response = client.post("/api/v1/recommend/batch", json={"requests": requests})
+
+    assert response.status_code == 200
+    body = response.json()
+    responses = body["responses"]
+    assert body["total"] == 4
+    assert responses[1] is None
+    assert [(e["index"], e["status_code"]) for e in body["errors"]] == [(1, 404)]
+
+    assert [r["user_id"] for r in (responses[0], responses[2], responses[3])] == [
+        "u3",
+        "u10",
+        "u20",
+    ]
+    assert result_ids(responses[0])[0] == "p3"
+    assert result_ids(responses[3])[0] == "p20"
+    assert len(result_ids(responses[3])) == 4
+    assert responses[2]["filters_applied"]
+    assert all(int(pid[1:]) % 2 == 1 for pid in result_ids(responses[2]))
+
+
+def test_recommend_batch_over_limit_is_rejected(client):
+    """Batches larger than the configured maximum are rejected with 400."""
+    requests = [{"user_id": f"u{i}"} for i in range(MAX_BATCH_SIZE + 1)]
+
+    response = client.post("/api/v1/recommend/batch", json={"requests": requests})
+
+    assert response.status_code == 400
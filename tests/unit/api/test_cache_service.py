@@ -0,0 +1,120 @@
+"""
+Tests for the API cache service.
+"""
+
+from types import SimpleNamespace
+
+from backend.api.models.recommend import RecommendRequest
+from backend.api.models.search import SearchRequest
+from backend.api.routers.recommend import _recommend_cache_keys
+from backend.api.routers.search import _search_cache_keys
+from backend.api.services.cache_service import CacheService
+from backend.ml.config import get_ml_config
+
+
+class FakeRedisClient:
+    """Redis client subset for counters and sorted sets, with pipelines."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        return True
+
+    def zincrby(self, key, amount, member):
+        scores = self.sets.setdefault(key, {})
+        scores[member] = scores.get(member, 0) + amount
+
+    def zremrangebyrank(self, key, start, end):
+        ranked = sorted(self.sets.get(key, {}).items(), key=lambda item: item[1])
+        for member, _ in ranked[start : (end + 1) or None]:
+            del self.sets[key][member]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+def make_service(client) -> CacheService:
+    redis = SimpleNamespace(_get_client=lambda: client)
+    return CacheService(cache=SimpleNamespace(config=get_ml_config(), redis=redis))
+
+
+def test_persist_popular_queries_applies_threshold_and_limit():
+    """Only popular queries are persisted and the shared set is trimmed to the limit."""
+    client = FakeRedisClient()
+    service = make_service(client)
+    threshold = service.config.POPULAR_QUERY_THRESHOLD
+    service.popular_queries = {
+        "red dress": threshold + 3,
+        "blue jeans": threshold + 2,
+        "white shirt": threshold,
+        "one-off": threshold - 1,
+    }
+
+    assert service.persist_popular_queries(limit=2) == 3
+
+    assert client.sets[service.config.POPULAR_QUERIES_KEY] == {
+        "red dress": threshold + 3,
+        "blue jeans": threshold + 2,
+    }
+    # Unpersisted counts are kept for a later call
+    assert service.popular_queries == {"one-off": threshold - 1}
+
+
+def test_invalidate_user_changes_only_their_cache_keys():
+    """Bumping a user's generation moves their search and recommend keys, nobody else's."""
+    service = make_service(FakeRedisClient())
+    settings = SimpleNamespace(enable_cache=True)
+    searches = [
+        SearchRequest(query="red dress", user_id=1),
+        SearchRequest(query="red dress", user_id=2),
+        SearchRequest(query="red dress"),
+    ]
+    recommends = [RecommendRequest(user_id="1"), RecommendRequest(user_id="2")]
+
+    search_keys = _search_cache_keys(searches, service, settings)
+    recommend_keys = _recommend_cache_keys(recommends, service, settings)
+    assert len(set(search_keys)) == 3
+
+    assert service.invalidate_user(1)
+
+    new_search_keys = _search_cache_keys(searches, service, settings)
+    new_recommend_keys = _recommend_cache_keys(recommends, service, settings)
+    assert new_search_keys[0] != search_keys[0]
+    assert new_search_keys[1:] == search_keys[1:]
+    assert new_recommend_keys[0] != recommend_keys[0]
+    assert new_recommend_keys[1] == recommend_keys[1]
+    # Keys are stable while the generation is unchanged
+    assert _search_cache_keys(searches, service, settings) == new_search_keys
+
+
+def test_user_generations_default_to_zero_without_redis():
+    """Redis failures fall back to generation 0 instead of failing the request."""
+
+    class DownClient:
+        def mget(self, keys):
+            raise ConnectionError("redis down")
+
+    service = make_service(DownClient())
+
+    assert service.get_user_generations([1, None, "2"]) == {"1": 0, "2": 0}
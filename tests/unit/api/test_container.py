@@ -0,0 +1,90 @@
+"""
+Tests for the application-lifetime service container.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import dependencies
+from backend.api.dependencies import get_embedding_cache, get_search_service
+from backend.api.services import container
+from backend.api.services.container import (
+    ServiceContainer,
+    get_service_container,
+    init_service_container,
+    reset_service_container,
+)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Count container builds (slowed down, so concurrent first uses overlap)."""
+    built = []
+
+    class CountingContainer(ServiceContainer):
+        def __init__(self, *args, **kwargs):
+            built.append(threading.get_ident())
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(container, "ServiceContainer", CountingContainer)
+    reset_service_container()
+    yield built
+    reset_service_container()
+
+
+def test_concurrent_first_use_builds_one_container(builds):
+    """Racing first requests share a single container."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        services = list(executor.map(lambda _: get_service_container(), range(8)))
+
+    assert len(builds) == 1
+    assert all(s is services[0] for s in services)
+
+
+def test_members_reuse_the_search_service_graph(builds):
+    """Searchers and caches are the search service's own instances, not copies."""
+    services = get_service_container()
+    personalized = services.search_service.personalized_search
+
+    assert services.similarity_search is personalized.similarity_search
+    assert services.filtered_search is personalized.filtered_search
+    assert services.index_manager is personalized.index_manager
+    assert services.embedding_cache is services.search_service.cache
+
+
+def test_requests_share_services(builds, monkeypatch):
+    """Every request resolves the same service instances."""
+    monkeypatch.setattr(dependencies, "get_session_factory", lambda: None)
+    app = FastAPI()
+
+    @app.get("/ids")
+    def ids(search=Depends(get_search_service), cache=Depends(get_embedding_cache)):
+        return {"search": id(search), "cache": id(cache)}
+
+    with TestClient(app) as client:
+        responses = [client.get("/ids").json() for _ in range(3)]
+
+    services = get_service_container()
+    assert (
+        responses
+        == [{"search": id(services.search_service), "cache": id(services.embedding_cache)}] * 3
+    )
+    assert len(builds) == 1
+
+
+def test_init_and_reset(builds):
+    """Startup replaces the container; after a reset the next use builds a new one."""
+    started = init_service_container()
+    assert get_service_container() is started
+
+    reset_service_container()
+    rebuilt = get_service_container()
+
+    assert rebuilt is not started
+    assert len(builds) == 2
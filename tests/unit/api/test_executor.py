@@ -0,0 +1,85 @@
+"""
+Tests for the stage executor queue accounting.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from backend.api.errors import ServiceOverloadedError
+from backend.api.services.executor import STAGE_DB, StageExecutor
+
+
+def make_executor(max_queue: int = 5) -> StageExecutor:
+    settings = SimpleNamespace(
+        executor_max_queue=max_queue,
+        executor_encode_workers=1,
+        executor_search_workers=1,
+        executor_db_workers=1,
+    )
+    return StageExecutor(settings)
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+async def test_cancelled_pending_jobs_leave_the_queue():
+    """Requests cancelled while waiting for a worker must not stay counted as queued."""
+    executor = make_executor(max_queue=5)
+    stats = executor._stats[STAGE_DB]
+    release = threading.Event()
+
+    try:
+        blocker = asyncio.ensure_future(executor.run(STAGE_DB, release.wait))
+        await wait_for(lambda: stats.in_flight == 1)
+
+        waiters = [asyncio.ensure_future(executor.run(STAGE_DB, lambda: None)) for _ in range(5)]
+        await wait_for(lambda: stats.queued == 5)
+
+        # Queue is full
+        with pytest.raises(ServiceOverloadedError):
+            await executor.run(STAGE_DB, lambda: None)
+
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert stats.queued == 0
+
+        release.set()
+        await blocker
+        assert await executor.run(STAGE_DB, lambda: 42) == 42
+        assert stats.queued == 0
+        assert stats.in_flight == 0
+
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_counts_completed_and_failed_jobs():
+    """Failed jobs leave the queue and are counted."""
+    executor = make_executor()
+    stats = executor._stats[STAGE_DB]
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        assert await executor.run(STAGE_DB, sum, [1, 2]) == 3
+        with pytest.raises(ValueError):
+            await executor.run(STAGE_DB, fail)
+
+        assert stats.queued == 0
+        assert stats.in_flight == 0
+        assert stats.completed == 2
+        assert stats.failed == 1
+
+    finally:
+        executor.shutdown()
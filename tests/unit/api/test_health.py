@@ -0,0 +1,63 @@
+"""
+Tests for the health and readiness endpoints.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from backend.api.dependencies import get_db
+from backend.api.routers import health
+from backend.api.services.warmup import WARMUP_READY, WARMUP_RUNNING
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Health router on a SQLite session, with a loaded index."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+    def sqlite_db():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(health.router)
+    app.dependency_overrides[get_db] = sqlite_db
+    monkeypatch.setattr(health, "get_index_manager", lambda: SimpleNamespace(index=object()))
+
+    yield TestClient(app)
+    engine.dispose()
+
+
+def set_warmup(monkeypatch, state: str) -> None:
+    warmup = SimpleNamespace(
+        state=state, is_ready=state == WARMUP_READY, get_status=lambda: {"state": state}
+    )
+    monkeypatch.setattr(health, "get_warmup_pipeline", lambda: warmup)
+
+
+def test_ready_after_warmup(client, monkeypatch):
+    """/ready returns 200 once warm-up is ready and the database answers."""
+    set_warmup(monkeypatch, WARMUP_READY)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_not_ready_during_warmup(client, monkeypatch):
+    """/ready returns 503 while warm-up is running."""
+    set_warmup(monkeypatch, WARMUP_RUNNING)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["reason"] == f"Warm-up {WARMUP_RUNNING}"
@@ -0,0 +1,70 @@
+"""
+Tests for the text encoder service's query embedding cache use.
+"""
+
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.api.services.executor import shutdown_stage_executor
+from backend.api.services.text_encoder import TextEncoderService
+from backend.ml.caching.query_embedding_cache import QueryEmbeddingCache
+from backend.ml.config import get_ml_config
+
+
+class EmptyRedisClient:
+    """Redis client subset with nothing stored and writes dropped."""
+
+    def mget(self, keys):
+        return [None] * len(keys)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def setex(self, key, ttl, value):
+        pass
+
+    def execute(self):
+        return []
+
+
+class CountingScheduler:
+    """Scheduler stand-in resolving every submitted text immediately."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def submit(self, text):
+        self.encoded.append(text)
+        future = Future()
+        future.set_result(np.ones(4, dtype=np.float32))
+        return future
+
+
+@pytest.fixture
+def stage_executor():
+    yield
+    shutdown_stage_executor()
+
+
+async def test_repeated_queries_count_local_hits(stage_executor):
+    """Local-tier hits served inline are counted in the cache statistics."""
+    config = get_ml_config()
+    client = EmptyRedisClient()
+    cache = QueryEmbeddingCache(config, SimpleNamespace(_get_client=lambda: client))
+    scheduler = CountingScheduler()
+    service = TextEncoderService(config, scheduler=scheduler, embedding_cache=cache)
+
+    for _ in range(5):
+        embedding = await service.encode_query_async("Red Dress")
+
+    assert embedding.shape == (4,)
+    assert scheduler.encoded == ["red dress"]
+
+    stats = cache.get_stats()
+    assert stats["local"]["hits"] == 4
+    assert stats["local"]["misses"] == 1
+    assert stats["redis"]["misses"] == 1
+    assert stats["overall_hit_rate"] == pytest.approx(0.8)
@@ -0,0 +1,65 @@
+"""
+Tests for the warm-up pipeline.
+"""
+
+from types import SimpleNamespace
+
+from backend.api.services.warmup import WARMUP_FAILED, WARMUP_READY, WarmupPipeline
+
+
+class FlakyIndexManager:
+    """Index manager whose first loads fail."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = 0
+
+    def ensure_index_loaded(self, session=None):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("database unavailable")
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def make_pipeline(index_manager) -> WarmupPipeline:
+    settings = SimpleNamespace(
+        warmup_queries=[],
+        warmup_popular_queries=0,
+        warmup_iterations=0,
+        warmup_index_retry_seconds=0.001,
+        warmup_index_retry_max_seconds=0.002,
+    )
+    # Optional steps fail on the bare container and are only reported
+    services = SimpleNamespace(index_manager=index_manager)
+    return WarmupPipeline(services, settings, db_session_factory=FakeSession)
+
+
+def test_index_load_is_retried_until_ready():
+    """A transient index load failure must not leave the instance unready forever."""
+    index_manager = FlakyIndexManager(failures=3)
+    pipeline = make_pipeline(index_manager)
+
+    pipeline.run()
+
+    assert pipeline.state == WARMUP_READY
+    assert pipeline.is_ready
+    assert index_manager.attempts == 4
+    assert pipeline.get_status()["index_attempts"] == 4
+    assert "index" not in pipeline.errors
+
+
+def test_stop_ends_index_retries():
+    """Shutdown stops the retry loop."""
+    pipeline = make_pipeline(FlakyIndexManager(failures=10**6))
+    pipeline.settings.warmup_index_retry_seconds = 60
+    pipeline.stop()
+
+    pipeline.run()
+
+    assert pipeline.state == WARMUP_FAILED
+    assert pipeline.index_attempts == 1
+    assert "index" in pipeline.errors
@@ -0,0 +1,66 @@
+"""
+Tests for cache clear jobs.
+"""
+
+from types import SimpleNamespace
+
+from backend.ml.caching.clear_jobs import CacheClearJob, patterns_for_cache_type
+from backend.ml.caching.product_metadata_cache import ProductMetadataCache
+from backend.ml.config import get_ml_config
+
+
+class JobClient:
+    """Redis client subset for job state, recording published messages."""
+
+    def __init__(self):
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return SimpleNamespace(hset=lambda *a, **kw: None, expire=lambda *a: None, execute=list)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 1
+
+
+class FakeRedisCache:
+    """Deletes a fixed number of keys per pattern in one SCAN step."""
+
+    def __init__(self):
+        self.config = get_ml_config()
+        self.client = JobClient()
+        self.scanned = []
+
+    def _get_client(self):
+        return self.client
+
+    def delete_pattern_step(self, pattern, cursor, count):
+        self.scanned.append(pattern)
+        return 0, 3
+
+
+def test_metadata_clear_invalidates_local_tiers():
+    """Completing a metadata clear publishes INVALIDATE_ALL, which clears local tiers."""
+    redis_cache = FakeRedisCache()
+    metadata_cache = ProductMetadataCache(redis_cache.config, redis_cache)
+    metadata_cache.local.set("p1", {"title": "Dress"})
+
+    job = CacheClearJob.create(redis_cache, patterns_for_cache_type("metadata")).run()
+
+    assert job.done
+    assert len(redis_cache.client.published) == 1
+    channel, message = redis_cache.client.published[0]
+    assert channel == metadata_cache.channel
+
+    metadata_cache._apply_message(message)
+    assert metadata_cache.local.get("p1") is None
+
+
+def test_other_clears_do_not_invalidate_metadata():
+    """Clearing other namespaces leaves the metadata tiers alone."""
+    redis_cache = FakeRedisCache()
+
+    CacheClearJob.create(redis_cache, patterns_for_cache_type("search")).run()
+
+    assert redis_cache.scanned == ["search:*"]
+    assert redis_cache.client.published == []
@@ -0,0 +1,111 @@
+"""
+Tests for cache value encoding.
+"""
+
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backend.ml.caching.codecs import CacheCodec, CacheCodecError, encode_array
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        "text",
+        1.5,
+        True,
+        [1, "a", None],
+        {"results": [{"id": "p1", "price": 9.99, "tags": ["a"]}], "total": 1},
+        {},
+    ],
+)
+def test_json_values_round_trip(value):
+    """JSON-compatible values decode to an equal value of the same type."""
+    codec = CacheCodec()
+    decoded = codec.decode(codec.encode(value))
+
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+def test_integers_are_counter_compatible():
+    """Integers are stored as ASCII, like INCRBY counters."""
+    codec = CacheCodec()
+
+    assert codec.encode(42) == b"42"
+    assert codec.encode(np.int64(-7)) == b"-7"
+    assert codec.decode(b"42") == 42
+
+
+def test_numpy_scalars_become_python_numbers():
+    """NumPy scalars inside JSON values are stored as equal Python numbers."""
+    codec = CacheCodec()
+    decoded = codec.decode(codec.encode({"score": np.float32(0.5), "rank": np.int64(3)}))
+
+    assert decoded == {"score": 0.5, "rank": 3}
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16, np.int64, np.uint8, np.bool_])
+def test_arrays_round_trip(dtype):
+    """Arrays keep their dtype and shape."""
+    codec = CacheCodec()
+    array = np.arange(12).reshape(3, 4).astype(dtype)
+    decoded = codec.decode(codec.encode(array))
+
+    assert decoded.dtype == array.dtype
+    np.testing.assert_array_equal(decoded, array)
+
+
+def test_array_stored_as_float16():
+    """encode_array can narrow embeddings for storage."""
+    array = np.linspace(0, 1, 8, dtype=np.float32)
+    decoded = CacheCodec().decode(encode_array(array, dtype=np.float16))
+
+    assert decoded.dtype == np.float16
+    np.testing.assert_allclose(decoded, array, atol=1e-3)
+
+
+def test_bytes_round_trip():
+    """Raw bytes are returned unchanged."""
+    codec = CacheCodec()
+
+    assert codec.decode(codec.encode(b"\x00\x01payload")) == b"\x00\x01payload"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        (1, 2),
+        {"vector": np.zeros(3, dtype=np.float32)},
+        {1: "non-str key"},
+        [datetime(2024, 1, 1)],
+        {"nested": [{"pair": (1, 2)}]},
+        {1, 2},
+    ],
+)
+def test_values_json_would_change_are_rejected(value):
+    """Values JSON cannot round-trip raise instead of being silently converted."""
+    with pytest.raises(CacheCodecError):
+        CacheCodec().encode(value)
+
+
+def test_pickle_writes_are_opt_in():
+    """With pickle writes enabled, unsupported values round-trip through pickle."""
+    codec = CacheCodec(pickle_writes=True)
+    value = {"pair": (1, 2), 3: datetime(2024, 1, 1)}
+
+    assert codec.decode(codec.encode(value)) == value
+    assert codec.pickle_encodes == 1
+
+
+def test_legacy_pickles():
+    """Untagged pickles are read only when pickle is allowed."""
+    legacy = pickle.dumps({"cached": "before the codec"})
+
+    assert CacheCodec().decode(legacy) == {"cached": "before the codec"}
+    with pytest.raises(CacheCodecError):
+        CacheCodec(allow_pickle=False).decode(legacy)
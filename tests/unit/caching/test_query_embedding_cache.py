@@ -0,0 +1,114 @@
+"""
+Tests for the two-tier query embedding cache.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.ml.caching.query_embedding_cache import QueryEmbeddingCache
+from backend.ml.config import get_ml_config
+
+
+class BytesRedisClient:
+    """Redis client subset storing raw bytes, recording MGET calls."""
+
+    def __init__(self):
+        self.values = {}
+        self.mgets = []
+        self.fail = False
+
+    def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.mgets.append(list(keys))
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def setex(self, key, ttl, value):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.values[key] = value
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def client() -> BytesRedisClient:
+    return BytesRedisClient()
+
+
+def make_cache(client: BytesRedisClient) -> QueryEmbeddingCache:
+    """A cache with its own local tier over the shared client."""
+    return QueryEmbeddingCache(get_ml_config(), SimpleNamespace(_get_client=lambda: client))
+
+
+def test_redis_values_are_little_endian_float32(client):
+    """Embeddings are stored as raw <f4 bytes and read back bit-exact."""
+    embedding = np.linspace(-1, 1, 8).astype(">f8")
+    make_cache(client).set("red dress", embedding)
+
+    (data,) = client.values.values()
+    assert data == embedding.astype("<f4").tobytes()
+
+    cached = make_cache(client).get("red dress")
+    assert cached.dtype == np.dtype("<f4")
+    np.testing.assert_array_equal(cached, embedding.astype(np.float32))
+    assert not cached.flags.writeable
+
+
+def test_redis_hits_are_promoted_to_local_tier(client):
+    """A Redis hit is served locally afterwards, without another round trip."""
+    make_cache(client).set("red dress", np.ones(4))
+    cache = make_cache(client)
+
+    assert cache.get("red dress") is not None
+    assert cache.get("red dress") is not None
+    assert len(client.mgets) == 1
+
+    stats = cache.get_stats()
+    assert stats["redis"]["hits"] == 1
+    assert stats["local"]["hits"] == 1
+    assert stats["local"]["misses"] == 1
+    assert stats["overall_hit_rate"] == 1.0
+
+
+def test_get_many_fetches_only_local_misses(client):
+    """Local hits are not looked up in Redis; the rest share one MGET."""
+    writer = make_cache(client)
+    writer.set_many({"a": np.zeros(4), "b": np.ones(4)})
+    cache = make_cache(client)
+    cache.set("c", np.full(4, 2.0))
+    client.mgets.clear()
+
+    found = cache.get_many(["a", "c", "b", "a", "missing"])
+
+    assert sorted(found) == ["a", "b", "c"]
+    assert len(client.mgets) == 1
+    assert len(client.mgets[0]) == 3  # a, b, missing
+    assert cache.redis_hits == 2
+    assert cache.redis_misses == 1
+
+
+def test_keys_include_model_version(monkeypatch, client):
+    """Embeddings cached for another model version are never served."""
+    config = get_ml_config()
+    make_cache(client).set("red dress", np.ones(4))
+
+    monkeypatch.setattr(config, "model_version", f"{config.model_version}-next")
+    assert make_cache(client).get("red dress") is None
+
+
+def test_redis_errors_fall_back_to_local_tier(client):
+    """Redis failures are counted and the local tier keeps working."""
+    client.fail = True
+    cache = make_cache(client)
+
+    cache.set("red dress", np.ones(4))
+    assert cache.get("red dress") is not None
+    assert cache.get("blue jeans") is None
+    assert cache.redis_errors == 2
@@ -0,0 +1,211 @@
+"""
+Tests for Redis key indexes and SCAN-based pattern deletion.
+"""
+
+import fnmatch
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.ml.caching import redis_cache
+from backend.ml.caching.embedding_cache import EmbeddingCache
+from backend.ml.caching.redis_cache import RedisCache
+from backend.ml.config import get_ml_config
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedisClient:
+    """Redis client subset with key expiry and sorted sets, recording calls."""
+
+    def __init__(self, clock: Clock):
+        self.clock = clock
+        self.values = {}
+        self.expires = {}
+        self.sets = {}
+        self.slots = []
+        self.calls = []
+
+    def _live(self, key) -> bool:
+        if key in self.expires and self.expires[key] <= self.clock():
+            del self.values[key], self.expires[key]
+        return key in self.values
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def ping(self):
+        return True
+
+    def set(self, key, value):
+        self.values[key] = value
+        self.expires.pop(key, None)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        self.expires[key] = self.clock() + ttl
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def get(self, key):
+        return self.values[key] if self._live(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, *keys):
+        deleted = sum(self._live(key) for key in keys)
+        for key in keys:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return deleted
+
+    def unlink(self, *keys):
+        self.calls.append(("unlink", len(keys)))
+        return self.delete(*keys)
+
+    def scan(self, cursor=0, match=None, count=None):
+        self.calls.append(("scan", cursor))
+        # Cursors index every key ever written, so deletes never shift them
+        slots = list(dict.fromkeys([*self.slots, *self.values]))
+        self.slots = slots
+        page = [key for key in slots[cursor : cursor + count] if self._live(key)]
+        next_cursor = cursor + count if cursor + count < len(slots) else 0
+        return next_cursor, [key for key in page if fnmatch.fnmatchcase(key, match)]
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update({m: float(s) for m, s in mapping.items()})
+
+    def zrem(self, key, *members):
+        return sum(self.sets.get(key, {}).pop(member, None) is not None for member in members)
+
+    def zremrangebyscore(self, key, low, high):
+        scores = self.sets.get(key, {})
+        removed = [m for m, s in scores.items() if float(low) <= s <= float(high)]
+        for member in removed:
+            del scores[member]
+        return len(removed)
+
+    def zcard(self, key):
+        return len(self.sets.get(key, {}))
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(redis_cache, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def client(clock) -> FakeRedisClient:
+    return FakeRedisClient(clock)
+
+
+@pytest.fixture
+def cache(monkeypatch, client) -> RedisCache:
+    cache = RedisCache(get_ml_config())
+    monkeypatch.setattr(cache, "client", client)
+    return cache
+
+
+def live_keys(client: FakeRedisClient, prefix: str) -> set:
+    return {key for key in list(client.values) if key.startswith(prefix) and client._live(key)}
+
+
+def assert_index_consistent(cache: RedisCache, client: FakeRedisClient, index_key: str, prefix):
+    """The key index counts exactly the live keys and holds no other members."""
+    count = cache.count_indexed([index_key])[index_key]
+    assert count == len(live_keys(client, prefix))
+    assert set(client.sets.get(index_key, {})) == live_keys(client, prefix)
+
+
+def test_key_index_follows_set_delete_and_expiry(cache, client, clock):
+    """Index counts track writes, deletes and TTL expiry without enumerating keys."""
+    embeddings = EmbeddingCache(redis_cache=cache)
+    vector = np.ones(4, dtype=np.float32)
+    index, prefix = embeddings.PRODUCT_INDEX, embeddings.PRODUCT_PREFIX
+
+    for product_id in range(3):
+        embeddings.set_product_embedding(product_id, vector, ttl=60)
+    embeddings.set_product_embedding(3, vector)  # No expiry
+    assert_index_consistent(cache, client, index, prefix)
+    assert embeddings.get_cache_stats()["cached_products"] == 4
+
+    assert embeddings.delete_product_embedding(1)
+    assert not embeddings.delete_product_embedding(1)
+    assert_index_consistent(cache, client, index, prefix)
+
+    # Rewriting a key moves its expiry
+    clock.now += 30
+    embeddings.set_product_embedding(0, vector, ttl=60)
+
+    clock.now += 31
+    assert_index_consistent(cache, client, index, prefix)
+    assert embeddings.get_cache_stats()["cached_products"] == 2
+
+    clock.now += 60
+    assert_index_consistent(cache, client, index, prefix)
+    assert embeddings.get_cache_stats()["cached_products"] == 1
+    assert ("scan", 0) not in client.calls
+
+
+def test_key_indexes_are_per_namespace(cache, client):
+    """Batch writes and user deletes only touch their own namespace's index."""
+    embeddings = EmbeddingCache(redis_cache=cache)
+    vector = np.ones(4, dtype=np.float32)
+
+    embeddings.set_product_embeddings_batch({i: vector for i in range(5)}, ttl=60)
+    embeddings.set_user_long_term_embedding("u1", vector)
+    embeddings.set_user_session_embedding("u1", vector)
+    embeddings.set_user_long_term_embedding("u2", vector)
+
+    stats = embeddings.get_cache_stats()
+    assert stats["cached_products"] == 5
+    assert stats["cached_user_long_term"] == 2
+    assert stats["cached_user_session"] == 1
+
+    assert embeddings.delete_user_embeddings("u1") == 2
+    stats = embeddings.get_cache_stats()
+    assert (stats["cached_products"], stats["cached_user_long_term"]) == (5, 1)
+    assert stats["cached_user_session"] == 0
+    assert_index_consistent(
+        cache, client, embeddings.USER_LONG_TERM_INDEX, embeddings.USER_LONG_TERM_PREFIX
+    )
+
+
+def test_delete_pattern_unlinks_in_scan_steps(cache, client):
+    """Pattern deletes run bounded SCAN steps, one UNLINK per non-empty step."""
+    for i in range(25):
+        client.set(f"search:{i:02d}", b"x")
+    for i in range(5):
+        client.set(f"user:{i}", b"x")
+
+    assert cache.delete_pattern("search:*", count=10) == 25
+
+    assert set(client.values) == {f"user:{i}" for i in range(5)}
+    unlinks = [n for call, n in client.calls if call == "unlink"]
+    assert sum(unlinks) == 25
+    assert max(unlinks) <= 10
+    assert len([call for call in client.calls if call[0] == "scan"]) >= 3
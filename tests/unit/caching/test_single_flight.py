@@ -0,0 +1,94 @@
+"""
+Tests for single-flight cache fills.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from backend.ml.caching.single_flight import SOURCE_COMPUTED, SOURCE_WAITED, SingleFlight
+
+
+class LockClient:
+    """Just the Redis lock commands SingleFlight uses, recording releases."""
+
+    def __init__(self, events):
+        self.keys = {}
+        self.events = events
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.keys)
+
+    def eval(self, script, num_keys, key, token):
+        self.events.append("release")
+        if self.keys.get(key) == token:
+            del self.keys[key]
+            return 1
+        return 0
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+def make_flight(client):
+    return SingleFlight(
+        SimpleNamespace(_get_client=lambda: client),
+        wait_seconds=2.0,
+        poll_interval_seconds=0.01,
+        run_blocking=run_inline,
+    )
+
+
+async def test_stores_before_releasing_lock():
+    """The computed value is stored before the refresh lock is released."""
+    events = []
+    cache = {}
+    flight = make_flight(LockClient(events))
+
+    async def compute():
+        return {"value": 1}
+
+    def store(key, value):
+        events.append("store")
+        cache[key] = value
+
+    value, source = await flight.get_or_compute(
+        "search:q", compute, lambda key: (cache.get(key), True), store
+    )
+
+    assert (value, source) == ({"value": 1}, SOURCE_COMPUTED)
+    assert events == ["store", "release"]
+
+
+async def test_other_process_waits_for_stored_value():
+    """A request in another process gets the lock holder's value instead of computing."""
+    events = []
+    cache = {}
+    client = LockClient(events)
+    holder, waiter = make_flight(client), make_flight(client)
+    computations = 0
+
+    async def compute():
+        nonlocal computations
+        computations += 1
+        await asyncio.sleep(0.05)
+        return {"value": computations}
+
+    def lookup(key):
+        return cache.get(key), True
+
+    results = await asyncio.gather(
+        holder.get_or_compute("search:q", compute, lookup, cache.__setitem__),
+        waiter.get_or_compute("search:q", compute, lookup, cache.__setitem__),
+    )
+
+    assert computations == 1
+    assert results == [({"value": 1}, SOURCE_COMPUTED), ({"value": 1}, SOURCE_WAITED)]
+    assert waiter.stats["lock_timeouts"] == 0
+    assert client.keys == {}
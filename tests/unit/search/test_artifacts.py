@@ -0,0 +1,152 @@
+"""
+Tests for checksummed index artifacts and their hash-based GCS sync.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from backend.ml.retrieval.artifacts import ArtifactError, ArtifactManifest, ArtifactStore
+from backend.ml.utils import gcs_utils
+
+GCS_PATH = "faiss"
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+
+    def exists(self) -> bool:
+        return self.name in self.bucket.objects
+
+    def upload_from_filename(self, filename: str) -> None:
+        self.bucket.objects[self.name] = Path(filename).read_bytes()
+
+    def upload_from_string(self, data, content_type=None) -> None:
+        self.bucket.objects[self.name] = data.encode() if isinstance(data, str) else data
+
+    def download_as_text(self) -> str:
+        return self.bucket.objects[self.name].decode()
+
+    def download_to_filename(self, filename: str) -> None:
+        self.bucket.downloads.append(self.name)
+        Path(filename).write_bytes(self.bucket.objects[self.name])
+
+    def download_as_bytes(self, start: int, end: int) -> bytes:
+        self.bucket.downloads.append(self.name)
+        return self.bucket.objects[self.name][start : end + 1]
+
+
+class FakeBucket:
+    """In-memory bucket recording content blob downloads."""
+
+    def __init__(self):
+        self.objects = {}
+        self.downloads = []
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+
+def publish_version(store: ArtifactStore, version: str, files: dict) -> ArtifactManifest:
+    staging = store.staging_dir()
+    for name, data in files.items():
+        (staging / name).write_bytes(data)
+    return ArtifactManifest.load(store.publish(staging, version))
+
+
+def upload(bucket: FakeBucket, store: ArtifactStore, manifest: ArtifactManifest) -> None:
+    version_path = store.version_path(manifest.version)
+    assert gcs_utils._upload_version(bucket, "bucket", GCS_PATH, version_path, manifest)
+
+
+def download(bucket: FakeBucket, store: ArtifactStore, version: str, chunk_size=1 << 20) -> bool:
+    return gcs_utils._download_version(
+        bucket, GCS_PATH, store, version, max_workers=2, chunk_size=chunk_size
+    )
+
+
+@pytest.fixture
+def bucket() -> FakeBucket:
+    return FakeBucket()
+
+
+@pytest.fixture
+def origin(tmp_path) -> ArtifactStore:
+    return ArtifactStore(tmp_path / "origin")
+
+
+@pytest.fixture
+def store(tmp_path) -> ArtifactStore:
+    return ArtifactStore(tmp_path / "local")
+
+
+def test_download_rejects_checksum_mismatch(bucket, origin, store):
+    """A blob whose content does not match its manifest hash is never published."""
+    manifest = publish_version(origin, "v1", {"index.faiss": b"index", "vectors.npy": b"vecs"})
+    upload(bucket, origin, manifest)
+
+    sha = manifest.files["vectors.npy"]["sha256"]
+    bucket.objects[f"{GCS_PATH}/blobs/{sha}"] = b"VECS"  # Same size, different content
+
+    assert not download(bucket, store, "v1")
+    assert store.current_version() is None
+    assert store.versions() == []
+
+
+def test_publish_rejects_files_not_matching_manifest(tmp_path, origin):
+    """Staged files that differ from a known manifest raise ArtifactError."""
+    manifest = publish_version(origin, "v1", {"index.faiss": b"index"})
+
+    store = ArtifactStore(tmp_path / "local")
+    staging = store.staging_dir()
+    (staging / "index.faiss").write_bytes(b"truncated")
+
+    with pytest.raises(ArtifactError):
+        store.publish(staging, manifest=manifest)
+    assert store.current_version() is None
+
+
+def test_download_skips_verified_local_version(bucket, origin, store):
+    """A version that is already present locally is activated without downloading."""
+    files = {"index.faiss": b"index", "vectors.npy": b"vecs"}
+    upload(bucket, origin, publish_version(origin, "v1", files))
+
+    assert download(bucket, store, "v1")
+    assert len(bucket.downloads) == 2
+    assert store.current_version() == "v1"
+    for name, data in files.items():
+        assert (store.version_path("v1") / name).read_bytes() == data
+
+    bucket.downloads.clear()
+    assert download(bucket, store, "v1")
+    assert bucket.downloads == []
+
+
+def test_download_fetches_only_changed_files(bucket, origin, store):
+    """Files whose hash is unchanged are linked from the local blob cache."""
+    upload(bucket, origin, publish_version(origin, "v1", {"index.faiss": b"a", "ids.npy": b"ids"}))
+    assert download(bucket, store, "v1")
+
+    manifest = publish_version(origin, "v2", {"index.faiss": b"b", "ids.npy": b"ids"})
+    upload(bucket, origin, manifest)
+    bucket.downloads.clear()
+
+    assert download(bucket, store, "v2")
+    assert bucket.downloads == [f"{GCS_PATH}/blobs/{manifest.files['index.faiss']['sha256']}"]
+    assert store.current_version() == "v2"
+    assert (store.version_path("v2") / "ids.npy").read_bytes() == b"ids"
+    assert not ArtifactManifest.load(store.version_path("v2")).verify(
+        store.version_path("v2"), check_hashes=True
+    )
+
+
+def test_large_blob_is_downloaded_in_ranges(bucket, origin, store):
+    """Files larger than the chunk size are reassembled from byte ranges."""
+    data = bytes(range(256)) * 4
+    upload(bucket, origin, publish_version(origin, "v1", {"vectors.npy": data}))
+
+    assert download(bucket, store, "v1", chunk_size=100)
+    assert len(bucket.downloads) == 11
+    assert (store.version_path("v1") / "vectors.npy").read_bytes() == data
@@ -0,0 +1,97 @@
+"""
+Tests for in-memory product filtering against SQL NULL semantics.
+"""
+
+import sqlite3
+import uuid
+from dataclasses import replace
+
+import pytest
+
+from backend.ml.retrieval.attribute_store import ProductAttributeStore
+from backend.ml.retrieval.filters import FilterOperator, ProductFilter, ProductFilters
+from backend.ml.retrieval.id_map import ProductIdMap
+
+# (price, in_stock, stock_quantity, merchant_id, category_id, brand_id, gender, is_active)
+PRODUCTS = [
+    (50.0, True, 10, 1, 10, 100, "F", True),
+    (None, True, None, None, None, None, None, True),
+    (150.0, True, 3, 2, 20, 200, "M", True),
+    (20.0, False, 0, 1, 10, 100, "U", True),
+    (80.0, True, 5, 3, None, 300, "F", False),
+]
+
+FILTERS = [
+    ProductFilters(),
+    ProductFilters(min_price=30.0, max_price=100.0),
+    ProductFilters(max_price=100.0, active_only=False, in_stock_only=False),
+    ProductFilters(min_stock_quantity=1),
+    ProductFilters(merchant_ids=[1, 3], active_only=False),
+    ProductFilters(exclude_merchant_ids=[2]),
+    ProductFilters(exclude_category_ids=[20], active_only=False),
+    ProductFilters(brand_ids=[100, 200], exclude_brand_ids=[200]),
+    ProductFilters(gender="F", active_only=False),
+    ProductFilters(custom_filters=[ProductFilter("brand_id", FilterOperator.NE, 100)]),
+    ProductFilters(custom_filters=[ProductFilter("price", FilterOperator.LT, 100.0)]),
+]
+
+
+@pytest.fixture(scope="module")
+def products():
+    product_ids = [str(uuid.uuid4()) for _ in range(len(PRODUCTS) + 1)]
+    # The last indexed product is missing from the database
+    rows = [(pid, *values) for pid, values in zip(product_ids, PRODUCTS)]
+    store = ProductAttributeStore.from_rows(ProductIdMap.from_product_ids(product_ids), rows)
+
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE products (position INTEGER, price REAL, in_stock BOOLEAN, "
+        "stock_quantity INTEGER, merchant_id INTEGER, category_id INTEGER, brand_id INTEGER, "
+        "gender TEXT, is_active BOOLEAN)"
+    )
+    db.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(position, *values) for position, values in enumerate(PRODUCTS)],
+    )
+    yield store, db
+    db.close()
+
+
+@pytest.mark.parametrize("filters", FILTERS, ids=lambda filters: filters.signature())
+def test_evaluate_matches_sql(products, filters):
+    """The in-memory mask selects exactly the rows the SQL WHERE clause selects."""
+    store, db = products
+    filters = replace(filters, require_embedding=False)  # no embedding column in the test table
+
+    where, parameters = filters.to_sql_where_clause()
+    query = "SELECT position FROM products" + (f" WHERE {where}" if where else "")
+    expected = {row[0] for row in db.execute(query.replace("%s", "?"), parameters)}
+
+    assert set(store.evaluate(filters).nonzero()[0].tolist()) == expected
+
+
+def test_null_attributes_never_match(products):
+    """A NULL attribute fails comparisons, IN and NOT IN alike."""
+    store, _ = products
+
+    for filters in [
+        ProductFilters(max_price=1000.0),
+        ProductFilters(merchant_ids=[1, 2, 3]),
+        ProductFilters(exclude_merchant_ids=[99]),
+        ProductFilters(custom_filters=[ProductFilter("category_id", FilterOperator.NE, 99)]),
+    ]:
+        assert not store.evaluate(filters)[1]
+
+
+def test_products_missing_from_db_never_match(products):
+    """Rows without database attributes are inactive, so the listing filter drops them."""
+    store, _ = products
+
+    assert store.evaluate(ProductFilters(in_stock_only=False)).tolist() == [
+        True,
+        True,
+        True,
+        True,
+        False,
+        False,
+    ]
@@ -0,0 +1,94 @@
+"""
+Tests for the shared index build pipeline.
+"""
+
+import sys
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.ml.retrieval import build_pipeline
+from backend.ml.retrieval.artifacts import ArtifactManifest, resolve_index_path
+from backend.ml.retrieval.build_pipeline import FileSource
+from backend.ml.retrieval.index_manager import FAISSIndexManager
+from backend.tasks.embeddings import rebuild_faiss_index
+
+NUM_VECTORS = 300
+
+# Fields that differ between any two builds
+VOLATILE_METADATA = {"created_at", "version", "build_seconds"}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = FAISSIndexManager()
+    manager.reset()
+    # No Redis delta stream and no products table in unit tests
+    monkeypatch.setattr(manager.config.storage, "faiss_delta_updates_enabled", False)
+    monkeypatch.setattr(manager.config.storage, "faiss_attribute_filtering_enabled", False)
+    monkeypatch.setattr(build_pipeline, "get_ml_config", lambda: manager.config)
+    yield manager
+    manager.reset()
+
+
+@pytest.fixture
+def source(tmp_path, manager):
+    dimension = manager.builder.dimension
+    vectors = np.random.default_rng(0).standard_normal((NUM_VECTORS, dimension))
+    product_ids = [str(uuid.UUID(int=i + 1)) for i in range(NUM_VECTORS)]
+    np.save(tmp_path / "embeddings.npy", vectors.astype(np.float32))
+    np.save(tmp_path / "product_ids.npy", np.array(product_ids))
+    return FileSource(tmp_path / "embeddings.npy")
+
+
+def load_build(manager, path):
+    index, id_mapping, metadata = manager.builder.load_index(path, mmap=False)
+    manifest = ArtifactManifest.load(resolve_index_path(path))
+    return index, id_mapping, metadata, manifest
+
+
+def test_manager_and_task_builds_match(monkeypatch, tmp_path, manager, source):
+    """The manager and the Celery task produce the same index artifacts."""
+    storage = manager.config.storage
+
+    monkeypatch.setattr(storage, "faiss_index_path", tmp_path / "manager")
+    manager.build_index_from_source(source)
+
+    closed = []
+    monkeypatch.setattr(storage, "faiss_index_path", tmp_path / "task")
+    monkeypatch.setattr(build_pipeline, "source_for_embedding_type", lambda embedding_type: source)
+    monkeypatch.setitem(
+        sys.modules,
+        "backend.db.session",
+        SimpleNamespace(SessionLocal=lambda: SimpleNamespace(close=lambda: closed.append(True))),
+    )
+    result = rebuild_faiss_index.run("text")
+
+    assert result["status"] == "success"
+    assert result["num_vectors"] == NUM_VECTORS
+    assert result["source"] == source.name
+    assert set(result["timings"]) == {"open", "build", "attributes", "save"}
+    assert closed == [True]
+
+    manager_index, manager_ids, manager_metadata, manager_manifest = load_build(
+        manager, tmp_path / "manager"
+    )
+    task_index, task_ids, task_metadata, task_manifest = load_build(manager, tmp_path / "task")
+
+    assert manager.get_snapshot().ntotal == task_index.ntotal == NUM_VECTORS
+    assert manager_ids.values() == task_ids.values()
+    np.testing.assert_array_equal(
+        manager_index.reconstruct_n(0, NUM_VECTORS), task_index.reconstruct_n(0, NUM_VECTORS)
+    )
+    assert {k: v for k, v in manager_metadata.items() if k not in VOLATILE_METADATA} == {
+        k: v for k, v in task_metadata.items() if k not in VOLATILE_METADATA
+    }
+
+    # Every artifact other than metadata.json is byte-identical
+    manager_files = dict(manager_manifest.files)
+    task_files = dict(task_manifest.files)
+    manager_files.pop("metadata.json")
+    task_files.pop("metadata.json")
+    assert manager_files == task_files
@@ -0,0 +1,141 @@
+"""
+Tests for streaming product embeddings into a preallocated matrix.
+"""
+
+import struct
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from backend.ml.retrieval.embedding_loader import (
+    COPY_SIGNATURE,
+    COPY_TRAILER,
+    EmbeddingLoaderError,
+    EmbeddingStream,
+)
+
+DIMENSION = 8
+NUM_VECTORS = 50
+
+
+@pytest.fixture(scope="module")
+def product_ids():
+    return [str(uuid.UUID(int=i + 1)) for i in range(NUM_VECTORS)]
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(0).standard_normal((NUM_VECTORS, DIMENSION)).astype(np.float32)
+
+
+def copy_payload(product_ids, vectors, dimension=DIMENSION) -> bytes:
+    """COPY BINARY output of SELECT id::uuid, embedding::vector (with a header extension)."""
+    parts = [COPY_SIGNATURE, struct.pack(">ii", 0, 4), b"ext!"]
+    for product_id, vector in zip(product_ids, vectors):
+        parts += [
+            struct.pack(">hi", 2, 16),
+            uuid.UUID(product_id).bytes,
+            struct.pack(">iHH", 4 + 4 * dimension, dimension, 0),
+            np.asarray(vector, dtype=">f4").tobytes(),
+        ]
+    parts.append(COPY_TRAILER)
+    return b"".join(parts)
+
+
+class CopyCursor:
+    """psycopg2-style cursor that writes COPY output in uneven pieces."""
+
+    def __init__(self, payload: bytes, piece_size: int = 999):
+        self.payload = payload
+        self.piece_size = piece_size
+        self.statements = []
+
+    def mogrify(self, query, params):
+        return query.encode()
+
+    def copy_expert(self, sql, file):
+        self.statements.append(sql)
+        for start in range(0, len(self.payload), self.piece_size):
+            file.write(self.payload[start : start + self.piece_size])
+
+    def close(self):
+        pass
+
+
+def copy_session(cursor: CopyCursor, count: int):
+    return SimpleNamespace(
+        execute=lambda statement, params=None: SimpleNamespace(scalar=lambda: count),
+        connection=lambda: SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor)),
+    )
+
+
+def test_copy_binary_fills_preallocated_matrix(product_ids, vectors):
+    """COPY BINARY tuples are decoded chunk by chunk into the counted matrix."""
+    cursor = CopyCursor(copy_payload(product_ids, vectors))
+    stream = EmbeddingStream.from_products(
+        copy_session(cursor, NUM_VECTORS), dimension=DIMENSION, chunk_size=7
+    )
+
+    chunks = [chunk.copy() for chunk in stream]
+
+    assert "(FORMAT binary)" in cursor.statements[0]
+    assert sum(len(chunk) for chunk in chunks) == NUM_VECTORS
+    np.testing.assert_array_equal(np.concatenate(chunks), vectors)
+    np.testing.assert_array_equal(stream.embeddings, vectors)
+    assert stream.embeddings.dtype == np.float32
+    assert stream._matrix.shape == (NUM_VECTORS, DIMENSION)  # Never grown
+    assert stream.id_mapping.is_uuid
+    assert stream.id_mapping.values() == product_ids
+
+
+def test_copy_binary_grows_past_count(product_ids, vectors):
+    """Rows inserted after the count still fit (the matrix is grown)."""
+    cursor = CopyCursor(copy_payload(product_ids, vectors))
+    stream = EmbeddingStream.from_products(
+        copy_session(cursor, NUM_VECTORS - 10), dimension=DIMENSION, chunk_size=7
+    ).load()
+
+    assert stream.num_vectors == NUM_VECTORS
+    np.testing.assert_array_equal(stream.embeddings, vectors)
+    assert stream.id_mapping.values() == product_ids
+
+
+def test_copy_binary_rejects_other_dimensions(product_ids, vectors):
+    """Vectors of another dimension fail the build instead of being misread."""
+    wide = np.hstack([vectors, vectors])
+    cursor = CopyCursor(copy_payload(product_ids, wide, dimension=2 * DIMENSION))
+    stream = EmbeddingStream.from_products(
+        copy_session(cursor, NUM_VECTORS), dimension=DIMENSION, chunk_size=7
+    )
+
+    with pytest.raises(EmbeddingLoaderError):
+        stream.load()
+
+
+def test_server_side_cursor_fallback(product_ids, vectors):
+    """Drivers without COPY support stream rows and parse each vector."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    with Session(engine) as session:
+        session.execute(text("CREATE TABLE products (id TEXT, text_embedding TEXT)"))
+        session.execute(
+            text("INSERT INTO products VALUES (:id, :embedding)"),
+            [
+                {"id": product_id, "embedding": "[" + ",".join(map(str, vector.tolist())) + "]"}
+                for product_id, vector in zip(product_ids, vectors)
+            ]
+            + [{"id": str(uuid.uuid4()), "embedding": None}],
+        )
+
+        stream = EmbeddingStream.from_products(session, dimension=DIMENSION, chunk_size=7)
+        assert stream.num_vectors == NUM_VECTORS
+        stream.load()
+
+    np.testing.assert_allclose(stream.embeddings, vectors, rtol=1e-6)
+    assert stream.id_mapping.values() == product_ids
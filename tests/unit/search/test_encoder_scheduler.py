@@ -0,0 +1,97 @@
+"""
+Tests for micro-batched query encoding.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.ml.encoder_scheduler import TextEncodingScheduler
+
+
+class RecordingModel:
+    """encode_text_batch stand-in: row i of a batch is [len(text), i]."""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+@pytest.fixture
+def make_scheduler():
+    schedulers = []
+
+    def make(model, batch_size):
+        scheduler = TextEncodingScheduler(encode_batch_fn=model)
+        # A long window: the batch closes when it is full, not on a timer
+        scheduler.batch_window_ms = 5000
+        scheduler.max_batch_size = batch_size
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.stop()
+
+
+def encode_concurrently(scheduler, texts):
+    """Call encode() from one thread per text, all released together."""
+    barrier = threading.Barrier(len(texts))
+
+    def encode(text):
+        barrier.wait()
+        return scheduler.encode(text, timeout=10)
+
+    with ThreadPoolExecutor(len(texts)) as pool:
+        futures = [pool.submit(encode, text) for text in texts]
+    return futures
+
+
+def test_concurrent_requests_share_one_batch(make_scheduler):
+    """Concurrent callers are encoded by one model call and get their own rows."""
+    model = RecordingModel()
+    texts = ["red dress", "boots", "a", "denim jacket", "boots"]
+    scheduler = make_scheduler(model, batch_size=len(texts))
+
+    futures = encode_concurrently(scheduler, texts)
+
+    assert len(model.batches) == 1
+    # Identical texts in a batch are encoded once
+    assert sorted(model.batches[0]) == sorted(set(texts))
+    for text, future in zip(texts, futures):
+        embedding = future.result()
+        assert embedding[0] == len(text)
+        assert model.batches[0][int(embedding[1])] == text
+
+    stats = scheduler.get_stats()
+    assert stats["batches_total"] == 1
+    assert stats["requests_total"] == len(texts)
+    assert stats["texts_encoded"] == 4
+
+
+def test_model_error_reaches_every_caller(make_scheduler):
+    """An exception from the model fails every future waiting on that batch."""
+    error = RuntimeError("CUDA out of memory")
+    model = RecordingModel(error=error)
+    texts = ["red dress", "boots", "sandals"]
+    scheduler = make_scheduler(model, batch_size=len(texts))
+
+    futures = encode_concurrently(scheduler, texts)
+
+    assert len(model.batches) == 1
+    for future in futures:
+        assert future.exception() is error
+    assert scheduler.get_stats()["batches_total"] == 0
+
+    # The scheduler keeps serving later batches
+    model.error = None
+    scheduler.max_batch_size = 1
+    assert scheduler.encode("hat", timeout=10)[0] == 3
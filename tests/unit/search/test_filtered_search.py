@@ -0,0 +1,136 @@
+"""
+Tests for filtered search strategies and the adaptive post-filter over-fetch.
+"""
+
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+
+from backend.ml.config import get_ml_config
+from backend.ml.retrieval.attribute_store import ProductAttributeStore
+from backend.ml.retrieval.filtered_search import FilteredSimilaritySearch, FilterSelectivityStats
+from backend.ml.retrieval.filters import ProductFilters
+from backend.ml.retrieval.id_map import ProductIdMap
+from backend.ml.retrieval.index_manager import IndexSnapshot
+
+DIMENSION = 16
+NUM_VECTORS = 500
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(0).standard_normal((NUM_VECTORS, DIMENSION)).astype(np.float32)
+
+
+def make_snapshot(index: faiss.Index, vectors: np.ndarray, num_allowed: int) -> IndexSnapshot:
+    """Snapshot whose first ``num_allowed`` products (shuffled) are in category 1."""
+    attributes = ProductAttributeStore.empty(len(vectors))
+    attributes.columns["is_active"][:] = True
+    attributes.columns["in_stock"][:] = True
+    attributes.columns["category_id"][:] = 2
+    allowed = np.random.default_rng(1).choice(len(vectors), num_allowed, replace=False)
+    attributes.columns["category_id"][allowed] = 1
+    return IndexSnapshot(
+        index=index,
+        id_mapping=ProductIdMap.from_product_ids([f"p{i}" for i in range(len(vectors))]),
+        vectors=vectors,
+        attributes=attributes,
+    )
+
+
+def make_search(snapshot: IndexSnapshot) -> FilteredSimilaritySearch:
+    index_manager = SimpleNamespace(get_snapshot=lambda: snapshot)
+    return FilteredSimilaritySearch(config=get_ml_config(), index_manager=index_manager)
+
+
+def flat_index(vectors: np.ndarray) -> faiss.Index:
+    index = faiss.IndexFlatL2(DIMENSION)
+    index.add(vectors)
+    return index
+
+
+def test_postfilter_falls_back_on_approximate_index(vectors):
+    """An IVF search that visits too few allowed products falls back to the ID selector."""
+    index = faiss.IndexIVFFlat(faiss.IndexFlatL2(DIMENSION), DIMENSION, 16)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = 1
+    snapshot = make_snapshot(index, vectors, num_allowed=75)
+    search = make_search(snapshot)
+    search.budget_ms = 1e6  # rounds end at the over-fetch limit, not the clock
+
+    results = search.search_with_filters(
+        vectors[0], ProductFilters(category_ids=[1]), k=20, strategy="postfilter"
+    )
+
+    assert len(results) == 20
+    assert snapshot.attributes.columns["category_id"][
+        snapshot.label_mask(results.product_ids)
+    ].all()
+    assert search.get_stats()["postfilter_fallbacks"] == 1
+
+
+def test_postfilter_on_flat_index_needs_no_fallback(vectors):
+    """A flat index is exhaustive: covering ntotal finds every allowed product."""
+    search = make_search(make_snapshot(flat_index(vectors), vectors, num_allowed=10))
+    search.max_overfetch = NUM_VECTORS
+
+    results = search.search_with_filters(
+        vectors[0], ProductFilters(category_ids=[1]), k=20, strategy="postfilter"
+    )
+
+    assert len(results) == 10
+    assert search.get_stats()["postfilter_fallbacks"] == 0
+
+
+def test_postfilter_learns_hit_rate_and_bounds_overfetch(vectors, monkeypatch):
+    """Hit rates are learned per filter, and rounds never fetch past k * max_overfetch."""
+    snapshot = make_snapshot(flat_index(vectors), vectors, num_allowed=100)
+    search = make_search(snapshot)
+    search.max_overfetch = 4
+    search.budget_ms = 1e6
+    requested = []
+    original_search = IndexSnapshot.search
+    monkeypatch.setattr(
+        IndexSnapshot,
+        "search",
+        lambda self, queries, k: requested.append(k) or original_search(self, queries, k),
+    )
+    filters = ProductFilters(category_ids=[1])
+
+    results = search.search_with_filters(vectors[0], filters, k=10, strategy="postfilter")
+
+    assert len(results) == 10
+    assert max(requested) <= 10 * search.max_overfetch
+    hit_rate = search.selectivity_stats.get(filters.signature())
+    assert 0 < hit_rate <= 1
+
+    # The learned rate sizes the next round for the same filter
+    requested.clear()
+    search.search_with_filters(vectors[1], filters, k=10, strategy="postfilter")
+    expected_k = min(max(int(np.ceil(1.5 * 10 / hit_rate)), 10), 10 * search.max_overfetch)
+    assert requested[0] == expected_k
+
+    stats = search.get_stats()
+    assert stats["postfilter"] == 2
+    assert stats["postfilter_rounds"] >= 2
+    assert stats["tracked_filter_signatures"] == 1
+
+
+def test_selectivity_stats_moving_average_and_bound():
+    """Observations are blended with the previous rate and old signatures are evicted."""
+    stats = FilterSelectivityStats(max_entries=2, alpha=0.5)
+
+    stats.record("a", 0.2)
+    stats.record("a", 0.6)
+    assert stats.get("a") == pytest.approx(0.4)
+
+    stats.record("b", 0.1)
+    stats.get("a")  # "a" is now the most recently used
+    stats.record("c", 0.3)
+
+    assert len(stats) == 2
+    assert stats.get("b") is None
+    assert stats.get("a") == pytest.approx(0.4)
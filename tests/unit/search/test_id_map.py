@@ -0,0 +1,79 @@
+"""
+Tests for the FAISS position <-> product ID map.
+"""
+
+import uuid
+
+import numpy as np
+
+from backend.ml.retrieval.id_map import ProductIdMap
+
+
+def test_uuid_lookups_round_trip():
+    """UUID maps are stored as bytes and look up in both directions."""
+    product_ids = [str(uuid.uuid4()) for _ in range(50)]
+    id_map = ProductIdMap.from_product_ids(product_ids)
+
+    assert id_map.is_uuid
+    assert len(id_map) == 50
+    assert id_map[7] == product_ids[7]
+    assert id_map.product_ids_at(np.array([3, 0])) == [product_ids[3], product_ids[0]]
+
+    for position, product_id in enumerate(product_ids):
+        assert id_map.position_of(product_id) == position
+        assert id_map.position_of(uuid.UUID(product_id)) == position
+        assert id_map.position_of(product_id.upper()) == position
+
+
+def test_uuid_misses():
+    """Unknown and unparseable IDs are misses."""
+    product_ids = [str(uuid.uuid4()) for _ in range(10)]
+    id_map = ProductIdMap.from_product_ids(product_ids)
+
+    positions = id_map.positions_of([str(uuid.uuid4()), "not-a-uuid", None, product_ids[4]])
+
+    assert positions.tolist() == [-1, -1, -1, 4]
+    assert id_map.get(10) is None
+    assert id_map.get(-1) is None
+
+
+def test_unparseable_ids_do_not_match_nil_uuid():
+    """Unparseable IDs must not be encoded onto the nil UUID row."""
+    nil = str(uuid.UUID(int=0))
+    id_map = ProductIdMap.from_product_ids([str(uuid.uuid4()), nil])
+
+    assert id_map.position_of(nil) == 1
+    assert id_map.position_of("garbage") is None
+    assert id_map.position_of(12345) is None
+
+
+def test_non_uuid_ids():
+    """Non-UUID IDs fall back to unicode keys with the same lookup semantics."""
+    id_map = ProductIdMap.from_product_ids([1, 2, 30])
+
+    assert not id_map.is_uuid
+    assert id_map[2] == "30"
+    assert id_map.position_of(2) == 1
+    assert id_map.position_of("30") == 2
+    assert id_map.position_of("4") is None
+
+
+def test_non_uuid_queries_are_not_truncated():
+    """Queries wider than the stored keys are misses, not prefix matches."""
+    assert ProductIdMap.from_product_ids([1, 2, 3]).position_of("12") is None
+    assert ProductIdMap.from_product_ids(["a", "bb"]).position_of("bbz") is None
+    assert ProductIdMap.from_product_ids(["a", "bb"]).positions_of(["bb", "bbb"]).tolist() == [
+        1,
+        -1,
+    ]
+
+
+def test_save_and_load(tmp_path):
+    """Saved maps load (memory-mapped) with identical lookups."""
+    product_ids = [str(uuid.uuid4()) for _ in range(20)]
+    ProductIdMap.from_product_ids(product_ids).save(tmp_path)
+
+    loaded = ProductIdMap.load(tmp_path)
+
+    assert loaded.product_ids_at(np.arange(20)) == product_ids
+    assert loaded.position_of(product_ids[11]) == 11
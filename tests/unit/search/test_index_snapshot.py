@@ -0,0 +1,279 @@
+"""
+Tests for index snapshot search over the main, delta and tombstone layers.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+import pytest
+
+from backend.ml.retrieval import index_manager
+from backend.ml.retrieval.id_map import ProductIdMap
+from backend.ml.retrieval.index_manager import FAISSIndexManager, IndexSnapshot
+from backend.ml.retrieval.index_updates import IndexDelta
+from backend.ml.retrieval.similarity_search import SimilaritySearch
+
+DIMENSION = 16
+
+
+def random_vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+
+@pytest.fixture
+def manager():
+    manager = FAISSIndexManager()
+    manager.reset()
+    yield manager
+    manager.reset()
+
+
+def publish_flat(
+    manager: FAISSIndexManager, vectors: np.ndarray, prefix: str = "p"
+) -> IndexSnapshot:
+    index = faiss.IndexFlatL2(DIMENSION)
+    index.add(vectors)
+    product_ids = [f"{prefix}{i}" for i in range(len(vectors))]
+    return manager._publish(
+        index=index,
+        id_mapping=ProductIdMap.from_product_ids(product_ids),
+        vectors=vectors,
+        metadata={},
+    )
+
+
+def exact_top_k(vectors: np.ndarray, product_ids, query: np.ndarray, k: int):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    return [product_ids[i] for i in np.argsort(distances, kind="stable")[:k]]
+
+
+def test_search_merges_delta_and_hides_tombstones(manager):
+    """Changed products are found at their new vectors, deleted ones never."""
+    vectors = random_vectors(200)
+    publish_flat(manager, vectors)
+
+    moved = random_vectors(1, seed=1)[0] * 10
+    added = random_vectors(1, seed=2)[0] * 10
+    delta = IndexDelta()
+    delta.add_upsert("p0", moved)
+    delta.add_upsert("new", added)
+    for i in range(1, 40):
+        delta.add_delete(f"p{i}")
+    snapshot = manager.apply_delta(delta)
+
+    assert snapshot.num_tombstones == 40
+    assert snapshot.delta_size == 2
+    assert snapshot.ntotal == 162
+
+    live_vectors, live_ids = snapshot.live_vectors()
+    queries = np.vstack([vectors[1], vectors[0], moved, added])
+    distances, labels = snapshot.search(queries, 10)
+
+    assert labels.shape == (4, 10)
+    assert (labels >= 0).all()
+    assert np.all(np.diff(distances, axis=1) >= 0)
+    for query, row in zip(queries, labels):
+        assert snapshot.product_ids_at(row) == exact_top_k(live_vectors, live_ids, query, 10)
+
+    assert snapshot.product_ids_at(labels[2, :1]) == ["p0"]
+    assert snapshot.product_ids_at(labels[3, :1]) == ["new"]
+
+
+def test_search_with_every_main_vector_deleted(manager):
+    """Only delta vectors are returned once the whole main index is tombstoned."""
+    vectors = random_vectors(5)
+    publish_flat(manager, vectors)
+
+    delta = IndexDelta()
+    for i in range(5):
+        delta.add_delete(f"p{i}")
+    delta.add_upsert("new", vectors[0])
+    snapshot = manager.apply_delta(delta)
+
+    distances, labels = snapshot.search(vectors[:1], 3)
+
+    assert labels.shape == (1, 1)
+    assert snapshot.product_ids_at(labels[0]) == ["new"]
+    assert distances[0, 0] == pytest.approx(0.0)
+
+
+def test_filtered_search_returns_min_k_allowed(manager):
+    """Approximate indices still return min(k, allowed) allowed results."""
+    vectors = random_vectors(2000)
+    quantizer = faiss.IndexFlatL2(DIMENSION)
+    index = faiss.IndexIVFFlat(quantizer, DIMENSION, 32)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = 1
+    snapshot = manager._publish(
+        index=index,
+        id_mapping=ProductIdMap.from_product_ids([f"p{i}" for i in range(2000)]),
+        vectors=vectors,
+        metadata={},
+    )
+
+    allowed = np.zeros(snapshot.main_size, dtype=bool)
+    allowed[np.random.default_rng(3).choice(2000, 25, replace=False)] = True
+    queries = random_vectors(4, seed=4)
+
+    for k in (10, 25, 100):
+        distances, labels = snapshot.search_filtered(queries, k, allowed)
+
+        assert labels.shape == (4, min(k, 25))
+        assert (labels >= 0).all()
+        assert allowed[labels].all()
+        assert np.isfinite(distances).all()
+
+    distances, labels = snapshot.search_filtered(queries, 10, np.zeros(2000, dtype=bool))
+    assert labels.shape == (4, 0)
+
+
+def test_pq_rerank_matches_exact_distances(monkeypatch):
+    """Re-ranked PQ results carry exact distances, however the queries are chunked."""
+    vectors = random_vectors(2000)
+    index = faiss.IndexIVFPQ(faiss.IndexFlatL2(DIMENSION), DIMENSION, 16, 4, 8)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = 16
+    snapshot = IndexSnapshot(
+        index=index,
+        id_mapping=ProductIdMap.from_product_ids([f"p{i}" for i in range(2000)]),
+        vectors=vectors.astype(np.float16),
+        refine_factor=4,
+    )
+    queries = random_vectors(9, seed=5)
+
+    distances, labels = snapshot.search(queries, 5)
+    monkeypatch.setattr(index_manager, "RERANK_CHUNK_ELEMENTS", 2 * 20 * DIMENSION)
+    chunked_distances, chunked_labels = snapshot.search(queries, 5)
+
+    exact = ((vectors.astype(np.float16).astype(np.float32)[labels] - queries[:, None]) ** 2).sum(
+        axis=2
+    )
+    assert labels.shape == (9, 5)
+    np.testing.assert_allclose(distances, exact, rtol=1e-4, atol=1e-3)
+    np.testing.assert_array_equal(chunked_labels, labels)
+    np.testing.assert_allclose(chunked_distances, distances, rtol=1e-5)
+
+
+def test_filtered_search_falls_back_to_exact_scan():
+    """When IVF probing misses allowed vectors (-1 labels), the allowed set is scanned exactly."""
+    vectors = random_vectors(2000)
+    index = faiss.IndexIVFFlat(faiss.IndexFlatL2(DIMENSION), DIMENSION, 32)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = 1
+    product_ids = [f"p{i}" for i in range(2000)]
+    snapshot = IndexSnapshot(
+        index=index, id_mapping=ProductIdMap.from_product_ids(product_ids), vectors=vectors
+    )
+    allowed = np.zeros(2000, dtype=bool)
+    allowed_positions = np.random.default_rng(3).choice(2000, 25, replace=False)
+    allowed[allowed_positions] = True
+    queries = random_vectors(4, seed=4)
+
+    # The probed lists alone cannot supply 20 allowed neighbours
+    params, _refs = IndexSnapshot._selector_params(allowed, index=index)
+    _, probed = index.search(queries, 20, params=params)
+    assert (probed < 0).any()
+
+    distances, labels = snapshot.search_filtered(queries, 20, allowed)
+
+    allowed_ids = [product_ids[i] for i in allowed_positions]
+    for query, row in zip(queries, labels):
+        assert snapshot.product_ids_at(row) == exact_top_k(
+            vectors[allowed_positions], allowed_ids, query, 20
+        )
+    assert np.all(np.diff(distances, axis=1) >= 0)
+
+
+def test_selector_params_keep_index_search_settings():
+    """Selector parameters carry the index's nprobe / efSearch, which they replace."""
+    vectors = random_vectors(500)
+    mask = np.ones(500, dtype=bool)
+
+    ivf = faiss.IndexIVFFlat(faiss.IndexFlatL2(DIMENSION), DIMENSION, 8)
+    ivf.train(vectors)
+    ivf.nprobe = 5
+    params, _refs = IndexSnapshot._selector_params(mask, index=ivf)
+    assert isinstance(params, faiss.SearchParametersIVF)
+    assert params.nprobe == 5
+
+    wrapped = faiss.IndexIDMap2(ivf)
+    params, _refs = IndexSnapshot._selector_params(mask, index=wrapped)
+    assert isinstance(params, faiss.SearchParametersIVF)
+    assert params.nprobe == 5
+
+    hnsw = faiss.IndexHNSWFlat(DIMENSION, 16)
+    hnsw.hnsw.efSearch = 77
+    params, _refs = IndexSnapshot._selector_params(mask, index=hnsw)
+    assert isinstance(params, faiss.SearchParametersHNSW)
+    assert params.efSearch == 77
+
+    params, _refs = IndexSnapshot._selector_params(mask, index=faiss.IndexFlatL2(DIMENSION))
+    assert type(params) is faiss.SearchParameters
+    assert params.sel is not None
+
+
+def test_filtered_hnsw_search_only_returns_allowed():
+    """The selector restricts HNSW searches to allowed labels."""
+    vectors = random_vectors(1000)
+    index = faiss.IndexHNSWFlat(DIMENSION, 16)
+    index.add(vectors)
+    index.hnsw.efSearch = 128
+    snapshot = IndexSnapshot(
+        index=index,
+        id_mapping=ProductIdMap.from_product_ids([f"p{i}" for i in range(1000)]),
+        vectors=vectors,
+    )
+    allowed = np.arange(1000) % 3 == 0
+
+    _, labels = snapshot.search_filtered(random_vectors(5, seed=6), 10, allowed)
+
+    assert labels.shape == (5, 10)
+    assert allowed[labels].all()
+
+
+def test_swap_during_search_keeps_the_pinned_snapshot(monkeypatch, manager):
+    """A search that started before a swap finishes on the snapshot it pinned."""
+    old = publish_flat(manager, random_vectors(100), prefix="old")
+    search = SimilaritySearch(index_manager=manager)
+
+    searching = threading.Event()
+    swapped = threading.Event()
+    original_search = IndexSnapshot.search
+
+    def paused_search(snapshot, queries, k):
+        if snapshot is old:
+            searching.set()
+            assert swapped.wait(5)
+        return original_search(snapshot, queries, k)
+
+    monkeypatch.setattr(IndexSnapshot, "search", paused_search)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        running = executor.submit(search.search, random_vectors(1, seed=5)[0], 20)
+        assert searching.wait(5)
+        new = publish_flat(manager, random_vectors(40, seed=6), prefix="new")
+        swapped.set()
+        results = running.result(timeout=5)
+
+    assert new.version > old.version
+    assert len(results) == 20
+    assert all(product_id.startswith("old") for product_id in results.product_ids)
+
+    results = search.search(random_vectors(1, seed=5)[0], 20)
+    assert all(product_id.startswith("new") for product_id in results.product_ids)
+
+
+def test_search_does_not_wait_for_a_running_build(manager):
+    """Readers never take the build lock, so searches proceed during a rebuild."""
+    publish_flat(manager, random_vectors(100))
+    search = SimilaritySearch(index_manager=manager)
+
+    with manager.build_lock:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = executor.submit(search.search, random_vectors(1, seed=7)[0], 10)
+            assert len(results.result(timeout=5)) == 10
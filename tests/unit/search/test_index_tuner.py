@@ -0,0 +1,35 @@
+"""
+Tests for FAISS index parameter tuning.
+"""
+
+import faiss
+import numpy as np
+
+from backend.ml.retrieval.index_tuner import IndexTuner
+
+
+def test_tune_ivf_reaches_target_recall():
+    """The cheapest nprobe reaching the recall target is set on the index."""
+    vectors = np.random.default_rng(0).standard_normal((3000, 16)).astype(np.float32)
+    tuner = IndexTuner()
+    nlist = tuner.build_params("IVF", len(vectors))["nlist"]
+
+    index = faiss.IndexIVFFlat(faiss.IndexFlatL2(16), 16, nlist)
+    index.train(vectors)
+    index.add(vectors)
+
+    result = tuner.tune(index, vectors, "IVF", {"nlist": nlist})
+
+    assert result.recall >= tuner.target_recall
+    assert index.nprobe == result.params["nprobe"]
+    assert result.sweep[-1]["recall"] == result.recall
+    assert all(step["recall"] < tuner.target_recall for step in result.sweep[:-1])
+
+
+def test_tune_flat_index_is_skipped():
+    """Flat indices have no search parameters to tune."""
+    vectors = np.random.default_rng(0).standard_normal((100, 8)).astype(np.float32)
+    index = faiss.IndexFlatL2(8)
+    index.add(vectors)
+
+    assert IndexTuner().tune(index, vectors, "Flat") is None
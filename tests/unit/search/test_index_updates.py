@@ -0,0 +1,121 @@
+"""
+Tests for index delta stream encoding.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+
+from backend.ml.retrieval import index_updates
+from backend.ml.retrieval.id_map import ProductIdMap
+from backend.ml.retrieval.index_manager import FAISSIndexManager
+from backend.ml.retrieval.index_updates import (
+    OP_DELETE,
+    OP_UPSERT,
+    IndexDeltaConsumer,
+    decode_delta_entries,
+    stream_id_from_timestamp,
+)
+
+
+def upsert_entry(entry_id: bytes, product_id: str, vector) -> tuple:
+    return (
+        entry_id,
+        {
+            b"op": OP_UPSERT,
+            b"product_id": product_id.encode(),
+            b"vector": np.asarray(vector, dtype="<f4").tobytes(),
+        },
+    )
+
+
+def test_naive_timestamps_are_utc():
+    """Index metadata timestamps are naive UTC, not local time."""
+    expected = int(datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc).timestamp() * 1000)
+
+    assert stream_id_from_timestamp("2024-05-01T12:00:00") == f"{expected}-0"
+    assert stream_id_from_timestamp("2024-05-01T14:00:00+02:00") == f"{expected}-0"
+
+
+def test_decode_applies_entries_in_order():
+    """Later entries for a product win."""
+    entries = [
+        upsert_entry(b"1-0", "a", [1.0, 2.0]),
+        upsert_entry(b"2-0", "b", [3.0, 4.0]),
+        (b"3-0", {b"op": OP_DELETE, b"product_id": b"a"}),
+        upsert_entry(b"4-0", "b", [5.0, 6.0]),
+    ]
+
+    delta, skipped = decode_delta_entries(entries, dimension=2)
+
+    assert skipped == 0
+    assert delta.deletes == ["a"]
+    assert list(delta.upserts) == ["b"]
+    np.testing.assert_array_equal(delta.upserts["b"], [5.0, 6.0])
+
+
+def test_decode_skips_unusable_entries():
+    """Entries with the wrong dimension or missing fields are skipped, not raised."""
+    entries = [
+        upsert_entry(b"1-0", "a", [1.0, 2.0, 3.0]),
+        (b"2-0", {b"op": OP_UPSERT, b"product_id": b"b"}),
+        (b"3-0", {b"op": OP_UPSERT, b"product_id": b"c", b"vector": b"\x00\x01\x02"}),
+        upsert_entry(b"4-0", "d", [1.0, 2.0]),
+    ]
+
+    delta, skipped = decode_delta_entries(entries, dimension=2)
+
+    assert skipped == 3
+    assert list(delta.upserts) == ["d"]
+
+
+def test_consumer_moves_past_unusable_entries(monkeypatch):
+    """A batch with bad entries is applied without them and the position advances."""
+    reads = []
+    batches = [
+        [
+            upsert_entry(b"5-0", "bad", [1.0, 2.0, 3.0]),
+            upsert_entry(b"6-0", "new", [0.5, 0.5]),
+        ]
+    ]
+
+    def xread(streams, count=None, block=None):
+        reads.append(dict(streams))
+        return [(b"stream", batches.pop(0))] if batches else []
+
+    client = SimpleNamespace(xread=xread)
+    monkeypatch.setattr(
+        index_updates, "get_redis_cache", lambda config: SimpleNamespace(_get_client=lambda: client)
+    )
+
+    manager = FAISSIndexManager()
+    manager.reset()
+    try:
+        index = faiss.IndexFlatL2(2)
+        vectors = np.zeros((3, 2), dtype=np.float32)
+        index.add(vectors)
+        manager._publish(
+            index=index,
+            id_mapping=ProductIdMap.from_product_ids(["a", "b", "c"]),
+            vectors=vectors,
+            metadata={},
+        )
+        consumer = IndexDeltaConsumer(manager)
+
+        assert consumer.poll_once() == 2
+        assert consumer.poll_once() == 0
+
+        snapshot = manager.get_snapshot()
+        assert snapshot.delta_stream_id == "6-0"
+        assert snapshot.delta_id_mapping.values() == ["new"]
+        assert consumer.entries_applied == 1
+        assert consumer.entries_skipped == 1
+
+        # No recorded position: read from the start of the stream, not "$"
+        assert list(reads[0].values()) == ["0-0"]
+        assert list(reads[1].values()) == ["6-0"]
+
+    finally:
+        manager.reset()
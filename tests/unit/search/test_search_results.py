@@ -0,0 +1,113 @@
+"""
+Tests for the columnar SearchResults type.
+"""
+
+import numpy as np
+import pytest
+
+from backend.ml.retrieval.similarity_search import SearchResult, SearchResults
+
+
+def make_results() -> SearchResults:
+    return SearchResults(
+        k=5,
+        product_ids=np.array(["a", "b", "c", "d", "e"]),
+        distances=np.array([0.1, 0.2, 0.3, 0.4, 0.5]),
+        similarities=np.array([0.9, 0.8, 0.7, 0.6, 0.5]),
+        scores={"final_score": np.array([0.5, 0.9, 0.7, 0.9, 0.1], dtype=np.float32)},
+    )
+
+
+def test_select_moves_every_column_together():
+    """Index lists, masks and slices reorder IDs, distances and scores as one row."""
+    results = make_results()
+    assert results.results[0].product_id == "a"
+
+    results.select([3, 0, 1])
+    assert results.get_product_ids() == ["d", "a", "b"]
+    np.testing.assert_allclose(results.distances, [0.4, 0.1, 0.2])
+    np.testing.assert_allclose(results.similarities, [0.6, 0.9, 0.8])
+    np.testing.assert_allclose(results.scores["final_score"], [0.9, 0.5, 0.9])
+    assert results.total_found == 3
+
+    # The per-item view is rebuilt, with ranks as the new row positions
+    assert [(r.product_id, r.rank) for r in results.results] == [("d", 0), ("a", 1), ("b", 2)]
+    assert results.results[0].metadata == {"final_score": pytest.approx(0.9)}
+
+    results.select(np.array([True, False, True]))
+    assert results.get_product_ids() == ["d", "b"]
+    assert results.truncate(1).get_product_ids() == ["d"]
+
+
+def test_copy_is_independent_of_selects():
+    """Selecting rows of a copy leaves the original intact."""
+    results = make_results()
+    top = results.copy().select([4])
+
+    assert top.get_product_ids() == ["e"]
+    assert len(results) == 5
+    assert results.get_product_ids() == ["a", "b", "c", "d", "e"]
+
+
+def test_sort_by_is_stable():
+    """Ties keep their previous order, in both directions."""
+    results = make_results().sort_by("final_score")
+    assert results.get_product_ids() == ["b", "d", "c", "a", "e"]
+
+    results.sort_by("distance", descending=False)
+    assert results.get_product_ids() == ["a", "b", "c", "d", "e"]
+
+    results.set_score("boost", np.zeros(5))
+    assert results.sort_by("boost").get_product_ids() == ["a", "b", "c", "d", "e"]
+
+
+def test_exclude_keep_and_score_shapes():
+    """Rows are dropped by product ID; score columns must match the row count."""
+    results = make_results().exclude("b").keep({"a", "c", "e", "z"})
+    assert results.get_product_ids() == ["a", "c", "e"]
+
+    with pytest.raises(ValueError):
+        results.set_score("boost", np.zeros(5))
+    np.testing.assert_array_equal(results.get_score("missing", default=0.0), np.zeros(3))
+
+
+def test_to_score_dicts():
+    """Score dicts carry rank, similarity and final score (similarity if unranked)."""
+    results = make_results().sort_by("final_score").truncate(2)
+    results.set_score("popularity_score", np.array([0.25, 0.75]))
+
+    assert results.to_score_dicts() == {
+        "b": {
+            "similarity": pytest.approx(0.8),
+            "rank": 0,
+            "final_score": pytest.approx(0.9),
+            "popularity_score": 0.25,
+            "price_affinity_score": None,
+            "brand_match_score": None,
+        },
+        "d": {
+            "similarity": pytest.approx(0.6),
+            "rank": 1,
+            "final_score": pytest.approx(0.9),
+            "popularity_score": 0.75,
+            "price_affinity_score": None,
+            "brand_match_score": None,
+        },
+    }
+
+    unranked = SearchResults(product_ids=np.array([7]), similarities=np.array([0.5]))
+    assert unranked.to_score_dicts()[7]["final_score"] == 0.5
+
+
+def test_from_result_list_keeps_numeric_metadata_as_scores():
+    """Per-item results become columns; non-numeric metadata is not a score."""
+    results = SearchResults(
+        results=[
+            SearchResult(1, 0.2, 0.8, 0, metadata={"final_score": 0.3, "brand": "x"}),
+            SearchResult(2, 0.1, 0.9, 1, metadata={"final_score": 0.6, "brand": "y"}),
+        ]
+    )
+
+    assert set(results.scores) == {"final_score"}
+    assert results.sort_by("final_score").get_product_ids() == [2, 1]
+    assert results.results[0].to_dict()["rank"] == 0
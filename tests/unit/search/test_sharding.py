@@ -0,0 +1,95 @@
+"""
+Tests for partitioning the main index into attribute shards.
+"""
+
+import faiss
+import numpy as np
+import pytest
+
+from backend.ml.retrieval.attribute_store import ProductAttributeStore
+from backend.ml.retrieval.id_map import ProductIdMap
+from backend.ml.retrieval.index_manager import IndexSnapshot
+from backend.ml.retrieval.sharding import OTHER_SHARD, ShardedIndex
+
+DIMENSION = 16
+NUM_VECTORS = 3000
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(0).standard_normal((NUM_VECTORS, DIMENSION)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def pq_index(vectors):
+    index = faiss.IndexIVFPQ(faiss.IndexFlatL2(DIMENSION), DIMENSION, 16, 4, 8)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = 16
+    return index
+
+
+@pytest.fixture
+def attributes():
+    store = ProductAttributeStore.empty(NUM_VECTORS)
+    # Categories 1 and 2 get their own shards, 3..12 share the "other" shard
+    store.columns["category_id"][:] = np.r_[
+        np.full(1500, 1), np.full(1000, 2), np.arange(500) % 10 + 3
+    ]
+    store.columns["is_active"][:] = True
+    return store
+
+
+def test_flat_shards_partition_positions(vectors, attributes):
+    """Every position lands in exactly one shard, labelled with its main position."""
+    shards = ShardedIndex.build(vectors, attributes, "category_id", min_shard_size=600)
+
+    assert sorted(shards.shards) == [OTHER_SHARD, 1, 2]
+    assert sum(shard.size for shard in shards.shards.values()) == NUM_VECTORS
+
+    _, labels = shards.search(vectors[1600:1601], 1, [2])
+    assert labels[0, 0] == 1600
+
+
+def test_ivf_shards_clone_the_main_index(vectors, attributes, pq_index):
+    """IVF-family main indices are cloned, so shards store codes instead of floats."""
+    shards = ShardedIndex.build(
+        vectors, attributes, "category_id", min_shard_size=600, main_index=pq_index
+    )
+
+    for shard in shards.shards.values():
+        assert isinstance(faiss.downcast_index(shard.index), faiss.IndexIVFPQ)
+    assert sum(shard.index.ntotal for shard in shards.shards.values()) == NUM_VECTORS
+
+
+def test_memory_limit(vectors, attributes):
+    """Shards needing more than max_memory_bytes are refused."""
+    with pytest.raises(ValueError, match="limit"):
+        ShardedIndex.build(
+            vectors, attributes, "category_id", min_shard_size=600, max_memory_bytes=1024
+        )
+
+
+def test_routed_filtered_search_over_pq_shards(vectors, attributes, pq_index):
+    """Searching routed PQ shards returns exact, allowed results."""
+    shards = ShardedIndex.build(
+        vectors, attributes, "category_id", min_shard_size=600, main_index=pq_index
+    )
+    snapshot = IndexSnapshot(
+        index=pq_index,
+        id_mapping=ProductIdMap.from_product_ids([f"p{i}" for i in range(NUM_VECTORS)]),
+        vectors=vectors,
+        attributes=attributes,
+        shards=shards,
+        refine_factor=4,
+    )
+
+    allowed = attributes.columns["category_id"] == 2
+    queries = vectors[[1700, 2100]]
+    distances, labels = snapshot.search_filtered(queries, 5, allowed, shard_keys=[2])
+
+    assert labels.shape == (2, 5)
+    assert allowed[labels].all()
+    assert labels[:, 0].tolist() == [1700, 2100]
+    exact = ((vectors[labels] - queries[:, None]) ** 2).sum(axis=2)
+    np.testing.assert_allclose(distances, exact, rtol=1e-4, atol=1e-4)